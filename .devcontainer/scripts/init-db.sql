@@ -8,6 +8,10 @@ CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 -- Create basic tables based on the KireMisu schema
 -- These are minimal tables for development setup
 
+-- Change sequence shared by every synced table and tombstone, so client
+-- sync can page through all library changes in one order
+CREATE SEQUENCE IF NOT EXISTS library_change_seq;
+
 -- Series table
 CREATE TABLE IF NOT EXISTS series (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -31,7 +35,11 @@ CREATE TABLE IF NOT EXISTS series (
     -- Timestamps
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    last_read_at TIMESTAMP WITH TIME ZONE
+    last_read_at TIMESTAMP WITH TIME ZONE,
+    
+    -- Delta sync: last change position and the transaction that made it
+    change_seq BIGINT NOT NULL DEFAULT nextval('library_change_seq'),
+    change_xid XID8 NOT NULL DEFAULT pg_current_xact_id()
 );
 
 -- Chapters table (metadata only, files stored in mounted volumes)
@@ -53,6 +61,8 @@ CREATE TABLE IF NOT EXISTS chapters (
     page_count INTEGER DEFAULT 0,
     file_size BIGINT,
     file_modified_at TIMESTAMP WITH TIME ZONE,
+    file_quick_hash TEXT, -- '<algorithm>:<hex>' of size + first and last 64 KiB
+    file_hash TEXT, -- '<algorithm>:<hex>' of the whole file, matches moved archives
     
     -- Processing status
     scan_status TEXT DEFAULT 'pending', -- pending, scanned, error
@@ -61,6 +71,9 @@ CREATE TABLE IF NOT EXISTS chapters (
     
     -- Chapter metadata
     source_metadata JSONB DEFAULT '{}',
+    page_hashes BYTEA, -- 64-bit perceptual hash per page, packed little-endian uint64
+    page_dimensions BYTEA, -- width and height per page, packed little-endian uint32 pairs (0 if unknown)
+    normalized_path TEXT, -- repacked STORED CBZ copy, relative to the processed data path
     
     -- Reading progress
     is_read BOOLEAN DEFAULT false,
@@ -71,6 +84,10 @@ CREATE TABLE IF NOT EXISTS chapters (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
+    -- Delta sync: last change position and the transaction that made it
+    change_seq BIGINT NOT NULL DEFAULT nextval('library_change_seq'),
+    change_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    
     UNIQUE(series_id, chapter_number)
 );
 
@@ -114,9 +131,65 @@ CREATE TABLE IF NOT EXISTS job_queue (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Reading progress per user and chapter. The users table is created by the
+-- application (app/db/init_db.py), so user_id has no foreign key; deleting a
+-- user deletes its progress.
+CREATE TABLE IF NOT EXISTS reading_progress (
+    user_id INTEGER NOT NULL,
+    chapter_id UUID NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
+    last_page_read INTEGER NOT NULL DEFAULT 0,
+    is_read BOOLEAN NOT NULL DEFAULT false,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    
+    -- Delta sync, as for series and chapters
+    change_seq BIGINT NOT NULL DEFAULT nextval('library_change_seq'),
+    change_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    
+    -- Covering: "is this chapter read" and progress lookups are index-only scans
+    PRIMARY KEY (user_id, chapter_id) INCLUDE (is_read, last_page_read)
+);
+
+-- The chapter each user last opened in each series, for the continue reading shelf
+CREATE TABLE IF NOT EXISTS series_reading (
+    user_id INTEGER NOT NULL,
+    series_id UUID NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    chapter_id UUID NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, series_id)
+);
+
+-- Finished jobs moved out of job_queue by the workers, in daily partitions
+-- (job_history_pYYYYMMDD, UTC days) created on demand and dropped whole
+-- once past the retention period
+CREATE TABLE IF NOT EXISTS job_history (
+    id UUID NOT NULL,
+    job_type TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER,
+    attempts INTEGER,
+    max_attempts INTEGER,
+    error_message TEXT,
+    scheduled_at TIMESTAMP WITH TIME ZONE,
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE
+) PARTITION BY RANGE (completed_at);
+
+-- Deleted series and chapters, kept for client delta sync
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    change_seq BIGINT PRIMARY KEY DEFAULT nextval('library_change_seq'),
+    change_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    entity TEXT NOT NULL, -- series, chapter
+    entity_id UUID NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Create indexes for performance
 CREATE INDEX IF NOT EXISTS idx_series_title ON series USING GIN (title_primary gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_series_genres ON series USING GIN (genres);
+CREATE INDEX IF NOT EXISTS idx_series_tags ON series USING GIN (tags);
+CREATE INDEX IF NOT EXISTS idx_series_user_metadata ON series USING GIN (user_metadata);
 CREATE INDEX IF NOT EXISTS idx_series_status ON series (status);
 CREATE INDEX IF NOT EXISTS idx_series_reading_status ON series (reading_status);
 CREATE INDEX IF NOT EXISTS idx_series_watching_config ON series USING GIN (watching_config);
@@ -126,12 +199,31 @@ CREATE INDEX IF NOT EXISTS idx_chapters_number ON chapters (series_id, chapter_n
 CREATE INDEX IF NOT EXISTS idx_chapters_scan_status ON chapters (scan_status);
 CREATE INDEX IF NOT EXISTS idx_chapters_relative_path ON chapters (relative_path);
 CREATE INDEX IF NOT EXISTS idx_chapters_is_read ON chapters (is_read);
+CREATE INDEX IF NOT EXISTS idx_chapters_file_hash ON chapters (file_hash);
+
+CREATE INDEX IF NOT EXISTS idx_series_change_seq ON series (change_seq);
+CREATE INDEX IF NOT EXISTS idx_series_change_xid ON series (change_xid);
+CREATE INDEX IF NOT EXISTS idx_chapters_change_seq ON chapters (change_seq);
+CREATE INDEX IF NOT EXISTS idx_chapters_change_xid ON chapters (change_xid);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_change_xid ON sync_tombstones (change_xid);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_deleted_at ON sync_tombstones (deleted_at);
 
 CREATE INDEX IF NOT EXISTS idx_watch_list_series_id ON watch_list (series_id);
 
-CREATE INDEX IF NOT EXISTS idx_job_queue_status ON job_queue (status);
-CREATE INDEX IF NOT EXISTS idx_job_queue_type ON job_queue (job_type);
-CREATE INDEX IF NOT EXISTS idx_job_queue_scheduled ON job_queue (scheduled_at);
+CREATE INDEX IF NOT EXISTS idx_reading_progress_chapter_id ON reading_progress (chapter_id);
+CREATE INDEX IF NOT EXISTS idx_reading_progress_change_seq ON reading_progress (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS idx_series_reading_recent ON series_reading (user_id, updated_at DESC)
+    INCLUDE (chapter_id);
+CREATE INDEX IF NOT EXISTS idx_series_reading_chapter_id ON series_reading (chapter_id);
+
+-- Partial indexes: each covers only the rows one query looks at, so claiming
+-- does not slow down with the number of finished jobs awaiting archival
+CREATE INDEX IF NOT EXISTS idx_job_queue_claimable ON job_queue (priority DESC, scheduled_at)
+    WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_job_queue_running ON job_queue (started_at) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_job_queue_finished ON job_queue (completed_at)
+    WHERE status IN ('completed', 'failed');
+CREATE INDEX IF NOT EXISTS idx_job_history_job_type ON job_history (job_type, completed_at);
 
 -- Create trigger to update updated_at timestamps
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -151,6 +243,60 @@ CREATE TRIGGER update_chapters_updated_at BEFORE UPDATE ON chapters
 CREATE TRIGGER update_watch_list_updated_at BEFORE UPDATE ON watch_list
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Delta sync bookkeeping. Only changes to columns clients receive move a
+-- row forward in the change sequence; e.g. storing page hashes does not.
+CREATE OR REPLACE FUNCTION bump_change_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.change_seq = nextval('library_change_seq');
+    NEW.change_xid = pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER bump_series_change_seq BEFORE UPDATE ON series
+    FOR EACH ROW WHEN (
+        (OLD.title_primary, OLD.title_alt, OLD.description, OLD.status, OLD.genres, OLD.tags,
+         OLD.chapter_count, OLD.reading_status, OLD.user_metadata)
+        IS DISTINCT FROM
+        (NEW.title_primary, NEW.title_alt, NEW.description, NEW.status, NEW.genres, NEW.tags,
+         NEW.chapter_count, NEW.reading_status, NEW.user_metadata)
+    )
+    EXECUTE FUNCTION bump_change_seq();
+
+CREATE TRIGGER bump_chapters_change_seq BEFORE UPDATE ON chapters
+    FOR EACH ROW WHEN (
+        (OLD.series_id, OLD.chapter_number, OLD.title, OLD.volume_number, OLD.page_count)
+        IS DISTINCT FROM
+        (NEW.series_id, NEW.chapter_number, NEW.title, NEW.volume_number, NEW.page_count)
+    )
+    EXECUTE FUNCTION bump_change_seq();
+
+CREATE TRIGGER bump_reading_progress_change_seq BEFORE UPDATE ON reading_progress
+    FOR EACH ROW WHEN (
+        (OLD.last_page_read, OLD.is_read) IS DISTINCT FROM (NEW.last_page_read, NEW.is_read)
+    )
+    EXECUTE FUNCTION bump_change_seq();
+
+CREATE OR REPLACE FUNCTION record_sync_tombstones()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO sync_tombstones (entity, entity_id)
+    SELECT TG_ARGV[0], id FROM deleted_rows;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Statement-level, so deleting a series with thousands of chapters writes
+-- its tombstones in one INSERT
+CREATE TRIGGER record_series_tombstones AFTER DELETE ON series
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_sync_tombstones('series');
+
+CREATE TRIGGER record_chapters_tombstones AFTER DELETE ON chapters
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_sync_tombstones('chapter');
+
 -- Insert sample data for development (metadata only)
 -- Note: Actual manga files should be placed in the mounted manga library directory
 INSERT INTO series (title_primary, description, genres, status) VALUES
@@ -1,7 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, health
+from app.api.v1.endpoints import auth, events, health, library, progress, sync, users
 
 api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["health"])
-api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
\ No newline at end of file
+api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
+api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(library.router, prefix="/library", tags=["library"])
+api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
@@ -1,18 +1,25 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.core.forwarded import client_ip
+from app.core.rate_limit import RateLimitExceeded, get_login_rate_limiter
+from app.core.signed_urls import verify_path
+from app.core.startup import register_warmup
+from app.db.database import SessionLocal, get_db
 from app.services.user import UserService
 from app.schemas.user import Token, TokenData, UserResponse
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(
+    tokenUrl="api/v1/auth/login", auto_error=False
+)
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -31,19 +38,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    user_service: UserService = Depends(get_user_service)
-):
-    credentials_exception = HTTPException(
+@register_warmup("jwt")
+def warm_jwt() -> None:
+    """Exercise JWT encode/decode so the crypto backends are loaded."""
+    token = create_access_token({"sub": "warmup"}, expires_delta=timedelta(minutes=1))
+    jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _user_from_token(token: str, user_service: UserService):
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        # Scoped tokens (signed media URLs) are not access tokens.
+        if username is None or payload.get("scope") is not None:
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
@@ -54,16 +68,101 @@ async def get_current_user(
         raise credentials_exception
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_service: UserService = Depends(get_user_service)
+):
+    return _user_from_token(token, user_service)
+
 async def get_current_active_user(current_user = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+def get_current_stream_user(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    access_token: Optional[str] = Query(
+        None, description="Bearer token, for clients that cannot set headers"
+    ),
+):
+    """Authenticate the event stream.
+
+    Browsers' EventSource cannot send an Authorization header, so the token
+    may also be passed as the ``access_token`` query parameter. Only the
+    event stream accepts that: media URLs use signatures instead (see
+    ``get_current_media_user``). The user is looked up with a short-lived
+    session: a ``get_db`` session would stay checked out for as long as the
+    stream is open.
+    """
+    db = SessionLocal()
+    try:
+        user = _user_from_token(token or access_token or "", UserService(db))
+    finally:
+        db.close()
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+def get_current_media_user(
+    request: Request,
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    sig: Optional[str] = Query(
+        None,
+        description=(
+            "Signature of a signed media URL, for clients that cannot set headers"
+        ),
+    ),
+):
+    """Authenticate page, tile and download requests.
+
+    Accepts a bearer token, or a short-lived ``sig`` signed for the
+    requested path, so image tags and download links work without putting
+    an access token in the URL. Uses a short-lived session like
+    ``get_current_stream_user``, since downloads outlive the request.
+    """
+    db = SessionLocal()
+    try:
+        user_service = UserService(db)
+        if token:
+            user = _user_from_token(token, user_service)
+        else:
+            username = verify_path(sig, request.url.path) if sig else None
+            user = user_service.get_user_by_username(username) if username else None
+            if user is None:
+                raise _credentials_exception()
+    finally:
+        db.close()
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+async def get_current_active_superuser(current_user = Depends(get_current_active_user)):
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges"
+        )
+    return current_user
+
 @router.post("/login", response_model=Token)
-async def login(
+def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     user_service: UserService = Depends(get_user_service)
 ):
+    # A plain def, so the limiter's backend calls and bcrypt run in the
+    # threadpool rather than stalling every request on the event loop.
+    # Shed excess attempts before the database lookup and bcrypt verify
+    if settings.LOGIN_RATE_LIMIT_ENABLED:
+        limiter = get_login_rate_limiter()
+        try:
+            limiter.check(client_ip(request), form_data.username)
+        except RateLimitExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": e.retry_after_header},
+            )
+
     user = user_service.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -71,6 +170,8 @@ async def login(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if settings.LOGIN_RATE_LIMIT_ENABLED:
+        limiter.reset_username(form_data.username)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
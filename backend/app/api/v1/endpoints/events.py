@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.v1.endpoints.auth import get_current_stream_user
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def event_stream(request: Request, current_user=Depends(get_current_stream_user)):
+    """Server-sent events for the current user: scan progress and new chapters.
+
+    Idle streams receive a comment line every ``SSE_HEARTBEAT_SECONDS``. A
+    client that falls behind by more than ``SSE_CLIENT_BUFFER_SIZE`` events
+    gets a final ``dropped`` event and should reconnect and resync.
+    """
+    broker = request.app.state.event_broker
+    try:
+        subscriber = broker.subscribe(current_user.id)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(int(settings.SSE_HEARTBEAT_SECONDS))},
+        )
+
+    async def messages():
+        try:
+            yield f"retry: {int(settings.SSE_HEARTBEAT_SECONDS * 1000)}\n\n"
+            async for message in subscriber.messages():
+                yield message
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,24 +1,52 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-
-from app.db.database import get_db
+from fastapi import APIRouter, Request, Response, status
 
 router = APIRouter()
 
 
+@router.get("/live", tags=["health"])
+async def liveness():
+    """Liveness probe. Never touches the database or filesystem."""
+    return {"status": "alive", "service": "kiremisu-api"}
+
+
+@router.get("/ready", tags=["health"])
+async def readiness(request: Request, response: Response):
+    """Readiness probe served from the background health snapshot."""
+    result = request.app.state.health_monitor.readiness()
+    if not request.app.state.ready:
+        result.update(ready=False, status="unhealthy", reason="warming up")
+    if not result["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {**result, "service": "kiremisu-api"}
+
+
 @router.get("/health", tags=["health"])
-async def health_check(db: Session = Depends(get_db)):
-    """Health check endpoint with database connectivity test."""
-    try:
-        # Test database connection
-        db.execute(text("SELECT 1"))
-        db_status = "healthy"
-    except Exception as e:
-        db_status = f"unhealthy: {str(e)}"
+async def health_check(request: Request):
+    """Health check endpoint reporting the latest cached dependency checks."""
+    result = request.app.state.health_monitor.readiness()
+    checks = result.get("checks", {})
     
     return {
-        "status": "healthy" if db_status == "healthy" else "unhealthy",
-        "database": db_status,
+        "status": result["status"],
+        "database": checks.get("database", {}).get("status", "unknown"),
+        "checks": checks,
         "service": "kiremisu-api"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/admission", tags=["health"])
+async def admission_metrics(request: Request):
+    """Admission control metrics of this process: load, queue depth and rejections."""
+    admission = request.app.state.admission
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, "pools": admission.metrics()}
+
+
+@router.get("/startup", tags=["health"])
+async def startup_report(request: Request):
+    """Startup timings: per-module import time, warmup steps and first request."""
+    return {
+        "ready": request.app.state.ready,
+        **request.app.state.startup_report.as_dict(),
+    }
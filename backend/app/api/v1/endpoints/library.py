@@ -0,0 +1,320 @@
+import json
+from typing import List, Optional
+from urllib.parse import quote, urlencode
+from uuid import UUID
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.auth import (
+    get_current_active_superuser,
+    get_current_active_user,
+    get_current_media_user,
+)
+from app.core.cache import SERIES_LIST_TAG, get_response_cache, series_tag
+from app.core.config import settings
+from app.core.delivery import file_response
+from app.core.ranges import (
+    RangeNotSatisfiable,
+    content_range_header,
+    parse_range_header,
+)
+from app.core.signed_urls import sign_path
+from app.db.database import SessionLocal, get_db
+from app.library.archive import ArchiveError
+from app.services.dedupe import DedupeService
+from app.services.download import DownloadService
+from app.services.normalize import NormalizeService
+from app.services.pages import PageService
+from app.repositories.series import SeriesFilters
+from app.services.series import SeriesService
+from app.schemas.library import (
+    ChapterPages,
+    NormalizeStarted,
+    SeriesBrowseResponse,
+    SeriesDetail,
+    SeriesDuplicates,
+    SeriesListResponse,
+    SignedUrl,
+)
+
+router = APIRouter()
+
+
+def _cached_json(key: str, tags: List[str], build) -> Response:
+    """Serve a rendered response model from the response cache."""
+    content = get_response_cache().get_or_compute(
+        key, tags, lambda: build().model_dump_json().encode()
+    )
+    return Response(content=content, media_type="application/json")
+
+
+@router.get("/series", response_model=SeriesListResponse)
+def list_series(
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """List series in title order with their chapter counts."""
+    return _cached_json(
+        f"series-list:{limit}:{offset}",
+        [SERIES_LIST_TAG],
+        lambda: SeriesService(db).list_series(limit, offset),
+    )
+
+
+@router.get("/browse", response_model=SeriesBrowseResponse)
+def browse_series(
+    genre: List[str] = Query([]),
+    tag: List[str] = Query([]),
+    series_status: List[str] = Query([], alias="status"),
+    reading_status: List[str] = Query([]),
+    metadata_key: List[str] = Query([]),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Filter series by genre, tag, status, reading status and metadata key.
+
+    Repeat a parameter to select several values. A series must have every
+    selected genre, tag and metadata key, and any of the selected statuses
+    and reading statuses.
+    """
+    filters = SeriesFilters(
+        genres=sorted(set(genre)),
+        tags=sorted(set(tag)),
+        statuses=sorted(set(series_status)),
+        reading_statuses=sorted(set(reading_status)),
+        metadata_keys=sorted(set(metadata_key)),
+    )
+    return _cached_json(
+        f"series-browse:{limit}:{offset}:{json.dumps(vars(filters), sort_keys=True)}",
+        [SERIES_LIST_TAG],
+        lambda: SeriesService(db).browse_series(filters, limit, offset),
+    )
+
+
+@router.get("/series/{series_id}", response_model=SeriesDetail)
+def get_series(
+    series_id: UUID,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Get a series with its chapter list."""
+    try:
+        return _cached_json(
+            f"series:{series_id}",
+            [series_tag(series_id)],
+            lambda: SeriesService(db).get_series_detail(str(series_id)),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/duplicates", response_model=List[SeriesDuplicates])
+def duplicate_chapters(
+    series_id: Optional[UUID] = None,
+    max_distance: int = Query(
+        4, ge=0, le=10, description="Max differing hash bits per page"
+    ),
+    min_similarity: float = Query(
+        0.8, gt=0, le=1, description="Fraction of pages that must match"
+    ),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Report chapters that duplicate another chapter of the same series.
+
+    Only chapters opened at least once are compared: their pages are hashed
+    in the background the first time the reader loads them.
+    """
+    return DedupeService(db).find_duplicate_chapters(
+        series_id=str(series_id) if series_id else None,
+        max_distance=max_distance,
+        min_similarity=min_similarity,
+    )
+
+
+@router.api_route("/series/{series_id}/download", methods=["GET", "HEAD"])
+def download_series(
+    series_id: UUID,
+    request: Request,
+    volume: Optional[int] = Query(None, ge=0, description="Only download this volume"),
+    current_user = Depends(get_current_media_user),
+):
+    """Download a series or volume as a zip of its chapters' pages.
+
+    The zip is generated while it is sent, copying page bytes straight from
+    the chapter archives. Its length is known up front and byte ranges are
+    supported, so interrupted downloads can resume.
+    """
+    # No request-scoped session: it would stay checked out for the whole download.
+    db = SessionLocal()
+    try:
+        filename, archive = DownloadService(db).build_series_archive(
+            str(series_id), volume
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (OSError, ArchiveError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Chapter files unavailable: {e}",
+        )
+    finally:
+        db.close()
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": archive.etag,
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+    }
+    try:
+        byte_range = parse_range_header(
+            request.headers.get("range"),
+            archive.size,
+            request.headers.get("if-range"),
+            archive.etag,
+        )
+    except RangeNotSatisfiable as e:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": e.content_range_header},
+        )
+
+    start, end = byte_range or (0, archive.size)
+    headers["Content-Length"] = str(end - start)
+    status_code = status.HTTP_200_OK
+    if byte_range is not None:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = content_range_header(start, end, archive.size)
+
+    if request.method == "HEAD":
+        return Response(
+            status_code=status_code, headers=headers, media_type="application/zip"
+        )
+    return StreamingResponse(
+        archive.iter_range(start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/zip",
+    )
+
+
+@router.post("/series/{series_id}/download-url", response_model=SignedUrl)
+def download_series_url(
+    series_id: UUID,
+    request: Request,
+    volume: Optional[int] = Query(None, ge=0, description="Only download this volume"),
+    current_user = Depends(get_current_active_user),
+):
+    """Get a short-lived download link, for browsers that cannot send the token."""
+    path = request.app.url_path_for("download_series", series_id=str(series_id))
+    signature, expires_at = sign_path(path, current_user.username)
+    query = {"sig": signature}
+    if volume is not None:
+        query["volume"] = volume
+    return SignedUrl(url=f"{path}?{urlencode(query)}", expires_at=expires_at)
+
+
+@router.get("/chapters/{chapter_id}/pages", response_model=ChapterPages)
+def get_chapter_pages(
+    chapter_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Get the width and height of every page, with double-page spreads flagged.
+
+    Also returns a short-lived signature for the chapter's page and tile
+    URLs, for image tags that cannot send the token.
+    """
+    try:
+        pages = PageService(db).get_chapter_pages(str(chapter_id))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (OSError, ArchiveError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Chapter file unavailable: {e}",
+        )
+    pages.media_signature, pages.media_signature_expires_at = sign_path(
+        request.url.path, current_user.username
+    )
+    return pages
+
+
+@router.get("/chapters/{chapter_id}/pages/{page_number}")
+def get_page(
+    chapter_id: UUID,
+    page_number: int = Path(..., ge=1, description="1-based page number"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_media_user),
+):
+    """Get one page image of a chapter.
+
+    Pages of chapters being read are served from pre-extracted files,
+    handed to nginx when X-Accel delivery is enabled; otherwise the page
+    is read from the chapter archive.
+    """
+    try:
+        page = PageService(db).get_page(str(chapter_id), page_number)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (OSError, ArchiveError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Chapter file unavailable: {e}",
+        )
+    if page.path is not None:
+        return file_response(page.path, page.media_type)
+    return Response(content=page.data, media_type=page.media_type)
+
+
+@router.get("/chapters/{chapter_id}/pages/{page_number}/tiles/{tile_index}")
+def get_page_tile(
+    chapter_id: UUID,
+    page_number: int = Path(..., ge=1, description="1-based page number"),
+    tile_index: int = Path(..., ge=0, description="0-based tile index, top to bottom"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_media_user),
+):
+    """Get one tile of a very tall page, as listed by the chapter's pages."""
+    try:
+        path = PageService(db).get_tile(str(chapter_id), page_number, tile_index)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return file_response(path, "image/jpeg")
+
+
+@router.post(
+    "/normalize",
+    response_model=NormalizeStarted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def start_normalization(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_superuser),
+):
+    """Start repacking the library's archives for random access (superuser only).
+
+    Background workers go through every chapter in batches and repack RAR
+    and compressed CBZ archives into CBZ files with uncompressed pages.
+    """
+    if not settings.NORMALIZE_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Archive normalization is disabled",
+        )
+    return NormalizeStarted(job_id=NormalizeService(db).start())
@@ -0,0 +1,71 @@
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.auth import get_current_active_user
+from app.db.database import get_db
+from app.schemas.progress import (
+    MAX_PROGRESS_BATCH,
+    ChapterProgress,
+    ContinueReadingItem,
+    ProgressBatch,
+    ProgressWriteResponse,
+)
+from app.services.progress import ProgressService
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[ChapterProgress])
+def get_progress(
+    chapter_id: List[UUID] = Query(..., max_length=MAX_PROGRESS_BATCH),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Get the current user's progress on chapters.
+
+    Repeat ``chapter_id`` to ask for several chapters. Chapters the user
+    has no progress on are left out.
+    """
+    chapter_ids = [str(c) for c in chapter_id]
+    return ProgressService(db).get_progress(current_user.id, chapter_ids)
+
+
+@router.put("", response_model=ProgressWriteResponse)
+def set_progress(
+    batch: ProgressBatch,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Store reading progress of the current user, many chapters at once.
+
+    Updates carrying an ``updated_at`` older than the stored progress are
+    ignored, so progress recorded offline can be replayed safely.
+    """
+    return ProgressService(db).set_progress(current_user.id, batch.items)
+
+
+@router.get("/series/{series_id}", response_model=List[ChapterProgress])
+def get_series_progress(
+    series_id: UUID,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Get the current user's progress on the chapters of a series, in reading order."""
+    return ProgressService(db).get_series_progress(current_user.id, str(series_id))
+
+
+@router.get("/continue", response_model=List[ContinueReadingItem])
+def continue_reading(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+):
+    """Get the next chapter to read in each series the current user is reading.
+
+    Series are ordered by when the user last read them. The next chapter is
+    the first unread one from the chapter last opened on; series read to the
+    end are left out.
+    """
+    return ProgressService(db).get_continue_reading(current_user.id, limit)
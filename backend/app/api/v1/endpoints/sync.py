@@ -0,0 +1,30 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.auth import get_current_active_user
+from app.db.database import get_db
+from app.schemas.sync import SyncResponse
+from app.services.sync import SyncService
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncResponse, response_model_exclude_none=True)
+def sync_library(
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous sync; omit for a full snapshot"
+    ),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum changes per page"),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user),
+):
+    """Return series, chapter and the current user's progress changes since a cursor.
+
+    Call repeatedly while ``has_more`` is true, then keep the last cursor
+    for the next sync. Responses with ``reset`` start a full snapshot.
+    """
+    try:
+        return SyncService(db).get_changes(cursor, limit, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
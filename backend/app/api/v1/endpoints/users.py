@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+
+from app.api.v1.endpoints.auth import get_current_active_superuser, get_user_service
+from app.services.user import UserService
+from app.services.user_import import detect_format, parse_user_import
+from app.schemas.user import UserImportResult
+
+router = APIRouter()
+
+
+@router.post("/import", response_model=UserImportResult)
+def import_users(
+    file: UploadFile = File(..., description="CSV or JSON file of users"),
+    user_service: UserService = Depends(get_user_service),
+    current_user = Depends(get_current_active_superuser),
+):
+    """Bulk-create users from a CSV or JSON file (superuser only).
+
+    Rows that fail validation or collide with existing usernames/emails are
+    reported individually; the remaining rows are still created.
+    """
+    try:
+        fmt = detect_format(file.filename, file.content_type)
+        rows, errors = parse_user_import(file.file.read(), fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    result = user_service.bulk_create_users(rows)
+    result.errors = sorted(errors + result.errors, key=lambda error: error.row)
+    result.total += len(errors)
+    result.failed = len(result.errors)
+    return result
@@ -0,0 +1,273 @@
+"""
+Admission control per route class.
+
+Heavy requests (page images, archive downloads, password hashing) and
+cheap ones (``/auth/users/me``, library listings) share the same workers.
+Without admission control a burst of heavy requests takes every thread of
+the worker pool and the cheap ones queue behind them. Each route class
+instead gets its own pool:
+
+- at most ``concurrency`` requests of the class run at once;
+- up to ``queue_size`` more wait, first come first served, for at most
+  ``queue_timeout`` seconds;
+- anything beyond that is answered at once with 503 and a
+  ``Retry-After`` estimated from the class's recent service times.
+
+A slot is held until the response has been sent, so a streamed download
+counts for as long as it streams. Pools are per process; with several
+uvicorn workers each one admits up to the configured limits.
+
+Health probes and the event stream are not admission controlled: probes
+must answer while the process is saturated, and event streams are
+long-lived and capped by ``SSE_MAX_SUBSCRIBERS``.
+"""
+
+import asyncio
+import json
+import math
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from app.core.config import settings
+
+API = "api"
+AUTH = "auth"
+MEDIA = "media"
+DOWNLOAD = "download"
+
+# Weight of the latest request in the moving average of service times.
+_SERVICE_TIME_WEIGHT = 0.1
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    """Run ``concurrency`` requests at once and queue ``queue_size`` more.
+
+    Queued requests wait at most ``queue_timeout`` seconds.
+    """
+
+    concurrency: int
+    queue_size: int
+    queue_timeout: float
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; carries the suggested retry delay."""
+
+    def __init__(self, pool: str, reason: str, retry_after: float):
+        super().__init__(
+            f"Too many {pool} requests ({reason}), retry after {retry_after:.1f}s"
+        )
+        self.pool = pool
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionPool:
+    """Concurrency limit with a bounded FIFO wait queue for one route class.
+
+    Only used from the event loop, so no locking is needed. A released slot
+    is handed straight to the oldest waiter, which keeps late arrivals from
+    overtaking requests that already waited.
+    """
+
+    def __init__(self, name: str, limits: PoolLimits):
+        self.name = name
+        self.limits = limits
+        self.active = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._service_time = 0.0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Expected seconds until a new request would get a slot."""
+        return self._service_time * (self.queued + 1) / max(1, self.limits.concurrency)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue if none is free.
+
+        Raises AdmissionRejected when the queue is full or the wait times out.
+        """
+        if self.active < self.limits.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.limits.queue_size:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(self.name, "queue full", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.max_queued = max(self.max_queued, len(self._waiters))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self.limits.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(future)
+            self.rejected_timeout += 1
+            raise AdmissionRejected(self.name, "queue timeout", self.retry_after())
+        except asyncio.CancelledError:
+            # The client went away. If a slot was handed over meanwhile, pass it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._discard(future)
+            raise
+        finally:
+            self.wait_seconds += time.monotonic() - started
+        self.admitted += 1
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        """Give a slot back, handing it to the oldest waiter if there is one."""
+        if service_time is not None:
+            error = service_time - self._service_time
+            self._service_time += _SERVICE_TIME_WEIGHT * error
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, future: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def metrics(self) -> dict:
+        return {
+            "concurrency": self.limits.concurrency,
+            "queue_size": self.limits.queue_size,
+            "queue_timeout_seconds": self.limits.queue_timeout,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_seconds_total": round(self.wait_seconds, 3),
+            "service_seconds_avg": round(self._service_time, 4),
+        }
+
+
+class AdmissionController:
+    """Maps requests to route classes and holds the pool of each class."""
+
+    def __init__(
+        self,
+        pools: Dict[str, PoolLimits],
+        rules: List[Tuple[Optional[str], str, Optional[str]]],
+        default: str = API,
+    ):
+        """``rules`` are (method or None, path regex, class or None to exempt).
+
+        The first matching rule wins.
+        """
+        self.pools = {
+            name: AdmissionPool(name, limits) for name, limits in pools.items()
+        }
+        self._rules: List[Tuple[Optional[str], Pattern, Optional[str]]] = [
+            (method, re.compile(pattern), name) for method, pattern, name in rules
+        ]
+        self.default = default
+
+    def classify(self, method: str, path: str) -> Optional[AdmissionPool]:
+        """Pool of a request, or None if it is not admission controlled."""
+        for rule_method, pattern, name in self._rules:
+            if (rule_method is None or rule_method == method) and pattern.match(path):
+                return self.pools[name] if name is not None else None
+        return self.pools[self.default]
+
+    def metrics(self) -> Dict[str, dict]:
+        return {name: pool.metrics() for name, pool in self.pools.items()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware running each request inside its route class's pool."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        pool = self.controller.classify(scope["method"], scope["path"])
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await pool.acquire()
+        except AdmissionRejected as e:
+            await _reject(send, e)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release(time.monotonic() - started)
+
+
+async def _reject(send, error: AdmissionRejected) -> None:
+    body = json.dumps({"detail": str(error)}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", error.retry_after_header.encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_admission_controller() -> AdmissionController:
+    """Build the route classes and pools configured in settings."""
+    prefix = re.escape(settings.API_V1_STR)
+    rules = [
+        (None, rf"{prefix}/health/", None),
+        (None, rf"{prefix}/events/stream$", None),
+        ("POST", rf"{prefix}/auth/login$", AUTH),
+        ("POST", rf"{prefix}/users/import$", AUTH),
+        (None, rf"{prefix}/library/chapters/[^/]+/pages/\d+(/|$)", MEDIA),
+        (None, rf"{prefix}/library/series/[^/]+/download$", DOWNLOAD),
+    ]
+    timeout = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+    pools = {
+        API: PoolLimits(
+            settings.ADMISSION_API_CONCURRENCY, settings.ADMISSION_API_QUEUE, timeout
+        ),
+        AUTH: PoolLimits(
+            settings.ADMISSION_AUTH_CONCURRENCY, settings.ADMISSION_AUTH_QUEUE, timeout
+        ),
+        MEDIA: PoolLimits(
+            settings.ADMISSION_MEDIA_CONCURRENCY,
+            settings.ADMISSION_MEDIA_QUEUE,
+            timeout,
+        ),
+        DOWNLOAD: PoolLimits(
+            settings.ADMISSION_DOWNLOAD_CONCURRENCY,
+            settings.ADMISSION_DOWNLOAD_QUEUE,
+            timeout,
+        ),
+    }
+    return AdmissionController(pools, rules)
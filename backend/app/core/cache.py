@@ -0,0 +1,421 @@
+"""
+Response cache for library aggregates.
+
+Series listings and series detail pages are built from many chapter rows
+but only change when a scan touches them. They are shared by every user,
+so they carry no reading progress; that is served per user by the
+progress endpoints.
+``ResponseCache`` keeps their rendered JSON in a backend: a bounded
+in-process LRU, or Redis so that several uvicorn workers share entries.
+
+Entries are tagged (``series:<id>``, ``series-list``). Every tag has a
+version token, and an entry records the versions of its tags as they were
+when its computation started. It is only served while those versions are
+unchanged, so invalidating a tag is a single write however many entries
+carry it, and a computation that overlaps an invalidation is never served.
+
+Writers call ``invalidate_series`` inside their transaction. It is sent on
+the same NOTIFY channel as server-sent events, so every API process drops
+the entries once the change commits, whichever process made it.
+
+Concurrent misses for one key are collapsed into one computation: within
+a process, followers wait for the leader's result; across processes
+(Redis backend), the leader holds a short lock while the others poll for
+its entry.
+"""
+
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import publish_event
+
+logger = logging.getLogger(__name__)
+
+# Carried by every entry, so the whole cache can be invalidated at once.
+ALL_TAG = "all"
+SERIES_LIST_TAG = "series-list"
+CACHE_INVALIDATE_EVENT = "cache_invalidate"
+# Tags per invalidation event, keeping NOTIFY payloads under their size limit.
+INVALIDATE_TAG_LIMIT = 100
+
+
+def series_tag(series_id) -> str:
+    return f"series:{series_id}"
+
+
+class CacheError(Exception):
+    """Raised by a backend that cannot be reached."""
+
+
+class CacheBackend(ABC):
+    """Storage for cache entries, tag versions and recompute locks."""
+
+    @abstractmethod
+    def lookup(
+        self, key: str, tags: Sequence[str]
+    ) -> Tuple[Optional[bytes], List[str]]:
+        """Return the entry under ``key``, or None, and the versions of ``tags``."""
+
+    @abstractmethod
+    def store(self, key: str, value: bytes, ttl: float) -> None:
+        """Store an entry for ``ttl`` seconds."""
+
+    @abstractmethod
+    def bump(self, tags: Sequence[str]) -> None:
+        """Give ``tags`` new versions, invalidating every entry carrying them."""
+
+    @abstractmethod
+    def acquire(self, key: str, ttl: float) -> bool:
+        """Take the recompute lock for ``key``; False if another process holds it."""
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Release the recompute lock for ``key``."""
+
+
+def _new_version() -> str:
+    # Random rather than a counter: a tag whose version is lost (evicted
+    # from Redis, say) must never come back with a version old entries carry.
+    return os.urandom(8).hex()
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU of entries with a hard cap on their number.
+
+    Tag versions are kept separately and never evicted; there is one per
+    series at most. Recompute locks are not needed within one process.
+    """
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, key: str, tags: Sequence[str]
+    ) -> Tuple[Optional[bytes], List[str]]:
+        now = time.monotonic()
+        with self._lock:
+            value = None
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    value = entry[0]
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+            return value, [self._versions.get(tag, "") for tag in tags]
+
+    def store(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bump(self, tags: Sequence[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = _new_version()
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        return True
+
+    def release(self, key: str) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Entries shared between processes through Redis.
+
+    A lookup is one round trip for the entry and its tag versions. Requires
+    the optional ``redis`` package (``pip install kiremisu-backend[redis]``).
+    """
+
+    def __init__(self, url: str, prefix: str = "kiremisu:cache:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis cache backend requires the 'redis' package")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    def lookup(
+        self, key: str, tags: Sequence[str]
+    ) -> Tuple[Optional[bytes], List[str]]:
+        pipe = self._client.pipeline(transaction=False)
+        pipe.get(self.prefix + "entry:" + key)
+        pipe.mget([self.prefix + "tag:" + tag for tag in tags])
+        try:
+            value, versions = pipe.execute()
+        except self._errors as e:
+            raise CacheError(str(e))
+        return value, [v.decode() if v is not None else "" for v in versions]
+
+    def store(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            self._client.set(
+                self.prefix + "entry:" + key, value, px=max(1, int(ttl * 1000))
+            )
+        except self._errors as e:
+            raise CacheError(str(e))
+
+    def bump(self, tags: Sequence[str]) -> None:
+        try:
+            self._client.mset(
+                {self.prefix + "tag:" + tag: _new_version() for tag in tags}
+            )
+        except self._errors as e:
+            raise CacheError(str(e))
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        try:
+            return bool(
+                self._client.set(
+                    self.prefix + "lock:" + key,
+                    b"1",
+                    nx=True,
+                    px=max(1, int(ttl * 1000)),
+                )
+            )
+        except self._errors as e:
+            raise CacheError(str(e))
+
+    def release(self, key: str) -> None:
+        try:
+            self._client.delete(self.prefix + "lock:" + key)
+        except self._errors as e:
+            raise CacheError(str(e))
+
+
+def create_backend(name: Optional[str] = None) -> CacheBackend:
+    """Build the backend selected by ``CACHE_BACKEND``."""
+    name = name or settings.CACHE_BACKEND
+    if name == "memory":
+        return MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    if name == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("REDIS_URL must be set to use the redis cache backend")
+        return RedisCacheBackend(settings.REDIS_URL)
+    raise ValueError(f"Unknown cache backend '{name}'")
+
+
+class _Flight:
+    """One in-progress computation that other threads can wait on."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._value: Optional[bytes] = None
+        self._error: Optional[BaseException] = None
+
+    def resolve(self, value: bytes) -> None:
+        self._value = value
+        self._done.set()
+
+    def fail(self, error: BaseException) -> None:
+        self._error = error
+        self._done.set()
+
+    def wait(self) -> bytes:
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+def _encode_entry(versions: Sequence[str], value: bytes) -> bytes:
+    return ",".join(versions).encode() + b"\n" + value
+
+
+class ResponseCache:
+    """Tagged, single-flight cache of rendered responses.
+
+    Backend failures are logged and treated as misses, so an unreachable
+    Redis slows requests down but never fails them.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float = 300.0,
+        lock_timeout: float = 10.0,
+        poll_interval: float = 0.05,
+        enabled: bool = True,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+
+    def get_or_compute(
+        self,
+        key: str,
+        tags: Iterable[str],
+        compute: Callable[[], bytes],
+        ttl: Optional[float] = None,
+    ) -> bytes:
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        if not self.enabled:
+            return compute()
+        tags = [ALL_TAG, *tags]
+        value, versions = self._lookup(key, tags)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            return flight.wait()
+        try:
+            value = self._compute_locked(key, tags, versions, compute, ttl or self.ttl)
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        else:
+            flight.resolve(value)
+            return value
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """Invalidate every entry carrying any of ``tags``."""
+        try:
+            self.backend.bump(list(tags))
+        except CacheError as e:
+            logger.warning("Cache invalidation failed: %s", e)
+
+    def clear(self) -> None:
+        """Invalidate every entry."""
+        self.invalidate([ALL_TAG])
+
+    def handle_invalidation(self, data: Optional[dict]) -> None:
+        """Apply a ``cache_invalidate`` event received from another process."""
+        tags = (data or {}).get("tags")
+        if tags:
+            self.invalidate(tags)
+
+    def _lookup(
+        self, key: str, tags: List[str]
+    ) -> Tuple[Optional[bytes], Optional[List[str]]]:
+        """Return the entry if it is still valid, and the current tag versions."""
+        try:
+            entry, versions = self.backend.lookup(key, tags)
+        except CacheError as e:
+            logger.warning("Cache lookup failed: %s", e)
+            return None, None
+        if entry is not None:
+            stamp, _, value = entry.partition(b"\n")
+            if stamp.decode() == ",".join(versions):
+                return value, versions
+        return None, versions
+
+    def _compute_locked(
+        self,
+        key: str,
+        tags: List[str],
+        versions: Optional[List[str]],
+        compute: Callable[[], bytes],
+        ttl: float,
+    ) -> bytes:
+        if versions is None:
+            return compute()
+        locked = self._acquire(key)
+        deadline = time.monotonic() + self.lock_timeout
+        while not locked and time.monotonic() < deadline:
+            # Another process is computing this entry; wait for it.
+            time.sleep(self.poll_interval)
+            value, versions = self._lookup(key, tags)
+            if value is not None:
+                return value
+            if versions is None:
+                return compute()
+            locked = self._acquire(key)
+        try:
+            value = compute()
+            # Stamped with the versions read before computing: if a tag was
+            # bumped meanwhile, the entry is stale on arrival and never served.
+            try:
+                self.backend.store(key, _encode_entry(versions, value), ttl)
+            except CacheError as e:
+                logger.warning("Cache store failed: %s", e)
+            return value
+        finally:
+            if locked:
+                try:
+                    self.backend.release(key)
+                except CacheError as e:
+                    logger.warning("Cache lock release failed: %s", e)
+
+    def _acquire(self, key: str) -> bool:
+        try:
+            return self.backend.acquire(key, self.lock_timeout)
+        except CacheError as e:
+            logger.warning("Cache lock failed: %s", e)
+            return True
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache configured from settings."""
+    return ResponseCache(
+        backend=create_backend(),
+        ttl=settings.CACHE_TTL_SECONDS,
+        lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS,
+        enabled=settings.CACHE_ENABLED,
+    )
+
+
+def invalidate_series(db: Session, series_ids: Iterable) -> None:
+    """Invalidate cached responses for ``series_ids`` once ``db`` commits.
+
+    Also invalidates the series listing, which aggregates every series.
+    Without PostgreSQL there is no notification channel, so only this
+    process's cache is invalidated, right away.
+    """
+    tags = sorted({series_tag(series_id) for series_id in series_ids})
+    if not tags:
+        return
+    tags.append(SERIES_LIST_TAG)
+    _invalidate_on_commit(db, tags)
+
+
+def invalidate_all(db: Session) -> None:
+    """Invalidate every cached response once ``db`` commits.
+
+    For changes too broad to tag series by series, such as a library import.
+    """
+    _invalidate_on_commit(db, [ALL_TAG])
+
+
+def _invalidate_on_commit(db: Session, tags: List[str]) -> None:
+    if db.get_bind().dialect.name != "postgresql":
+        get_response_cache().invalidate(tags)
+        return
+    for start in range(0, len(tags), INVALIDATE_TAG_LIMIT):
+        batch = tags[start:start + INVALIDATE_TAG_LIMIT]
+        publish_event(db, CACHE_INVALIDATE_EVENT, {"tags": batch})
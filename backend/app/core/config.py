@@ -1,3 +1,4 @@
+import ipaddress
 import os
 from typing import List, Optional
 from pydantic import validator
@@ -14,6 +15,7 @@ class Settings(BaseSettings):
     
     # Security
     SECRET_KEY: str  # Required environment variable - no default for security
+    MEDIA_URL_TTL_SECONDS: int = 900  # Lifetime of signed page, tile and download URLs
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
@@ -23,9 +25,114 @@ class Settings(BaseSettings):
     THUMBNAILS_PATH: str = "/thumbnails"
     PROCESSED_DATA_PATH: str = "/processed"
     
+    # File delivery: "direct" (served by the API) or "x-accel" (nginx sends the
+    # file named in X-Accel-Redirect from its internal locations under X_ACCEL_PREFIX)
+    FILE_DELIVERY: str = "direct"
+    X_ACCEL_PREFIX: str = "/_protected"
+
     # Logging
     LOG_LEVEL: str = "INFO"
     
+    # Startup warmup
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 2  # Connections opened before readiness flips
+
+    # Login rate limiting (token buckets, checked before any password hashing)
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 5
+    LOGIN_RATE_LIMIT_PERIOD_SECONDS: float = 60.0
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per process) or "redis" (shared)
+    RATE_LIMIT_MAX_KEYS: int = 10000  # Bound on buckets held by the memory backend
+    REDIS_URL: Optional[str] = None
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = 0.5  # Bound on a login waiting for Redis
+    # Reverse proxies (addresses or CIDR ranges) whose X-Forwarded-For is believed
+    # when resolving the client IP; empty means the socket peer is the client
+    TRUSTED_PROXIES: List[str] = []
+
+    # Admission control per route class (per process). Requests beyond a class's
+    # concurrency wait in its queue up to the timeout, or get 503 with Retry-After
+    # when the queue is full. Keep the concurrencies summed below the threadpool
+    # size (40) so sync endpoints of one class cannot take every thread.
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_API_CONCURRENCY: int = 16  # Everything not in another class
+    ADMISSION_API_QUEUE: int = 200
+    ADMISSION_AUTH_CONCURRENCY: int = 4  # Login and user import (password hashing)
+    ADMISSION_AUTH_QUEUE: int = 32
+    ADMISSION_MEDIA_CONCURRENCY: int = 12  # Page images and tiles
+    ADMISSION_MEDIA_QUEUE: int = 64
+    ADMISSION_DOWNLOAD_CONCURRENCY: int = 4  # Series downloads, held while streaming
+    ADMISSION_DOWNLOAD_QUEUE: int = 8
+
+    # Background job queue: workers move finished jobs to the job_history table,
+    # partitioned by day, and drop partitions past the retention period
+    JOB_ARCHIVE_ENABLED: bool = True
+    # Finished jobs stay in job_queue this long
+    JOB_ARCHIVE_AFTER_SECONDS: float = 3600.0
+    JOB_ARCHIVE_BATCH_SIZE: int = 5000  # Jobs moved per transaction
+    JOB_HISTORY_RETENTION_DAYS: int = 30
+    JOB_MAINTENANCE_INTERVAL_SECONDS: float = 300.0
+
+    # Library scanning
+    # Files hashed concurrently; reads dominate, so this is not tied to CPUs
+    FINGERPRINT_WORKERS: int = 4
+
+    # Bulk user import
+    USER_IMPORT_MAX_ROWS: int = 5000
+    USER_IMPORT_HASH_WORKERS: Optional[int] = None  # Defaults to the CPU count
+
+    # Health checks (readiness snapshot refreshed in the background)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_SNAPSHOT_MAX_AGE_SECONDS: float = 30.0  # Older snapshots fail readiness
+    HEALTH_DB_LATENCY_THRESHOLD_MS: float = 250.0
+    HEALTH_JOB_QUEUE_MAX_LAG_SECONDS: float = 300.0
+
+    # Client delta sync
+    SYNC_DEFAULT_BATCH_SIZE: int = 500
+    SYNC_MAX_BATCH_SIZE: int = 5000
+    # Cursors older than this restart with a full snapshot
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Server-sent events
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_CLIENT_BUFFER_SIZE: int = 100  # Events buffered per stream before it is dropped
+    SSE_MAX_SUBSCRIBERS: int = 10000  # Per API process
+
+    # Response cache (series listings and detail)
+    CACHE_ENABLED: bool = True
+    # "memory" (per process) or "redis" (shared between workers, uses REDIS_URL)
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_MAX_ENTRIES: int = 2000  # Bound on entries held by the memory backend
+    # Longest wait for another process computing the same entry
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 10.0
+
+    # Extracted pages of chapters being read (under PROCESSED_DATA_PATH/pages)
+    PAGE_CACHE_ENABLED: bool = True
+    # Disk budget; least valuable chapters are evicted beyond it
+    PAGE_CACHE_MAX_GB: float = 10.0
+    # Chapters after the one being read to extract ahead
+    PAGE_CACHE_PREFETCH_CHAPTERS: int = 1
+    # Split very tall (long-strip) pages into tiles when extracting
+    PAGE_TILE_ENABLED: bool = True
+    PAGE_TILE_HEIGHT: int = 2048  # Rows per tile
+    PAGE_TILE_MIN_HEIGHT: int = 4096  # Pages taller than this are tiled
+    # Pages tiled at once per worker process; bounds decode memory
+    PAGE_TILE_WORKERS: int = 2
+
+    # Archive normalization (opt-in): background jobs repack RAR and compressed or
+    # unordered CBZ chapters into CBZ files with STORED pages in reading order
+    NORMALIZE_ENABLED: bool = False
+    # "processed" (copies under PROCESSED_DATA_PATH/normalized) or "replace"
+    # (library files)
+    NORMALIZE_TARGET: str = "processed"
+    NORMALIZE_WORKERS: int = 2
+    # Read rate shared by the workers, 0 for no limit
+    NORMALIZE_MAX_MB_PER_SECOND: float = 20.0
+    NORMALIZE_BATCH_SIZE: int = 100  # Chapters per job
+
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v: str | List[str]) -> List[str]:
         if isinstance(v, str) and not v.startswith("["):
@@ -34,6 +141,12 @@ class Settings(BaseSettings):
             return v
         raise ValueError(v)
     
+    @validator("TRUSTED_PROXIES")
+    def check_trusted_proxies(cls, v: List[str]) -> List[str]:
+        for entry in v:
+            ipaddress.ip_network(entry.strip(), strict=False)
+        return v
+
     @validator("DATABASE_URL", pre=True)
     def assemble_db_connection(cls, v: Optional[str]) -> str:
         if isinstance(v, str):
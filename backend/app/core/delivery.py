@@ -0,0 +1,79 @@
+"""
+File delivery through the reverse proxy.
+
+Serving a file from the API keeps a worker busy copying every byte. With
+``FILE_DELIVERY = "x-accel"`` the API only authenticates the request and
+resolves the file, then answers with an empty response whose
+``X-Accel-Redirect`` header names the file under an internal nginx
+location. nginx streams it with sendfile and handles ranges, keep-alive
+and slow clients, while the worker moves on to the next request.
+
+Each storage root is exposed under its own internal location (see
+docker/nginx/nginx.conf)::
+
+    MANGA_LIBRARY_PATH   -> {X_ACCEL_PREFIX}/manga/
+    THUMBNAILS_PATH      -> {X_ACCEL_PREFIX}/thumbnails/
+    PROCESSED_DATA_PATH  -> {X_ACCEL_PREFIX}/processed/
+
+With the default ``"direct"`` mode, as in development without nginx, and
+for files outside those roots, the API serves the file itself.
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DIRECT = "direct"
+X_ACCEL = "x-accel"
+
+
+def _locations() -> Dict[str, str]:
+    """Storage roots by internal location name."""
+    return {
+        "manga": settings.MANGA_LIBRARY_PATH,
+        "thumbnails": settings.THUMBNAILS_PATH,
+        "processed": settings.PROCESSED_DATA_PATH,
+    }
+
+
+def x_accel_uri(path: str) -> Optional[str]:
+    """Internal nginx URI of a file, or None if it is outside every storage root."""
+    real = os.path.realpath(path)
+    for name, root in _locations().items():
+        root = os.path.realpath(root)
+        if os.path.commonpath([real, root]) == root and real != root:
+            relative = os.path.relpath(real, root).replace(os.sep, "/")
+            # nginx unescapes the URI, so '?', '%' and '#' in file names survive.
+            return quote(f"{settings.X_ACCEL_PREFIX.rstrip('/')}/{name}/{relative}")
+    return None
+
+
+def file_response(
+    path: str,
+    media_type: str,
+    filename: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Respond with a file, letting nginx send it when X-Accel delivery is enabled."""
+    if settings.FILE_DELIVERY == X_ACCEL:
+        uri = x_accel_uri(path)
+        if uri is not None:
+            response = Response(media_type=media_type, headers=headers)
+            response.headers["X-Accel-Redirect"] = uri
+            if filename is not None:
+                response.headers["Content-Disposition"] = (
+                    f"attachment; filename*=UTF-8''{quote(filename)}"
+                )
+            return response
+        logger.warning(
+            "Serving '%s' directly: it is outside the X-Accel storage roots", path
+        )
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
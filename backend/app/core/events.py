@@ -0,0 +1,302 @@
+"""
+Server-sent event fan-out.
+
+Any process (API or worker) publishes events with ``publish_event``, which
+issues ``pg_notify`` inside the caller's transaction, so events are only
+delivered once the change they describe is committed.
+
+Each API process holds exactly one ``LISTEN`` connection. Its socket is
+watched by the event loop, so nothing runs until a notification arrives.
+Each notification is formatted once and handed to every matching
+subscriber's bounded buffer. A subscriber whose buffer overflows is
+dropped and told to resync rather than letting it hold memory. A single
+timer pings all subscribers for heartbeats, so idle streams cost no
+per-connection timers.
+
+Events meant for the API processes themselves (cache invalidation, say)
+are given to handlers registered with ``add_handler`` instead of clients.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_CHANNEL = "kiremisu_events"
+# NOTIFY payloads must be shorter than 8000 bytes.
+MAX_PAYLOAD_BYTES = 7900
+
+HEARTBEAT_MESSAGE = ": keepalive\n\n"
+DROPPED_MESSAGE = 'event: dropped\ndata: {"reason": "client too slow, resync"}\n\n'
+RESYNC_EVENT = "resync"
+
+
+def publish_event(
+    db: Session, event_type: str, data: dict, user_id: Optional[int] = None
+) -> None:
+    """Queue an event for delivery when ``db``'s transaction commits.
+
+    Events without ``user_id`` go to every connected user. Does nothing on
+    databases other than PostgreSQL.
+    """
+    payload = json.dumps(
+        {"type": event_type, "data": data, "user_id": user_id}, default=str
+    )
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        raise ValueError(
+            f"Event payload for '{event_type}' exceeds {MAX_PAYLOAD_BYTES} bytes"
+        )
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": EVENT_CHANNEL, "payload": payload},
+    )
+
+
+def format_event(event_id: int, event_type: str, data) -> str:
+    """Encode one event in the text/event-stream format."""
+    encoded = json.dumps(data, default=str)
+    return f"id: {event_id}\nevent: {event_type}\ndata: {encoded}\n\n"
+
+
+class Subscriber:
+    """One client stream with a bounded buffer of formatted events."""
+
+    def __init__(self, user_id: Optional[int], buffer_size: int):
+        self.user_id = user_id
+        self.buffer_size = buffer_size
+        self.dropped = False
+        self._buffer: deque = deque()
+        self._heartbeat = False
+        self._wakeup = asyncio.Event()
+
+    def offer(self, message: str) -> bool:
+        """Buffer a message. Returns False once the subscriber has been dropped."""
+        if self.dropped:
+            return False
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped = True
+            self._buffer.clear()
+            self._wakeup.set()
+            return False
+        self._buffer.append(message)
+        self._wakeup.set()
+        return True
+
+    def ping(self) -> None:
+        """Request a heartbeat, which never takes buffer space."""
+        self._heartbeat = True
+        self._wakeup.set()
+
+    async def messages(self) -> AsyncIterator[str]:
+        """Yield buffered messages and heartbeats until dropped."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._buffer:
+                yield self._buffer.popleft()
+            if self.dropped:
+                yield DROPPED_MESSAGE
+                return
+            if self._heartbeat:
+                self._heartbeat = False
+                yield HEARTBEAT_MESSAGE
+
+
+class EventBroker:
+    """Per-process fan-out from one LISTEN connection to SSE subscribers."""
+
+    def __init__(
+        self,
+        buffer_size: int = None,
+        heartbeat_interval: float = None,
+        max_subscribers: int = None,
+    ):
+        self.buffer_size = buffer_size or settings.SSE_CLIENT_BUFFER_SIZE
+        self.heartbeat_interval = heartbeat_interval or settings.SSE_HEARTBEAT_SECONDS
+        self.max_subscribers = max_subscribers or settings.SSE_MAX_SUBSCRIBERS
+        self._by_user: Dict[int, Set[Subscriber]] = {}
+        self._count = 0
+        self._next_id = 0
+        self.dropped_total = 0
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._handlers: Dict[str, Callable[[Optional[dict]], None]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def subscribe(self, user_id: Optional[int]) -> Subscriber:
+        """Register a new stream. Raises RuntimeError when the process is full."""
+        if self._count >= self.max_subscribers:
+            raise RuntimeError("Too many event subscribers")
+        subscriber = Subscriber(user_id, self.buffer_size)
+        self._by_user.setdefault(user_id, set()).add(subscriber)
+        self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._by_user.get(subscriber.user_id)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._by_user[subscriber.user_id]
+        self._count -= 1
+
+    def add_handler(
+        self, event_type: str, handler: Callable[[Optional[dict]], None]
+    ) -> None:
+        """Handle ``event_type`` in this process instead of sending it to clients.
+
+        A handler for ``resync`` is also called after the listener
+        reconnects, since notifications may have been missed.
+        """
+        self._handlers[event_type] = handler
+
+    def _handle(self, event_type: str, data) -> bool:
+        handler = self._handlers.get(event_type)
+        if handler is None:
+            return False
+        try:
+            handler(data)
+        except Exception:
+            logger.exception("Event handler for '%s' failed", event_type)
+        return True
+
+    def dispatch(self, payload: str) -> int:
+        """Fan a raw notification payload out to its subscribers. Returns deliveries."""
+        try:
+            event = json.loads(payload)
+            event_type = event["type"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed event payload: %.200s", payload)
+            return 0
+        if event_type != RESYNC_EVENT and self._handle(event_type, event.get("data")):
+            return 0
+        return self.send(event_type, event.get("data"), event.get("user_id"))
+
+    def send(self, event_type: str, data, user_id: Optional[int] = None) -> int:
+        """Deliver an event to one user's streams, or to all if ``user_id`` is None."""
+        self._next_id += 1
+        message = format_event(self._next_id, event_type, data)
+        if user_id is None:
+            targets = [s for subscribers in self._by_user.values() for s in subscribers]
+        else:
+            targets = list(self._by_user.get(user_id, ()))
+        delivered = 0
+        for subscriber in targets:
+            if subscriber.offer(message):
+                delivered += 1
+            else:
+                self.dropped_total += 1
+                self.unsubscribe(subscriber)
+        return delivered
+
+    def ping_all(self) -> None:
+        for subscribers in self._by_user.values():
+            for subscriber in subscribers:
+                subscriber.ping()
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Start heartbeats and, on PostgreSQL, the LISTEN connection."""
+        from app.db.database import engine
+
+        self._loop = asyncio.get_running_loop()
+        self._spawn(self._heartbeat_loop())
+        if engine.dialect.name == "postgresql":
+            self._spawn(self._listen_loop())
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._close_connection()
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.ping_all()
+
+    @staticmethod
+    def _connect():
+        from app.db.database import engine
+
+        # A dedicated connection outside the pool, so it never counts
+        # against request traffic and is never recycled under us.
+        raw = engine.raw_connection()
+        raw.detach()
+        connection = raw.dbapi_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {EVENT_CHANNEL}")
+        return connection
+
+    async def _listen_loop(self) -> None:
+        delay = 1.0
+        first = True
+        while True:
+            try:
+                self._connection = await asyncio.to_thread(self._connect)
+            except Exception as e:
+                logger.warning(
+                    "Event listener cannot connect, retrying in %.0fs: %s", delay, e
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            delay = 1.0
+            if not first:
+                # Notifications sent while disconnected are lost.
+                self._handle(RESYNC_EVENT, None)
+                self.send(RESYNC_EVENT, {"reason": "event stream reconnected"})
+            first = False
+
+            lost = self._loop.create_future()
+            self._loop.add_reader(self._connection.fileno(), self._on_readable, lost)
+            try:
+                await lost
+            finally:
+                self._close_connection()
+            logger.warning("Event listener connection lost, reconnecting")
+
+    def _on_readable(self, lost: asyncio.Future) -> None:
+        try:
+            self._connection.poll()
+        except Exception as e:
+            if not lost.done():
+                lost.set_result(e)
+            return
+        notifies = self._connection.notifies
+        while notifies:
+            self.dispatch(notifies.pop(0).payload)
+
+    def _close_connection(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+        except (ValueError, OSError):
+            pass
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
@@ -0,0 +1,61 @@
+"""
+Client address resolution behind a reverse proxy.
+
+In production every request reaches the API from nginx, so the socket peer
+is the proxy rather than the client. X-Forwarded-For is only believed when
+the peer is one of ``TRUSTED_PROXIES``; anything else could be forged by
+the client itself.
+"""
+
+import ipaddress
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.requests import Request
+
+from app.core.config import settings
+
+Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+@lru_cache
+def parse_networks(entries: Tuple[str, ...]) -> List[Network]:
+    """Parse addresses and CIDR ranges; a bare address is a one-host range."""
+    return [ipaddress.ip_network(entry.strip(), strict=False) for entry in entries]
+
+
+def _is_trusted(address: str, trusted: Iterable[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address.strip())
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def resolve_client_ip(
+    peer: Optional[str], forwarded_for: Optional[str], trusted: List[Network]
+) -> Optional[str]:
+    """Pick the client address from the socket peer and X-Forwarded-For.
+
+    Each proxy appends the address it received the request from, so the
+    header is walked from the right, skipping trusted proxies; the first
+    untrusted hop is the client. Entries left of it were written by the
+    client and are ignored. When every hop is trusted the left-most one is
+    used.
+    """
+    if not peer or not forwarded_for or not _is_trusted(peer, trusted):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """Address of the client that sent ``request``, as seen through trusted proxies."""
+    return resolve_client_ip(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+        parse_networks(tuple(settings.TRUSTED_PROXIES)),
+    )
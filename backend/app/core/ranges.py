@@ -0,0 +1,64 @@
+"""
+HTTP byte range requests (RFC 9110, section 14).
+
+Only single ranges are honoured. Multi-range requests are answered with
+the full representation, which the RFC allows, rather than a
+multipart/byteranges body.
+"""
+
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised for a syntactically valid range that lies outside the resource."""
+
+    def __init__(self, size: int):
+        super().__init__(f"Range not satisfiable for a {size} byte resource")
+        self.size = size
+
+    @property
+    def content_range_header(self) -> str:
+        return f"bytes */{self.size}"
+
+
+def parse_range_header(
+    value: Optional[str],
+    size: int,
+    if_range: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> Optional[Tuple[int, int]]:
+    """Resolve a ``Range`` header to a half-open ``(start, end)`` byte span.
+
+    Returns None when the full resource should be sent: no or malformed
+    header, several ranges, or an ``If-Range`` validator that no longer
+    matches ``etag``.
+    """
+    if not value or (if_range is not None and if_range != etag):
+        return None
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) + 1 if last else size
+            if last and end <= start:
+                return None
+        else:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(size)
+            start, end = max(0, size - suffix), size
+    except ValueError:
+        return None
+    if start < 0 or start >= size:
+        raise RangeNotSatisfiable(size)
+    return start, min(end, size)
+
+
+def content_range_header(start: int, end: int, size: int) -> str:
+    """``Content-Range`` value for the half-open span ``[start, end)``."""
+    return f"bytes {start}-{end - 1}/{size}"
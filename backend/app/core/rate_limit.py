@@ -0,0 +1,222 @@
+"""
+Token-bucket rate limiting.
+
+Used to shed login attempts before any database lookup or password hashing
+happens. The in-memory backend keeps a bounded number of buckets per
+process; the Redis backend shares buckets between uvicorn workers and
+replicas.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Allow bursts of ``capacity`` hits, refilled evenly over ``period`` seconds."""
+
+    capacity: int
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets."""
+
+    @abstractmethod
+    def hit(self, key: str, limit: RateLimit) -> float:
+        """Take one token from the bucket for ``key``.
+
+        Returns 0 if the hit is allowed, otherwise the number of seconds
+        until a token becomes available.
+        """
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """Forget the bucket for ``key``."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets with a hard cap on the number of tracked keys.
+
+    When the cap is reached the least recently used bucket is dropped. An
+    evicted bucket restarts full, which is the state it would have refilled
+    to anyway unless the key is under sustained attack, in which case it is
+    recently used and not evicted.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (limit.capacity, now))
+            tokens = min(
+                limit.capacity, tokens + (now - updated_at) * limit.refill_rate
+            )
+
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / limit.refill_rate
+
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Token bucket evaluated atomically inside Redis using the server clock, so
+# workers with skewed clocks still agree. Buckets expire once they would
+# have refilled completely, which keeps memory bounded.
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared between processes through Redis.
+
+    Requires the optional ``redis`` package (``pip install kiremisu-backend[redis]``).
+    """
+
+    def __init__(
+        self, url: str, prefix: str = "kiremisu:ratelimit:", timeout: float = 0.5
+    ):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "The redis rate limit backend requires the 'redis' package"
+            )
+        self.prefix = prefix
+        # Logins wait on these calls from a threadpool worker; a stalled Redis
+        # must not hold the worker (and its AUTH admission slot) indefinitely.
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    def hit(self, key: str, limit: RateLimit) -> float:
+        result = self._script(
+            keys=[self.prefix + key], args=[limit.capacity, limit.refill_rate]
+        )
+        return float(result)
+
+    def reset(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+
+def create_backend(name: Optional[str] = None) -> RateLimitBackend:
+    """Build the backend selected by ``RATE_LIMIT_BACKEND``."""
+    name = name or settings.RATE_LIMIT_BACKEND
+    if name == "memory":
+        return MemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if name == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError(
+                "REDIS_URL must be set to use the redis rate limit backend"
+            )
+        return RedisRateLimitBackend(
+            settings.REDIS_URL, timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS
+        )
+    raise ValueError(f"Unknown rate limit backend '{name}'")
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a hit is rejected; carries the suggested retry delay."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class LoginRateLimiter:
+    """Limits login attempts per client IP and per username."""
+
+    def __init__(
+        self, backend: RateLimitBackend, per_ip: RateLimit, per_username: RateLimit
+    ):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_username = per_username
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        # Usernames are at most 50 characters; clamping keeps attacker-chosen
+        # keys from growing the bucket store.
+        return "user:" + username.strip().lower()[:50]
+
+    def check(self, client_ip: Optional[str], username: str) -> None:
+        """Record a login attempt, raising RateLimitExceeded if over the limit.
+
+        The IP bucket is checked first so a flood from one address cannot
+        drain the buckets of the usernames it is guessing.
+        """
+        retry_after = self.backend.hit(f"ip:{client_ip or 'unknown'}", self.per_ip)
+        if retry_after:
+            raise RateLimitExceeded(retry_after)
+        retry_after = self.backend.hit(self._username_key(username), self.per_username)
+        if retry_after:
+            raise RateLimitExceeded(retry_after)
+
+    def reset_username(self, username: str) -> None:
+        """Clear the username bucket after a successful login."""
+        self.backend.reset(self._username_key(username))
+
+
+@lru_cache
+def get_login_rate_limiter() -> LoginRateLimiter:
+    """Process-wide login rate limiter configured from settings."""
+    return LoginRateLimiter(
+        backend=create_backend(),
+        per_ip=RateLimit(
+            settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_PERIOD_SECONDS
+        ),
+        per_username=RateLimit(
+            settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+            settings.LOGIN_RATE_LIMIT_PERIOD_SECONDS,
+        ),
+    )
@@ -0,0 +1,49 @@
+"""
+Short-lived, path-scoped signatures for media URLs.
+
+Image tags and download links cannot send an Authorization header, and a
+bearer token in a query string ends up in proxy and access logs. Media
+URLs instead carry a ``sig`` parameter that only grants access to the URLs
+under one path (a chapter's pages, a series download) for a few minutes.
+
+Signatures are JWTs with a ``scope`` claim, which access tokens never
+have, so a leaked signature cannot be used as a bearer token.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+MEDIA_SCOPE = "media"
+ALGORITHM = "HS256"
+
+
+def sign_path(
+    path: str, subject: str, ttl_seconds: Optional[int] = None
+) -> Tuple[str, datetime]:
+    """Sign access to ``path`` and the paths below it.
+
+    Returns the signature and its expiry.
+    """
+    ttl = settings.MEDIA_URL_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    expires_at = now + timedelta(seconds=ttl)
+    claims = {"sub": subject, "scope": MEDIA_SCOPE, "path": path, "exp": expires_at}
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=ALGORITHM), expires_at
+
+
+def verify_path(signature: str, path: str) -> Optional[str]:
+    """Return the signed subject if ``signature`` is valid for ``path``, else None."""
+    try:
+        claims = jwt.decode(signature, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    scope_path = claims.get("path")
+    if claims.get("scope") != MEDIA_SCOPE or not isinstance(scope_path, str):
+        return None
+    if path != scope_path and not path.startswith(scope_path.rstrip("/") + "/"):
+        return None
+    return claims.get("sub")
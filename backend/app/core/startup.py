@@ -0,0 +1,108 @@
+"""
+Application startup instrumentation and warmup.
+
+Tracks how long each application module takes to import, runs the warmup
+steps registered by other modules before the app reports itself as ready,
+and records the time to the first successful request so cold starts during
+rolling deploys can be measured instead of guessed.
+"""
+
+import importlib
+import logging
+import time
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Reference point for all startup timings. This module is the first thing
+# app.main imports, so it is as close to process start as we can get.
+PROCESS_START = time.perf_counter()
+
+
+def _elapsed_ms(since: float = PROCESS_START) -> float:
+    return round((time.perf_counter() - since) * 1000, 2)
+
+
+@dataclass
+class StartupReport:
+    """Timings collected while the application starts up."""
+
+    module_import_ms: Dict[str, float] = field(default_factory=dict)
+    warmup_ms: Dict[str, float] = field(default_factory=dict)
+    warmup_errors: Dict[str, str] = field(default_factory=dict)
+    app_created_ms: Optional[float] = None
+    ready_ms: Optional[float] = None
+    first_request_ms: Optional[float] = None
+
+    def mark_app_created(self) -> None:
+        self.app_created_ms = _elapsed_ms()
+
+    def mark_ready(self) -> None:
+        self.ready_ms = _elapsed_ms()
+
+    def mark_first_request(self) -> bool:
+        """Record the first successful request. Returns True only once."""
+        if self.first_request_ms is not None:
+            return False
+        self.first_request_ms = _elapsed_ms()
+        return True
+
+    def as_dict(self) -> dict:
+        return {
+            "module_import_ms": dict(self.module_import_ms),
+            "warmup_ms": dict(self.warmup_ms),
+            "warmup_errors": dict(self.warmup_errors),
+            "app_created_ms": self.app_created_ms,
+            "ready_ms": self.ready_ms,
+            "first_request_ms": self.first_request_ms,
+        }
+
+
+def timed_import(name: str, report: StartupReport) -> ModuleType:
+    """Import a module and record in ``report`` how long it took.
+
+    Modules are expected to be imported in dependency order, so each timing
+    covers only the work that was not already done by an earlier import.
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    report.module_import_ms[name] = _elapsed_ms(start)
+    return module
+
+
+WarmupStep = Callable[[], None]
+
+_warmup_steps: Dict[str, WarmupStep] = {}
+
+
+def register_warmup(name: str) -> Callable[[WarmupStep], WarmupStep]:
+    """Decorator registering a callable to run before the app becomes ready.
+
+    Steps run synchronously in registration order from a worker thread, so
+    they may block on I/O. Registering the same name twice replaces the step.
+    """
+
+    def decorator(func: WarmupStep) -> WarmupStep:
+        _warmup_steps[name] = func
+        return func
+
+    return decorator
+
+
+def run_warmup(report: StartupReport) -> StartupReport:
+    """Run every registered warmup step, timing each one.
+
+    A failing step is logged and recorded but never prevents startup; the
+    readiness checks are responsible for deciding whether the app can serve.
+    """
+    for name, step in list(_warmup_steps.items()):
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            report.warmup_errors[name] = str(e)
+            logger.warning("Warmup step '%s' failed: %s", name, e)
+        report.warmup_ms[name] = _elapsed_ms(start)
+    return report
@@ -0,0 +1,49 @@
+"""
+Helpers for bulk loading rows with PostgreSQL ``COPY``.
+
+``COPY ... FROM STDIN`` in text format is the fastest way to get many rows
+into a (usually temporary staging) table: one round trip and no per-row
+statement overhead.
+"""
+
+import io
+from datetime import date, datetime
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy.orm import Session
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def encode_copy_value(value: Any) -> str:
+    """Encode one value for COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # bytea hex input; the backslash itself must be escaped for COPY.
+        return "\\\\x" + bytes(value).hex()
+    return str(value).translate(_ESCAPES)
+
+
+def copy_rows(
+    db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> int:
+    """COPY rows into ``table`` on the session's connection. Returns the row count."""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(encode_copy_value(value) for value in row))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+    return count
@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine
+from typing import Optional
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.startup import register_warmup
 
 engine = create_engine(
     settings.DATABASE_URL,
@@ -21,4 +24,30 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@register_warmup("database_pool")
+def warm_pool(connections: Optional[int] = None) -> int:
+    """Open pool connections up front so first requests don't pay for them.
+
+    Connections are checked out together so the pool really opens distinct
+    connections, then returned to the pool. Returns the number opened.
+    """
+    if connections is None:
+        connections = settings.WARMUP_POOL_CONNECTIONS
+    pool_size = getattr(engine.pool, "size", None)
+    if callable(pool_size):
+        connections = min(connections, pool_size())
+    connections = max(0, connections)
+
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
@@ -0,0 +1,126 @@
+"""
+Read-only access to chapter archives.
+
+Chapters are stored as CBZ/ZIP archives, or CBR/RAR when the optional
+``rarfile`` package is installed (``pip install kiremisu-backend[rar]``,
+plus an extraction tool such as 7zip). Pages are the image members of the
+archive in reading order.
+"""
+
+import os
+import re
+import zipfile
+from typing import IO, List
+
+try:
+    import rarfile
+except ImportError:  # optional dependency
+    rarfile = None
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif", ".bmp"}
+ZIP_EXTENSIONS = {".cbz", ".zip"}
+RAR_EXTENSIONS = {".cbr", ".rar"}
+ARCHIVE_EXTENSIONS = ZIP_EXTENSIONS | RAR_EXTENSIONS
+
+_DIGITS_RE = re.compile(r"(\d+)")
+
+
+class ArchiveError(Exception):
+    """Raised when a chapter archive cannot be opened or read."""
+
+
+def rar_supported() -> bool:
+    """Whether RAR archives can be opened (the ``rarfile`` package is installed)."""
+    return rarfile is not None
+
+
+def is_image_name(name: str) -> bool:
+    """Whether an archive member name looks like a page image."""
+    base = name.rsplit("/", 1)[-1]
+    if base.startswith(".") or "__MACOSX/" in name:
+        return False
+    return os.path.splitext(base)[1].lower() in IMAGE_EXTENSIONS
+
+
+def natural_sort_key(name: str) -> tuple:
+    """Sort key ordering embedded numbers by value: ``2.jpg`` < ``10.jpg``.
+
+    Text is compared case-insensitively; names that only differ by case
+    or leading zeros fall back to plain string order.
+    """
+    parts = _DIGITS_RE.split(name)
+    # re.split with one group alternates text and digits, so every key
+    # position always holds the same type and keys stay comparable.
+    parts[1::2] = [int(p) for p in parts[1::2]]
+    parts[0::2] = [p.casefold() for p in parts[0::2]]
+    parts.append(name)
+    return tuple(parts)
+
+
+class ChapterArchive:
+    """A chapter archive opened for reading pages.
+
+    Use as a context manager so the underlying file handle is closed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            if extension in RAR_EXTENSIONS:
+                if rarfile is None:
+                    raise ArchiveError("RAR archives require the 'rarfile' package")
+                self._archive = rarfile.RarFile(path)
+            else:
+                self._archive = zipfile.ZipFile(path)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise ArchiveError(f"Cannot open archive '{path}': {e}")
+        except Exception as e:
+            if rarfile is not None and isinstance(e, rarfile.Error):
+                raise ArchiveError(f"Cannot open archive '{path}': {e}")
+            raise
+
+    def __enter__(self) -> "ChapterArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._archive.close()
+
+    @property
+    def is_zip(self) -> bool:
+        return isinstance(self._archive, zipfile.ZipFile)
+
+    def infolist(self):
+        """Raw member info objects from the underlying archive."""
+        return self._archive.infolist()
+
+    def getinfo(self, name: str):
+        """Raw member info object of one member."""
+        return self._archive.getinfo(name)
+
+    def pages(self) -> List[str]:
+        """Names of the page images in reading order."""
+        names = [
+            info.filename for info in self._archive.infolist()
+            if not info.is_dir() and is_image_name(info.filename)
+        ]
+        return sorted(names, key=natural_sort_key)
+
+    def open_page(self, name: str) -> IO[bytes]:
+        """Open a page for streaming reads."""
+        return self._archive.open(name)
+
+    def read_page(self, name: str) -> bytes:
+        """Read a whole page into memory."""
+        return self._archive.read(name)
+
+    def extract_pages(self, directory: str) -> None:
+        """Extract every page under ``directory``, keeping member paths.
+
+        All pages are extracted in one pass in stored order, which solid
+        RAR archives need to avoid decompressing from the start per page.
+        """
+        self._archive.extractall(directory, members=self.pages())
@@ -0,0 +1,257 @@
+"""
+Perceptual page hashing and near-duplicate search.
+
+Each page is reduced to a 64-bit difference hash (dHash), so re-encoded or
+slightly cropped copies of the same scan land within a few bits of each
+other. Hashes are kept as packed ``uint64`` arrays and compared with
+vectorized Hamming distances.
+
+All-pairs comparison of a million hashes would be 10^12 comparisons, so
+``find_near_duplicate_pairs`` uses multi-index hashing instead: by the
+pigeonhole principle, two hashes within ``max_distance`` bits must agree
+exactly on some subset of bit blocks. Candidates are found by sorting on
+each such subset and only those pairs are verified.
+"""
+
+import functools
+import io
+import itertools
+import logging
+import math
+import operator
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.library.archive import ChapterArchive
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 4
+# Blank and near-uniform pages (white separators, solid credits) all hash to
+# almost no set bits and would match each other across every chapter.
+DEFAULT_MIN_INFORMATION_BITS = 6
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dhash(image_bytes: bytes) -> int:
+    """Compute the 64-bit difference hash of an encoded image."""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        # Let the JPEG decoder downscale while decoding; we only need 9x8.
+        image.draft("L", (64, 64))
+        small = image.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hash_chapter_pages(path: str) -> np.ndarray:
+    """Hash every page of a chapter archive, in reading order.
+
+    Pages that cannot be decoded are skipped with a warning.
+    """
+    hashes = []
+    with ChapterArchive(path) as archive:
+        for name in archive.pages():
+            try:
+                hashes.append(dhash(archive.read_page(name)))
+            except Exception as e:
+                logger.warning("Cannot hash page '%s' in '%s': %s", name, path, e)
+    return np.array(hashes, dtype=np.uint64)
+
+
+def pack_hashes(hashes: np.ndarray) -> bytes:
+    """Serialize hashes to little-endian bytes for storage."""
+    return np.asarray(hashes, dtype="<u8").tobytes()
+
+
+def unpack_hashes(data: bytes) -> np.ndarray:
+    """Inverse of ``pack_hashes``."""
+    return np.frombuffer(data or b"", dtype="<u8").astype(np.uint64)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Number of set bits in each uint64."""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(values)
+    return (
+        _POPCOUNT_TABLE[values.view(np.uint8)]
+        .reshape(-1, 8)
+        .sum(axis=1, dtype=np.uint8)
+    )
+
+
+def hamming_distances(query: int, hashes: np.ndarray) -> np.ndarray:
+    """Hamming distance from one hash to every hash in an array."""
+    return popcount(np.asarray(hashes, dtype=np.uint64) ^ np.uint64(query))
+
+
+def _candidate_masks(max_distance: int, count: int) -> List[np.uint64]:
+    """Bit masks whose exact agreement is necessary for a match.
+
+    The hash is split into ``max_distance + r`` contiguous blocks. Two hashes
+    within ``max_distance`` bits differ in at most that many blocks, so they
+    agree exactly on at least ``r`` of them, i.e. on at least one mask made
+    of ``r`` blocks. ``r`` is chosen so each mask has roughly log2(count)
+    bits: fewer bits produce crowded buckets, more bits produce more masks.
+    """
+    if not 0 <= max_distance < HASH_BITS // 2:
+        raise ValueError(f"max_distance must be between 0 and {HASH_BITS // 2 - 1}")
+    target_bits = min(48, max(16, math.ceil(math.log2(max(count, 2))) + 2))
+    r = 1
+    while HASH_BITS * r / (max_distance + r) < target_bits:
+        r += 1
+    blocks = max_distance + r
+
+    block_masks = []
+    shift = 0
+    for index in range(blocks):
+        size = HASH_BITS // blocks + (1 if index < HASH_BITS % blocks else 0)
+        block_masks.append(((1 << size) - 1) << shift)
+        shift += size
+    return [
+        np.uint64(functools.reduce(operator.or_, combo))
+        for combo in itertools.combinations(block_masks, r)
+    ]
+
+
+def find_near_duplicate_pairs(
+    hashes: np.ndarray,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    min_information_bits: int = DEFAULT_MIN_INFORMATION_BITS,
+    chunk_size: int = 1 << 20,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find all index pairs (i, j), i < j, within ``max_distance`` bits.
+
+    Candidate pairs are generated and verified in chunks of ``chunk_size``
+    so memory stays bounded even when many pages collide on a mask.
+    """
+    hashes = np.ascontiguousarray(hashes, dtype=np.uint64)
+    bits = popcount(hashes)
+    informative = np.flatnonzero(
+        (bits >= min_information_bits) & (bits <= HASH_BITS - min_information_bits)
+    )
+    values = hashes[informative]
+
+    found = []
+    for mask in _candidate_masks(max_distance, len(values)):
+        keys = values & mask
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        # Pairs sharing this mask are at most (run length - 1) apart once
+        # sorted, so stepping the offset until no neighbours match covers
+        # every pair exactly once per mask.
+        offset = 1
+        while offset < len(order):
+            same = np.flatnonzero(sorted_keys[offset:] == sorted_keys[:-offset])
+            if len(same) == 0:
+                break
+            for start in range(0, len(same), chunk_size):
+                positions = same[start : start + chunk_size]
+                a = order[positions]
+                b = order[positions + offset]
+                close = popcount(values[a] ^ values[b]) <= max_distance
+                a, b = a[close], b[close]
+                found.append(np.minimum(a, b).astype(np.int64) << 32 | np.maximum(a, b))
+            offset += 1
+
+    if not found:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    # A pair agreeing on several masks is found once per mask.
+    pairs = np.unique(np.concatenate(found))
+    return informative[pairs >> 32], informative[pairs & 0xFFFFFFFF]
+
+
+@dataclass
+class DuplicateChapterMatch:
+    """Two chapters sharing most of their pages."""
+
+    chapter_a: Hashable
+    chapter_b: Hashable
+    matched_pages: int
+    pages_a: int
+    pages_b: int
+
+    @property
+    def similarity(self) -> float:
+        """Fraction of the shorter chapter's pages found in the other one."""
+        return self.matched_pages / max(1, min(self.pages_a, self.pages_b))
+
+
+def find_duplicate_chapters(
+    chapter_hashes: Dict[Hashable, np.ndarray],
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    min_similarity: float = 0.8,
+    groups: Dict[Hashable, Hashable] = None,
+) -> List[DuplicateChapterMatch]:
+    """Find chapters whose pages are near-duplicates of another chapter's.
+
+    ``chapter_hashes`` maps chapter ids to their page hashes. If ``groups``
+    is given (chapter id -> series id), only chapters in the same group are
+    compared. Matches are ordered by decreasing similarity.
+    """
+    chapter_ids: Sequence[Hashable] = list(chapter_hashes)
+    if len(chapter_ids) < 2:
+        return []
+    counts = np.array([len(chapter_hashes[c]) for c in chapter_ids], dtype=np.int64)
+    owners = np.repeat(np.arange(len(chapter_ids), dtype=np.int64), counts)
+    all_hashes = np.concatenate([chapter_hashes[c] for c in chapter_ids]).astype(
+        np.uint64
+    )
+
+    i, j = find_near_duplicate_pairs(all_hashes, max_distance=max_distance)
+    owner_i, owner_j = owners[i], owners[j]
+    cross = owner_i != owner_j
+    if groups is not None:
+        group_ids = {}
+        group_of = np.array(
+            [group_ids.setdefault(groups[c], len(group_ids)) for c in chapter_ids]
+        )
+        cross &= group_of[owner_i] == group_of[owner_j]
+    i, j, owner_i, owner_j = i[cross], j[cross], owner_i[cross], owner_j[cross]
+    if len(i) == 0:
+        return []
+
+    # Orient every pair as (lower chapter, higher chapter) and count distinct
+    # matched pages on each side, so one page matching many doesn't inflate.
+    swap = owner_i > owner_j
+    low_page = np.where(swap, j, i)
+    high_page = np.where(swap, i, j)
+    pair_key = np.minimum(owner_i, owner_j) * len(chapter_ids) + np.maximum(
+        owner_i, owner_j
+    )
+
+    low_keys, low_counts = np.unique(
+        np.unique(np.stack([pair_key, low_page], axis=1), axis=0)[:, 0],
+        return_counts=True,
+    )
+    high_keys, high_counts = np.unique(
+        np.unique(np.stack([pair_key, high_page], axis=1), axis=0)[:, 0],
+        return_counts=True,
+    )
+    if not np.array_equal(low_keys, high_keys):
+        # Every pair key has pages on both sides; anything else is a bug above.
+        raise RuntimeError(
+            "Duplicate chapter pairs lost one side while counting matched pages"
+        )
+
+    matches = []
+    for key, matched in zip(low_keys, np.minimum(low_counts, high_counts), strict=True):
+        a, b = divmod(int(key), len(chapter_ids))
+        match = DuplicateChapterMatch(
+            chapter_a=chapter_ids[a],
+            chapter_b=chapter_ids[b],
+            matched_pages=int(matched),
+            pages_a=int(counts[a]),
+            pages_b=int(counts[b]),
+        )
+        if match.similarity >= min_similarity:
+            matches.append(match)
+    matches.sort(key=lambda m: m.similarity, reverse=True)
+    return matches
@@ -0,0 +1,293 @@
+"""
+Chapter and volume information from file names.
+
+Chapter files are named by whoever scanned or bought them, for example
+``Chapter 001 - Romance Dawn.cbz``, ``[Group] Berserk v01 c003.cbz`` or
+``Mob Psycho 100 - 012.5.cbz``. ``FilenameParser`` applies one fixed,
+ordered set of precompiled rules to every name:
+
+1. the extension and bracketed tags (``[Group]``, ``(Digital)``, ``{v2}``)
+   are split off;
+2. the series name, when known, is stripped from the front;
+3. explicit markers are matched: ``Vol.``/``v`` for volumes and
+   ``Chapter``/``Ch.``/``c``/``Episode``/``#`` for chapters, including
+   decimal chapters (``12.5``);
+4. failing that, a number standing alone between dashes
+   (``Title - 012.5`` or ``Title - 101 - Finale``) is the chapter, and
+   otherwise the first bare number;
+5. whatever follows the chapter number is the title, and extras
+   (``Extra``, ``Omake``, ``Special``...) are flagged.
+
+``parse_many`` parses a whole directory listing at once. When no series
+name is given it infers the prefix shared by the listing, so numbers in
+series names like ``20th Century Boys`` are not taken for chapters.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.library.archive import ARCHIVE_EXTENSIONS, natural_sort_key
+
+# chapters.chapter_number is DECIMAL(10,2) and volume_number INTEGER.
+MAX_CHAPTER_NUMBER = Decimal("99999999.99")
+MAX_CHAPTER_DIGITS = 8  # Before the decimal point
+MAX_VOLUME_NUMBER = 9999
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_TAG_RE = re.compile(r"\[([^\[\]]*)\]|\(([^()]*)\)|\{([^{}]*)\}")
+_VOLUME_RE = re.compile(r"(?<![a-z0-9])(?:vol(?:ume)?\.?\s*|v\.?)(\d+)", re.IGNORECASE)
+_CHAPTER_RE = re.compile(
+    r"(?<![a-z0-9])(?:chapter|chap|ch|episode|ep)\.?\s*" + _NUMBER
+    + r"(?:-\d+(?:\.\d+)?)?"
+    r"|(?<![a-z0-9])(?:c\.?|#)" + _NUMBER + r"(?:-\d+(?:\.\d+)?)?",
+    re.IGNORECASE,
+)
+_BARE_NUMBER_RE = re.compile(r"(?<![\d.])" + _NUMBER + r"(?![\d])")
+_DASH_NUMBER_RE = re.compile(r"(?:^|\s)[-–—]\s*" + _NUMBER + r"(?=\s*(?:[-–—:]|$))")
+_EXTRA_RE = re.compile(
+    r"(?<![a-z])(?:extra|omake|special|bonus|side[\s-]?story)(?![a-z])", re.IGNORECASE
+)
+_TRAILING_MARKER_RE = re.compile(
+    r"(?:^|[\s\-.])(?:vol(?:ume)?|v|chapter|chap|ch|episode|ep|c|#)\.?\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class ParsedFilename:
+    """Chapter information derived from one file name."""
+    filename: str
+    chapter_number: Optional[Decimal] = None
+    volume_number: Optional[int] = None
+    title: Optional[str] = None
+    extra: bool = False
+    group: Optional[str] = None
+    # Lower case, without the dot, as stored in chapters.file_extension
+    extension: Optional[str] = None
+    tags: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def sort_key(self) -> tuple:
+        """Reading order: numbered chapters first, then by volume, number and name."""
+        return (
+            self.chapter_number is None,
+            self.chapter_number if self.chapter_number is not None else 0,
+            self.volume_number if self.volume_number is not None else -1,
+            self.extra,
+            natural_sort_key(self.filename),
+        )
+
+
+@lru_cache(maxsize=4096)
+def _chapter_value(text: str) -> Optional[Decimal]:
+    # Cached since every series repeats the same numbers ("001", "002"...);
+    # Decimals are immutable, so results can be shared.
+    whole, _, fraction = text.partition(".")
+    if len(fraction) > 2 or len(whole.lstrip("0")) > MAX_CHAPTER_DIGITS:
+        return None
+    return Decimal(text)
+
+
+def _volume_value(text: str) -> Optional[int]:
+    value = int(text)
+    return value if value <= MAX_VOLUME_NUMBER else None
+
+
+def _title(text: str) -> Optional[str]:
+    # Normalized text has no whitespace but single spaces.
+    return text.lstrip(" -–—:.,").rstrip(" -–—") or None
+
+
+@lru_cache(maxsize=1024)
+def _series_prefix_pattern(series: str) -> Optional["re.Pattern"]:
+    """Compiled pattern matching a series name at the start of a file name.
+
+    Cached per series, since a library walk parses many files per series.
+    Spaces, underscores and dots in the series name are interchangeable.
+    """
+    words = [w for w in re.split(r"[\s_.]+", series.strip()) if w]
+    if not words:
+        return None
+    return re.compile(
+        r"\s*" + r"[\s_.]*".join(re.escape(w) for w in words) + r"(?![a-z0-9])",
+        re.IGNORECASE,
+    )
+
+
+def _strip_tags(stem: str) -> Tuple[str, Tuple[str, ...], Optional[str]]:
+    if "[" not in stem and "(" not in stem and "{" not in stem:
+        return stem, (), None
+    tags = []
+    group = None
+    # Text between the tags, joined by spaces where the tags were.
+    pieces = []
+    end = 0
+    for match in _TAG_RE.finditer(stem):
+        start = match.start()
+        pieces.append(stem[end:start])
+        end = match.end()
+        tag = match.group(match.lastindex).strip()
+        if not tag:
+            continue
+        # A square-bracketed tag leading the name is the scanlation group.
+        if group is None and match.lastindex == 1 and not stem[:start].strip():
+            group = tag
+        tags.append(tag)
+    pieces.append(stem[end:])
+    return " ".join(pieces), tuple(tags), group
+
+
+def _split_name(
+    filename: str,
+) -> Tuple[Optional[str], str, Tuple[str, ...], Optional[str]]:
+    """Split a file name into extension, normalized text, tags and group."""
+    stem = filename[filename.rfind("/") + 1 :]
+    extension = None
+    # String methods rather than regexes: this runs for every file. The
+    # extension is up to five ASCII letters and digits, starting with a letter.
+    base, dot, suffix = stem.rpartition(".")
+    if (
+        dot
+        and 0 < len(suffix) <= 5
+        and suffix.isascii()
+        and suffix.isalnum()
+        and suffix[0].isalpha()
+    ):
+        extension = suffix.lower()
+        stem = base
+    stem, tags, group = _strip_tags(stem)
+    return extension, " ".join(stem.replace("_", " ").split()), tags, group
+
+
+class FilenameParser:
+    """Parses chapter file names with a precompiled, ordered rule set."""
+
+    def parse(self, filename: str, series: Optional[str] = None) -> ParsedFilename:
+        """Parse a single file name, optionally knowing its series name."""
+        prefix = _series_prefix_pattern(series) if series else None
+        return self._parse(filename, _split_name(filename), prefix)
+
+    def parse_many(
+        self, filenames: Iterable[str], series: Optional[str] = None
+    ) -> List[ParsedFilename]:
+        """Parse a directory listing in one pass.
+
+        Results are in input order. Without ``series``, the name prefix
+        shared by the listing's chapter files is used in its place.
+        """
+        filenames = list(filenames)
+        # Each name is split once and shared by prefix inference and parsing.
+        parts = [_split_name(name) for name in filenames]
+        if series is None:
+            series = _shared_prefix(parts)
+        prefix = _series_prefix_pattern(series) if series else None
+        return [
+            self._parse(name, split, prefix)
+            for name, split in zip(filenames, parts, strict=True)
+        ]
+
+    def _parse(
+        self, filename: str, split: tuple, prefix: Optional["re.Pattern"]
+    ) -> ParsedFilename:
+        extension, text, tags, group = split
+        if prefix is not None:
+            match = prefix.match(text)
+            # Keep the name intact if it *is* the series name plus nothing.
+            if match and match.end() < len(text):
+                text = text[match.end() :]
+
+        # Explicit chapter marker, with any volume marker in front of it.
+        chapter = volume_number = title = chapter_end = None
+        for match in _CHAPTER_RE.finditer(text):
+            chapter = _chapter_value(match.group(1) or match.group(2))
+            if chapter is not None:
+                chapter_start, chapter_end = match.span()
+                break
+
+        if chapter_end is not None:
+            volume = _VOLUME_RE.search(text, 0, chapter_start)
+            if volume:
+                volume_number = _volume_value(volume.group(1))
+        else:
+            search_from = 0
+            volume = _VOLUME_RE.search(text)
+            if volume:
+                volume_number = _volume_value(volume.group(1))
+                search_from = volume.end()
+            # Bare number: one set off by dashes, else the first one after
+            # the series name and volume, so "Mob Psycho 100 - 012" is 12.
+            for pattern in (_DASH_NUMBER_RE, _BARE_NUMBER_RE):
+                for match in pattern.finditer(text, search_from):
+                    chapter = _chapter_value(match.group(1))
+                    if chapter is not None:
+                        chapter_end = match.end()
+                        break
+                if chapter_end is not None:
+                    break
+
+        if chapter_end is not None:
+            title = _title(text[chapter_end:])
+        elif volume_number is None:
+            title = _title(text)
+        extra = _EXTRA_RE.search(text) is not None
+        if not extra and tags:
+            extra = any(_EXTRA_RE.search(tag) for tag in tags)
+        return ParsedFilename(
+            filename, chapter, volume_number, title, extra, group, extension, tags
+        )
+
+
+def infer_series_prefix(filenames: Sequence[str]) -> Optional[str]:
+    """The series name shared by a listing of chapter files, if any.
+
+    Only archives and extension-less entries (image folders) are considered,
+    so covers and sidecar files don't defeat the inference. The shared
+    prefix is cut back to a whole word and never includes a volume or
+    chapter marker.
+    """
+    return _shared_prefix([_split_name(name) for name in filenames])
+
+
+def _shared_prefix(parts: Sequence[tuple]) -> Optional[str]:
+    stems = [
+        text.lower()
+        for extension, text, _, _ in parts
+        if extension is None or "." + extension in ARCHIVE_EXTENSIONS
+    ]
+    if len(stems) < 2:
+        return None
+
+    prefix = os.path.commonprefix(stems)
+    if len(prefix) == min(len(s) for s in stems):
+        return None
+    # Back up to a word boundary so "Berserk 00" becomes "Berserk ".
+    prefix = prefix[: max(prefix.rfind(" "), 0)]
+    marker = _VOLUME_RE.search(prefix) or _CHAPTER_RE.search(prefix)
+    if marker:
+        prefix = prefix[: marker.start()]
+    while True:
+        trailing = _TRAILING_MARKER_RE.search(prefix)
+        if not trailing:
+            break
+        prefix = prefix[: trailing.start()]
+    prefix = prefix.strip(" -_.:")
+    return prefix or None
+
+
+_default_parser = FilenameParser()
+
+
+def parse_filename(filename: str, series: Optional[str] = None) -> ParsedFilename:
+    """Parse one chapter file name with the shared parser."""
+    return _default_parser.parse(filename, series)
+
+
+def parse_filenames(
+    filenames: Iterable[str], series: Optional[str] = None
+) -> List[ParsedFilename]:
+    """Parse a directory listing with the shared parser."""
+    return _default_parser.parse_many(filenames, series)
@@ -0,0 +1,183 @@
+"""
+Page dimensions from image headers.
+
+Readers lay pages out, and tell double-page spreads from single pages,
+before downloading them. Dimensions are read from the first bytes of each
+image (JPEG SOF, PNG IHDR, WebP VP8/VP8L/VP8X, GIF and BMP headers)
+without decoding any pixels, so a page costs a few microseconds plus the
+read of its header from the archive.
+
+JPEGs rotated by their EXIF orientation report the displayed size, as
+browsers apply the orientation when drawing them.
+"""
+
+import logging
+import struct
+from typing import IO, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.library.archive import ChapterArchive
+
+logger = logging.getLogger(__name__)
+
+# Give up on headers that do not end within this many bytes.
+MAX_HEADER_BYTES = 1024 * 1024
+_READ_SIZE = 4096
+
+# Start-of-frame markers; C4 (DHT), C8 (JPG) and CC (DAC) share the range.
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field.
+_JPEG_STANDALONE = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+Size = Tuple[int, int]
+
+
+class _Header:
+    """The start of an image stream, read further on demand."""
+
+    def __init__(self, stream: IO[bytes]):
+        self.stream = stream
+        self.data = stream.read(_READ_SIZE)
+
+    def get(self, offset: int, size: int) -> Optional[bytes]:
+        end = offset + size
+        if end > len(self.data):
+            if end > MAX_HEADER_BYTES:
+                return None
+            self.data += self.stream.read(max(end - len(self.data), _READ_SIZE))
+            if end > len(self.data):
+                return None
+        return self.data[offset:end]
+
+
+def _exif_orientation(segment: bytes) -> int:
+    """Orientation tag (1-8) from an APP1 Exif segment body, 1 if absent."""
+    if not segment.startswith(b"Exif\0\0") or len(segment) < 14:
+        return 1
+    tiff = segment[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return 1
+    try:
+        ifd = struct.unpack_from(order + "I", tiff, 4)[0]
+        count = struct.unpack_from(order + "H", tiff, ifd)[0]
+        for entry in range(ifd + 2, ifd + 2 + 12 * count, 12):
+            tag, _, _, value = struct.unpack_from(order + "HHIH", tiff, entry)
+            if tag == 0x0112:
+                return value
+    except struct.error:
+        pass
+    return 1
+
+
+def _jpeg_size(header: _Header) -> Optional[Size]:
+    offset = 2
+    orientation = 1
+    while True:
+        marker = header.get(offset, 2)
+        if marker is None or marker[0] != 0xFF:
+            return None
+        kind = marker[1]
+        if kind == 0xFF:  # Fill byte
+            offset += 1
+            continue
+        if kind in _JPEG_STANDALONE:
+            offset += 2
+            continue
+        length_bytes = header.get(offset + 2, 2)
+        if length_bytes is None:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if kind in _JPEG_SOF:
+            frame = header.get(offset + 5, 4)
+            if frame is None:
+                return None
+            height, width = struct.unpack(">HH", frame)
+            return (height, width) if orientation >= 5 else (width, height)
+        if kind == 0xE1 and orientation == 1:
+            segment = header.get(offset + 4, length - 2)
+            if segment is not None:
+                orientation = _exif_orientation(segment)
+        if kind == 0xDA:  # Start of scan without a frame header
+            return None
+        offset += 2 + length
+
+
+def _webp_size(header: _Header) -> Optional[Size]:
+    chunk = header.get(12, 4)
+    body = header.get(20, 10)
+    if chunk is None or body is None:
+        return None
+    if chunk == b"VP8 ":
+        if body[3:6] != b"\x9d\x01\x2a":
+            return None
+        width, height = struct.unpack_from("<HH", body, 6)
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        if body[0] != 0x2F:
+            return None
+        bits = int.from_bytes(body[1:5], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(body[4:7], "little") + 1
+        return width, int.from_bytes(body[7:10], "little") + 1
+    return None
+
+
+def read_image_size(stream: IO[bytes]) -> Optional[Size]:
+    """(width, height) of an encoded image from its header, or None if unrecognized."""
+    header = _Header(stream)
+    head = header.data
+    if head.startswith(b"\xff\xd8"):
+        return _jpeg_size(header)
+    if (
+        head.startswith(b"\x89PNG\r\n\x1a\n")
+        and head[12:16] == b"IHDR"
+        and len(head) >= 24
+    ):
+        return struct.unpack_from(">II", head, 16)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return _webp_size(header)
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        return struct.unpack_from("<HH", head, 6)
+    if head[:2] == b"BM" and len(head) >= 26:
+        width, height = struct.unpack_from("<ii", head, 18)
+        return abs(width), abs(height)
+    return None
+
+
+def read_chapter_dimensions(path: str) -> List[Size]:
+    """(width, height) of every page of a chapter archive in reading order.
+
+    Pages whose header cannot be read or parsed are (0, 0).
+    """
+    sizes = []
+    with ChapterArchive(path) as archive:
+        for name in archive.pages():
+            size = None
+            try:
+                with archive.open_page(name) as stream:
+                    size = read_image_size(stream)
+            except Exception as e:
+                logger.warning(
+                    "Cannot read page header '%s' in '%s': %s", name, path, e
+                )
+            sizes.append(size or (0, 0))
+    return sizes
+
+
+def pack_dimensions(sizes: Sequence[Size]) -> bytes:
+    """Serialize sizes as little-endian uint32 (width, height) pairs for storage."""
+    return np.asarray(sizes, dtype="<u4").reshape(-1, 2).tobytes()
+
+
+def unpack_dimensions(data: bytes) -> List[Size]:
+    """Inverse of ``pack_dimensions``."""
+    pairs = np.frombuffer(data, dtype="<u4").reshape(-1, 2).tolist()
+    return [tuple(pair) for pair in pairs]
+
+
+def is_spread(width: int, height: int) -> bool:
+    """Whether a page is a double-page spread: wider than it is tall."""
+    return width > height > 0
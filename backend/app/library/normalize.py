@@ -0,0 +1,199 @@
+"""
+Repacking chapter archives for random access.
+
+Reading one page of a deflated CBZ means inflating it, and reading one
+page of a solid RAR means decompressing everything before it. Normalized
+chapters are CBZ files whose pages are STORED, in reading order:
+
+- page bytes are copied as they are. JPEG, PNG and WebP are compressed
+  already, so deflating them saved next to nothing anyway;
+- members are laid out in natural page order, so reading a chapter front
+  to back reads the file front to back;
+- other members (ComicInfo.xml and the like) are kept, deflated; junk
+  such as ``__MACOSX/`` and dot files is dropped.
+
+RAR pages are extracted in one sequential pass before repacking. Every
+write goes to a temporary file in the destination directory, which is
+verified and then renamed over the destination, so readers see either
+the old file or the complete new one.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Optional
+
+from app.library.archive import (
+    RAR_EXTENSIONS,
+    ArchiveError,
+    ChapterArchive,
+    is_image_name,
+    natural_sort_key,
+    rar_supported,
+)
+
+logger = logging.getLogger(__name__)
+
+NORMALIZED_EXTENSION = ".cbz"
+COPY_CHUNK = 1024 * 1024
+
+COMPRESSED_PAGES = "compressed pages"
+RAR_ARCHIVE = "rar archive"
+UNORDERED_PAGES = "pages out of order"
+
+_rar_skip_logged = False
+
+
+class Throttle:
+    """Caps the combined byte rate of the threads sharing it."""
+
+    def __init__(self, bytes_per_second: float):
+        # 0 disables throttling.
+        self.bytes_per_second = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_free = time.monotonic()
+
+    def consume(self, size: int) -> None:
+        """Account for ``size`` bytes, sleeping until the rate allows them."""
+        if self.bytes_per_second <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_free, now)
+            self._next_free = start + size / self.bytes_per_second
+        if start > now:
+            time.sleep(start - now)
+
+
+@dataclass
+class RepackResult:
+    """What one repacked archive took and produced."""
+    pages: int
+    bytes_read: int
+    bytes_written: int
+
+
+def normalization_reason(path: str) -> Optional[str]:
+    """Why an archive should be repacked, or None if it is normalized already.
+
+    Only reads the archive's directory. RAR archives are left alone when
+    ``rarfile`` is not installed, since they could not be read to repack.
+    """
+    global _rar_skip_logged
+    if os.path.splitext(path)[1].lower() in RAR_EXTENSIONS:
+        if rar_supported():
+            return RAR_ARCHIVE
+        if not _rar_skip_logged:
+            _rar_skip_logged = True
+            logger.warning(
+                "Not normalizing RAR archives: the 'rarfile' package is not installed"
+            )
+        return None
+    with ChapterArchive(path) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        pages = archive.pages()
+    if any(infos[name].compress_type != zipfile.ZIP_STORED for name in pages):
+        return COMPRESSED_PAGES
+    offsets = [infos[name].header_offset for name in pages]
+    if offsets != sorted(offsets):
+        return UNORDERED_PAGES
+    return None
+
+
+def _is_junk(name: str) -> bool:
+    base = name.rstrip("/").rsplit("/", 1)[-1]
+    return "__MACOSX/" in name or base.startswith(".")
+
+
+def _copy(src: IO[bytes], dst: IO[bytes], throttle: Optional[Throttle]) -> int:
+    copied = 0
+    while True:
+        chunk = src.read(COPY_CHUNK)
+        if not chunk:
+            return copied
+        if throttle is not None:
+            throttle.consume(len(chunk))
+        dst.write(chunk)
+        copied += len(chunk)
+
+
+def repack(
+    source_path: str, dest_path: str, throttle: Optional[Throttle] = None
+) -> RepackResult:
+    """Write a normalized copy of a chapter archive to ``dest_path``.
+
+    ``dest_path`` may be the source itself; it is only replaced once the
+    copy is complete and verified. Raises ArchiveError if the source
+    cannot be read.
+    """
+    directory = os.path.dirname(dest_path) or "."
+    temp_name = f".{os.path.basename(dest_path)}.{uuid.uuid4().hex}.tmp"
+    temp = os.path.join(directory, temp_name)
+    spool = None
+    try:
+        with ChapterArchive(source_path) as archive:
+            pages = archive.pages()
+            if not pages:
+                raise ArchiveError(f"No pages in '{source_path}'")
+            extras = [
+                info.filename
+                for info in archive.infolist()
+                if not info.is_dir()
+                and not is_image_name(info.filename)
+                and not _is_junk(info.filename)
+            ]
+            if not archive.is_zip:
+                # Solid archives decompress sequentially: one pass in stored order.
+                spool = tempfile.mkdtemp(prefix=".normalize-", dir=directory)
+                archive.extract_pages(spool)
+
+            bytes_read = 0
+            with zipfile.ZipFile(
+                temp, "w", compression=zipfile.ZIP_STORED, allowZip64=True
+            ) as out:
+                for name in pages:
+                    info = zipfile.ZipInfo(name, _date_time(archive, name))
+                    info.compress_type = zipfile.ZIP_STORED
+                    if spool is not None:
+                        src = open(os.path.join(spool, name), "rb")
+                    else:
+                        src = archive.open_page(name)
+                    with src, out.open(info, "w", force_zip64=True) as dst:
+                        bytes_read += _copy(src, dst, throttle)
+                for name in sorted(extras, key=natural_sort_key):
+                    info = zipfile.ZipInfo(name, _date_time(archive, name))
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    data = archive.read_page(name)
+                    bytes_read += len(data)
+                    out.writestr(info, data)
+
+        with ChapterArchive(temp) as written:
+            if written.pages() != pages:
+                raise ArchiveError(f"Repacked copy of '{source_path}' lost pages")
+        result = RepackResult(len(pages), bytes_read, os.path.getsize(temp))
+        os.replace(temp, dest_path)
+        return result
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    finally:
+        if spool is not None:
+            shutil.rmtree(spool, ignore_errors=True)
+
+
+def _date_time(archive: ChapterArchive, name: str):
+    date_time = archive.getinfo(name).date_time
+    # Zip timestamps cannot go before 1980.
+    return date_time if date_time and date_time[0] >= 1980 else (1980, 1, 1, 0, 0, 0)
+
+
+def normalized_name(file_name: str) -> str:
+    """File name of a chapter once normalized."""
+    return os.path.splitext(file_name)[0] + NORMALIZED_EXTENSION
@@ -0,0 +1,384 @@
+"""
+Pre-extracted pages for chapters being read.
+
+Reading a page out of a deflated CBZ or a RAR decompresses it on every
+request. Chapters that are being read, or are expected to be read next,
+are extracted once into plain files so pages can be served straight from
+disk.
+
+Layout::
+
+    <root>/
+        index.json              # size, access score and last access per chapter
+        index.lock
+        <chapter_id>/
+            manifest.json       # page file names and the source archive signature
+            0001.jpg
+            0002.png
+            ...
+            tiles/
+                0007-000.jpg    # tiles of page 7, a very tall page
+                0007-001.jpg
+
+A chapter is extracted into a temporary directory and renamed into place
+when complete, so a chapter directory with a manifest is always whole.
+The manifest records the source archive's size and modification time; a
+chapter whose archive changed on disk is served from the archive again
+until it is re-extracted. Pages taller than ``tile_min_height`` are also
+split into tiles during extraction (see ``app.library.tiles``), on a pool
+of ``tile_workers`` threads; the manifest lists each tile's rows.
+
+``index.json`` is what eviction works from, so restarting needs no walk
+over the page files. Only background jobs write it, under a file lock; if
+it is lost it is rebuilt from the chapter manifests. Eviction keeps the
+tier within its byte budget by dropping the chapters with the lowest
+access score: each read adds one and scores halve every ``HALF_LIFE``
+seconds, so chapters read repeatedly outlive chapters read once, and old
+favourites still age out (LFU with LRU-style decay).
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+
+from app.library.archive import ChapterArchive
+from app.library.image_header import read_image_size
+from app.library.tiles import tile_page
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.json"
+TILES_DIR = "tiles"
+HALF_LIFE = 3 * 24 * 3600
+_TEMP_PREFIX = ".tmp-"
+
+
+def source_signature(path: str) -> Tuple[int, int]:
+    """Size and modification time identifying one version of a source archive."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def decayed_score(entry: dict, now: float) -> float:
+    age = now - entry.get("score_at", now)
+    return entry.get("score", 0.0) * 0.5 ** (age / HALF_LIFE)
+
+
+def _write_json(path: str, data) -> None:
+    """Replace a JSON file atomically."""
+    temp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(temp, path)
+
+
+class PageCache:
+    """Disk tier of extracted chapter pages with a byte budget."""
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int,
+        tile_height: int = 0,
+        tile_min_height: int = 0,
+        tile_workers: int = 1,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        # A tile height of 0 disables tiling.
+        self.tile_height = tile_height
+        self.tile_min_height = tile_min_height
+        self.tile_workers = tile_workers
+
+    def chapter_dir(self, chapter_id: str) -> str:
+        return os.path.join(self.root, str(chapter_id))
+
+    def _manifest_path(self, chapter_id: str) -> str:
+        return os.path.join(self.chapter_dir(chapter_id), MANIFEST_NAME)
+
+    # Reading
+
+    def load_manifest(self, chapter_id: str) -> Optional[dict]:
+        try:
+            with open(self._manifest_path(chapter_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_current(self, manifest: Optional[dict], source_path: str) -> bool:
+        """Whether an extracted chapter still matches its source archive."""
+        if manifest is None:
+            return False
+        try:
+            return tuple(manifest["source"]) == source_signature(source_path)
+        except OSError:
+            return False
+
+    def page_path(
+        self, chapter_id: str, page_number: int, source_path: str
+    ) -> Optional[str]:
+        """Path of an extracted page (1-based), or None to read it from the archive."""
+        manifest = self.load_manifest(chapter_id)
+        if not self.is_current(manifest, source_path):
+            return None
+        pages = manifest["pages"]
+        if not 1 <= page_number <= len(pages):
+            return None
+        return os.path.join(self.chapter_dir(chapter_id), pages[page_number - 1])
+
+    def tile_path(
+        self, chapter_id: str, page_number: int, tile_index: int, source_path: str
+    ) -> Optional[str]:
+        """Path of one tile of a tiled page, or None if there is no such tile."""
+        manifest = self.load_manifest(chapter_id)
+        if not self.is_current(manifest, source_path):
+            return None
+        tiles = manifest.get("tiles", {}).get(str(page_number), [])
+        if not 0 <= tile_index < len(tiles):
+            return None
+        return os.path.join(
+            self.chapter_dir(chapter_id), TILES_DIR, tiles[tile_index]["file"]
+        )
+
+    # Writing (background jobs only)
+
+    def extract(self, chapter_id: str, source_path: str) -> dict:
+        """Extract every page of a chapter and return its manifest."""
+        os.makedirs(self.root, exist_ok=True)
+        signature = source_signature(source_path)
+        temp = os.path.join(self.root, f"{_TEMP_PREFIX}{chapter_id}-{uuid.uuid4().hex}")
+        os.mkdir(temp)
+        try:
+            pages = []
+            size = 0
+            with ChapterArchive(source_path) as archive:
+                for index, name in enumerate(archive.pages(), start=1):
+                    file_name = f"{index:04d}{os.path.splitext(name)[1].lower()}"
+                    page_file = os.path.join(temp, file_name)
+                    with archive.open_page(name) as src, open(page_file, "wb") as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                        size += dst.tell()
+                    pages.append(file_name)
+            tiles, tile_bytes = self._tile_pages(temp, pages)
+            manifest = {
+                "chapter_id": str(chapter_id),
+                "source": list(signature),
+                "pages": pages,
+                "tiling": self._tiling(),
+                "tiles": tiles,
+                "bytes": size + tile_bytes,
+            }
+            _write_json(os.path.join(temp, MANIFEST_NAME), manifest)
+
+            target = self.chapter_dir(chapter_id)
+            if os.path.exists(target):
+                # Move the old copy aside first so the rename below is atomic.
+                stale = os.path.join(
+                    self.root, f"{_TEMP_PREFIX}{chapter_id}-{uuid.uuid4().hex}"
+                )
+                os.rename(target, stale)
+                shutil.rmtree(stale, ignore_errors=True)
+            os.rename(temp, target)
+            return manifest
+        except BaseException:
+            shutil.rmtree(temp, ignore_errors=True)
+            raise
+
+    def _tiling(self) -> List[int]:
+        return [self.tile_height, self.tile_min_height]
+
+    def _tile_pages(
+        self, directory: str, pages: List[str]
+    ) -> Tuple[Dict[str, List[dict]], int]:
+        """Tile the tall pages extracted into ``directory``.
+
+        Returns the tiles by page number and their total size. A page that
+        cannot be tiled is left untiled and served whole.
+        """
+        if not self.tile_height:
+            return {}, 0
+        tall = []
+        for number, file_name in enumerate(pages, start=1):
+            with open(os.path.join(directory, file_name), "rb") as f:
+                size = read_image_size(f)
+            if size is not None and size[1] > self.tile_min_height:
+                tall.append((number, file_name))
+        if not tall:
+            return {}, 0
+
+        tiles_dir = os.path.join(directory, TILES_DIR)
+        os.mkdir(tiles_dir)
+
+        def tile(item: Tuple[int, str]) -> Tuple[int, Optional[List[dict]]]:
+            number, file_name = item
+            stem = f"{number:04d}"
+            try:
+                page_file = os.path.join(directory, file_name)
+                return number, tile_page(page_file, tiles_dir, stem, self.tile_height)
+            except Exception as e:
+                logger.warning(
+                    "Cannot tile page %d of chapter in '%s': %s", number, directory, e
+                )
+                for name in os.listdir(tiles_dir):
+                    if name.startswith(f"{stem}-"):
+                        os.remove(os.path.join(tiles_dir, name))
+                return number, None
+
+        with ThreadPoolExecutor(
+            max_workers=self.tile_workers, thread_name_prefix="tiles"
+        ) as executor:
+            results = list(executor.map(tile, tall))
+        tiles = {
+            str(number): page_tiles for number, page_tiles in results if page_tiles
+        }
+        size = sum(
+            os.path.getsize(os.path.join(tiles_dir, entry["file"]))
+            for page_tiles in tiles.values()
+            for entry in page_tiles
+        )
+        return tiles, size
+
+    def ensure(self, chapter_id: str, source_path: str, accessed: bool = False) -> bool:
+        """Extract a chapter unless a current copy exists, and record it in the index.
+
+        ``accessed`` counts a read of the chapter towards its score.
+        Returns whether the chapter was extracted.
+        """
+        chapter_id = str(chapter_id)
+        manifest = self.load_manifest(chapter_id)
+        extracted = False
+        if (
+            not self.is_current(manifest, source_path)
+            or manifest.get("tiling") != self._tiling()
+        ):
+            manifest = self.extract(chapter_id, source_path)
+            extracted = True
+        now = time.time()
+        with self._index() as index:
+            if not os.path.exists(self._manifest_path(chapter_id)):
+                # Evicted by another worker since it was checked above.
+                index.pop(chapter_id, None)
+                return extracted
+            entry = index.setdefault(
+                chapter_id, {"score": 0.0, "score_at": now, "last_access": now}
+            )
+            entry["bytes"] = manifest["bytes"]
+            if accessed:
+                entry["score"] = decayed_score(entry, now) + 1
+                entry["score_at"] = now
+                entry["last_access"] = now
+        return extracted
+
+    def evict(self, protect: Collection[str] = ()) -> List[str]:
+        """Drop the lowest-scoring chapters until the tier fits its budget.
+
+        Chapters in ``protect`` (the one being read, say) are kept even if
+        that leaves the tier over budget. Returns the evicted chapter IDs.
+        """
+        protect = {str(chapter_id) for chapter_id in protect}
+        now = time.time()
+        evicted = []
+        with self._index() as index:
+            total = sum(entry.get("bytes", 0) for entry in index.values())
+            if total <= self.max_bytes:
+                return evicted
+            candidates = sorted(
+                (chapter_id for chapter_id in index if chapter_id not in protect),
+                key=lambda chapter_id: (
+                    decayed_score(index[chapter_id], now),
+                    index[chapter_id]["last_access"],
+                ),
+            )
+            for chapter_id in candidates:
+                if total <= self.max_bytes:
+                    break
+                total -= index.pop(chapter_id).get("bytes", 0)
+                self._remove(chapter_id)
+                evicted.append(chapter_id)
+        if evicted:
+            logger.info("Evicted %d chapters from the page cache", len(evicted))
+        return evicted
+
+    def remove(self, chapter_id: str) -> None:
+        """Drop one chapter, e.g. after it was deleted from the library."""
+        with self._index() as index:
+            index.pop(str(chapter_id), None)
+            self._remove(str(chapter_id))
+
+    def total_bytes(self) -> int:
+        return sum(
+            entry.get("bytes", 0) for entry in (self._read_index() or {}).values()
+        )
+
+    def _remove(self, chapter_id: str) -> None:
+        target = self.chapter_dir(chapter_id)
+        if not os.path.exists(target):
+            return
+        # Renamed first so no reader sees a partially deleted chapter;
+        # pages already open keep being served until closed.
+        trash = os.path.join(
+            self.root, f"{_TEMP_PREFIX}{chapter_id}-{uuid.uuid4().hex}"
+        )
+        os.rename(target, trash)
+        shutil.rmtree(trash, ignore_errors=True)
+
+    # Index
+
+    @contextmanager
+    def _index(self) -> Iterator[Dict[str, dict]]:
+        """Load the index under an exclusive lock and save it afterwards."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "index.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                index = self._read_index()
+                if index is None:
+                    index = self._rebuild_index()
+                yield index
+                _write_json(os.path.join(self.root, INDEX_NAME), index)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self) -> Optional[Dict[str, dict]]:
+        try:
+            with open(os.path.join(self.root, INDEX_NAME), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning("Page cache index is corrupt, rebuilding it")
+            return None
+
+    def _rebuild_index(self) -> Dict[str, dict]:
+        """Recover the index from chapter manifests, clearing leftover temp files."""
+        index = {}
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(_TEMP_PREFIX):
+                # Recent ones may be extractions still in progress.
+                if os.path.getmtime(path) < time.time() - 3600:
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+            if not os.path.isdir(path):
+                continue
+            manifest = self.load_manifest(name)
+            if manifest is None:
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            modified = os.path.getmtime(os.path.join(path, MANIFEST_NAME))
+            index[name] = {
+                "bytes": manifest["bytes"],
+                "score": 0.0,
+                "score_at": modified,
+                "last_access": modified,
+            }
+        logger.info("Rebuilt page cache index with %d chapters", len(index))
+        return index
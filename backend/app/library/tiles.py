@@ -0,0 +1,105 @@
+"""
+Tiles of very tall pages.
+
+Long-strip (webtoon) chapters often hold single images of 800x30000 px or
+more. Decoding one takes hundreds of MB, and a reader cannot show
+anything until the whole image has arrived. Such pages are split into
+tiles of a fixed number of rows that clients load top to bottom.
+
+With the optional ``pyvips`` package the source is decoded sequentially:
+only the band of rows feeding the tile being written is in memory, however
+tall the page. The Docker image installs libvips and the ``vips`` extra.
+Without them, Pillow decodes the whole page once and crops tiles from it;
+pages above ``PILLOW_MAX_PIXELS`` are then refused and served whole, so
+memory stays bounded by one decoded page of that size per tiling worker.
+"""
+
+import os
+from typing import List, Tuple
+
+from PIL import Image
+
+try:
+    import pyvips
+except (ImportError, OSError):  # optional dependency, needs libvips
+    pyvips = None
+else:
+    # Every page is a new pipeline; cached operations would only pin the
+    # decode buffers of pages already tiled.
+    pyvips.cache_set_max(0)
+
+TILE_EXTENSION = ".jpg"
+TILE_QUALITY = 90
+# Largest page the Pillow fallback decodes, about 64 MB as RGBX.
+PILLOW_MAX_PIXELS = 16 * 1024 * 1024
+
+
+def tile_plan(height: int, tile_height: int) -> List[Tuple[int, int]]:
+    """(top, height) of each tile of a page, top to bottom."""
+    return [
+        (top, min(tile_height, height - top)) for top in range(0, height, tile_height)
+    ]
+
+
+def tile_page(
+    source_path: str, out_dir: str, stem: str, tile_height: int
+) -> List[dict]:
+    """Split an image into tiles named ``<stem>-<index>.jpg`` in ``out_dir``.
+
+    Returns the tiles as manifest entries: file name, top row and height.
+    """
+    if pyvips is not None:
+        return _tile_with_vips(source_path, out_dir, stem, tile_height)
+    return _tile_with_pillow(source_path, out_dir, stem, tile_height)
+
+
+def _tile_name(stem: str, index: int) -> str:
+    return f"{stem}-{index:03d}{TILE_EXTENSION}"
+
+
+def _tile_with_vips(
+    source_path: str, out_dir: str, stem: str, tile_height: int
+) -> List[dict]:
+    image = pyvips.Image.new_from_file(source_path, access="sequential")
+    if image.hasalpha():
+        image = image.flatten(background=[255])
+    # One region reads the page top to bottom. A pipeline per tile would
+    # restart the sequential decoder behind rows it already passed.
+    region = pyvips.Region.new(image)
+    tiles = []
+    for index, (top, height) in enumerate(tile_plan(image.height, tile_height)):
+        name = _tile_name(stem, index)
+        band = region.fetch(0, top, image.width, height)
+        tile = pyvips.Image.new_from_memory(
+            band, image.width, height, image.bands, image.format
+        )
+        tile.jpegsave(os.path.join(out_dir, name), Q=TILE_QUALITY)
+        tiles.append({"file": name, "top": top, "height": height})
+    return tiles
+
+
+def _tile_with_pillow(
+    source_path: str, out_dir: str, stem: str, tile_height: int
+) -> List[dict]:
+    tiles = []
+    with Image.open(source_path) as image:
+        if image.width * image.height > PILLOW_MAX_PIXELS:
+            raise ValueError(
+                f"{image.width}x{image.height} page is too large to tile without pyvips"
+            )
+        for index, (top, height) in enumerate(tile_plan(image.height, tile_height)):
+            name = _tile_name(stem, index)
+            band = _flatten(image.crop((0, top, image.width, top + height)))
+            band.save(os.path.join(out_dir, name), quality=TILE_QUALITY)
+            tiles.append({"file": name, "top": top, "height": height})
+    return tiles
+
+
+def _flatten(band: Image.Image) -> Image.Image:
+    """Convert to RGB for JPEG, putting transparent areas on white."""
+    if band.mode in ("RGB", "L"):
+        return band
+    band = band.convert("RGBA")
+    flat = Image.new("RGB", band.size, (255, 255, 255))
+    flat.paste(band, mask=band.getchannel("A"))
+    return flat
@@ -0,0 +1,364 @@
+"""
+Zip archives streamed on the fly from existing chapter archives.
+
+A volume or series download is a zip whose members are the pages of its
+chapter archives. Nothing is recompressed or staged on disk: each page's
+raw member bytes are copied straight out of its source CBZ, with the CRC
+and sizes taken from the source central directory. The container itself
+adds no compression, so pages keep the method they were stored with
+(normally STORED already, since images don't compress).
+
+Because every header can be computed from metadata alone, the exact
+archive length is known before the first byte is sent and any byte range
+can be generated on its own, which is what resumable downloads need.
+Memory use depends on the number of pages, never on their size.
+"""
+
+import bisect
+import hashlib
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+from app.library.archive import ArchiveError, ChapterArchive
+
+CHUNK_SIZE = 256 * 1024
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = 0xFFFF
+_UTF8_FLAG = 0x800
+# Deflate option bits are kept; encryption and data-descriptor bits are not.
+_KEPT_FLAGS = 0x06
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_ZIP64_END = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_END = struct.Struct("<4s4H2LH")
+
+
+@dataclass
+class ZipMember:
+    """One page of the generated archive and where its bytes come from."""
+    name: str
+    source_path: str
+    source_name: str
+    crc: int
+    compressed_size: int
+    file_size: int
+    method: int = zipfile.ZIP_STORED
+    flags: int = 0
+    date_time: Tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0)
+    # Offset of the member's local header in a zip source. None means the
+    # source is not a zip and the page is decompressed into a STORED entry.
+    source_header_offset: Optional[int] = None
+    offset: int = 0  # Local header offset in the generated archive
+
+    @property
+    def encoded_name(self) -> bytes:
+        return self.name.encode("utf-8")
+
+    @property
+    def zip64_sizes(self) -> bool:
+        return self.compressed_size >= _ZIP64_LIMIT or self.file_size >= _ZIP64_LIMIT
+
+    @property
+    def header_length(self) -> int:
+        return (
+            _LOCAL_HEADER.size
+            + len(self.encoded_name)
+            + (20 if self.zip64_sizes else 0)
+        )
+
+    @property
+    def dos_time(self) -> Tuple[int, int]:
+        year, month, day, hour, minute, second = self.date_time
+        if year < 1980:
+            year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+        return (
+            (year - 1980) << 9 | month << 5 | day,
+            hour << 11 | minute << 5 | second // 2,
+        )
+
+
+def archive_members(path: str, prefix: str) -> List[ZipMember]:
+    """Describe the pages of one chapter archive as members under ``prefix/``."""
+    members = []
+    with ChapterArchive(path) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        for name in archive.pages():
+            info = infos[name]
+            member = ZipMember(
+                name=f"{prefix}/{name}",
+                source_path=path,
+                source_name=name,
+                crc=info.CRC,
+                compressed_size=info.file_size,
+                file_size=info.file_size,
+                date_time=tuple(info.date_time),
+            )
+            if archive.is_zip:
+                if info.flag_bits & 0x1:
+                    raise ArchiveError(
+                        f"Encrypted page '{name}' in '{path}' cannot be streamed"
+                    )
+                member.source_header_offset = info.header_offset
+                member.method = info.compress_type
+                member.flags = info.flag_bits & _KEPT_FLAGS
+                member.compressed_size = info.compress_size
+            members.append(member)
+    return members
+
+
+class ZipStream:
+    """A zip archive laid out in advance and generated by byte range."""
+
+    def __init__(self, members: Sequence[ZipMember], etag_salt: bytes = b""):
+        self.members = list(members)
+        offset = 0
+        for member in self.members:
+            member.offset = offset
+            offset += member.header_length + member.compressed_size
+        self._member_offsets = [member.offset for member in self.members]
+        self.central_directory_offset = offset
+        self.central_directory_size = sum(
+            self._central_record_length(m) for m in self.members
+        )
+        self._end_records = self._build_end_records()
+        self.size = (
+            self.central_directory_offset
+            + self.central_directory_size
+            + len(self._end_records)
+        )
+
+        digest = hashlib.blake2b(etag_salt, digest_size=16)
+        for member in self.members:
+            digest.update(
+                b"%s\0%d\0%d\0%d\0%d\n"
+                % (
+                    member.encoded_name,
+                    member.crc,
+                    member.compressed_size,
+                    member.file_size,
+                    member.method,
+                )
+            )
+        self.etag = f'"{digest.hexdigest()}"'
+
+    def _zip64_central_fields(self, member: ZipMember) -> List[int]:
+        fields = []
+        if member.file_size >= _ZIP64_LIMIT:
+            fields.append(member.file_size)
+        if member.compressed_size >= _ZIP64_LIMIT:
+            fields.append(member.compressed_size)
+        if member.offset >= _ZIP64_LIMIT:
+            fields.append(member.offset)
+        return fields
+
+    def _central_record_length(self, member: ZipMember) -> int:
+        fields = self._zip64_central_fields(member)
+        return (
+            _CENTRAL_HEADER.size
+            + len(member.encoded_name)
+            + (4 + 8 * len(fields) if fields else 0)
+        )
+
+    def _local_header(self, member: ZipMember) -> bytes:
+        name = member.encoded_name
+        date, time = member.dos_time
+        extra = b""
+        compressed_size, file_size = member.compressed_size, member.file_size
+        version = 20
+        if member.zip64_sizes:
+            extra = struct.pack("<2H2Q", 0x0001, 16, file_size, compressed_size)
+            compressed_size = file_size = _ZIP64_LIMIT
+            version = 45
+        return _LOCAL_HEADER.pack(
+            b"PK\x03\x04", version, member.flags | _UTF8_FLAG, member.method,
+            time, date, member.crc, compressed_size, file_size, len(name), len(extra),
+        ) + name + extra
+
+    def _central_record(self, member: ZipMember) -> bytes:
+        name = member.encoded_name
+        date, time = member.dos_time
+        fields = self._zip64_central_fields(member)
+        extra = (
+            struct.pack(f"<2H{len(fields)}Q", 0x0001, 8 * len(fields), *fields)
+            if fields
+            else b""
+        )
+        version = 45 if fields else 20
+        return _CENTRAL_HEADER.pack(
+            b"PK\x01\x02", version, version, member.flags | _UTF8_FLAG,
+            member.method, time, date,
+            member.crc,
+            min(member.compressed_size, _ZIP64_LIMIT),
+            min(member.file_size, _ZIP64_LIMIT),
+            len(name), len(extra), 0, 0, 0, 0,
+            min(member.offset, _ZIP64_LIMIT),
+        ) + name + extra
+
+    def _build_end_records(self) -> bytes:
+        count = len(self.members)
+        cd_offset, cd_size = self.central_directory_offset, self.central_directory_size
+        records = b""
+        if (
+            count >= _ZIP64_COUNT_LIMIT
+            or cd_offset >= _ZIP64_LIMIT
+            or cd_size >= _ZIP64_LIMIT
+        ):
+            zip64_end_offset = cd_offset + cd_size
+            records += _ZIP64_END.pack(
+                b"PK\x06\x06", _ZIP64_END.size - 12, 45, 45, 0, 0,
+                count, count, cd_size, cd_offset,
+            )
+            records += _ZIP64_LOCATOR.pack(b"PK\x06\x07", 0, zip64_end_offset, 1)
+        records += _END.pack(
+            b"PK\x05\x06", 0, 0,
+            min(count, _ZIP64_COUNT_LIMIT), min(count, _ZIP64_COUNT_LIMIT),
+            min(cd_size, _ZIP64_LIMIT), min(cd_offset, _ZIP64_LIMIT), 0,
+        )
+        return records
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the archive bytes in ``[start, end)``, at most CHUNK_SIZE at a time."""
+        end = self.size if end is None else min(end, self.size)
+        if start >= end:
+            return
+        source = _SourceReader()
+        try:
+            position = start
+            index = max(0, bisect.bisect_right(self._member_offsets, start) - 1)
+            for member in self.members[index:]:
+                if position >= end:
+                    return
+                header_end = member.offset + member.header_length
+                if position < header_end:
+                    header = self._local_header(member)
+                    yield header[position - member.offset : end - member.offset]
+                    position = min(header_end, end)
+                data_end = header_end + member.compressed_size
+                if position < end and position < data_end:
+                    stop = min(data_end, end)
+                    for chunk in source.read(
+                        member, position - header_end, stop - position
+                    ):
+                        yield chunk
+                    position = stop
+        finally:
+            source.close()
+
+        if position >= end:
+            return
+        offset = self.central_directory_offset
+        for member in self.members:
+            length = self._central_record_length(member)
+            if offset + length > position:
+                record = self._central_record(member)
+                yield record[position - offset : end - offset]
+                position = min(offset + length, end)
+                if position >= end:
+                    return
+            offset += length
+        tail_offset = self.central_directory_offset + self.central_directory_size
+        yield self._end_records[position - tail_offset : end - tail_offset]
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.iter_range()
+
+
+class _SourceReader:
+    """Reads member data from source archives, keeping one file open at a time."""
+
+    def __init__(self):
+        self._path: Optional[str] = None
+        self._file: Optional[BinaryIO] = None
+        self._archive: Optional[ChapterArchive] = None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._archive is not None:
+            self._archive.close()
+        self._path = self._file = self._archive = None
+
+    def read(self, member: ZipMember, skip: int, length: int) -> Iterator[bytes]:
+        if member.source_header_offset is None:
+            yield from self._read_decompressed(member, skip, length)
+            return
+        if self._path != member.source_path or self._file is None:
+            self.close()
+            self._file = open(member.source_path, "rb")
+            self._path = member.source_path
+        f = self._file
+        # The local header's name and extra lengths can differ from the
+        # central directory's, so the data offset comes from the header itself.
+        f.seek(member.source_header_offset)
+        header = f.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size or header[:4] != b"PK\x03\x04":
+            raise ArchiveError(
+                f"Bad local header for '{member.source_name}' in '{member.source_path}'"
+            )
+        name_length, extra_length = struct.unpack("<2H", header[26:30])
+        f.seek(
+            member.source_header_offset
+            + _LOCAL_HEADER.size
+            + name_length
+            + extra_length
+            + skip
+        )
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                raise ArchiveError(
+                    f"'{member.source_path}' ended inside '{member.source_name}'"
+                )
+            length -= len(chunk)
+            yield chunk
+
+    def _read_decompressed(
+        self, member: ZipMember, skip: int, length: int
+    ) -> Iterator[bytes]:
+        if self._path != member.source_path or self._archive is None:
+            self.close()
+            self._archive = ChapterArchive(member.source_path)
+            self._path = member.source_path
+        with self._archive.open_page(member.source_name) as page:
+            # Non-zip sources can't seek inside compressed data; resuming
+            # mid-page reads and discards up to the requested offset.
+            while skip > 0:
+                skipped = len(page.read(min(CHUNK_SIZE, skip)))
+                if not skipped:
+                    break
+                skip -= skipped
+            while length > 0:
+                chunk = page.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    raise ArchiveError(
+                        f"'{member.source_name}' in '{member.source_path}' "
+                        "is shorter than recorded"
+                    )
+                length -= len(chunk)
+                yield chunk
+
+
+def build_zip_stream(chapters: Sequence[Tuple[str, str]]) -> ZipStream:
+    """Lay out a zip of several chapter archives.
+
+    ``chapters`` is a sequence of (folder name, archive path) pairs; each
+    chapter's pages are placed under its folder, in reading order. The
+    ETag covers the source files' sizes and modification times as well as
+    the member list, so a resumed download never mixes two versions.
+    """
+    members = []
+    salt = hashlib.blake2b(digest_size=16)
+    for folder, path in chapters:
+        stat = os.stat(path)
+        salt.update(
+            b"%s\0%d\0%d\n"
+            % (path.encode("utf-8", "surrogateescape"), stat.st_size, stat.st_mtime_ns)
+        )
+        members.extend(archive_members(path, folder))
+    return ZipStream(members, etag_salt=salt.digest())
@@ -1,17 +1,33 @@
+# Imported first so import timings below are measured from the same origin.
+from app.core import startup
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Tuple
+
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.api.v1.api import api_router
-from app.core.config import settings
+logger = logging.getLogger(__name__)
+
+# Imported in dependency order so each timing only covers its own module.
+APP_MODULES = [
+    "app.core.config",
+    "app.db.database",
+    "app.services.user",
+    "app.services.health",
+    "app.api.v1.api",
+]
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Middleware to add security headers to all responses."""
-    
+
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
-        
+
         # Security headers
         response.headers["X-Content-Type-Options"] = "nosniff"
         response.headers["X-Frame-Options"] = "DENY"
@@ -26,36 +42,142 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "connect-src 'self'; "
             "frame-ancestors 'none'"
         )
-        
+
         # Only add HSTS in production (when using HTTPS)
         # This prevents HSTS issues in local development
         if request.url.scheme == "https":
             response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
+
+        return response
+
+
+class FirstRequestTimerMiddleware(BaseHTTPMiddleware):
+    """Middleware recording the time to the first successful response.
+
+    Requests under ``excluded_prefixes`` (health probes and the startup
+    report) are not counted: they would mark the first request long before
+    any client is served.
+    """
+
+    def __init__(self, app, excluded_prefixes: Tuple[str, ...] = ()):
+        super().__init__(app)
+        self.excluded_prefixes = excluded_prefixes
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        report = request.app.state.startup_report
+        if (
+            response.status_code < 400
+            and report.first_request_ms is None
+            and not request.url.path.startswith(self.excluded_prefixes)
+        ):
+            if report.mark_first_request():
+                logger.info(
+                    "First successful request after %.1f ms", report.first_request_ms
+                )
+
         return response
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.VERSION,
-    description="Self-hosted manga library management system",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
-)
-
-# Add security headers middleware
-app.add_middleware(SecurityHeadersMiddleware)
-
-# CORS middleware with security restrictions
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.BACKEND_CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Specific methods only
-    allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With"],  # Specific headers only
-)
-
-# Include routers
-app.include_router(api_router, prefix=settings.API_V1_STR)
-
-@app.get("/")
-async def root():
-    return {"message": "KireMisu API", "version": settings.VERSION}
\ No newline at end of file
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up pools and caches before the app reports itself as ready."""
+    from app.core.config import settings
+
+    report = app.state.startup_report
+    app.state.ready = False
+
+    if settings.WARMUP_ENABLED:
+        await run_in_threadpool(startup.run_warmup, report)
+
+    # Take the first snapshot before flipping readiness, then keep it fresh.
+    monitor = app.state.health_monitor
+    await monitor.refresh()
+    monitor.start()
+    await app.state.event_broker.start()
+
+    report.mark_ready()
+    app.state.ready = True
+    logger.info(
+        "Startup complete in %.1f ms (imports: %s, warmup: %s)",
+        report.ready_ms,
+        report.module_import_ms,
+        report.warmup_ms,
+    )
+
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await app.state.event_broker.stop()
+        await monitor.stop()
+
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application with its own startup report."""
+    report = startup.StartupReport()
+    for module in APP_MODULES:
+        startup.timed_import(module, report)
+
+    from app.api.v1.api import api_router
+    from app.core.admission import AdmissionMiddleware, create_admission_controller
+    from app.core.cache import CACHE_INVALIDATE_EVENT, get_response_cache
+    from app.core.config import settings
+    from app.core.events import RESYNC_EVENT, EventBroker
+    from app.services.health import HealthMonitor
+
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        version=settings.VERSION,
+        description="Self-hosted manga library management system",
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
+    )
+    app.state.ready = False
+    app.state.startup_report = report
+    app.state.health_monitor = HealthMonitor()
+    app.state.event_broker = EventBroker()
+    # Cache invalidations from any process arrive with the other events.
+    response_cache = get_response_cache()
+    broker = app.state.event_broker
+    broker.add_handler(CACHE_INVALIDATE_EVENT, response_cache.handle_invalidation)
+    broker.add_handler(RESYNC_EVENT, lambda data: response_cache.clear())
+
+    # Admission control, innermost so rejections still get the headers below
+    app.state.admission = None
+    if settings.ADMISSION_ENABLED:
+        app.state.admission = create_admission_controller()
+    if app.state.admission is not None:
+        app.add_middleware(AdmissionMiddleware, controller=app.state.admission)
+
+    # Add security headers middleware
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(
+        FirstRequestTimerMiddleware,
+        excluded_prefixes=(f"{settings.API_V1_STR}/health/",),
+    )
+
+    # CORS middleware with security restrictions
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.BACKEND_CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Specific methods only
+        allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With"],  # Specific headers only
+    )
+
+    # Include routers
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+
+    @app.get("/")
+    async def root():
+        return {"message": "KireMisu API", "version": settings.VERSION}
+
+    report.mark_app_created()
+    return app
+
+
+app = create_app()
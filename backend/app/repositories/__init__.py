@@ -1,3 +1,6 @@
+from .chapter import ChapterRepository
+from .series import SeriesRepository
+from .sync import SyncRepository
 from .user import UserRepository
 
-__all__ = ["UserRepository"]
\ No newline at end of file
+__all__ = ["ChapterRepository", "SeriesRepository", "SyncRepository", "UserRepository"]
@@ -0,0 +1,438 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_series
+from app.core.events import publish_event
+from app.db.copy import copy_rows
+
+
+@dataclass
+class ChapterScanRow:
+    """One chapter file as found by the library scanner."""
+    series_id: str
+    chapter_number: Decimal
+    relative_path: str
+    file_name: str
+    file_extension: Optional[str] = None
+    title: Optional[str] = None
+    volume_number: Optional[int] = None
+    page_count: int = 0
+    file_size: Optional[int] = None
+    file_modified_at: Optional[datetime] = None
+    file_quick_hash: Optional[str] = None
+    file_hash: Optional[str] = None
+
+
+@dataclass
+class ChapterUpsertResult:
+    """Row counts for one applied scan batch."""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    moved: int = 0  # Existing chapters matched to a moved or renamed file by content
+    # Rows sharing (series_id, chapter_number) with another row in the batch
+    duplicates: int = 0
+    # Inserted chapters per series ID
+    new_chapters: Dict[str, int] = field(default_factory=dict)
+
+
+# Columns written from scan results. Only these are compared when deciding
+# whether an existing chapter changed; reading progress is never touched.
+SCAN_COLUMNS = [
+    "series_id",
+    "chapter_number",
+    "title",
+    "volume_number",
+    "relative_path",
+    "file_name",
+    "file_extension",
+    "page_count",
+    "file_size",
+    "file_modified_at",
+    "file_quick_hash",
+    "file_hash",
+]
+_COMPARED_COLUMNS = [
+    c for c in SCAN_COLUMNS if c not in ("series_id", "chapter_number")
+] + ["scan_status", "scan_error"]
+# Per-page data derived from the file contents, cleared when the file changes
+# so it is recomputed rather than served for the old file.
+_DERIVED_COLUMNS = ["page_hashes", "page_dimensions", "normalized_path"]
+_FILE_COLUMNS = ["file_size", "file_modified_at", "file_hash"]
+
+# A batch without fingerprints (the file could not be read, say) keeps the
+# stored ones rather than clearing them.
+_FINGERPRINT_COLUMNS = {"file_quick_hash", "file_hash"}
+
+# Series IDs per scan event, keeping NOTIFY payloads under their size limit.
+EVENT_SERIES_LIMIT = 100
+
+
+def _scanned_value(column: str) -> str:
+    if column in _FINGERPRINT_COLUMNS:
+        return f"COALESCE(EXCLUDED.{column}, chapters.{column})"
+    return f"EXCLUDED.{column}"
+
+
+class ChapterRepository:
+    """Repository layer for chapter data access operations.
+
+    Chapters are defined by the SQL schema rather than ORM models, and the
+    hot paths here are set-based, so queries are written in SQL directly.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_chapter(self, chapter_id: str) -> Optional[dict]:
+        """Get a chapter row by ID."""
+        row = self.db.execute(
+            text("SELECT * FROM chapters WHERE id = :chapter_id"),
+            {"chapter_id": chapter_id},
+        ).mappings().first()
+        return dict(row) if row else None
+
+    def get_chapters(self, chapter_ids: Sequence[str]) -> List[dict]:
+        """Get chapter summaries for several chapter IDs."""
+        if not chapter_ids:
+            return []
+        rows = self.db.execute(
+            text("""
+                SELECT id, series_id, chapter_number, volume_number, title,
+                       relative_path, page_count
+                FROM chapters WHERE id IN :chapter_ids
+            """).bindparams(bindparam("chapter_ids", expanding=True)),
+            {"chapter_ids": list(chapter_ids)},
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+    def get_series_chapters(
+        self, series_id: str, volume_number: Optional[int] = None
+    ) -> List[dict]:
+        """Get a series' chapter files in reading order, optionally for one volume."""
+        query = """
+            SELECT id, chapter_number, volume_number, title, relative_path,
+                   normalized_path, file_name, page_count
+            FROM chapters WHERE series_id = :series_id
+        """
+        params = {"series_id": series_id}
+        if volume_number is not None:
+            query += " AND volume_number = :volume_number"
+            params["volume_number"] = volume_number
+        query += " ORDER BY chapter_number"
+        rows = self.db.execute(text(query), params).mappings().all()
+        return [dict(row) for row in rows]
+
+    def get_next_chapters(
+        self, series_id: str, chapter_number, limit: int
+    ) -> List[dict]:
+        """Get the chapters after ``chapter_number`` in a series, in reading order."""
+        if limit <= 0:
+            return []
+        rows = self.db.execute(
+            text("""
+                SELECT id, chapter_number, relative_path, normalized_path FROM chapters
+                WHERE series_id = :series_id AND chapter_number > :chapter_number
+                ORDER BY chapter_number LIMIT :limit
+            """),
+            {"series_id": series_id, "chapter_number": chapter_number, "limit": limit},
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+    def get_fingerprints(self, relative_paths: Sequence[str]) -> Dict[str, dict]:
+        """Get stored size and fingerprints of chapters by relative path."""
+        if not relative_paths:
+            return {}
+        rows = self.db.execute(
+            text("""
+                SELECT relative_path, file_size, file_quick_hash, file_hash
+                FROM chapters WHERE relative_path IN :relative_paths
+            """).bindparams(bindparam("relative_paths", expanding=True)),
+            {"relative_paths": list(relative_paths)},
+        ).mappings().all()
+        return {row["relative_path"]: dict(row) for row in rows}
+
+    def set_page_hashes(self, chapter_id: str, page_hashes: bytes) -> None:
+        """Store the packed perceptual hashes of a chapter's pages."""
+        self.db.execute(
+            text(
+                "UPDATE chapters SET page_hashes = :page_hashes WHERE id = :chapter_id"
+            ),
+            {"chapter_id": chapter_id, "page_hashes": page_hashes},
+        )
+        self.db.commit()
+
+    def set_page_dimensions(self, chapter_id: str, page_dimensions: bytes) -> None:
+        """Store the packed width and height of a chapter's pages."""
+        self.db.execute(
+            text(
+                "UPDATE chapters SET page_dimensions = :page_dimensions "
+                "WHERE id = :chapter_id"
+            ),
+            {"chapter_id": chapter_id, "page_dimensions": page_dimensions},
+        )
+        self.db.commit()
+
+    def iter_page_hashes(self, series_id: Optional[str] = None) -> Iterable[tuple]:
+        """Yield (chapter_id, series_id, packed hashes) for hashed chapters."""
+        query = (
+            "SELECT id, series_id, page_hashes FROM chapters "
+            "WHERE page_hashes IS NOT NULL"
+        )
+        params = {}
+        if series_id is not None:
+            query += " AND series_id = :series_id"
+            params["series_id"] = series_id
+        result = self.db.execute(
+            text(query).execution_options(stream_results=True, yield_per=5000), params
+        )
+        for row in result:
+            yield row.id, row.series_id, bytes(row.page_hashes)
+
+    def get_normalize_candidates(
+        self, after_id: Optional[str], limit: int
+    ) -> List[dict]:
+        """Get chapters without a normalized copy in ID order after ``after_id``."""
+        query = """
+            SELECT id, series_id, relative_path, file_name FROM chapters
+            WHERE normalized_path IS NULL
+        """
+        params = {"limit": limit}
+        if after_id is not None:
+            query += " AND id > :after_id"
+            params["after_id"] = after_id
+        query += " ORDER BY id LIMIT :limit"
+        rows = self.db.execute(text(query), params).mappings().all()
+        return [dict(row) for row in rows]
+
+    def set_normalized_path(self, chapter_id: str, normalized_path: str) -> None:
+        """Record a chapter's normalized copy, relative to the processed data path."""
+        self.db.execute(
+            text(
+                "UPDATE chapters SET normalized_path = :normalized_path "
+                "WHERE id = :chapter_id"
+            ),
+            {"chapter_id": chapter_id, "normalized_path": normalized_path},
+        )
+        self.db.commit()
+
+    def replace_file(self, chapter_id: str, row: ChapterScanRow) -> None:
+        """Point a chapter at a rewritten file with the same pages.
+
+        Unlike a scan, per-page data is kept: the pages are the same.
+        """
+        columns = (
+            ["relative_path", "file_name", "file_extension", "page_count"]
+            + _FILE_COLUMNS
+            + ["file_quick_hash"]
+        )
+        assignments = ", ".join(f"{c} = :{c}" for c in columns)
+        self.db.execute(
+            text(f"""
+                UPDATE chapters SET {assignments}, last_scanned_at = NOW()
+                WHERE id = :chapter_id
+            """),
+            {"chapter_id": chapter_id, **{c: getattr(row, c) for c in columns}},
+        )
+        invalidate_series(self.db, [row.series_id])
+        self.db.commit()
+
+    def upsert_scan_batch(
+        self,
+        rows: Sequence[ChapterScanRow],
+        complete_series: Sequence[str] = (),
+    ) -> ChapterUpsertResult:
+        """Apply a batch of scan results set-based.
+
+        Rows are COPYed into a temporary table and merged with one
+        INSERT ... ON CONFLICT DO UPDATE that only rewrites chapters whose
+        scanned values differ, so unchanged chapters cause no writes and do
+        not fire the updated_at trigger.
+
+        ``complete_series`` lists series whose full set of chapter files is
+        in this batch; their chapters that are not in the batch have
+        vanished from disk and are deleted. Before that, a vanished chapter
+        whose ``file_hash`` equals that of a batch row with no chapter yet
+        is moved to that row's series and number, keeping its ID and
+        reading progress.
+        """
+        result = ChapterUpsertResult()
+        self.db.execute(text("""
+            CREATE TEMP TABLE chapter_scan_staging (
+                series_id UUID NOT NULL,
+                chapter_number DECIMAL(10,2) NOT NULL,
+                title TEXT,
+                volume_number INTEGER,
+                relative_path TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                file_extension TEXT,
+                page_count INTEGER,
+                file_size BIGINT,
+                file_modified_at TIMESTAMP WITH TIME ZONE,
+                file_quick_hash TEXT,
+                file_hash TEXT
+            ) ON COMMIT DROP
+        """))
+        staged = copy_rows(
+            self.db,
+            "chapter_scan_staging",
+            SCAN_COLUMNS,
+            ([getattr(row, column) for column in SCAN_COLUMNS] for row in rows),
+        )
+
+        columns = ", ".join(SCAN_COLUMNS)
+        file_changed = (
+            f"({', '.join(f'chapters.{c}' for c in _FILE_COLUMNS)}) "
+            f"IS DISTINCT FROM ({', '.join(_scanned_value(c) for c in _FILE_COLUMNS)})"
+        )
+        updates = ", ".join(f"{c} = {_scanned_value(c)}" for c in _COMPARED_COLUMNS)
+        scanned = ", ".join(_scanned_value(c) for c in _COMPARED_COLUMNS)
+        cleared = ", ".join(
+            f"{c} = CASE WHEN {file_changed} THEN NULL ELSE chapters.{c} END"
+            for c in _DERIVED_COLUMNS
+        )
+        changed_series = set()
+        if complete_series:
+            moved = self._move_renamed_chapters(complete_series)
+            result.moved = len(moved)
+            for row in moved:
+                changed_series.update((str(row.old_series_id), str(row.series_id)))
+
+        counts = self.db.execute(text(f"""
+            WITH batch AS (
+                -- ON CONFLICT cannot touch the same row twice in one statement
+                SELECT DISTINCT ON (series_id, chapter_number) *
+                FROM chapter_scan_staging
+                ORDER BY series_id, chapter_number, relative_path
+            ),
+            upserted AS (
+                INSERT INTO chapters
+                    ({columns}, scan_status, scan_error, last_scanned_at)
+                SELECT {columns}, 'scanned', NULL, NOW() FROM batch
+                ON CONFLICT (series_id, chapter_number) DO UPDATE SET
+                    {updates},
+                    {cleared},
+                    last_scanned_at = EXCLUDED.last_scanned_at
+                WHERE ({", ".join(f"chapters.{c}" for c in _COMPARED_COLUMNS)})
+                    IS DISTINCT FROM ({scanned})
+                RETURNING series_id, (xmax = 0) AS inserted
+            )
+            SELECT
+                series_id,
+                COUNT(*) FILTER (WHERE inserted) AS inserted,
+                COUNT(*) FILTER (WHERE NOT inserted) AS updated
+            FROM upserted GROUP BY series_id
+        """)).all()
+        unique_rows = self.db.execute(text(
+            "SELECT COUNT(*) FROM "
+            "(SELECT DISTINCT series_id, chapter_number FROM chapter_scan_staging) s"
+        )).scalar()
+        result.inserted = sum(row.inserted for row in counts)
+        result.updated = sum(row.updated for row in counts)
+        result.unchanged = unique_rows - result.inserted - result.updated - result.moved
+        result.duplicates = staged - unique_rows
+        result.new_chapters = {
+            str(row.series_id): row.inserted for row in counts if row.inserted
+        }
+
+        changed_series.update(str(row.series_id) for row in counts)
+        if complete_series:
+            deleted = self.db.execute(
+                text("""
+                    WITH deleted AS (
+                        DELETE FROM chapters c
+                        WHERE c.series_id IN :series_ids
+                          AND NOT EXISTS (
+                              SELECT 1 FROM chapter_scan_staging s
+                              WHERE s.series_id = c.series_id
+                                AND s.chapter_number = c.chapter_number
+                          )
+                        RETURNING c.series_id
+                    )
+                    SELECT series_id, COUNT(*) AS deleted
+                    FROM deleted GROUP BY series_id
+                """).bindparams(bindparam("series_ids", expanding=True)),
+                {"series_ids": list(complete_series)},
+            ).all()
+            result.deleted = sum(row.deleted for row in deleted)
+            changed_series.update(str(row.series_id) for row in deleted)
+
+        # Delivered to connected clients when the batch commits.
+        new_chapters = list(result.new_chapters.items())
+        publish_event(self.db, "scan_progress", {
+            "inserted": result.inserted,
+            "updated": result.updated,
+            "unchanged": result.unchanged,
+            "deleted": result.deleted,
+            "moved": result.moved,
+            "series_ids": sorted(changed_series)[:EVENT_SERIES_LIMIT],
+        })
+        for start in range(0, len(new_chapters), EVENT_SERIES_LIMIT):
+            batch = new_chapters[start:start + EVENT_SERIES_LIMIT]
+            publish_event(self.db, "chapters_added", {
+                "series": [
+                    {"series_id": series_id, "count": count}
+                    for series_id, count in batch
+                ],
+            })
+        invalidate_series(self.db, changed_series)
+
+        self.db.commit()
+        return result
+
+    def _move_renamed_chapters(self, complete_series: Sequence[str]) -> list:
+        """Reassign vanished chapters to staged files with the same content.
+
+        Each vanished chapter is matched to at most one new file and vice
+        versa; copies of one file pair up in path order. Returns rows of
+        (id, old_series_id, series_id) for the moved chapters.
+        """
+        assignments = ", ".join(f"{c} = arrived.{c}" for c in SCAN_COLUMNS)
+        return self.db.execute(
+            text(f"""
+                WITH batch AS (
+                    SELECT DISTINCT ON (series_id, chapter_number) *
+                    FROM chapter_scan_staging
+                    ORDER BY series_id, chapter_number, relative_path
+                ),
+                arrived AS (
+                    SELECT b.*,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY b.file_hash ORDER BY b.relative_path
+                           ) AS n
+                    FROM batch b
+                    WHERE b.file_hash IS NOT NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM chapters c
+                          WHERE c.series_id = b.series_id
+                            AND c.chapter_number = b.chapter_number
+                      )
+                ),
+                departed AS (
+                    SELECT c.id, c.series_id, c.file_hash,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY c.file_hash ORDER BY c.relative_path
+                           ) AS n
+                    FROM chapters c
+                    WHERE c.series_id IN :series_ids
+                      AND c.file_hash IS NOT NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM chapter_scan_staging s
+                          WHERE s.series_id = c.series_id
+                            AND s.chapter_number = c.chapter_number
+                      )
+                )
+                UPDATE chapters SET {assignments},
+                    scan_status = 'scanned', scan_error = NULL, last_scanned_at = NOW()
+                FROM departed JOIN arrived USING (file_hash, n)
+                WHERE chapters.id = departed.id
+                RETURNING chapters.id, departed.series_id AS old_series_id,
+                    chapters.series_id
+            """).bindparams(bindparam("series_ids", expanding=True)),
+            {"series_ids": list(complete_series)},
+        ).all()
@@ -0,0 +1,184 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+@dataclass
+class ProgressEntry:
+    """One chapter's reading progress as written by a client."""
+    chapter_id: str
+    last_page_read: int
+    is_read: bool
+    # When the client recorded it; defaults to now
+    updated_at: Optional[datetime] = None
+
+
+@dataclass
+class ProgressWriteResult:
+    """Outcome of one batched progress write."""
+    applied: int = 0
+    stale: int = 0  # Older than the progress already stored
+    unknown_chapters: List[str] = field(default_factory=list)
+
+
+class ProgressRepository:
+    """Repository layer for per-user reading progress.
+
+    ``reading_progress`` holds one row per user and chapter. Its primary key
+    covers ``is_read`` and ``last_page_read``, so progress lookups and the
+    "is this chapter read" probes of the continue reading query are
+    index-only scans. ``series_reading`` holds the chapter each user last
+    opened in each series, maintained by the same statement that writes
+    progress, so the continue reading shelf starts from a short per-user
+    index walk instead of scanning the user's progress.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_progress(self, user_id: int, chapter_ids: Sequence[str]) -> List[dict]:
+        """Progress of the given chapters that the user has any progress on."""
+        if not chapter_ids:
+            return []
+        return [dict(row) for row in self.db.execute(text("""
+            SELECT chapter_id, last_page_read, is_read, updated_at
+            FROM reading_progress
+            WHERE user_id = :user_id
+              AND chapter_id = ANY(CAST(:chapter_ids AS uuid[]))
+        """), {"user_id": user_id, "chapter_ids": list(chapter_ids)}).mappings()]
+
+    def get_series_progress(self, user_id: int, series_id: str) -> List[dict]:
+        """Progress of the user on every chapter of a series, in reading order."""
+        return [dict(row) for row in self.db.execute(text("""
+            SELECT p.chapter_id, p.last_page_read, p.is_read, p.updated_at
+            FROM chapters c
+            JOIN reading_progress p
+              ON p.user_id = :user_id AND p.chapter_id = c.id
+            WHERE c.series_id = :series_id
+            ORDER BY c.chapter_number
+        """), {"user_id": user_id, "series_id": series_id}).mappings()]
+
+    def set_progress(
+        self, user_id: int, entries: Sequence[ProgressEntry]
+    ) -> ProgressWriteResult:
+        """Upsert a batch of progress in one statement.
+
+        An entry only replaces stored progress that is not newer, so a
+        client replaying progress recorded offline cannot undo what another
+        device wrote since. Timestamps from the future are clamped to now.
+        ``entries`` must not repeat a chapter.
+        """
+        if not entries:
+            return ProgressWriteResult()
+        row = self.db.execute(text("""
+            WITH input AS (
+                SELECT i.chapter_id, i.last_page_read, i.is_read,
+                       LEAST(COALESCE(i.updated_at, NOW()), NOW()) AS updated_at
+                FROM unnest(
+                    CAST(:chapter_ids AS uuid[]), CAST(:pages AS integer[]),
+                    CAST(:read AS boolean[]), CAST(:updated_at AS timestamptz[])
+                ) AS i(chapter_id, last_page_read, is_read, updated_at)
+            ),
+            known AS (
+                SELECT i.*, c.series_id, c.chapter_number
+                FROM input i JOIN chapters c ON c.id = i.chapter_id
+            ),
+            written AS (
+                INSERT INTO reading_progress AS p
+                    (user_id, chapter_id, last_page_read, is_read, updated_at)
+                SELECT :user_id, chapter_id, last_page_read, is_read, updated_at
+                FROM known
+                ON CONFLICT (user_id, chapter_id) DO UPDATE SET
+                    last_page_read = EXCLUDED.last_page_read,
+                    is_read = EXCLUDED.is_read,
+                    updated_at = EXCLUDED.updated_at
+                WHERE p.updated_at <= EXCLUDED.updated_at
+                RETURNING 1
+            ),
+            latest AS (
+                SELECT DISTINCT ON (series_id) series_id, chapter_id, updated_at
+                FROM known
+                ORDER BY series_id, updated_at DESC, chapter_number DESC
+            ),
+            -- Data-modifying CTEs run even though nothing reads them
+            opened AS (
+                INSERT INTO series_reading AS s
+                    (user_id, series_id, chapter_id, updated_at)
+                SELECT :user_id, series_id, chapter_id, updated_at FROM latest
+                ON CONFLICT (user_id, series_id) DO UPDATE SET
+                    chapter_id = EXCLUDED.chapter_id,
+                    updated_at = EXCLUDED.updated_at
+                WHERE s.updated_at <= EXCLUDED.updated_at
+            )
+            SELECT (SELECT count(*) FROM written) AS applied,
+                   (SELECT count(*) FROM known) AS known,
+                   ARRAY(
+                       SELECT chapter_id::text FROM input
+                       WHERE chapter_id NOT IN (SELECT chapter_id FROM known)
+                   ) AS unknown
+        """), {
+            "user_id": user_id,
+            "chapter_ids": [entry.chapter_id for entry in entries],
+            "pages": [entry.last_page_read for entry in entries],
+            "read": [entry.is_read for entry in entries],
+            "updated_at": [entry.updated_at for entry in entries],
+        }).one()
+        self.db.commit()
+        return ProgressWriteResult(
+            applied=row.applied,
+            stale=row.known - row.applied,
+            unknown_chapters=row.unknown,
+        )
+
+    def get_continue_reading(self, user_id: int, limit: int) -> List[dict]:
+        """The next chapter to read in each series the user reads, most recent first.
+
+        For each series, starting from the chapter last opened there, the
+        next chapter is the first one in reading order that is not read:
+        the opened chapter itself if it is unfinished. Series with nothing
+        left to read are skipped. Each series costs a few index probes: its
+        ``series_reading`` entry, the chapters index from the opened
+        chapter on, and an index-only ``reading_progress`` probe per read
+        chapter passed over.
+        """
+        return [dict(row) for row in self.db.execute(text("""
+            SELECT s.id AS series_id, s.title_primary,
+                   r.updated_at AS last_read_at, n.id AS chapter_id,
+                   n.chapter_number, n.volume_number, n.title AS chapter_title,
+                   n.page_count, COALESCE(p.last_page_read, 0) AS last_page_read
+            FROM series_reading r
+            JOIN chapters opened ON opened.id = r.chapter_id
+            JOIN series s ON s.id = opened.series_id
+            CROSS JOIN LATERAL (
+                SELECT c.id, c.chapter_number, c.volume_number, c.title,
+                       c.page_count
+                FROM chapters c
+                WHERE c.series_id = opened.series_id
+                AND c.chapter_number >= opened.chapter_number
+                AND NOT EXISTS (
+                    SELECT 1 FROM reading_progress d
+                    WHERE d.user_id = r.user_id
+                      AND d.chapter_id = c.id AND d.is_read
+                )
+                ORDER BY c.chapter_number
+                LIMIT 1
+            ) n
+            LEFT JOIN reading_progress p
+              ON p.user_id = r.user_id AND p.chapter_id = n.id
+            WHERE r.user_id = :user_id
+            ORDER BY r.updated_at DESC
+            LIMIT :limit
+        """), {"user_id": user_id, "limit": limit}).mappings()]
+
+    def delete_user_progress(self, user_id: int) -> None:
+        """Delete all progress of a user. Does not commit."""
+        params = {"user_id": user_id}
+        self.db.execute(
+            text("DELETE FROM series_reading WHERE user_id = :user_id"), params
+        )
+        self.db.execute(
+            text("DELETE FROM reading_progress WHERE user_id = :user_id"), params
+        )
@@ -0,0 +1,181 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Values returned per facet, besides the selected ones which are always included.
+FACET_VALUE_LIMIT = 50
+
+# Series summaries for one page of series IDs, with chapter counts.
+_SUMMARY_COLUMNS = """
+    s.id, s.title_primary, s.status, s.genres, s.reading_status, s.updated_at,
+    COALESCE(c.chapter_count, 0) AS chapter_count,
+    c.latest_chapter
+"""
+_CHAPTER_COUNTS = """
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) AS chapter_count, MAX(chapter_number) AS latest_chapter
+        FROM chapters WHERE series_id = s.id
+    ) c ON true
+"""
+
+
+@dataclass
+class SeriesFilters:
+    """Browse filters. Empty lists do not filter.
+
+    A series must have every selected genre, tag and metadata key, and
+    any of the selected statuses and reading statuses.
+    """
+    genres: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    statuses: List[str] = field(default_factory=list)
+    reading_statuses: List[str] = field(default_factory=list)
+    metadata_keys: List[str] = field(default_factory=list)
+
+
+class SeriesRepository:
+    """Repository layer for series data access operations.
+
+    Like chapters, series are defined by the SQL schema rather than ORM
+    models, so queries are written in SQL directly.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_series(self, series_id: str) -> Optional[dict]:
+        """Get a series row by ID."""
+        row = self.db.execute(
+            text("SELECT * FROM series WHERE id = :series_id"),
+            {"series_id": series_id},
+        ).mappings().first()
+        return dict(row) if row else None
+
+    def list_series(self, limit: int, offset: int) -> Tuple[int, List[dict]]:
+        """Get a page of series by title, with chapter counts, and the series total."""
+        total = self.db.execute(text("SELECT COUNT(*) FROM series")).scalar()
+        rows = self.db.execute(
+            text(f"""
+                SELECT {_SUMMARY_COLUMNS}
+                FROM (
+                    SELECT * FROM series ORDER BY title_primary, id
+                    LIMIT :limit OFFSET :offset
+                ) s
+                {_CHAPTER_COUNTS}
+                ORDER BY s.title_primary, s.id
+            """),
+            {"limit": limit, "offset": offset},
+        ).mappings().all()
+        return total, [dict(row) for row in rows]
+
+    def browse_series(
+        self, filters: SeriesFilters, limit: int, offset: int
+    ) -> Tuple[int, List[dict], Dict[str, List[Tuple[str, int]]]]:
+        """Get a page of filtered series, the total matched and facet counts at once.
+
+        Genre, tag and metadata key filters are containment tests served by
+        the GIN indexes on those columns. Facet counts are aggregated over
+        the matching series in the same statement rather than with a query
+        per value. Status and reading status counts ignore their own
+        filter, so the other values stay selectable with the number of
+        series each would add.
+
+        Returns (total, rows, facets) where facets maps each facet name to
+        (value, count) pairs, most frequent first.
+        """
+        conditions = []
+        if filters.genres:
+            conditions.append("genres @> CAST(:genres AS TEXT[])")
+        if filters.tags:
+            conditions.append("tags @> CAST(:tags AS TEXT[])")
+        if filters.metadata_keys:
+            conditions.append("user_metadata ?& CAST(:metadata_keys AS TEXT[])")
+        status_filter = "status = ANY(:statuses)" if filters.statuses else "true"
+        reading_filter = (
+            "reading_status = ANY(:reading_statuses)"
+            if filters.reading_statuses
+            else "true"
+        )
+
+        row = self.db.execute(
+            text(f"""
+                WITH base AS MATERIALIZED (
+                    SELECT id, title_primary, status, genres, tags, reading_status,
+                           user_metadata
+                    FROM series
+                    WHERE {" AND ".join(conditions) or "true"}
+                ),
+                matched AS MATERIALIZED (
+                    SELECT * FROM base WHERE {status_filter} AND {reading_filter}
+                ),
+                facet_counts AS (
+                    SELECT 'genres' AS facet, value, COUNT(*) AS count
+                    FROM matched, unnest(genres) AS value GROUP BY value
+                    UNION ALL
+                    SELECT 'tags', value, COUNT(*)
+                    FROM matched, unnest(tags) AS value GROUP BY value
+                    UNION ALL
+                    SELECT 'metadata_keys', value, COUNT(*)
+                    FROM matched, jsonb_object_keys(user_metadata) AS value
+                    WHERE jsonb_typeof(user_metadata) = 'object' GROUP BY value
+                    UNION ALL
+                    SELECT 'statuses', status, COUNT(*)
+                    FROM base WHERE {reading_filter} AND status IS NOT NULL
+                    GROUP BY status
+                    UNION ALL
+                    SELECT 'reading_statuses', reading_status, COUNT(*)
+                    FROM base WHERE {status_filter} AND reading_status IS NOT NULL
+                    GROUP BY reading_status
+                ),
+                ranked AS (
+                    SELECT *,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY facet ORDER BY count DESC, value
+                           ) AS rank
+                    FROM facet_counts
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM matched) AS total,
+                    (
+                        SELECT json_agg(
+                            json_build_array(facet, value, count) ORDER BY facet, rank
+                        )
+                        FROM ranked
+                        WHERE rank <= :facet_limit
+                           OR (facet = 'genres' AND value = ANY(:genres))
+                           OR (facet = 'tags' AND value = ANY(:tags))
+                           OR (facet = 'metadata_keys' AND value = ANY(:metadata_keys))
+                           OR (facet = 'statuses' AND value = ANY(:statuses))
+                           OR (facet = 'reading_statuses'
+                               AND value = ANY(:reading_statuses))
+                    ) AS facets,
+                    (
+                        SELECT json_agg(page ORDER BY page.title_primary, page.id)
+                        FROM (
+                            SELECT {_SUMMARY_COLUMNS}
+                            FROM (
+                                SELECT id FROM matched ORDER BY title_primary, id
+                                LIMIT :limit OFFSET :offset
+                            ) m
+                            JOIN series s ON s.id = m.id
+                            {_CHAPTER_COUNTS}
+                        ) page
+                    ) AS items
+            """),
+            {
+                "genres": filters.genres,
+                "tags": filters.tags,
+                "metadata_keys": filters.metadata_keys,
+                "statuses": filters.statuses,
+                "reading_statuses": filters.reading_statuses,
+                "facet_limit": FACET_VALUE_LIMIT,
+                "limit": limit,
+                "offset": offset,
+            },
+        ).one()
+
+        facets: Dict[str, List[Tuple[str, int]]] = {}
+        for facet, value, count in row.facets or []:
+            facets.setdefault(facet, []).append((value, count))
+        return row.total, row.items or [], facets
@@ -0,0 +1,166 @@
+import heapq
+from typing import List, NamedTuple, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Columns sent to clients. Changes to other columns (paths, page hashes,
+# scan status) don't move rows forward in the change sequence.
+SERIES_SYNC_COLUMNS = [
+    "id",
+    "title_primary",
+    "title_alt",
+    "description",
+    "status",
+    "genres",
+    "tags",
+    "chapter_count",
+    "reading_status",
+    "user_metadata",
+    "updated_at",
+]
+CHAPTER_SYNC_COLUMNS = [
+    "id",
+    "series_id",
+    "chapter_number",
+    "volume_number",
+    "title",
+    "page_count",
+    "updated_at",
+]
+PROGRESS_SYNC_COLUMNS = [
+    "chapter_id",
+    "last_page_read",
+    "is_read",
+    "updated_at",
+]
+
+
+class SyncChangeRow(NamedTuple):
+    """One change: a live row to upsert, or a tombstone when ``data`` is None."""
+    change_seq: int
+    entity: str
+    entity_id: str
+    data: Optional[dict]
+
+
+class SyncRepository:
+    """Repository layer for client delta sync.
+
+    Every series, chapter, reading progress row and tombstone carries the
+    ``change_seq`` of its last change and the ``change_xid`` of the
+    transaction that made it.
+    Pages are read in ``change_seq`` order; ``change_xid`` against a
+    snapshot's xmin decides which changes a previous sync may have missed
+    because their transaction had not committed yet.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def snapshot_xmin(self) -> int:
+        """Oldest transaction still in progress, as seen by this session.
+
+        Every change not visible to a read at this point was made by a
+        transaction with an ID at or above this value.
+        """
+        return int(
+            self.db.execute(
+                text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text")
+            ).scalar()
+        )
+
+    def get_changes(
+        self,
+        since_xid: Optional[int],
+        after_seq: int,
+        limit: int,
+        user_id: Optional[int] = None,
+    ) -> List[SyncChangeRow]:
+        """Changes after ``after_seq`` in sequence order, at most ``limit``.
+
+        With ``since_xid``, only changes made by transaction ``since_xid``
+        or later are returned, tombstones included. Without it, every live
+        row is returned: a full snapshot. With ``user_id``, that user's
+        reading progress is included.
+        """
+        params = {
+            "after_seq": after_seq,
+            "limit": limit,
+            "since_xid": str(since_xid),
+            "user_id": user_id,
+        }
+        xid_filter = ""
+        if since_xid is not None:
+            xid_filter = "AND change_xid >= CAST(:since_xid AS xid8)"
+
+        sources = []
+        for entity, table, columns in (
+            ("series", "series", SERIES_SYNC_COLUMNS),
+            ("chapter", "chapters", CHAPTER_SYNC_COLUMNS),
+        ):
+            rows = self.db.execute(text(f"""
+                SELECT change_seq, {", ".join(columns)} FROM {table}
+                WHERE change_seq > :after_seq {xid_filter}
+                ORDER BY change_seq LIMIT :limit
+            """), params).mappings().all()
+            sources.append([
+                SyncChangeRow(
+                    row["change_seq"], entity, row["id"], {c: row[c] for c in columns}
+                )
+                for row in rows
+            ])
+
+        if user_id is not None:
+            # Progress rows go away with their chapter, whose tombstone covers them.
+            rows = self.db.execute(text(f"""
+                SELECT change_seq, {", ".join(PROGRESS_SYNC_COLUMNS)}
+                FROM reading_progress
+                WHERE user_id = :user_id
+                  AND change_seq > :after_seq {xid_filter}
+                ORDER BY change_seq LIMIT :limit
+            """), params).mappings().all()
+            sources.append([
+                SyncChangeRow(row["change_seq"], "progress", row["chapter_id"],
+                              {c: row[c] for c in PROGRESS_SYNC_COLUMNS})
+                for row in rows
+            ])
+
+        if since_xid is not None:
+            # A tombstone is obsolete if the row came back (e.g. re-imported).
+            rows = self.db.execute(
+                text(f"""
+                    SELECT t.change_seq, t.entity, t.entity_id FROM sync_tombstones t
+                    WHERE t.change_seq > :after_seq
+                    {xid_filter.replace("change_xid", "t.change_xid")}
+                    AND NOT EXISTS (
+                        SELECT 1 FROM series s
+                        WHERE t.entity = 'series' AND s.id = t.entity_id
+                    )
+                    AND NOT EXISTS (
+                        SELECT 1 FROM chapters c
+                        WHERE t.entity = 'chapter' AND c.id = t.entity_id
+                    )
+                    ORDER BY t.change_seq LIMIT :limit
+                """),
+                params,
+            ).all()
+            sources.append(
+                [
+                    SyncChangeRow(seq, entity, entity_id, None)
+                    for seq, entity, entity_id in rows
+                ]
+            )
+
+        return list(heapq.merge(*sources))[:limit]
+
+    def prune_tombstones(self, retention_days: int) -> int:
+        """Delete tombstones older than the retention period; returns the count."""
+        result = self.db.execute(
+            text(
+                "DELETE FROM sync_tombstones "
+                "WHERE deleted_at < NOW() - make_interval(days => :days)"
+            ),
+            {"days": retention_days},
+        )
+        self.db.commit()
+        return result.rowcount
@@ -1,9 +1,15 @@
-from typing import Optional
+from typing import List, Optional, Sequence, Set, Tuple
+from sqlalchemy import insert, or_, text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.db.copy import copy_rows
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.repositories.progress import ProgressRepository
+from app.schemas.user import UserCreate, UserImportError, UserUpdate
+
+# (row number in the import file, validated user data, password hash)
+UserImportRow = Tuple[int, UserCreate, str]
 
 
 class UserRepository:
@@ -78,6 +84,9 @@ class UserRepository:
         if not db_user:
             return False
         
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Progress tables come from init-db.sql and have no foreign key to users.
+            ProgressRepository(self.db).delete_user_progress(user_id)
         self.db.delete(db_user)
         self.db.commit()
         return True
@@ -114,4 +123,179 @@ class UserRepository:
         db_user.is_active = False
         self.db.commit()
         self.db.refresh(db_user)
-        return db_user
\ No newline at end of file
+        return db_user
+
+    def bulk_create_users(
+        self, rows: Sequence[UserImportRow]
+    ) -> Tuple[int, List[UserImportError]]:
+        """Create many users in one transaction.
+
+        Rows that collide with an existing user, or with an earlier row of the
+        same batch, are skipped and reported instead of aborting the batch.
+        Returns the number of users created and the per-row conflicts.
+        """
+        if not rows:
+            return 0, []
+        if self.db.get_bind().dialect.name == "postgresql":
+            return self._bulk_create_users_copy(rows)
+        return self._bulk_create_users_orm(rows)
+
+    def _bulk_create_users_copy(
+        self, rows: Sequence[UserImportRow]
+    ) -> Tuple[int, List[UserImportError]]:
+        """Load rows through a staging table with COPY and insert set-based."""
+        self.db.execute(
+            text("""
+                CREATE TEMP TABLE user_import_staging (
+                    row_no INTEGER NOT NULL,
+                    username VARCHAR(50) NOT NULL,
+                    email VARCHAR(255) NOT NULL,
+                    full_name VARCHAR(255),
+                    hashed_password VARCHAR(255) NOT NULL
+                ) ON COMMIT DROP
+            """)
+        )
+
+        copy_rows(
+            self.db,
+            "user_import_staging",
+            ["row_no", "username", "email", "full_name", "hashed_password"],
+            (
+                (
+                    row_no,
+                    user_data.username,
+                    user_data.email,
+                    user_data.full_name,
+                    hashed_password,
+                )
+                for row_no, user_data, hashed_password in rows
+            ),
+        )
+
+        taken_usernames = set(
+            self.db.execute(
+                text("""
+                    SELECT u.username FROM users u
+                    WHERE u.username IN (SELECT username FROM user_import_staging)
+                """)
+            ).scalars()
+        )
+        taken_emails = set(
+            self.db.execute(
+                text("""
+                    SELECT u.email FROM users u
+                    WHERE u.email IN (SELECT email FROM user_import_staging)
+                """)
+            ).scalars()
+        )
+        accepted, errors = _resolve_import_conflicts(
+            rows, taken_usernames, taken_emails
+        )
+
+        # A user created concurrently since the checks above is skipped here
+        # and reported below instead of failing the batch.
+        created = set(
+            self.db.execute(
+                text("""
+                    INSERT INTO users (username, email, full_name, hashed_password,
+                                       is_active, is_superuser, created_at, updated_at)
+                    SELECT s.username, s.email, s.full_name, s.hashed_password,
+                           true, false, NOW(), NOW()
+                    FROM user_import_staging s
+                    WHERE s.row_no = ANY(:row_nos)
+                    ORDER BY s.row_no
+                    ON CONFLICT DO NOTHING
+                    RETURNING username
+                """),
+                {"row_nos": [row_no for row_no, _, _ in accepted]},
+            ).scalars()
+        )
+        self.db.commit()
+
+        for row_no, user_data, _ in accepted:
+            if user_data.username not in created:
+                errors.append(
+                    UserImportError(
+                        row=row_no,
+                        username=user_data.username,
+                        email=user_data.email,
+                        error="User creation failed due to constraint violation",
+                    )
+                )
+        errors.sort(key=lambda error: error.row)
+        return len(created), errors
+
+    def _bulk_create_users_orm(
+        self, rows: Sequence[UserImportRow]
+    ) -> Tuple[int, List[UserImportError]]:
+        """Fallback for databases without COPY: check conflicts, then executemany."""
+        usernames = {user_data.username for _, user_data, _ in rows}
+        emails = {user_data.email for _, user_data, _ in rows}
+        existing = (
+            self.db.query(User.username, User.email)
+            .filter(or_(User.username.in_(usernames), User.email.in_(emails)))
+            .all()
+        )
+        accepted, errors = _resolve_import_conflicts(
+            rows, {u.username for u in existing}, {u.email for u in existing}
+        )
+        to_insert = [
+            {
+                "username": user_data.username,
+                "email": user_data.email,
+                "full_name": user_data.full_name,
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_superuser": False,
+            }
+            for _, user_data, hashed_password in accepted
+        ]
+
+        if to_insert:
+            self.db.execute(insert(User), to_insert)
+        self.db.commit()
+        return len(to_insert), errors
+
+
+def _resolve_import_conflicts(
+    rows: Sequence[UserImportRow],
+    taken_usernames: Set[str],
+    taken_emails: Set[str],
+) -> Tuple[List[UserImportRow], List[UserImportError]]:
+    """Pick the rows to create, in row order.
+
+    A row is rejected if its username or email belongs to an existing user
+    or to an earlier row that was accepted. Rows rejected for one field do
+    not claim the other, so a later row may still use it.
+    """
+    taken_usernames = set(taken_usernames)
+    taken_emails = set(taken_emails)
+    accepted = []
+    errors = []
+    for row_no, user_data, hashed_password in sorted(rows, key=lambda r: r[0]):
+        if user_data.username in taken_usernames:
+            errors.append(
+                UserImportError(
+                    row=row_no,
+                    username=user_data.username,
+                    email=user_data.email,
+                    field="username",
+                    error=f"Username '{user_data.username}' already exists",
+                )
+            )
+            continue
+        if user_data.email in taken_emails:
+            errors.append(
+                UserImportError(
+                    row=row_no,
+                    username=user_data.username,
+                    email=user_data.email,
+                    field="email",
+                    error=f"Email '{user_data.email}' already exists",
+                )
+            )
+            continue
+        taken_usernames.add(user_data.username)
+        taken_emails.add(user_data.email)
+        accepted.append((row_no, user_data, hashed_password))
+    return accepted, errors
@@ -7,6 +7,8 @@ from .user import (
     UserLogin,
     Token,
     TokenData,
+    UserImportError,
+    UserImportResult,
 )
 
 __all__ = [
@@ -18,4 +20,6 @@ __all__ = [
     "UserLogin",
     "Token",
     "TokenData",
+    "UserImportError",
+    "UserImportResult",
 ]
\ No newline at end of file
@@ -0,0 +1,134 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class DuplicateChapterPair(BaseModel):
+    """Schema for two chapters whose pages are near-duplicates."""
+    chapter_a: UUID
+    chapter_b: UUID
+    chapter_number_a: Decimal
+    chapter_number_b: Decimal
+    relative_path_a: str
+    relative_path_b: str
+    matched_pages: int = Field(
+        ..., description="Pages of the shorter chapter found in the other"
+    )
+    pages_a: int
+    pages_b: int
+    similarity: float = Field(..., ge=0, le=1)
+
+
+class SeriesDuplicates(BaseModel):
+    """Schema for the duplicate chapters found within one series."""
+    series_id: UUID
+    duplicates: List[DuplicateChapterPair]
+
+
+class SeriesSummary(BaseModel):
+    """Schema for a series in the library listing."""
+    id: UUID
+    title_primary: str
+    status: Optional[str] = None
+    genres: Optional[List[str]] = None
+    reading_status: Optional[str] = None
+    chapter_count: int = Field(0, description="Chapters found on disk")
+    latest_chapter: Optional[Decimal] = None
+    updated_at: Optional[datetime] = None
+
+
+class SeriesListResponse(BaseModel):
+    """Schema for one page of the library listing."""
+    total: int
+    items: List[SeriesSummary]
+
+
+class FacetValue(BaseModel):
+    """Schema for one value of a browse facet."""
+    value: str
+    count: int = Field(..., description="Matching series with this value")
+
+
+class BrowseFacets(BaseModel):
+    """Schema for the facet counts of a browse result."""
+    genres: List[FacetValue] = []
+    tags: List[FacetValue] = []
+    statuses: List[FacetValue] = []
+    reading_statuses: List[FacetValue] = []
+    metadata_keys: List[FacetValue] = []
+
+
+class SeriesBrowseResponse(SeriesListResponse):
+    """Schema for one page of filtered series with facet counts."""
+    facets: BrowseFacets
+
+
+class ChapterSummary(BaseModel):
+    """Schema for a chapter in a series' chapter list."""
+    id: UUID
+    chapter_number: Decimal
+    volume_number: Optional[int] = None
+    title: Optional[str] = None
+    page_count: Optional[int] = None
+
+
+class TileInfo(BaseModel):
+    """Schema for one tile of a very tall page."""
+    index: int = Field(..., ge=0)
+    top: int = Field(..., description="First row of the page in this tile")
+    height: int
+
+
+class PageInfo(BaseModel):
+    """Schema for the layout metadata of one page."""
+    number: int = Field(..., ge=1)
+    width: Optional[int] = Field(
+        None, description="Pixels, null if the header could not be read"
+    )
+    height: Optional[int] = None
+    is_spread: bool = Field(False, description="Double-page spread: wider than tall")
+    tiles: Optional[List[TileInfo]] = Field(
+        None,
+        description=(
+            "Tiles to load top to bottom instead of the page, once the chapter "
+            "is extracted"
+        ),
+    )
+
+
+class ChapterPages(BaseModel):
+    """Schema for a chapter's pages with their dimensions."""
+    chapter_id: UUID
+    page_count: int
+    pages: List[PageInfo]
+    media_signature: Optional[str] = Field(
+        None,
+        description=(
+            "Pass as ?sig= on this chapter's page and tile URLs "
+            "when headers cannot be sent"
+        ),
+    )
+    media_signature_expires_at: Optional[datetime] = None
+
+
+class SeriesDetail(SeriesSummary):
+    """Schema for a series with its chapter list."""
+    title_alt: Optional[List[str]] = None
+    description: Optional[str] = None
+    tags: Optional[List[str]] = None
+    chapters: List[ChapterSummary]
+
+
+class SignedUrl(BaseModel):
+    """Schema for a short-lived URL that needs no Authorization header."""
+    url: str
+    expires_at: datetime
+
+
+class NormalizeStarted(BaseModel):
+    """Schema for a queued archive normalization sweep."""
+    job_id: Optional[UUID] = Field(
+        None, description="Null if a sweep is already under way"
+    )
@@ -0,0 +1,64 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+MAX_PROGRESS_BATCH = 1000
+
+
+class ProgressUpdate(BaseModel):
+    """Schema for one chapter's reading progress sent by a client."""
+    chapter_id: UUID
+    last_page_read: int = Field(0, ge=0)
+    is_read: bool = False
+    updated_at: Optional[datetime] = Field(
+        None,
+        description=(
+            "When the progress was recorded, for progress kept offline; "
+            "defaults to now"
+        ),
+    )
+
+
+class ProgressBatch(BaseModel):
+    """Schema for a batch of reading progress updates."""
+    items: List[ProgressUpdate] = Field(..., max_length=MAX_PROGRESS_BATCH)
+
+
+class ProgressWriteResponse(BaseModel):
+    """Schema for the outcome of a progress batch."""
+    applied: int = Field(..., description="Updates stored")
+    stale: int = Field(
+        0,
+        description=(
+            "Updates older than the stored progress or another update in the "
+            "batch, ignored"
+        ),
+    )
+    unknown_chapters: List[UUID] = Field(
+        default_factory=list, description="Chapters that do not exist, ignored"
+    )
+
+
+class ChapterProgress(BaseModel):
+    """Schema for the current user's progress on one chapter."""
+    chapter_id: UUID
+    last_page_read: int
+    is_read: bool
+    updated_at: datetime
+
+
+class ContinueReadingItem(BaseModel):
+    """Schema for the next chapter to read in a series the user is reading."""
+    series_id: UUID
+    title_primary: str
+    chapter_id: UUID
+    chapter_number: Decimal
+    volume_number: Optional[int] = None
+    chapter_title: Optional[str] = None
+    page_count: Optional[int] = None
+    last_page_read: int = Field(
+        0, description="Page to resume at; 0 for a chapter not started"
+    )
+    last_read_at: datetime
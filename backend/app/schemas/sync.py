@@ -0,0 +1,65 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class SyncSeries(BaseModel):
+    """Schema for a series as sent to syncing clients."""
+    id: UUID
+    title_primary: str
+    title_alt: Optional[List[str]] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    genres: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    chapter_count: Optional[int] = None
+    reading_status: Optional[str] = None
+    user_metadata: Optional[Dict[str, Any]] = None
+    updated_at: Optional[datetime] = None
+
+
+class SyncChapter(BaseModel):
+    """Schema for a chapter as sent to syncing clients."""
+    id: UUID
+    series_id: UUID
+    chapter_number: Decimal
+    volume_number: Optional[int] = None
+    title: Optional[str] = None
+    page_count: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+
+class SyncProgress(BaseModel):
+    """Schema for the syncing user's reading progress on a chapter."""
+    chapter_id: UUID
+    last_page_read: int
+    is_read: bool
+    updated_at: datetime
+
+
+class SyncDeleted(BaseModel):
+    """Schema for IDs deleted since the previous sync."""
+    series: List[UUID] = Field(default_factory=list)
+    chapters: List[UUID] = Field(default_factory=list)
+
+
+class SyncResponse(BaseModel):
+    """Schema for one page of library changes."""
+    cursor: str = Field(..., description="Opaque cursor to pass to the next sync call")
+    has_more: bool = Field(
+        ..., description="Whether more changes are available right away"
+    )
+    reset: bool = Field(
+        False,
+        description=(
+            "This page starts a full snapshot; discard local library data first"
+        ),
+    )
+    series: List[SyncSeries] = Field(default_factory=list)
+    chapters: List[SyncChapter] = Field(default_factory=list)
+    progress: List[SyncProgress] = Field(
+        default_factory=list, description="The user's own reading progress"
+    )
+    deleted: SyncDeleted = Field(default_factory=SyncDeleted)
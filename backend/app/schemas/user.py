@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -53,4 +53,21 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     """Schema for token payload data."""
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+
+
+class UserImportError(BaseModel):
+    """Schema for a row rejected during bulk user import."""
+    row: int = Field(..., description="Row number in the import file (1-based)")
+    username: Optional[str] = None
+    email: Optional[str] = None
+    field: Optional[str] = Field(None, description="Field that caused the rejection")
+    error: str
+
+
+class UserImportResult(BaseModel):
+    """Schema for bulk user import results."""
+    total: int
+    created: int
+    failed: int
+    errors: List[UserImportError] = []
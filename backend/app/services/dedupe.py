@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from app.library import dedupe
+from app.repositories.chapter import ChapterRepository
+from app.schemas.library import DuplicateChapterPair, SeriesDuplicates
+from app.services.normalize import chapter_file_path
+
+HASH_CHAPTER_JOB = "hash_chapter_pages"
+
+
+class DedupeService:
+    """Service layer for duplicate page and chapter detection."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.chapter_repo = ChapterRepository(db)
+
+    def update_chapter_hashes(self, chapter_id: str) -> int:
+        """Hash a chapter's pages and store them. Returns the page count hashed.
+
+        Runs as a background job queued the first time a chapter is opened.
+        """
+        chapter = self.chapter_repo.get_chapter(chapter_id)
+        if chapter is None:
+            raise ValueError(f"Chapter '{chapter_id}' not found")
+        path = chapter_file_path(chapter)
+        hashes = dedupe.hash_chapter_pages(path)
+        self.chapter_repo.set_page_hashes(chapter_id, dedupe.pack_hashes(hashes))
+        return len(hashes)
+
+    def find_duplicate_chapters(
+        self,
+        series_id: Optional[str] = None,
+        max_distance: int = dedupe.DEFAULT_MAX_DISTANCE,
+        min_similarity: float = 0.8,
+    ) -> List[SeriesDuplicates]:
+        """Report chapters that duplicate another chapter of the same series."""
+        chapter_hashes = {}
+        series_of: Dict[str, str] = {}
+        for chapter_id, chapter_series_id, packed in self.chapter_repo.iter_page_hashes(
+            series_id
+        ):
+            chapter_hashes[chapter_id] = dedupe.unpack_hashes(packed)
+            series_of[chapter_id] = chapter_series_id
+
+        matches = dedupe.find_duplicate_chapters(
+            chapter_hashes,
+            max_distance=max_distance,
+            min_similarity=min_similarity,
+            groups=series_of,
+        )
+        if not matches:
+            return []
+
+        chapters = {
+            str(chapter["id"]): chapter
+            for chapter in self.chapter_repo.get_chapters(
+                list({m.chapter_a for m in matches} | {m.chapter_b for m in matches})
+            )
+        }
+        by_series: Dict[str, List[DuplicateChapterPair]] = {}
+        for match in matches:
+            chapter_a = chapters[str(match.chapter_a)]
+            chapter_b = chapters[str(match.chapter_b)]
+            by_series.setdefault(str(series_of[match.chapter_a]), []).append(
+                DuplicateChapterPair(
+                    chapter_a=chapter_a["id"],
+                    chapter_b=chapter_b["id"],
+                    chapter_number_a=chapter_a["chapter_number"],
+                    chapter_number_b=chapter_b["chapter_number"],
+                    relative_path_a=chapter_a["relative_path"],
+                    relative_path_b=chapter_b["relative_path"],
+                    matched_pages=match.matched_pages,
+                    pages_a=match.pages_a,
+                    pages_b=match.pages_b,
+                    similarity=round(match.similarity, 4),
+                )
+            )
+        return [
+            SeriesDuplicates(series_id=key, duplicates=pairs)
+            for key, pairs in by_series.items()
+        ]
@@ -0,0 +1,54 @@
+import os
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.library.zipstream import ZipStream, build_zip_stream
+from app.repositories.chapter import ChapterRepository
+from app.repositories.series import SeriesRepository
+from app.services.normalize import chapter_file_path
+
+# Characters that are unsafe in file and folder names on common platforms.
+_UNSAFE_NAME_CHARS = str.maketrans(dict.fromkeys('<>:"/\\|?*\0', "_"))
+
+
+def _safe_name(name: str) -> str:
+    return name.translate(_UNSAFE_NAME_CHARS).strip(" .") or "_"
+
+
+class DownloadService:
+    """Service layer for whole-series and whole-volume downloads."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.series_repo = SeriesRepository(db)
+        self.chapter_repo = ChapterRepository(db)
+
+    def build_series_archive(
+        self, series_id: str, volume_number: Optional[int] = None
+    ) -> Tuple[str, ZipStream]:
+        """Lay out the download archive for a series or one of its volumes.
+
+        Returns the suggested download file name and the archive. Each
+        chapter becomes a folder named after its file, holding its pages.
+        """
+        series = self.series_repo.get_series(series_id)
+        if series is None:
+            raise ValueError("Series not found")
+        chapters = self.chapter_repo.get_series_chapters(series_id, volume_number)
+        if not chapters:
+            raise ValueError("No chapters to download")
+
+        entries = []
+        used = set()
+        for chapter in chapters:
+            folder = _safe_name(os.path.splitext(chapter["file_name"])[0])
+            # Chapter file names are only unique per directory on disk.
+            if folder in used:
+                folder = f"{folder} ({chapter['chapter_number']})"
+            used.add(folder)
+            entries.append((folder, chapter_file_path(chapter)))
+
+        title = _safe_name(series["title_primary"])
+        if volume_number is not None:
+            title = f"{title} - Vol. {volume_number}"
+        return f"{title}.zip", build_zip_stream(entries)
@@ -0,0 +1,78 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.library import fingerprint
+from app.repositories.chapter import ChapterRepository, ChapterScanRow
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FingerprintResult:
+    """Counts for one fingerprinted scan batch."""
+    reused: int = 0  # Quick fingerprint unchanged, stored full fingerprint kept
+    hashed: int = 0  # Hashed in full
+    failed: int = 0  # Could not be read
+    bytes_hashed: int = 0
+
+
+class FingerprintService:
+    """Service layer for content fingerprints of scanned chapter files."""
+
+    def __init__(self, db: Session, workers: Optional[int] = None):
+        self.db = db
+        self.chapter_repo = ChapterRepository(db)
+        self.workers = workers or settings.FINGERPRINT_WORKERS
+
+    def fingerprint_batch(
+        self, rows: Sequence[ChapterScanRow], verify: bool = False
+    ) -> FingerprintResult:
+        """Fill in the fingerprints of a scan batch before it is upserted.
+
+        Every file gets a quick fingerprint. Files that are new, changed
+        size or changed quick fingerprint are hashed in full; the others
+        keep their stored full fingerprint. ``verify`` hashes every file in
+        full, for mounts where a same-size rewrite could go unnoticed.
+        Files that cannot be read are left without fingerprints, which the
+        upsert treats as unchanged.
+        """
+        known = self.chapter_repo.get_fingerprints([row.relative_path for row in rows])
+        result = FingerprintResult()
+        fingerprints = fingerprint.map_threaded(
+            lambda row: self._fingerprint(row, known.get(row.relative_path), verify),
+            rows,
+            self.workers,
+        )
+        for row, (quick, full, hashed_bytes) in zip(rows, fingerprints, strict=True):
+            row.file_quick_hash, row.file_hash = quick, full
+            if quick is None:
+                result.failed += 1
+            elif hashed_bytes is None:
+                result.reused += 1
+            else:
+                result.hashed += 1
+                result.bytes_hashed += hashed_bytes
+        return result
+
+    def _fingerprint(
+        self, row: ChapterScanRow, stored: Optional[Dict], verify: bool
+    ) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        path = os.path.join(settings.MANGA_LIBRARY_PATH, row.relative_path)
+        try:
+            quick = fingerprint.quick_fingerprint(path)
+            if (
+                not verify
+                and stored is not None
+                and stored["file_hash"] is not None
+                and stored["file_quick_hash"] == quick
+                and stored["file_size"] == row.file_size
+            ):
+                return quick, stored["file_hash"], None
+            return quick, fingerprint.full_fingerprint(path), os.path.getsize(path)
+        except OSError as e:
+            logger.warning("Cannot fingerprint '%s': %s", row.relative_path, e)
+            return None, None, None
@@ -0,0 +1,200 @@
+"""
+Background health monitoring.
+
+Probes hit the API far more often than the underlying dependencies change,
+so the checks run on a fixed interval in a background task and the probe
+endpoints only read the latest snapshot. A probe therefore never takes a
+pool connection or touches the library mount itself.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+
+@dataclass
+class HealthSnapshot:
+    """Result of one round of dependency checks."""
+
+    checked_at: datetime
+    monotonic_at: float
+    checks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.monotonic_at
+
+
+def check_database() -> Dict[str, Any]:
+    """Measure database round-trip latency and job queue lag."""
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        try:
+            lag = conn.execute(text(
+                "SELECT EXTRACT(EPOCH FROM (NOW() - MIN(scheduled_at))) "
+                "FROM job_queue WHERE status = 'pending' AND scheduled_at <= NOW()"
+            )).scalar()
+            job_queue = {
+                "status": HEALTHY,
+                "lag_seconds": round(float(lag), 2) if lag is not None else 0.0,
+            }
+            if job_queue["lag_seconds"] > settings.HEALTH_JOB_QUEUE_MAX_LAG_SECONDS:
+                job_queue["status"] = DEGRADED
+        except Exception as e:
+            conn.rollback()
+            job_queue = {"status": UNKNOWN, "error": str(e)}
+
+    database = {"status": HEALTHY, "latency_ms": latency_ms}
+    if latency_ms > settings.HEALTH_DB_LATENCY_THRESHOLD_MS:
+        database["status"] = DEGRADED
+    return {"database": database, "job_queue": job_queue}
+
+
+def check_library(path: Optional[str] = None) -> Dict[str, Any]:
+    """Check that the manga library mount is present and readable."""
+    path = path or settings.MANGA_LIBRARY_PATH
+    start = time.perf_counter()
+    if not os.path.isdir(path):
+        return {"status": UNHEALTHY, "path": path, "error": "not a directory"}
+    # Reading one entry forces a real round trip on network filesystems,
+    # where a stale mount can still pass a cached stat().
+    with os.scandir(path) as entries:
+        next(entries, None)
+    return {
+        "status": HEALTHY,
+        "path": path,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+class HealthMonitor:
+    """Refreshes a health snapshot in the background and evaluates readiness."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        max_age: Optional[float] = None,
+    ):
+        self.interval = (
+            interval if interval is not None else settings.HEALTH_CHECK_INTERVAL_SECONDS
+        )
+        self.timeout = (
+            timeout if timeout is not None else settings.HEALTH_CHECK_TIMEOUT_SECONDS
+        )
+        self.max_age = (
+            max_age if max_age is not None else settings.HEALTH_SNAPSHOT_MAX_AGE_SECONDS
+        )
+        self.snapshot: Optional[HealthSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_check(self, func) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(run_in_threadpool(func), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return {"status": UNHEALTHY, "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            return {"status": UNHEALTHY, "error": str(e)}
+
+    async def refresh(self) -> HealthSnapshot:
+        """Run all checks concurrently and store the new snapshot."""
+        db_result, library = await asyncio.gather(
+            self._run_check(check_database),
+            self._run_check(check_library),
+        )
+        if "database" in db_result:
+            checks = {**db_result, "library": library}
+        else:
+            # The database itself failed, so the queue lag is unknown too.
+            checks = {
+                "database": db_result,
+                "library": library,
+                "job_queue": {"status": UNKNOWN},
+            }
+
+        self.snapshot = HealthSnapshot(
+            checked_at=datetime.now(timezone.utc),
+            monotonic_at=time.monotonic(),
+            checks=checks,
+        )
+        return self.snapshot
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health check refresh failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def readiness(self) -> Dict[str, Any]:
+        """Evaluate the latest snapshot against the staleness thresholds.
+
+        The database and library mount are required to serve traffic. Slow
+        queries or a lagging job queue only mark the service as degraded.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {
+                "ready": False,
+                "status": UNHEALTHY,
+                "reason": "no health snapshot yet",
+            }
+
+        age = round(snapshot.age_seconds(), 2)
+        result = {
+            "ready": True,
+            "status": HEALTHY,
+            "checked_at": snapshot.checked_at.isoformat(),
+            "age_seconds": age,
+            "checks": snapshot.checks,
+        }
+
+        if age > self.max_age:
+            result.update(
+                ready=False, status=UNHEALTHY, reason="health snapshot is stale"
+            )
+            return result
+
+        for name in ("database", "library"):
+            if snapshot.checks[name]["status"] == UNHEALTHY:
+                result.update(
+                    ready=False, status=UNHEALTHY, reason=f"{name} unavailable"
+                )
+                return result
+
+        if any(check["status"] == DEGRADED for check in snapshot.checks.values()):
+            result["status"] = DEGRADED
+        return result
@@ -0,0 +1,417 @@
+"""
+Library metadata export and import.
+
+Exports stream each table through a server-side cursor as newline-delimited
+JSON, optionally gzip or zstd compressed. PostgreSQL renders every row with
+``row_to_json`` so Python never materializes more than one cursor batch.
+
+Imports never parse row JSON in Python either: row lines are streamed into
+a ``json`` staging table with ``COPY``, then turned back into typed rows
+with ``json_populate_record`` and upserted set-based, one batch at a time.
+(``json`` rather than ``jsonb`` staging, because each document is only
+parsed once, by ``json_populate_record``.)
+
+Importing into a library that already has rows maps imported ids onto the
+matching local rows first: users by username, chapters by series and
+chapter number. References in later sections are rewritten through those
+maps, so progress follows the account and chapter it belongs to.
+
+File layout::
+
+    {"__export__": {"format": "kiremisu-library", "version": 1, ...}}
+    {"__table__": "series", "columns": ["id", "title_primary", ...]}
+    {"id": "...", "title_primary": "...", ...}
+    ...
+    {"__table__": "chapters", "columns": [...]}
+    ...
+"""
+
+import gzip
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import IO, Dict, Iterator, List, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_all
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT = "kiremisu-library"
+EXPORT_VERSION = 1
+
+# Parents before children so foreign keys hold as rows are imported.
+TRANSFER_TABLES = [
+    "users",
+    "series",
+    "chapters",
+    "watch_list",
+    "reading_progress",
+    "series_reading",
+]
+
+# Tables whose rows are not identified by an ``id`` column.
+CONFLICT_KEYS = {
+    "watch_list": ("series_id",),
+    "reading_progress": ("user_id", "chapter_id"),
+    "series_reading": ("user_id", "series_id"),
+}
+
+# Columns rewritten through the id map of the named table (see _map_ids).
+REMAPPED_COLUMNS = {
+    "users": {"id": "users"},
+    "chapters": {"id": "chapters"},
+    "reading_progress": {"user_id": "users", "chapter_id": "chapters"},
+    "series_reading": {"user_id": "users", "chapter_id": "chapters"},
+}
+ID_MAP_TABLES = {
+    "users": "library_import_user_ids",
+    "chapters": "library_import_chapter_ids",
+}
+# Tables with a user_id column, rewritten through the users id map.
+USER_OWNED_TABLES = {"reading_progress", "series_reading"}
+
+# Existing accounts are never modified by an import: that would let an
+# export file reset passwords or grant superuser.
+INSERT_ONLY_TABLES = {"users"}
+
+# Delta sync bookkeeping is local to a database; imported rows get fresh values.
+LOCAL_COLUMNS = {"change_seq", "change_xid"}
+
+EXPORT_FETCH_SIZE = 10000
+IMPORT_BATCH_ROWS = 50000
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_TABLE_MARKER = b'{"__table__"'
+
+
+def open_export_file(path: str) -> IO[bytes]:
+    """Open an export file for writing, compressed according to its extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wb", compresslevel=6)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(
+            open(path, "wb")
+        )
+    return open(path, "wb")
+
+
+def open_import_file(path: str) -> IO[bytes]:
+    """Open an export file for line-by-line reading, detecting compression."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.open(path, "rb")
+    if magic.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), closefd=True
+        )
+        return io.BufferedReader(reader)
+    return open(path, "rb")
+
+
+@dataclass
+class TransferStats:
+    """Row counts per table for an export or import."""
+
+    tables: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.tables.values())
+
+
+class LibraryTransferService:
+    """Service layer for streaming library export and import."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        if self.db.get_bind().dialect.name != "postgresql":
+            raise ValueError("Library export/import requires PostgreSQL")
+
+    def _raw_connection(self):
+        return self.db.connection().connection
+
+    def _table_columns(self, table: str) -> List[str]:
+        cursor = self._raw_connection().cursor()
+        try:
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = %s "
+                "ORDER BY ordinal_position",
+                (table,),
+            )
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def export_library(
+        self, out: IO[bytes], tables: Sequence[str] = TRANSFER_TABLES
+    ) -> TransferStats:
+        """Write the given tables to ``out`` as NDJSON."""
+        stats = TransferStats()
+        header = {
+            "format": EXPORT_FORMAT,
+            "version": EXPORT_VERSION,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "tables": list(tables),
+        }
+        out.write(json.dumps({"__export__": header}).encode() + b"\n")
+
+        for table in tables:
+            columns = self._table_columns(table)
+            if not columns:
+                raise ValueError(f"Unknown table '{table}'")
+            out.write(
+                json.dumps({"__table__": table, "columns": columns}).encode() + b"\n"
+            )
+
+            # A named cursor keeps the result set on the server and fetches
+            # EXPORT_FETCH_SIZE rows per round trip.
+            cursor = self._raw_connection().cursor(name=f"export_{table}")
+            cursor.itersize = EXPORT_FETCH_SIZE
+            count = 0
+            try:
+                cursor.execute(f'SELECT row_to_json(t)::text FROM "{table}" t')
+                for (line,) in cursor:
+                    out.write(line.encode() + b"\n")
+                    count += 1
+            finally:
+                cursor.close()
+            stats.tables[table] = count
+            logger.info("Exported %d rows from %s", count, table)
+
+        self.db.commit()
+        return stats
+
+    def import_library(
+        self, source: IO[bytes], batch_rows: int = IMPORT_BATCH_ROWS
+    ) -> TransferStats:
+        """Upsert every table section of an export read from ``source``.
+
+        Runs in a single transaction: either the whole file is applied or
+        nothing is. Users whose username already exists are merged into
+        the local account, which is left unchanged; a new user whose email
+        belongs to another local account fails the import. Progress can only
+        be imported along with its users, unless there are no local users;
+        rows of users missing from the export are dropped.
+        """
+        header_line = source.readline()
+        try:
+            header = json.loads(header_line)["__export__"]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Not a KireMisu library export")
+        if (
+            header.get("format") != EXPORT_FORMAT
+            or header.get("version") != EXPORT_VERSION
+        ):
+            raise ValueError(
+                f"Unsupported export format "
+                f"{header.get('format')} v{header.get('version')}"
+            )
+
+        stats = TransferStats()
+        cursor = self._raw_connection().cursor()
+        try:
+            cursor.execute(
+                "CREATE TEMP TABLE library_import_staging (doc json) ON COMMIT DROP"
+            )
+            cursor.execute(
+                "CREATE TEMP TABLE library_import_user_ids "
+                "(old_id integer PRIMARY KEY, new_id integer NOT NULL) ON COMMIT DROP"
+            )
+            cursor.execute(
+                "CREATE TEMP TABLE library_import_chapter_ids "
+                "(old_id uuid PRIMARY KEY, new_id uuid NOT NULL) ON COMMIT DROP"
+            )
+            # Into an empty users table exported ids are kept as they are;
+            # otherwise new users are numbered after the local ones.
+            cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM users)")
+            keep_user_ids = cursor.fetchone()[0]
+
+            line = source.readline()
+            while line:
+                if not line.startswith(_TABLE_MARKER):
+                    raise ValueError("Expected a table section marker")
+                section = json.loads(line)
+                table = section["__table__"]
+                if table not in TRANSFER_TABLES:
+                    raise ValueError(f"Refusing to import unknown table '{table}'")
+                users_mapped = "users" in stats.tables or keep_user_ids
+                if table in USER_OWNED_TABLES and not users_mapped:
+                    # Unmapped user ids would land on whichever local
+                    # account happens to have the same id.
+                    raise ValueError(
+                        f"Cannot import '{table}' without the users section "
+                        "it belongs to"
+                    )
+                exported = set(section["columns"]) - LOCAL_COLUMNS
+                columns = [c for c in self._table_columns(table) if c in exported]
+
+                # Read rows until the next section marker or end of file.
+                pending = [None]
+
+                def section_rows(pending: list = pending) -> Iterator[bytes]:
+                    while True:
+                        row = source.readline()
+                        if not row or row.startswith(_TABLE_MARKER):
+                            pending[0] = row
+                            return
+                        if row.strip():
+                            yield row
+
+                rows = section_rows()
+                count = 0
+                while True:
+                    batch = _take(rows, batch_rows)
+                    if not batch:
+                        break
+                    cursor.copy_expert(
+                        "COPY library_import_staging (doc) FROM STDIN",
+                        _copy_payload(batch),
+                    )
+                    self._map_ids(cursor, table, keep_user_ids)
+                    cursor.execute(self._upsert_sql(table, columns, keep_user_ids))
+                    cursor.execute("TRUNCATE library_import_staging")
+                    count += len(batch)
+                stats.tables[table] = stats.tables.get(table, 0) + count
+                logger.info("Imported %d rows into %s", count, table)
+                line = pending[0]
+
+            if "users" in stats.tables:
+                # Imported ids bypass the serial sequence; move it past them.
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence('users', 'id'), "
+                    "COALESCE((SELECT MAX(id) FROM users), 1))"
+                )
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        # Imported rows can change any series, chapter or user; cached
+        # responses are dropped when the import commits.
+        invalidate_all(self.db)
+        self.db.commit()
+        return stats
+
+    @staticmethod
+    def _map_ids(cursor, table: str, keep_user_ids: bool) -> None:
+        """Record the local id of each staged user or chapter row."""
+        rows = _staged_rows(table)
+        if table == "users":
+            cursor.execute(
+                f"SELECT r.username FROM {rows} "
+                "WHERE NOT EXISTS "
+                "(SELECT 1 FROM users u WHERE u.username = r.username) "
+                "AND EXISTS (SELECT 1 FROM users u WHERE u.email = r.email) LIMIT 1"
+            )
+            clash = cursor.fetchone()
+            if clash:
+                raise ValueError(
+                    f"Cannot import user '{clash[0]}': "
+                    "its email belongs to another account"
+                )
+            new_id = (
+                "r.id"
+                if keep_user_ids
+                else "nextval(pg_get_serial_sequence('users', 'id'))"
+            )
+            cursor.execute(
+                "INSERT INTO library_import_user_ids (old_id, new_id) "
+                f"SELECT r.id, COALESCE(u.id, {new_id}) FROM {rows} "
+                "LEFT JOIN users u ON u.username = r.username "
+                "ON CONFLICT (old_id) DO NOTHING"
+            )
+        elif table == "chapters":
+            cursor.execute(
+                "INSERT INTO library_import_chapter_ids (old_id, new_id) "
+                f"SELECT r.id, COALESCE(c.id, r.id) FROM {rows} "
+                "LEFT JOIN chapters c ON c.series_id = r.series_id "
+                "AND c.chapter_number = r.chapter_number "
+                "ON CONFLICT (old_id) DO NOTHING"
+            )
+
+    @staticmethod
+    def _upsert_sql(
+        table: str, columns: Sequence[str], keep_user_ids: bool = False
+    ) -> str:
+        quoted = [f'"{column}"' for column in columns]
+        keys = CONFLICT_KEYS.get(table, ("id",))
+        remapped = REMAPPED_COLUMNS.get(table, {})
+        values = [
+            f'COALESCE(m_{column}.new_id, r."{column}")'
+            if column in remapped
+            else f'r."{column}"'
+            for column in columns
+        ]
+        joins = "".join(
+            f" LEFT JOIN {ID_MAP_TABLES[remapped[column]]} m_{column} "
+            f'ON m_{column}.old_id = r."{column}"'
+            for column in columns
+            if column in remapped
+        )
+        # Rows of users missing from the export have no local account.
+        where = ""
+        if table in USER_OWNED_TABLES and not keep_user_ids:
+            where = " WHERE m_user_id.new_id IS NOT NULL"
+        updates = [
+            f'"{column}"' for column in columns if column not in keys and column != "id"
+        ]
+        sql = (
+            f'INSERT INTO "{table}" ({", ".join(quoted)}) '
+            f"SELECT {', '.join(values)} "
+            f"FROM {_staged_rows(table)}"
+            f"{joins}{where} ON CONFLICT ({', '.join(keys)}) DO "
+        )
+        if not updates or table in INSERT_ONLY_TABLES:
+            return sql + "NOTHING"
+        # Skip rows that are already identical so unchanged rows don't fire
+        # the updated_at triggers or create dead tuples.
+        return sql + (
+            f"UPDATE SET {', '.join(f'{c} = EXCLUDED.{c}' for c in updates)} "
+            f"WHERE ({', '.join(f'{table}.{c}' for c in updates)}) "
+            f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in updates)})"
+        )
+
+
+def _copy_payload(lines: Sequence[bytes]) -> IO[bytes]:
+    """Encode NDJSON lines as one ``json`` value per line in COPY text format.
+
+    Backslashes are the only characters JSON output can contain that COPY
+    treats specially; JSON already escapes tabs and newlines in strings.
+    """
+    return io.BytesIO(
+        b"".join(line.rstrip(b"\r\n").replace(b"\\", b"\\\\") + b"\n" for line in lines)
+    )
+
+
+def _take(iterator: Iterator[bytes], count: int) -> List[bytes]:
+    batch = []
+    for item in iterator:
+        batch.append(item)
+        if len(batch) >= count:
+            break
+    return batch
+
+
+def _staged_rows(table: str) -> str:
+    """FROM clause exposing the staged documents as rows ``r`` of ``table``."""
+    return (
+        "library_import_staging s CROSS JOIN LATERAL "
+        f'json_populate_record(NULL::"{table}", s.doc) r'
+    )
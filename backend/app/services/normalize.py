@@ -0,0 +1,197 @@
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Union
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.library import fingerprint, normalize
+from app.library.archive import ArchiveError
+from app.repositories.chapter import ChapterRepository, ChapterScanRow
+from app.workers.queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+NORMALIZE_JOB = "normalize_chapters"
+
+# Where normalized archives go: copies under PROCESSED_DATA_PATH, or over the
+# library file.
+PROCESSED = "processed"
+REPLACE = "replace"
+NORMALIZED_DIR = "normalized"
+FAILED = "failed"
+
+
+def chapter_file_path(chapter: dict) -> str:
+    """The archive to read a chapter's pages from: its normalized copy if it has one."""
+    if chapter.get("normalized_path"):
+        return os.path.join(settings.PROCESSED_DATA_PATH, chapter["normalized_path"])
+    return os.path.join(settings.MANGA_LIBRARY_PATH, chapter["relative_path"])
+
+
+@dataclass
+class _Repacked:
+    """A chapter repacked on a pool thread, waiting to be recorded."""
+    # Processed-relative path of the copy, or the replaced file
+    location: Union[str, ChapterScanRow]
+    result: normalize.RepackResult
+
+
+@dataclass
+class NormalizeResult:
+    """Counts for one batch of the normalization sweep."""
+    checked: int = 0
+    normalized: int = 0
+    failed: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    last_id: Optional[str] = None  # Where the next batch starts
+
+
+class NormalizeService:
+    """Service layer for repacking chapter archives into STORED CBZ files."""
+
+    def __init__(
+        self,
+        db: Session,
+        workers: Optional[int] = None,
+        target: Optional[str] = None,
+        throttle: Optional[normalize.Throttle] = None,
+    ):
+        self.db = db
+        self.chapter_repo = ChapterRepository(db)
+        self.workers = workers or settings.NORMALIZE_WORKERS
+        self.target = target or settings.NORMALIZE_TARGET
+        if self.target not in (PROCESSED, REPLACE):
+            raise ValueError(f"Unknown normalization target '{self.target}'")
+        self.throttle = throttle or normalize.Throttle(
+            settings.NORMALIZE_MAX_MB_PER_SECOND * 1024 ** 2
+        )
+
+    def start(self) -> Optional[str]:
+        """Queue a sweep over the library. Returns None if a sweep is under way."""
+        queue = JobQueue(self.db)
+        if queue.has_jobs(NORMALIZE_JOB):
+            return None
+        job_id = queue.enqueue(NORMALIZE_JOB, {"after": None}, priority=-10)
+        self.db.commit()
+        return job_id
+
+    def run_batch(
+        self, after_id: Optional[str] = None, batch_size: Optional[int] = None
+    ) -> NormalizeResult:
+        """Normalize the next batch of chapters and queue the batch after it.
+
+        Each job handles one batch, so the sweep makes progress in small
+        steps that survive worker restarts, and other jobs run in between.
+        """
+        library = settings.MANGA_LIBRARY_PATH
+        if self.target == REPLACE and not os.access(library, os.W_OK):
+            # Fail the job with a clear message instead of an EROFS per chapter.
+            raise RuntimeError(
+                f"NORMALIZE_TARGET=replace needs write access to {library}; "
+                "mount the library read-write for the workers or use the "
+                "'processed' target"
+            )
+        batch_size = batch_size or settings.NORMALIZE_BATCH_SIZE
+        chapters = self.chapter_repo.get_normalize_candidates(after_id, batch_size)
+        result = self.normalize_chapters(chapters)
+        if len(chapters) == batch_size:
+            JobQueue(self.db).enqueue(
+                NORMALIZE_JOB, {"after": result.last_id}, priority=-10
+            )
+            self.db.commit()
+        else:
+            logger.info("Archive normalization sweep finished")
+        return result
+
+    def normalize_chapters(self, chapters) -> NormalizeResult:
+        """Repack the chapters that need it on the worker pool and record the files."""
+        result = NormalizeResult()
+        outcomes = fingerprint.map_threaded(self._repack, chapters, self.workers)
+        for chapter, repacked in zip(chapters, outcomes, strict=True):
+            result.checked += 1
+            result.last_id = str(chapter["id"])
+            if repacked is FAILED:
+                result.failed += 1
+            if not isinstance(repacked, _Repacked):
+                continue
+            result.normalized += 1
+            result.bytes_read += repacked.result.bytes_read
+            result.bytes_written += repacked.result.bytes_written
+            if self.target == PROCESSED:
+                self.chapter_repo.set_normalized_path(
+                    str(chapter["id"]), repacked.location
+                )
+                continue
+            self.chapter_repo.replace_file(str(chapter["id"]), repacked.location)
+            if repacked.location.relative_path != chapter["relative_path"]:
+                # The chapter now points at the new file; the old one is superseded.
+                old = os.path.join(
+                    settings.MANGA_LIBRARY_PATH, chapter["relative_path"]
+                )
+                try:
+                    os.remove(old)
+                except OSError as e:
+                    logger.warning(
+                        "Cannot remove '%s' after normalizing it: %s", old, e
+                    )
+        return result
+
+    def _repack(self, chapter: dict) -> Union[_Repacked, str, None]:
+        """Repack one chapter if it needs it, on a pool thread without database access.
+
+        Returns None for a chapter that is normalized already or gone, left
+        to the next scan, and FAILED for one that could not be repacked.
+        """
+        source = os.path.join(settings.MANGA_LIBRARY_PATH, chapter["relative_path"])
+        if not os.path.exists(source):
+            return None
+        try:
+            reason = normalize.normalization_reason(source)
+            if reason is None:
+                return None
+            if self.target == PROCESSED:
+                relative = os.path.join(
+                    NORMALIZED_DIR, f"{chapter['id']}{normalize.NORMALIZED_EXTENSION}"
+                )
+                dest = os.path.join(settings.PROCESSED_DATA_PATH, relative)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                repacked = normalize.repack(source, dest, self.throttle)
+                logger.info("Normalized '%s' (%s)", chapter["relative_path"], reason)
+                return _Repacked(relative, repacked)
+
+            relative = os.path.join(
+                os.path.dirname(chapter["relative_path"]),
+                normalize.normalized_name(chapter["file_name"]),
+            )
+            dest = os.path.join(settings.MANGA_LIBRARY_PATH, relative)
+            if relative != chapter["relative_path"] and os.path.exists(dest):
+                logger.warning(
+                    "Not normalizing '%s': '%s' exists",
+                    chapter["relative_path"],
+                    relative,
+                )
+                return FAILED
+            repacked = normalize.repack(source, dest, self.throttle)
+            stat = os.stat(dest)
+            row = ChapterScanRow(
+                series_id=str(chapter["series_id"]),
+                chapter_number=None,
+                relative_path=relative,
+                file_name=os.path.basename(relative),
+                file_extension=normalize.NORMALIZED_EXTENSION.lstrip("."),
+                page_count=repacked.pages,
+                file_size=stat.st_size,
+                file_modified_at=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                file_quick_hash=fingerprint.quick_fingerprint(dest),
+                file_hash=fingerprint.full_fingerprint(dest),
+            )
+            logger.info(
+                "Normalized '%s' in place (%s)", chapter["relative_path"], reason
+            )
+            return _Repacked(row, repacked)
+        except (OSError, ArchiveError) as e:
+            logger.warning("Cannot normalize '%s': %s", chapter["relative_path"], e)
+            return FAILED
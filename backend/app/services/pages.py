@@ -0,0 +1,203 @@
+import mimetypes
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.library import image_header
+from app.library.archive import ChapterArchive
+from app.library.page_cache import PageCache
+from app.repositories.chapter import ChapterRepository
+from app.schemas.library import ChapterPages, PageInfo, TileInfo
+from app.services.dedupe import HASH_CHAPTER_JOB
+from app.services.normalize import chapter_file_path
+from app.workers.queue import JobQueue
+
+WARM_CHAPTER_JOB = "warm_chapter"
+
+
+@lru_cache
+def get_page_cache() -> PageCache:
+    """Process-wide extracted page tier configured from settings."""
+    return PageCache(
+        os.path.join(settings.PROCESSED_DATA_PATH, "pages"),
+        int(settings.PAGE_CACHE_MAX_GB * 1024 ** 3),
+        tile_height=settings.PAGE_TILE_HEIGHT if settings.PAGE_TILE_ENABLED else 0,
+        tile_min_height=settings.PAGE_TILE_MIN_HEIGHT,
+        tile_workers=settings.PAGE_TILE_WORKERS,
+    )
+
+
+@dataclass
+class PageContent:
+    """A page to send: an extracted file, or bytes read from the archive."""
+    media_type: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+
+
+def _media_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+class PageService:
+    """Service layer for reading pages, backed by the extracted page tier."""
+
+    def __init__(self, db: Session, cache: Optional[PageCache] = None):
+        self.db = db
+        self.chapter_repo = ChapterRepository(db)
+        if cache is None and settings.PAGE_CACHE_ENABLED:
+            cache = get_page_cache()
+        self.cache = cache
+
+    def get_page(self, chapter_id: str, page_number: int) -> PageContent:
+        """Get a page by 1-based number.
+
+        Pages of extracted chapters are served as files. Otherwise the page
+        is read from the archive and the chapter is queued for extraction,
+        along with the chapters expected next. Opening a chapter (page 1)
+        also counts as a read for the eviction policy.
+        """
+        chapter = self.chapter_repo.get_chapter(chapter_id)
+        if chapter is None:
+            raise ValueError("Chapter not found")
+        source = chapter_file_path(chapter)
+
+        path = None
+        if self.cache is not None:
+            path = self.cache.page_path(chapter_id, page_number, source)
+        if path is not None:
+            if page_number == 1:
+                self._queue_warm(chapter_id)
+            return PageContent(media_type=_media_type(path), path=path)
+
+        with ChapterArchive(source) as archive:
+            pages = archive.pages()
+            if not 1 <= page_number <= len(pages):
+                raise ValueError("Page not found")
+            name = pages[page_number - 1]
+            data = archive.read_page(name)
+        # An extraction may have finished while the page was read; don't
+        # queue the chapter again once it is in the tier.
+        if self.cache:
+            manifest = self.cache.load_manifest(chapter_id)
+            if not self.cache.is_current(manifest, source):
+                self._queue_warm(chapter_id)
+        return PageContent(media_type=_media_type(name), data=data)
+
+    def get_chapter_pages(self, chapter_id: str) -> ChapterPages:
+        """Get a chapter's page dimensions for layout, reading them if not stored yet.
+
+        Very tall pages list their tiles once the chapter is extracted;
+        until then the chapter is queued for extraction and pages are
+        listed without tiles. Chapters opened for the first time are also
+        queued for perceptual hashing, for duplicate detection.
+        """
+        chapter = self.chapter_repo.get_chapter(chapter_id)
+        if chapter is None:
+            raise ValueError("Chapter not found")
+        if chapter["page_dimensions"] is not None:
+            sizes = image_header.unpack_dimensions(bytes(chapter["page_dimensions"]))
+        else:
+            sizes = self.update_page_dimensions(chapter_id)
+        if chapter["page_hashes"] is None:
+            JobQueue(self.db).enqueue(
+                HASH_CHAPTER_JOB,
+                {"chapter_id": str(chapter_id)},
+                priority=-5,
+                unique=True,
+            )
+            self.db.commit()
+        tiles = {}
+        if self.cache:
+            source = chapter_file_path(chapter)
+            manifest = self.cache.load_manifest(chapter_id)
+            if self.cache.is_current(manifest, source):
+                tiles = manifest.get("tiles", {})
+            else:
+                self._queue_warm(chapter_id)
+        return ChapterPages(
+            chapter_id=chapter_id,
+            page_count=len(sizes),
+            pages=[
+                PageInfo(
+                    number=number,
+                    width=width or None,
+                    height=height or None,
+                    is_spread=image_header.is_spread(width, height),
+                    tiles=[
+                        TileInfo(index=index, top=tile["top"], height=tile["height"])
+                        for index, tile in enumerate(tiles[str(number)])
+                    ] if str(number) in tiles else None,
+                )
+                for number, (width, height) in enumerate(sizes, start=1)
+            ],
+        )
+
+    def get_tile(self, chapter_id: str, page_number: int, tile_index: int) -> str:
+        """Get the path of one tile of an extracted, tiled page."""
+        chapter = self.chapter_repo.get_chapter(chapter_id)
+        if chapter is None:
+            raise ValueError("Chapter not found")
+        source = chapter_file_path(chapter)
+        path = None
+        if self.cache is not None:
+            path = self.cache.tile_path(chapter_id, page_number, tile_index, source)
+        if path is None:
+            raise ValueError("Tile not found")
+        return path
+
+    def update_page_dimensions(self, chapter_id: str) -> List[Tuple[int, int]]:
+        """Read a chapter's page dimensions from the image headers and store them.
+
+        This is the hook the scanner calls for new and changed chapters.
+        """
+        chapter = self.chapter_repo.get_chapter(chapter_id)
+        if chapter is None:
+            raise ValueError(f"Chapter '{chapter_id}' not found")
+        path = chapter_file_path(chapter)
+        sizes = image_header.read_chapter_dimensions(path)
+        self.chapter_repo.set_page_dimensions(
+            chapter_id, image_header.pack_dimensions(sizes)
+        )
+        return sizes
+
+    def _queue_warm(self, chapter_id: str) -> None:
+        JobQueue(self.db).enqueue(
+            WARM_CHAPTER_JOB,
+            {"chapter_id": str(chapter_id)},
+            priority=10,
+            unique=True,
+        )
+        self.db.commit()
+
+    def warm_chapter(self, chapter_id: str) -> int:
+        """Extract a chapter being read and the chapters after it, then evict to budget.
+
+        Returns the number of chapters extracted.
+        """
+        if self.cache is None:
+            return 0
+        chapter = self.chapter_repo.get_chapter(chapter_id)
+        if chapter is None:
+            # Deleted since the job was queued.
+            self.cache.remove(chapter_id)
+            return 0
+        following = self.chapter_repo.get_next_chapters(
+            str(chapter["series_id"]),
+            chapter["chapter_number"],
+            settings.PAGE_CACHE_PREFETCH_CHAPTERS,
+        )
+        extracted = 0
+        warmed = []
+        for target in [chapter, *following]:
+            source = chapter_file_path(target)
+            if not os.path.exists(source):
+                continue
+            if self.cache.ensure(str(target["id"]), source, accessed=target is chapter):
+                extracted += 1
+            warmed.append(str(target["id"]))
+        self.cache.evict(protect=warmed)
+        return extracted
@@ -0,0 +1,75 @@
+from typing import Dict, List, Sequence
+from sqlalchemy.orm import Session
+
+from app.repositories.progress import ProgressEntry, ProgressRepository
+from app.schemas.progress import (
+    ChapterProgress,
+    ContinueReadingItem,
+    ProgressUpdate,
+    ProgressWriteResponse,
+)
+
+
+def latest_per_chapter(updates: Sequence[ProgressUpdate]) -> List[ProgressUpdate]:
+    """Keep one update per chapter: the most recent, or the last sent among equals.
+
+    An update without a timestamp stands for now, so it is the most recent.
+    """
+    latest: Dict[str, ProgressUpdate] = {}
+    for update in updates:
+        key = str(update.chapter_id)
+        current = latest.get(key)
+        if current is None or update.updated_at is None or (
+            current.updated_at is not None and update.updated_at >= current.updated_at
+        ):
+            latest[key] = update
+    return list(latest.values())
+
+
+class ProgressService:
+    """Service layer for per-user reading progress."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.progress_repo = ProgressRepository(db)
+
+    def get_progress(
+        self, user_id: int, chapter_ids: Sequence[str]
+    ) -> List[ChapterProgress]:
+        """Get the user's progress on the given chapters, leaving out unread ones."""
+        rows = self.progress_repo.get_progress(user_id, sorted(set(chapter_ids)))
+        return [ChapterProgress(**row) for row in rows]
+
+    def get_series_progress(
+        self, user_id: int, series_id: str
+    ) -> List[ChapterProgress]:
+        """Get the user's progress on the chapters of a series, in reading order."""
+        rows = self.progress_repo.get_series_progress(user_id, series_id)
+        return [ChapterProgress(**row) for row in rows]
+
+    def set_progress(
+        self, user_id: int, updates: Sequence[ProgressUpdate]
+    ) -> ProgressWriteResponse:
+        """Store a batch of progress updates in one statement."""
+        entries = [
+            ProgressEntry(
+                str(update.chapter_id),
+                update.last_page_read,
+                update.is_read,
+                update.updated_at,
+            )
+            for update in latest_per_chapter(updates)
+        ]
+        result = self.progress_repo.set_progress(user_id, entries)
+        return ProgressWriteResponse(
+            applied=result.applied,
+            stale=result.stale + len(updates) - len(entries),
+            unknown_chapters=result.unknown_chapters,
+        )
+
+    def get_continue_reading(
+        self, user_id: int, limit: int
+    ) -> List[ContinueReadingItem]:
+        """Get the next chapter of each series the user reads, most recent first."""
+        rows = self.progress_repo.get_continue_reading(user_id, limit)
+        return [ContinueReadingItem(**row) for row in rows]
@@ -0,0 +1,67 @@
+from sqlalchemy.orm import Session
+
+from app.repositories.chapter import ChapterRepository
+from app.repositories.series import SeriesFilters, SeriesRepository
+from app.schemas.library import (
+    BrowseFacets,
+    ChapterSummary,
+    FacetValue,
+    SeriesBrowseResponse,
+    SeriesDetail,
+    SeriesListResponse,
+    SeriesSummary,
+)
+
+_SERIES_DETAIL_COLUMNS = set(SeriesDetail.model_fields) - {
+    "chapter_count", "latest_chapter", "chapters"
+}
+
+
+class SeriesService:
+    """Service layer for the library listing and series detail."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.series_repo = SeriesRepository(db)
+        self.chapter_repo = ChapterRepository(db)
+
+    def list_series(self, limit: int, offset: int) -> SeriesListResponse:
+        """Get a page of series in title order."""
+        total, rows = self.series_repo.list_series(limit, offset)
+        return SeriesListResponse(
+            total=total, items=[SeriesSummary(**row) for row in rows]
+        )
+
+    def browse_series(
+        self, filters: SeriesFilters, limit: int, offset: int
+    ) -> SeriesBrowseResponse:
+        """Get a page of filtered series in title order with facet counts."""
+        total, rows, facets = self.series_repo.browse_series(filters, limit, offset)
+        return SeriesBrowseResponse(
+            total=total,
+            items=[SeriesSummary(**row) for row in rows],
+            facets=BrowseFacets(**{
+                facet: [FacetValue(value=value, count=count) for value, count in pairs]
+                for facet, pairs in facets.items()
+            }),
+        )
+
+    def get_series_detail(self, series_id: str) -> SeriesDetail:
+        """Get a series with its chapters in reading order."""
+        series = self.series_repo.get_series(series_id)
+        if series is None:
+            raise ValueError("Series not found")
+        chapters = self.chapter_repo.get_series_chapters(series_id)
+        # The stored series.chapter_count is not maintained by scans; count the rows.
+        return SeriesDetail(
+            **{
+                key: value
+                for key, value in series.items()
+                if key in _SERIES_DETAIL_COLUMNS
+            },
+            chapter_count=len(chapters),
+            latest_chapter=max(
+                (chapter["chapter_number"] for chapter in chapters), default=None
+            ),
+            chapters=[ChapterSummary(**chapter) for chapter in chapters],
+        )
@@ -0,0 +1,137 @@
+"""
+Client delta sync.
+
+A sync pass pages through library changes in change-sequence order. The
+opaque cursor records which transactions the pass covers:
+
+- ``since``: changes made by transactions from this ID on are included.
+  It is the snapshot xmin taken when the previous pass started, so any
+  change that pass could not see (its transaction had not committed) is
+  picked up now. Absent for a full snapshot of live rows.
+- ``after``: the last change sequence number already sent in this pass.
+- ``next``: the snapshot xmin taken when this pass started, which becomes
+  the next pass's ``since``.
+
+Changes can be sent twice around a pass boundary but never missed; clients
+apply them as idempotent upserts and deletes.
+"""
+
+import base64
+import binascii
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.sync import SyncRepository
+from app.schemas.sync import (
+    SyncChapter,
+    SyncDeleted,
+    SyncProgress,
+    SyncResponse,
+    SyncSeries,
+)
+
+CURSOR_VERSION = 1
+
+
+@dataclass
+class SyncCursor:
+    """Decoded sync cursor. See the module docstring for the fields."""
+    since: Optional[int] = None
+    since_at: float = 0.0  # When the ``since`` snapshot was taken
+    after: int = 0
+    next: Optional[int] = None
+    next_at: float = 0.0
+
+    def encode(self) -> str:
+        payload = json.dumps(
+            {"v": CURSOR_VERSION, **asdict(self)}, separators=(",", ":")
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "SyncCursor":
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            if payload.pop("v") != CURSOR_VERSION:
+                raise ValueError
+            return cls(**payload)
+        except (ValueError, TypeError, KeyError, binascii.Error):
+            raise ValueError("Invalid sync cursor")
+
+
+class SyncService:
+    """Service layer for client delta sync."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.sync_repo = SyncRepository(db)
+
+    def get_changes(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> SyncResponse:
+        """Return the page of changes after ``cursor``, with ``user_id``'s progress.
+
+        Without a cursor, or with one older than the tombstone retention
+        period, a full snapshot starts and the response has ``reset`` set.
+        """
+        limit = min(
+            limit or settings.SYNC_DEFAULT_BATCH_SIZE, settings.SYNC_MAX_BATCH_SIZE
+        )
+        now = time.time()
+        state = SyncCursor.decode(cursor) if cursor else None
+        reset = False
+        if state is None or (
+            state.since is not None
+            and now - state.since_at > settings.SYNC_TOMBSTONE_RETENTION_DAYS * 86400
+        ):
+            state = SyncCursor()
+            reset = True
+        if state.next is None:
+            state.next, state.next_at = self.sync_repo.snapshot_xmin(), now
+
+        changes = self.sync_repo.get_changes(
+            state.since, state.after, limit + 1, user_id
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if has_more:
+            next_cursor = SyncCursor(
+                state.since,
+                state.since_at,
+                changes[-1].change_seq,
+                state.next,
+                state.next_at,
+            )
+        else:
+            next_cursor = SyncCursor(since=state.next, since_at=state.next_at)
+
+        response = SyncResponse(
+            cursor=next_cursor.encode(),
+            has_more=has_more,
+            reset=reset,
+            deleted=SyncDeleted(),
+        )
+        for change in changes:
+            if change.data is None:
+                target = (
+                    response.deleted.series
+                    if change.entity == "series"
+                    else response.deleted.chapters
+                )
+                target.append(change.entity_id)
+            elif change.entity == "series":
+                response.series.append(SyncSeries(**change.data))
+            elif change.entity == "progress":
+                response.progress.append(SyncProgress(**change.data))
+            else:
+                response.chapters.append(SyncChapter(**change.data))
+        return response
@@ -1,72 +1,125 @@
-from typing import Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 
+from app.core.config import settings
+from app.core.startup import register_warmup
 from app.models.user import User
 from app.repositories.user import UserRepository
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, UserImportResult
+
+# Shared across requests: building a CryptContext and loading the bcrypt
+# backend is comparatively expensive, so it is done once per process.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+@register_warmup("password_hashing")
+def warm_password_hashing() -> None:
+    """Load the bcrypt backend and run one hash/verify round trip."""
+    hashed = pwd_context.hash("warmup-password")
+    pwd_context.verify("warmup-password", hashed)
+
+
+def hash_passwords(
+    passwords: Sequence[str], workers: Optional[int] = None
+) -> List[str]:
+    """Hash many passwords in parallel, preserving order.
+
+    The bcrypt backend releases the GIL while hashing, so a thread pool runs
+    the hashes on all cores without the start-up cost of worker processes.
+    """
+    workers = workers or settings.USER_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < 2:
+        return [pwd_context.hash(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=min(workers, len(passwords))) as executor:
+        return list(executor.map(pwd_context.hash, passwords))
 
 
 class UserService:
     """Service layer for user authentication and management."""
-    
+
     def __init__(self, db: Session):
         self.db = db
         self.user_repo = UserRepository(db)
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    
+        self.pwd_context = pwd_context
+
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate user with username and password."""
         user = self.user_repo.get_user_by_username(username)
         if not user:
             return None
-        
+
         if not self.verify_password(password, user.hashed_password):
             return None
-            
+
         # Only return active users
         if not user.is_active:
             return None
-            
+
         return user
-    
+
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
         return self.user_repo.get_user_by_username(username)
-    
+
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
         return self.user_repo.get_user_by_id(user_id)
-    
+
     def create_user(self, user_data: UserCreate) -> User:
         """Create a new user with hashed password."""
         hashed_password = self.get_password_hash(user_data.password)
         return self.user_repo.create_user(user_data, hashed_password)
-    
+
+    def bulk_create_users(
+        self, rows: Sequence[Tuple[int, UserCreate]]
+    ) -> UserImportResult:
+        """Create many users at once, reporting conflicts per row.
+
+        Rows are (row number, user data) pairs; the row number is only used
+        to report conflicts back against the source file.
+        """
+        hashed_passwords = hash_passwords([user_data.password for _, user_data in rows])
+        created, errors = self.user_repo.bulk_create_users(
+            [
+                (row_no, user_data, hashed_password)
+                for (row_no, user_data), hashed_password in zip(
+                    rows, hashed_passwords, strict=True
+                )
+            ]
+        )
+        return UserImportResult(
+            total=len(rows), created=created, failed=len(errors), errors=errors
+        )
+
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a plain password against a hashed password."""
         return self.pwd_context.verify(plain_password, hashed_password)
-    
+
     def get_password_hash(self, password: str) -> str:
         """Hash a plain password."""
         return self.pwd_context.hash(password)
-    
-    def create_admin_user(self, username: str, password: str, email: str, full_name: str = None) -> User:
+
+    def create_admin_user(
+        self, username: str, password: str, email: str, full_name: str = None
+    ) -> User:
         """Create an admin user with superuser privileges."""
         user_data = UserCreate(
             username=username,
             password=password,
             email=email,
-            full_name=full_name or "Administrator"
+            full_name=full_name or "Administrator",
         )
-        
+
         # Create user with hashed password
         hashed_password = self.get_password_hash(password)
         user = self.user_repo.create_user(user_data, hashed_password)
-        
+
         # Set as superuser
         user.is_superuser = True
         self.db.commit()
         self.db.refresh(user)
-        
+
         return user
\ No newline at end of file
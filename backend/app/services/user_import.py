@@ -0,0 +1,109 @@
+"""
+Parsing of bulk user import files.
+
+Accepts CSV with a header row (``username,email,password[,full_name]``) or
+JSON (a list of objects, or ``{"users": [...]}``). Every row is validated
+against ``UserCreate``; invalid rows are reported by row number so the rest
+of the file can still be imported.
+"""
+
+import csv
+import io
+import json
+from typing import List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.user import UserCreate, UserImportError
+
+SUPPORTED_FORMATS = ("csv", "json")
+
+ParsedRows = Tuple[List[Tuple[int, UserCreate]], List[UserImportError]]
+
+
+def detect_format(
+    filename: Optional[str] = None, content_type: Optional[str] = None
+) -> str:
+    """Work out the import format from a file name or content type."""
+    if filename:
+        extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        if extension in SUPPORTED_FORMATS:
+            return extension
+    if content_type:
+        if "json" in content_type:
+            return "json"
+        if "csv" in content_type:
+            return "csv"
+    raise ValueError("Unsupported import format, expected a .csv or .json file")
+
+
+def _load_records(content: str, fmt: str) -> List[dict]:
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        missing = {"username", "email", "password"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(
+                f"CSV header is missing columns: {', '.join(sorted(missing))}"
+            )
+        return [
+            {key: (value or None) for key, value in record.items() if key is not None}
+            for record in reader
+        ]
+
+    if fmt == "json":
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if isinstance(data, dict):
+            data = data.get("users")
+        if not isinstance(data, list):
+            raise ValueError('JSON import must be a list of users or {"users": [...]}')
+        return data
+
+    raise ValueError(f"Unsupported import format '{fmt}'")
+
+
+def parse_user_import(content: Union[bytes, str], fmt: str) -> ParsedRows:
+    """Parse and validate an import file.
+
+    Returns the valid rows as (row number, user data) pairs together with the
+    rows that failed validation. Raises ValueError if the file as a whole is
+    unusable.
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError("Import file must be UTF-8 encoded")
+
+    records = _load_records(content, fmt)
+    if len(records) > settings.USER_IMPORT_MAX_ROWS:
+        raise ValueError(
+            f"Import is limited to {settings.USER_IMPORT_MAX_ROWS} users per file"
+        )
+
+    rows = []
+    errors = []
+    for row_no, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            errors.append(
+                UserImportError(row=row_no, error="Expected an object with user fields")
+            )
+            continue
+        try:
+            rows.append((row_no, UserCreate(**record)))
+        except ValidationError as e:
+            first = e.errors()[0]
+            username, email = record.get("username"), record.get("email")
+            errors.append(
+                UserImportError(
+                    row=row_no,
+                    username=str(username) if username is not None else None,
+                    email=str(email) if email is not None else None,
+                    field=str(first["loc"][0]) if first["loc"] else None,
+                    error=first["msg"],
+                )
+            )
+    return rows, errors
@@ -0,0 +1,26 @@
+"""Run the background job worker: ``python -m app.workers``."""
+
+import logging
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.workers import jobs  # noqa: F401  (registers the job handlers)
+from app.workers.queue import RetentionPolicy, Worker
+
+
+def main() -> None:
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    retention = RetentionPolicy(
+        archive_after_seconds=settings.JOB_ARCHIVE_AFTER_SECONDS,
+        retention_days=settings.JOB_HISTORY_RETENTION_DAYS,
+        batch_size=settings.JOB_ARCHIVE_BATCH_SIZE,
+    )
+    Worker(
+        SessionLocal,
+        retention=retention if settings.JOB_ARCHIVE_ENABLED else None,
+        maintenance_interval=settings.JOB_MAINTENANCE_INTERVAL_SECONDS,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
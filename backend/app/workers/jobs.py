@@ -0,0 +1,53 @@
+"""Handlers for background jobs and maintenance tasks.
+
+Importing this module registers them.
+"""
+
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.sync import SyncRepository
+from app.services.dedupe import HASH_CHAPTER_JOB, DedupeService
+from app.services.normalize import NORMALIZE_JOB, NormalizeService
+from app.services.pages import WARM_CHAPTER_JOB, PageService
+from app.workers.queue import register_job, register_maintenance
+
+logger = logging.getLogger(__name__)
+
+
+@register_job(WARM_CHAPTER_JOB)
+def warm_chapter(db: Session, payload: dict) -> None:
+    """Extract a chapter being read, and the ones after it, into the page tier."""
+    PageService(db).warm_chapter(payload["chapter_id"])
+
+
+@register_job(NORMALIZE_JOB)
+def normalize_chapters(db: Session, payload: dict) -> None:
+    """Repack the next batch of chapter archives for random access."""
+    if settings.NORMALIZE_ENABLED:
+        NormalizeService(db).run_batch(payload.get("after"))
+
+
+@register_job(HASH_CHAPTER_JOB)
+def hash_chapter_pages(db: Session, payload: dict) -> None:
+    """Store perceptual hashes of a chapter's pages for duplicate detection."""
+    try:
+        DedupeService(db).update_chapter_hashes(payload["chapter_id"])
+    except ValueError:
+        # Deleted since the job was queued.
+        pass
+
+
+@register_maintenance
+def prune_sync_tombstones(db: Session) -> None:
+    """Delete sync tombstones past the retention period.
+
+    Cursors older than that get a full snapshot instead.
+    """
+    removed = SyncRepository(db).prune_tombstones(
+        settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    )
+    if removed:
+        logger.info("Pruned %d sync tombstones", removed)
@@ -0,0 +1,452 @@
+"""
+Background job queue on the ``job_queue`` table.
+
+Producers enqueue jobs in their own transaction. Workers claim them with
+``FOR UPDATE SKIP LOCKED``, so any number of worker processes can poll the
+same table without blocking each other or running a job twice. Failed
+jobs are retried with exponential backoff until ``max_attempts``.
+
+Finished jobs do not stay in ``job_queue``: workers move them in batches
+into ``job_history``, which is partitioned by UTC day of completion, and
+drop whole partitions once they pass the retention period. The queue
+table stays as small as the jobs in flight, and its partial indexes
+cover only the rows each query looks at, so claiming costs the same
+however much history has accumulated.
+"""
+
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# Running jobs older than this are assumed to belong to a dead worker.
+STALE_JOB_SECONDS = 3600
+
+HISTORY_TABLE = "job_history"
+_PARTITION_NAME = re.compile(rf"^{HISTORY_TABLE}_p(\d{{8}})$")
+# Serializes creating and dropping history partitions between workers.
+_HISTORY_LOCK_KEY = 0x6A6F6268
+
+_JOB_COLUMNS = (
+    "id, job_type, payload, status, priority, attempts, max_attempts, error_message, "
+    "scheduled_at, started_at, completed_at, created_at"
+)
+
+
+def partition_name(day: date) -> str:
+    """Name of the job history partition for a UTC day."""
+    return f"{HISTORY_TABLE}_p{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    """Inverse of ``partition_name``; None for other table names."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match[1][:4]), int(match[1][4:6]), int(match[1][6:]))
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long finished jobs stay in the queue and then in the history."""
+    archive_after_seconds: float  # Finished jobs stay in job_queue this long
+    retention_days: int  # History partitions older than this are dropped
+    batch_size: int = 5000  # Jobs moved per transaction
+
+
+@dataclass
+class Job:
+    """A claimed job."""
+    id: str
+    job_type: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    """Enqueue, claim and finish background jobs."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: dict,
+        priority: int = 0,
+        delay_seconds: float = 0,
+        unique: bool = False,
+    ) -> Optional[str]:
+        """Add a job in the caller's transaction and return its ID.
+
+        With ``unique``, nothing is added if an identical job is already
+        waiting or running, and None is returned.
+        """
+        query = """
+            INSERT INTO job_queue (job_type, payload, priority, scheduled_at)
+            SELECT :job_type, CAST(:payload AS JSONB), :priority,
+                   NOW() + make_interval(secs => :delay)
+        """
+        if unique:
+            query += """
+            WHERE NOT EXISTS (
+                SELECT 1 FROM job_queue
+                WHERE job_type = :job_type AND payload = CAST(:payload AS JSONB)
+                  AND status IN ('pending', 'running')
+            )
+            """
+        job_id = self.db.execute(
+            text(query + " RETURNING id"),
+            {
+                "job_type": job_type,
+                "payload": json.dumps(payload),
+                "priority": priority,
+                "delay": delay_seconds,
+            },
+        ).scalar()
+        return str(job_id) if job_id is not None else None
+
+    def has_jobs(self, job_type: str) -> bool:
+        """Whether a job of this type is waiting or running."""
+        return self.db.execute(
+            text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM job_queue
+                    WHERE job_type = :job_type AND status IN ('pending', 'running')
+                )
+            """),
+            {"job_type": job_type},
+        ).scalar()
+
+    def claim(
+        self, job_types: Optional[Sequence[str]] = None, limit: int = 1
+    ) -> List[Job]:
+        """Mark up to ``limit`` due jobs as running, highest priority first."""
+        type_filter = "AND job_type IN :job_types" if job_types else ""
+        query = text(f"""
+            UPDATE job_queue
+            SET status = 'running', started_at = NOW(), attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM job_queue
+                WHERE status = 'pending' AND scheduled_at <= NOW() {type_filter}
+                ORDER BY priority DESC, scheduled_at
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, job_type, payload, attempts, max_attempts, priority,
+                      scheduled_at
+        """)
+        params = {"limit": limit}
+        if job_types:
+            query = query.bindparams(bindparam("job_types", expanding=True))
+            params["job_types"] = list(job_types)
+        rows = self.db.execute(query, params).all()
+        self.db.commit()
+        rows = sorted(rows, key=lambda row: (-row.priority, row.scheduled_at))
+        return [
+            Job(str(row.id), row.job_type, row.payload, row.attempts, row.max_attempts)
+            for row in rows
+        ]
+
+    def complete(self, job_id: str) -> None:
+        self.db.execute(
+            text("""
+                UPDATE job_queue
+                SET status = 'completed', completed_at = NOW(), error_message = NULL
+                WHERE id = :id
+            """),
+            {"id": job_id},
+        )
+        self.db.commit()
+
+    def fail(self, job: Job, error: str) -> None:
+        """Record a failure, rescheduling the job unless it is out of attempts."""
+        delay = min(RETRY_BASE_SECONDS * 2 ** (job.attempts - 1), RETRY_MAX_SECONDS)
+        self.db.execute(
+            text("""
+                UPDATE job_queue SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'failed'
+                                  ELSE 'pending' END,
+                    scheduled_at = CASE WHEN attempts >= max_attempts THEN scheduled_at
+                                        ELSE NOW() + make_interval(secs => :delay) END,
+                    completed_at = CASE WHEN attempts >= max_attempts THEN NOW() END,
+                    error_message = :error
+                WHERE id = :id
+            """),
+            {"id": job.id, "error": error[:2000], "delay": delay},
+        )
+        self.db.commit()
+
+    def requeue_stale(self, older_than_seconds: float = STALE_JOB_SECONDS) -> int:
+        """Return jobs stuck in 'running' to the queue. Returns how many were handled.
+
+        Jobs out of attempts are failed instead, as ``fail`` would, so a job
+        that keeps killing its worker is not retried forever.
+        """
+        count = self.db.execute(
+            text("""
+                UPDATE job_queue SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'failed'
+                                  ELSE 'pending' END,
+                    scheduled_at = CASE WHEN attempts >= max_attempts THEN scheduled_at
+                                        ELSE NOW() END,
+                    completed_at = CASE WHEN attempts >= max_attempts THEN NOW() END,
+                    error_message = CASE WHEN attempts >= max_attempts
+                                         THEN 'Worker stopped while running the job'
+                                         ELSE error_message END
+                WHERE status = 'running'
+                  AND started_at < NOW() - make_interval(secs => :age)
+            """),
+            {"age": older_than_seconds},
+        ).rowcount
+        self.db.commit()
+        return count
+
+    def archive_finished(self, policy: RetentionPolicy) -> Tuple[int, int]:
+        """Move finished jobs into the history, one batch per transaction.
+
+        Jobs that finished before the retention period are deleted instead
+        of archived into partitions that would be dropped right away.
+        Returns (archived, deleted).
+        """
+        today = self._today()
+        retained_from = today - timedelta(days=policy.retention_days)
+        deleted = self._move_finished(
+            "completed_at < CAST(:retained_from AS timestamp) AT TIME ZONE 'UTC'",
+            {"retained_from": retained_from},
+            policy.batch_size,
+            archive=False,
+        )
+
+        oldest = self.db.execute(
+            text("""
+                SELECT MIN(completed_at AT TIME ZONE 'UTC')::date FROM job_queue
+                WHERE status IN ('completed', 'failed')
+                  AND completed_at < NOW() - make_interval(secs => :age)
+            """),
+            {"age": policy.archive_after_seconds},
+        ).scalar()
+        self.db.commit()
+        if oldest is None:
+            return 0, deleted
+        # Tomorrow's too, in case the day ends while batches are moved.
+        self._create_partitions(max(oldest, retained_from), today + timedelta(days=1))
+        archived = self._move_finished(
+            "completed_at < NOW() - make_interval(secs => :age)",
+            {"age": policy.archive_after_seconds},
+            policy.batch_size,
+            archive=True,
+        )
+        return archived, deleted
+
+    def drop_expired_history(self, retention_days: int) -> List[str]:
+        """Drop the history partitions of days past the retention period.
+
+        Returns the names of the dropped partitions.
+        """
+        retained_from = self._today() - timedelta(days=retention_days)
+        self._lock_history()
+        names = self.db.execute(
+            text("""
+                SELECT child.relname FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = CAST(:table AS regclass)
+            """),
+            {"table": HISTORY_TABLE},
+        ).scalars().all()
+        expired = []
+        for name in sorted(names):
+            day = partition_day(name)
+            if day is not None and day < retained_from:
+                self.db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                expired.append(name)
+        self.db.commit()
+        return expired
+
+    def _today(self) -> date:
+        return self.db.execute(text("SELECT (NOW() AT TIME ZONE 'UTC')::date")).scalar()
+
+    def _lock_history(self) -> None:
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _HISTORY_LOCK_KEY}
+        )
+
+    def _create_partitions(self, first: date, last: date) -> None:
+        self._lock_history()
+        day = first
+        while day <= last:
+            # Names and bounds come from dates, never from input.
+            next_day = day + timedelta(days=1)
+            self.db.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS "{partition_name(day)}"
+                PARTITION OF {HISTORY_TABLE}
+                FOR VALUES FROM ('{day.isoformat()} 00:00:00+00')
+                TO ('{next_day.isoformat()} 00:00:00+00')
+            """))
+            day = next_day
+        self.db.commit()
+
+    def _move_finished(
+        self, condition: str, params: dict, batch_size: int, archive: bool
+    ) -> int:
+        """Delete finished jobs matching ``condition`` in batches.
+
+        With ``archive`` the deleted jobs are copied to the history first.
+        """
+        batch = f"""
+            DELETE FROM job_queue WHERE id IN (
+                SELECT id FROM job_queue
+                WHERE status IN ('completed', 'failed') AND {condition}
+                ORDER BY completed_at
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {_JOB_COLUMNS}
+        """
+        if archive:
+            batch = f"""
+                WITH moved AS ({batch})
+                INSERT INTO {HISTORY_TABLE} ({_JOB_COLUMNS})
+                SELECT {_JOB_COLUMNS} FROM moved
+            """
+        total = 0
+        while True:
+            count = self.db.execute(
+                text(batch), {**params, "batch_size": batch_size}
+            ).rowcount
+            self.db.commit()
+            total += count
+            if count < batch_size:
+                return total
+
+
+JobHandler = Callable[[Session, dict], None]
+MaintenanceTask = Callable[[Session], None]
+
+_handlers: Dict[str, JobHandler] = {}
+_maintenance_tasks: Dict[str, MaintenanceTask] = {}
+
+
+def register_job(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Decorator registering the handler for a job type.
+
+    Handlers receive a session and the job payload. Raising marks the job
+    as failed and schedules a retry.
+    """
+
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[job_type] = func
+        return func
+
+    return decorator
+
+
+def register_maintenance(func: MaintenanceTask) -> MaintenanceTask:
+    """Decorator registering a task run by every worker's maintenance pass.
+
+    Tasks receive a session of their own. They must be safe to run
+    concurrently from several workers, since every worker runs them.
+    """
+    _maintenance_tasks[func.__name__] = func
+    return func
+
+
+class Worker:
+    """Runs claimed jobs with their registered handlers."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 1,
+        retention: Optional[RetentionPolicy] = None,
+        maintenance_interval: float = 300.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        # Without a retention policy finished jobs stay in job_queue.
+        self.retention = retention
+        self.maintenance_interval = maintenance_interval
+
+    def run_once(self) -> int:
+        """Claim and run one batch of jobs. Returns the number of jobs run."""
+        db = self.session_factory()
+        try:
+            queue = JobQueue(db)
+            jobs = queue.claim(list(_handlers), self.batch_size)
+            for job in jobs:
+                try:
+                    _handlers[job.job_type](db, job.payload)
+                except Exception as e:
+                    db.rollback()
+                    logger.exception("Job %s (%s) failed", job.id, job.job_type)
+                    queue.fail(job, f"{type(e).__name__}: {e}")
+                else:
+                    queue.complete(job.id)
+            return len(jobs)
+        finally:
+            db.close()
+
+    def maintain(self) -> None:
+        """Archive finished jobs per the retention policy, then run maintenance."""
+        if self.retention is not None:
+            self._archive_jobs()
+        for name, task in _maintenance_tasks.items():
+            db = self.session_factory()
+            try:
+                task(db)
+            except Exception:
+                db.rollback()
+                logger.exception("Maintenance task %s failed", name)
+            finally:
+                db.close()
+
+    def _archive_jobs(self) -> None:
+        db = self.session_factory()
+        try:
+            queue = JobQueue(db)
+            archived, deleted = queue.archive_finished(self.retention)
+            dropped = queue.drop_expired_history(self.retention.retention_days)
+        except Exception:
+            db.rollback()
+            logger.exception("Job queue maintenance failed")
+            return
+        finally:
+            db.close()
+        if archived or deleted or dropped:
+            logger.info(
+                "Archived %d finished jobs, deleted %d expired ones, "
+                "dropped history partitions: %s",
+                archived, deleted, ", ".join(dropped) or "none",
+            )
+
+    def run(self, poll_interval: float = 1.0) -> None:
+        """Run jobs until interrupted, sleeping while the queue is empty."""
+        logger.info("Worker started for job types: %s", ", ".join(sorted(_handlers)))
+        next_stale_check = 0.0
+        next_maintenance = 0.0
+        while True:
+            if time.monotonic() >= next_stale_check:
+                db = self.session_factory()
+                try:
+                    requeued = JobQueue(db).requeue_stale()
+                finally:
+                    db.close()
+                if requeued:
+                    logger.warning("Requeued or failed %d stale jobs", requeued)
+                next_stale_check = time.monotonic() + 60
+            if time.monotonic() >= next_maintenance:
+                self.maintain()
+                next_maintenance = time.monotonic() + self.maintenance_interval
+            if not self.run_once():
+                time.sleep(poll_interval)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark for near-duplicate page search.
+
+Generates random 64-bit page hashes, plants near-duplicate copies of some
+of them, and times ``find_near_duplicate_pairs`` over the whole set.
+
+Usage:
+    python benchmarks/dedupe_search.py [--pages 1000000] [--max-distance 4]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.library.dedupe import find_near_duplicate_pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=1_000_000)
+    parser.add_argument("--duplicates", type=int, default=10_000)
+    parser.add_argument("--max-distance", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2**64 - 1, size=args.pages, dtype=np.uint64)
+    targets = rng.choice(args.pages, size=2 * args.duplicates, replace=False)
+    sources, copies = targets[:args.duplicates], targets[args.duplicates:]
+    flips = np.zeros(args.duplicates, dtype=np.uint64)
+    for k in range(args.duplicates):
+        for bit in rng.choice(
+            64, rng.integers(0, args.max_distance + 1), replace=False
+        ):
+            flips[k] |= np.uint64(1) << np.uint64(bit)
+    hashes[copies] = hashes[sources] ^ flips
+
+    start = time.perf_counter()
+    i, j = find_near_duplicate_pairs(hashes, max_distance=args.max_distance)
+    elapsed = time.perf_counter() - start
+
+    found = set(zip(i.tolist(), j.tolist(), strict=True))
+    planted = {
+        (min(a, b), max(a, b))
+        for a, b in zip(sources.tolist(), copies.tolist(), strict=True)
+    }
+    print(f"{args.pages} hashes, max distance {args.max_distance}: {elapsed:.2f}s")
+    print(
+        f"pairs found: {len(found)}, "
+        f"planted pairs recovered: {len(planted & found)}/{len(planted)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
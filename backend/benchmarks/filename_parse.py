@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark for chapter file name parsing.
+
+Generates a synthetic library listing in the naming styles seen in the
+wild and times ``parse_filenames`` over it, one directory at a time as a
+library walk would.
+
+Usage:
+    python benchmarks/filename_parse.py [--files 150000] [--per-series 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.library.filename_parser import parse_filenames
+
+STYLES = [
+    "Chapter {ch:03d} - {title}.cbz",
+    "[Group] {series} v{vol:02d} c{ch:03d}.cbz",
+    "{series} - {ch:03d} (Digital).cbz",
+    "{series_underscored}_v{vol:02d}_ch{ch:03d}.cbz",
+    "Vol. {vol} Ch. {ch} - {title}.cbz",
+    "{series} #{ch:03d} [v2].cbr",
+]
+WORDS = [
+    "Romance", "Dawn", "Night", "Blade", "Return",
+    "Storm", "Garden", "Promise", "100", "20th",
+]
+
+
+def make_listing(rng: random.Random, series_count: int, per_series: int):
+    for s in range(series_count):
+        series = " ".join(rng.sample(WORDS, 2)) + f" {s}"
+        style = STYLES[s % len(STYLES)]
+        names = []
+        for ch in range(1, per_series + 1):
+            names.append(
+                style.format(
+                    series=series,
+                    series_underscored=series.replace(" ", "_"),
+                    vol=ch // 10 + 1,
+                    ch=ch,
+                    title=" ".join(rng.sample(WORDS, 3)),
+                )
+            )
+        yield names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=150_000)
+    parser.add_argument("--per-series", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    listings = list(
+        make_listing(rng, max(1, args.files // args.per_series), args.per_series)
+    )
+    total = sum(len(names) for names in listings)
+
+    start = time.perf_counter()
+    parsed = 0
+    numbered = 0
+    for names in listings:
+        for result in parse_filenames(names):
+            parsed += 1
+            numbered += result.chapter_number is not None
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{total} file names in {len(listings)} directories: {elapsed:.2f}s "
+        f"({total / elapsed:,.0f} names/s)"
+    )
+    print(f"chapter number found for {numbered}/{parsed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Bulk user import script for KireMisu manga library.
+
+Creates many user accounts at once from a CSV or JSON file. Passwords are
+hashed in parallel and rows are loaded in a single batch; rows that fail
+validation or clash with existing usernames/emails are reported and skipped.
+
+Usage:
+    python import_users.py users.csv
+    python import_users.py users.json
+
+CSV files need a header row with username, email, password and optionally
+full_name. JSON files contain a list of objects with the same fields.
+"""
+
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.db.database import SessionLocal
+from app.services.user import UserService
+from app.services.user_import import detect_format, parse_user_import
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python import_users.py <users.csv|users.json>")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    print("🚀 KireMisu Bulk User Import")
+    print("=" * 50)
+
+    try:
+        fmt = detect_format(path)
+        with open(path, "rb") as f:
+            rows, errors = parse_user_import(f.read(), fmt)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read import file: {e}")
+        sys.exit(1)
+
+    print(
+        f"Importing {len(rows)} valid rows "
+        f"({len(errors)} rejected during validation)..."
+    )
+
+    db = SessionLocal()
+    try:
+        result = UserService(db).bulk_create_users(rows)
+    finally:
+        db.close()
+
+    errors = sorted(errors + result.errors, key=lambda error: error.row)
+    for error in errors:
+        print(f"   Row {error.row}: {error.error}")
+
+    print(f"\n✅ Created {result.created} users, {len(errors)} rows skipped")
+    if errors:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
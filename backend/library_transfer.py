@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Library metadata export/import script for KireMisu manga library.
+
+Moves series, chapters, watch list and user data between instances without
+a full database dump. Files are newline-delimited JSON, compressed with
+gzip (.gz) or zstd (.zst, requires the zstandard package) based on the
+file extension; imports detect the compression automatically.
+
+Usage:
+    python library_transfer.py export library.ndjson.zst
+    python library_transfer.py export series.ndjson.gz --tables series chapters
+    python library_transfer.py import library.ndjson.zst
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.db.database import SessionLocal
+from app.services.library_transfer import (
+    TRANSFER_TABLES,
+    LibraryTransferService,
+    open_export_file,
+    open_import_file,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export or import KireMisu library metadata"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser(
+        "export", help="Write library metadata to a file"
+    )
+    export_parser.add_argument("path")
+    export_parser.add_argument(
+        "--tables", nargs="+", choices=TRANSFER_TABLES, default=TRANSFER_TABLES
+    )
+    import_parser = subparsers.add_parser(
+        "import", help="Upsert library metadata from a file"
+    )
+    import_parser.add_argument("path")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        service = LibraryTransferService(db)
+        if args.command == "export":
+            with open_export_file(args.path) as out:
+                stats = service.export_library(out, tables=args.tables)
+        else:
+            with open_import_file(args.path) as source:
+                stats = service.import_library(source)
+    except (OSError, ValueError) as e:
+        print(f"❌ {args.command.capitalize()} failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    for table, count in stats.tables.items():
+        print(f"   {table}: {count} rows")
+    print(
+        f"✅ {args.command.capitalize()}ed {stats.total_rows} rows "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
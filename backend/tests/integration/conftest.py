@@ -0,0 +1,73 @@
+"""
+Fixtures for tests against a real PostgreSQL server.
+
+Set TEST_DATABASE_URL to a server where the connecting role may create
+databases. Each test session builds a scratch database from
+.devcontainer/scripts/init-db.sql and drops it at the end; without the
+variable the integration tests are skipped.
+"""
+
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import Base as UserBase
+
+INIT_SQL = (
+    Path(__file__).resolve().parents[3] / ".devcontainer" / "scripts" / "init-db.sql"
+)
+# Everything after this line of the init script is development sample data.
+SAMPLE_DATA_MARKER = "-- Insert sample data"
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    """Engine bound to a scratch database with the full schema."""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    name = f"kiremisu_test_{uuid.uuid4().hex[:12]}"
+    with admin.connect() as conn:
+        conn.execute(text(f'CREATE DATABASE "{name}"'))
+    engine = create_engine(make_url(url).set(database=name))
+    try:
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute(INIT_SQL.read_text().split(SAMPLE_DATA_MARKER)[0])
+            cursor.close()
+            raw.commit()
+        finally:
+            raw.close()
+        UserBase.metadata.create_all(bind=engine)
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        admin.dispose()
+
+
+@pytest.fixture
+def pg_session(pg_engine):
+    """Session on the scratch database; every table is emptied afterwards."""
+    db = sessionmaker(autocommit=False, autoflush=False, bind=pg_engine)()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        tables = db.execute(
+            text(
+                "SELECT string_agg(format('%I', tablename), ', ') FROM pg_tables "
+                "WHERE schemaname = 'public'"
+            )
+        ).scalar()
+        db.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        db.commit()
+        db.close()
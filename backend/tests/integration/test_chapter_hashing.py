@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.dedupe import HASH_CHAPTER_JOB
+from app.services.pages import PageService
+from app.workers import jobs
+
+
+def make_page(seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    image = Image.fromarray(rng.integers(0, 255, size=(48, 32), dtype=np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class TestChapterHashing:
+    """Test cases for filling page hashes when chapters are opened."""
+
+    def test_first_open_queues_hashing(self, pg_session, tmp_path, monkeypatch):
+        """Test that opening an unhashed chapter queues one job storing its hashes."""
+        monkeypatch.setattr(settings, "MANGA_LIBRARY_PATH", str(tmp_path))
+        monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+        with zipfile.ZipFile(tmp_path / "ch1.cbz", "w") as archive:
+            archive.writestr("001.jpg", make_page(1))
+            archive.writestr("002.jpg", make_page(2))
+        series_id = pg_session.execute(
+            text("INSERT INTO series (title_primary) VALUES ('Series') RETURNING id")
+        ).scalar()
+        chapter_id = str(
+            pg_session.execute(
+                text("""
+                    INSERT INTO chapters
+                        (series_id, chapter_number, relative_path, file_name)
+                    VALUES (:series_id, 1, 'ch1.cbz', 'ch1.cbz') RETURNING id
+                """),
+                {"series_id": series_id},
+            ).scalar()
+        )
+        pg_session.commit()
+        service = PageService(pg_session)
+
+        service.get_chapter_pages(chapter_id)
+        service.get_chapter_pages(chapter_id)
+        queued = (
+            pg_session.execute(
+                text("SELECT payload FROM job_queue WHERE job_type = :job_type"),
+                {"job_type": HASH_CHAPTER_JOB},
+            )
+            .scalars()
+            .all()
+        )
+
+        assert queued == [{"chapter_id": chapter_id}]
+
+        jobs.hash_chapter_pages(pg_session, queued[0])
+        pg_session.execute(text("DELETE FROM job_queue"))
+        pg_session.commit()
+        service.get_chapter_pages(chapter_id)
+        stored = pg_session.execute(
+            text("SELECT length(page_hashes) FROM chapters WHERE id = :chapter_id"),
+            {"chapter_id": chapter_id},
+        ).scalar()
+
+        assert stored == 16
+        assert pg_session.execute(text("SELECT count(*) FROM job_queue")).scalar() == 0
+
+    def test_deleted_chapter_job_is_noop(self, pg_session):
+        """Test that a hash job for a chapter deleted since queueing does nothing."""
+        jobs.hash_chapter_pages(
+            pg_session, {"chapter_id": "00000000-0000-0000-0000-000000000000"}
+        )
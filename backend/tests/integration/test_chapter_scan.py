@@ -0,0 +1,222 @@
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.repositories.chapter import ChapterRepository, ChapterScanRow
+from app.services.fingerprint import FingerprintService
+
+
+def add_series(db) -> str:
+    return str(db.execute(text(
+        "INSERT INTO series (id, title_primary) VALUES (:id, 'Series') RETURNING id"
+    ), {"id": str(uuid.uuid4())}).scalar())
+
+
+def scan_row(series_id: str, number: int, path: str = None, **values) -> ChapterScanRow:
+    path = path or f"{series_id}/ch{number:03d}.cbz"
+    return ChapterScanRow(
+        series_id=series_id,
+        chapter_number=Decimal(number),
+        relative_path=path,
+        file_name=path.rsplit("/", 1)[-1],
+        page_count=values.pop("page_count", 20),
+        file_size=values.pop("file_size", 1000 + number),
+        **values,
+    )
+
+
+def chapter_versions(db, series_id: str) -> dict:
+    """Row version (xmin) of each chapter of a series, by chapter number."""
+    return {
+        int(row.chapter_number): row.xmin
+        for row in db.execute(text(
+            "SELECT chapter_number, xmin::text AS xmin FROM chapters "
+            "WHERE series_id = :series_id"
+        ), {"series_id": series_id})
+    }
+
+
+class TestUpsertScanBatch:
+    """Test cases for applying scan batches set-based."""
+
+    def test_insert_update_unchanged_counts(self, pg_session):
+        """Test that a rescan reports inserted, updated and unchanged chapters."""
+        series_id = add_series(pg_session)
+        pg_session.commit()
+        repo = ChapterRepository(pg_session)
+
+        first = repo.upsert_scan_batch([scan_row(series_id, n) for n in (1, 2, 3)])
+        second = repo.upsert_scan_batch([
+            scan_row(series_id, 1),
+            scan_row(series_id, 2, page_count=24),
+            scan_row(series_id, 3),
+            scan_row(series_id, 4),
+        ])
+
+        assert (first.inserted, first.updated, first.unchanged) == (3, 0, 0)
+        assert first.new_chapters == {series_id: 3}
+        assert (second.inserted, second.updated, second.unchanged) == (1, 1, 2)
+        assert pg_session.execute(text(
+            "SELECT page_count FROM chapters "
+            "WHERE series_id = :series_id AND chapter_number = 2"
+        ), {"series_id": series_id}).scalar() == 24
+
+    def test_unchanged_rows_not_written(self, pg_session):
+        """Test that rescanning identical files leaves the chapter rows untouched."""
+        series_id = add_series(pg_session)
+        pg_session.commit()
+        repo = ChapterRepository(pg_session)
+        rows = [scan_row(series_id, n, file_hash=f"xxh3:{n}") for n in (1, 2)]
+        repo.upsert_scan_batch(rows)
+        before = chapter_versions(pg_session, series_id)
+
+        result = repo.upsert_scan_batch(rows)
+
+        assert (result.inserted, result.updated, result.unchanged) == (0, 0, 2)
+        assert chapter_versions(pg_session, series_id) == before
+
+    def test_missing_fingerprints_keep_stored(self, pg_session):
+        """Test that a row without fingerprints neither clears nor changes them."""
+        series_id = add_series(pg_session)
+        pg_session.commit()
+        repo = ChapterRepository(pg_session)
+        repo.upsert_scan_batch(
+            [scan_row(series_id, 1, file_quick_hash="xxh3:q", file_hash="xxh3:f")]
+        )
+
+        result = repo.upsert_scan_batch([scan_row(series_id, 1)])
+
+        assert result.unchanged == 1
+        assert pg_session.execute(text(
+            "SELECT file_hash FROM chapters WHERE series_id = :series_id"
+        ), {"series_id": series_id}).scalar() == "xxh3:f"
+
+    def test_complete_series_deletes_vanished(self, pg_session):
+        """Test that only complete series lose the chapters missing from the batch."""
+        complete, partial = add_series(pg_session), add_series(pg_session)
+        pg_session.commit()
+        repo = ChapterRepository(pg_session)
+        repo.upsert_scan_batch(
+            [scan_row(s, n) for s in (complete, partial) for n in (1, 2, 3)]
+        )
+
+        result = repo.upsert_scan_batch(
+            [scan_row(complete, 1), scan_row(partial, 1)],
+            complete_series=[complete],
+        )
+
+        assert result.deleted == 2
+        assert sorted(chapter_versions(pg_session, complete)) == [1]
+        assert sorted(chapter_versions(pg_session, partial)) == [1, 2, 3]
+
+    def test_duplicate_rows_collapsed(self, pg_session):
+        """Test that rows sharing a chapter number count once, keeping the first."""
+        series_id = add_series(pg_session)
+        pg_session.commit()
+        repo = ChapterRepository(pg_session)
+
+        result = repo.upsert_scan_batch([
+            scan_row(series_id, 1, path=f"{series_id}/b/ch001.cbz"),
+            scan_row(series_id, 1, path=f"{series_id}/a/ch001.cbz"),
+            scan_row(series_id, 2),
+        ], complete_series=[series_id])
+
+        assert (result.inserted, result.duplicates) == (2, 1)
+        assert (result.unchanged, result.deleted) == (0, 0)
+        assert pg_session.execute(text(
+            "SELECT relative_path FROM chapters "
+            "WHERE series_id = :series_id AND chapter_number = 1"
+        ), {"series_id": series_id}).scalar() == f"{series_id}/a/ch001.cbz"
+
+
+class TestMovedChapters:
+    """Test cases for keeping chapters whose files moved, matched by content."""
+
+    def scan(self, db, library, files, complete_series):
+        """Fingerprint and apply a scan of (series_id, number, path) ``files``."""
+        rows = [
+            scan_row(
+                series_id, number, path=path, file_size=(library / path).stat().st_size
+            )
+            for series_id, number, path in files
+        ]
+        FingerprintService(db, workers=2).fingerprint_batch(rows)
+        return ChapterRepository(db).upsert_scan_batch(
+            rows, complete_series=complete_series
+        )
+
+    def chapter_ids(self, db) -> dict:
+        return {
+            row.relative_path: (
+                str(row.id), str(row.series_id), int(row.chapter_number)
+            )
+            for row in db.execute(text(
+                "SELECT id, series_id, chapter_number, relative_path FROM chapters"
+            ))
+        }
+
+    def test_moved_file_keeps_chapter(self, pg_session, tmp_path, monkeypatch):
+        """Test that a vanished chapter and a new file with its content become one."""
+        monkeypatch.setattr(settings, "MANGA_LIBRARY_PATH", str(tmp_path))
+        old, new = add_series(pg_session), add_series(pg_session)
+        pg_session.commit()
+        (tmp_path / "old").mkdir()
+        (tmp_path / "new").mkdir()
+        (tmp_path / "old" / "ch1.cbz").write_bytes(b"chapter one" * 1000)
+        (tmp_path / "old" / "ch2.cbz").write_bytes(b"chapter two" * 1000)
+        self.scan(
+            pg_session,
+            tmp_path,
+            [(old, 1, "old/ch1.cbz"), (old, 2, "old/ch2.cbz")],
+            [old],
+        )
+        before = self.chapter_ids(pg_session)
+        pg_session.execute(
+            text(
+                "INSERT INTO reading_progress (user_id, chapter_id, last_page_read) "
+                "VALUES (1, :chapter_id, 7)"
+            ),
+            {"chapter_id": before["old/ch1.cbz"][0]},
+        )
+        pg_session.commit()
+
+        (tmp_path / "old" / "ch1.cbz").rename(tmp_path / "new" / "Chapter 5.cbz")
+        result = self.scan(
+            pg_session,
+            tmp_path,
+            [(old, 2, "old/ch2.cbz"), (new, 5, "new/Chapter 5.cbz")],
+            [old, new],
+        )
+        after = self.chapter_ids(pg_session)
+
+        counts = (result.moved, result.inserted, result.deleted, result.unchanged)
+        assert counts == (1, 0, 0, 1)
+        assert after["new/Chapter 5.cbz"] == (before["old/ch1.cbz"][0], new, 5)
+        assert after["old/ch2.cbz"] == before["old/ch2.cbz"]
+        progress = pg_session.execute(
+            text("SELECT last_page_read FROM reading_progress")
+        ).scalar()
+        assert progress == 7
+
+    def test_different_content_replaces_chapter(
+        self, pg_session, tmp_path, monkeypatch
+    ):
+        """Test that a vanished chapter is deleted when the new content differs."""
+        monkeypatch.setattr(settings, "MANGA_LIBRARY_PATH", str(tmp_path))
+        series_id = add_series(pg_session)
+        pg_session.commit()
+        (tmp_path / "ch1.cbz").write_bytes(b"chapter one" * 1000)
+        self.scan(pg_session, tmp_path, [(series_id, 1, "ch1.cbz")], [series_id])
+        before = self.chapter_ids(pg_session)
+
+        (tmp_path / "ch1.cbz").unlink()
+        (tmp_path / "ch2.cbz").write_bytes(b"chapter two" * 1000)
+        result = self.scan(
+            pg_session, tmp_path, [(series_id, 2, "ch2.cbz")], [series_id]
+        )
+        after = self.chapter_ids(pg_session)
+
+        assert (result.moved, result.inserted, result.deleted) == (0, 1, 1)
+        assert after["ch2.cbz"][0] != before["ch1.cbz"][0]
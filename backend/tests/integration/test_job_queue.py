@@ -0,0 +1,207 @@
+import json
+from datetime import timedelta
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.workers.queue import JobQueue, RetentionPolicy, partition_name
+
+
+def add_job(db, job_type: str = "scan", status: str = "pending", priority: int = 0,
+            scheduled_in: float = -1, finished_ago: float = None) -> str:
+    """Insert a job directly, finished ``finished_ago`` seconds ago if given."""
+    return str(db.execute(text("""
+        INSERT INTO job_queue
+            (job_type, payload, status, priority, scheduled_at, completed_at)
+        VALUES (
+            :job_type, CAST(:payload AS JSONB), :status, :priority,
+            NOW() + make_interval(secs => :scheduled_in),
+            NOW() - make_interval(secs => CAST(:finished_ago AS DOUBLE PRECISION))
+        )
+        RETURNING id
+    """), {
+        "job_type": job_type,
+        "payload": json.dumps({}),
+        "status": status,
+        "priority": priority,
+        "scheduled_in": scheduled_in,
+        "finished_ago": finished_ago,
+    }).scalar())
+
+
+def add_partition(db, day) -> str:
+    name = partition_name(day)
+    next_day = day + timedelta(days=1)
+    db.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF job_history
+        FOR VALUES FROM ('{day.isoformat()} 00:00:00+00')
+        TO ('{next_day.isoformat()} 00:00:00+00')
+    """))
+    return name
+
+
+def history_partitions(db) -> list:
+    return db.execute(text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'job_history'::regclass
+    """)).scalars().all()
+
+
+class TestClaim:
+    """Test cases for claiming due jobs."""
+
+    def test_priority_order_and_type_filter(self, pg_session):
+        """Test that due jobs of the given types are claimed by priority, then age."""
+        low = add_job(pg_session, priority=0, scheduled_in=-30)
+        high = add_job(pg_session, priority=5, scheduled_in=-10)
+        older_high = add_job(pg_session, job_type="hash", priority=5, scheduled_in=-20)
+        add_job(pg_session, job_type="other", priority=9)
+        add_job(pg_session, priority=9, scheduled_in=60)
+        add_job(pg_session, status="running", priority=9)
+        pg_session.commit()
+        queue = JobQueue(pg_session)
+
+        jobs = queue.claim(["scan", "hash"], limit=2)
+        rest = queue.claim(["scan", "hash"], limit=10)
+
+        assert [job.id for job in jobs] == [older_high, high]
+        assert [job.id for job in rest] == [low]
+        assert all(job.attempts == 1 for job in jobs + rest)
+        assert pg_session.execute(text(
+            "SELECT COUNT(*) FROM job_queue WHERE status = 'running'"
+        )).scalar() == 4
+
+    def test_locked_jobs_skipped(self, pg_engine, pg_session):
+        """Test that a job locked by another transaction is skipped, not waited for."""
+        first = add_job(pg_session, priority=1)
+        second = add_job(pg_session, priority=0)
+        pg_session.commit()
+        other = sessionmaker(bind=pg_engine)()
+        try:
+            other.execute(
+                text("SELECT 1 FROM job_queue WHERE id = :id FOR UPDATE"), {"id": first}
+            )
+
+            jobs = JobQueue(pg_session).claim(["scan"], limit=2)
+        finally:
+            other.rollback()
+            other.close()
+
+        assert [job.id for job in jobs] == [second]
+
+
+class TestRequeueStale:
+    """Test cases for recovering jobs whose worker stopped mid-run."""
+
+    def test_stale_jobs_requeued_or_failed(self, pg_session):
+        """Test that stale jobs go back to pending, or fail once out of attempts."""
+        retry, exhausted, fresh = (
+            add_job(pg_session, status="running") for _ in range(3)
+        )
+        pg_session.execute(text("""
+            UPDATE job_queue SET started_at = NOW() - INTERVAL '1 hour',
+                attempts = CASE WHEN id = :exhausted THEN max_attempts ELSE 1 END
+            WHERE id <> :fresh
+        """), {"exhausted": exhausted, "fresh": fresh})
+        pg_session.execute(
+            text("UPDATE job_queue SET started_at = NOW() WHERE id = :id"),
+            {"id": fresh},
+        )
+        pg_session.commit()
+
+        count = JobQueue(pg_session).requeue_stale(older_than_seconds=600)
+
+        rows = {
+            row.id: (row.status, row.completed_at is not None)
+            for row in pg_session.execute(
+                text("SELECT id::text, status, completed_at FROM job_queue")
+            )
+        }
+        assert count == 2
+        assert rows == {
+            retry: ("pending", False),
+            exhausted: ("failed", True),
+            fresh: ("running", False),
+        }
+
+
+class TestArchiveFinished:
+    """Test cases for moving finished jobs into the partitioned history."""
+
+    def test_jobs_moved_into_day_partitions(self, pg_engine, pg_session):
+        """Test that finished jobs move to day partitions, expired ones are deleted."""
+        archived_ids = [
+            add_job(pg_session, status="completed", finished_ago=2 * 3600 + n)
+            for n in range(4)
+        ]
+        archived_ids.append(
+            add_job(pg_session, status="failed", finished_ago=2 * 86400)
+        )
+        expired = add_job(pg_session, status="completed", finished_ago=40 * 86400)
+        recent = add_job(pg_session, status="completed", finished_ago=60)
+        pending = add_job(pg_session)
+        pg_session.commit()
+        batches = []
+
+        def record_batch(conn, cursor, statement, parameters, context, executemany):
+            if "DELETE FROM job_queue" in statement:
+                batches.append(cursor.rowcount)
+
+        event.listen(pg_engine, "after_cursor_execute", record_batch)
+        try:
+            archived, deleted = JobQueue(pg_session).archive_finished(
+                RetentionPolicy(
+                    archive_after_seconds=3600, retention_days=30, batch_size=2
+                )
+            )
+        finally:
+            event.remove(pg_engine, "after_cursor_execute", record_batch)
+
+        assert (archived, deleted) == (5, 1)
+        # One delete-only batch, then archive batches until one comes back short.
+        assert batches == [1, 2, 2, 1]
+        queued = pg_session.execute(text("SELECT id::text FROM job_queue")).scalars()
+        assert set(queued) == {recent, pending}
+        placed = pg_session.execute(text("""
+            SELECT id::text, tableoid::regclass::text AS partition,
+                   (completed_at AT TIME ZONE 'UTC')::date AS day
+            FROM job_history
+        """)).all()
+        assert sorted(row.id for row in placed) == sorted(archived_ids)
+        assert expired not in {row.id for row in placed}
+        assert all(row.partition == partition_name(row.day) for row in placed)
+
+    def test_nothing_finished(self, pg_session):
+        """Test that a queue without finished jobs is left alone."""
+        add_job(pg_session)
+        pg_session.commit()
+
+        result = JobQueue(pg_session).archive_finished(
+            RetentionPolicy(archive_after_seconds=0, retention_days=30)
+        )
+
+        assert result == (0, 0)
+        assert pg_session.execute(text("SELECT COUNT(*) FROM job_queue")).scalar() == 1
+
+
+class TestDropExpiredHistory:
+    """Test cases for dropping history partitions past the retention period."""
+
+    def test_only_expired_partitions_dropped(self, pg_session):
+        """Test that only partitions of days before the retention period are dropped."""
+        today = pg_session.execute(
+            text("SELECT (NOW() AT TIME ZONE 'UTC')::date")
+        ).scalar()
+        names = {
+            age: add_partition(pg_session, today - timedelta(days=age))
+            for age in (45, 31, 30, 1, 0)
+        }
+        pg_session.commit()
+
+        dropped = JobQueue(pg_session).drop_expired_history(30)
+
+        assert dropped == [names[45], names[31]]
+        remaining = set(history_partitions(pg_session))
+        assert not remaining & {names[45], names[31]}
+        assert {names[30], names[1], names[0]} <= remaining
@@ -0,0 +1,220 @@
+import io
+import json
+import select
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.core.cache import ALL_TAG, CACHE_INVALIDATE_EVENT
+from app.core.events import EVENT_CHANNEL
+from app.services.library_transfer import LibraryTransferService
+
+SERIES_ID = "11111111-1111-1111-1111-111111111111"
+
+
+def add_user(db, user_id, username, email, password, superuser=False):
+    db.execute(
+        text("""
+            INSERT INTO users
+                (id, username, email, hashed_password, is_active, is_superuser)
+            VALUES (:id, :username, :email, :password, true, :superuser)
+        """),
+        {
+            "id": user_id,
+            "username": username,
+            "email": email,
+            "password": password,
+            "superuser": superuser,
+        },
+    )
+
+
+def add_series(db):
+    db.execute(
+        text("INSERT INTO series (id, title_primary) VALUES (:id, 'Series')"),
+        {"id": SERIES_ID},
+    )
+
+
+def add_chapter(db, chapter_id):
+    db.execute(text("""
+        INSERT INTO chapters (id, series_id, chapter_number, relative_path, file_name)
+        VALUES (:id, :series_id, 1, 'ch1.cbz', 'ch1.cbz')
+    """), {"id": chapter_id, "series_id": SERIES_ID})
+
+
+def export_and_reset(db) -> io.BytesIO:
+    """Export everything in the database, then empty it."""
+    out = io.BytesIO()
+    LibraryTransferService(db).export_library(out)
+    db.execute(text("TRUNCATE users, series, watch_list RESTART IDENTITY CASCADE"))
+    db.commit()
+    out.seek(0)
+    return out
+
+
+def without_section(export: io.BytesIO, table: str) -> io.BytesIO:
+    """Copy of an export with one table section left out."""
+    kept, skipping = [], False
+    for line in export.getvalue().splitlines(keepends=True):
+        if line.startswith(b'{"__table__"'):
+            skipping = json.loads(line)["__table__"] == table
+        if not skipping:
+            kept.append(line)
+    return io.BytesIO(b"".join(kept))
+
+
+def wait_for_events(conn, timeout: float = 5) -> list:
+    """Notifications received on a LISTEN connection, waiting for the first."""
+    deadline = time.monotonic() + timeout
+    while not conn.notifies and time.monotonic() < deadline:
+        select.select([conn], [], [], deadline - time.monotonic())
+        conn.poll()
+    return [json.loads(n.payload) for n in conn.notifies]
+
+
+class TestImportIntoExistingLibrary:
+    """Test cases for importing an export into a database that already has rows."""
+
+    def test_rows_mapped_onto_local_rows(self, pg_session):
+        """Test that users match by username and chapters by number.
+
+        Local accounts are never modified by the import.
+        """
+        db = pg_session
+        add_user(db, 1, "carol", "carol@x", "exported", superuser=True)
+        add_user(db, 2, "alice", "alice@x", "exported", superuser=True)
+        add_series(db)
+        add_chapter(db, "22222222-2222-2222-2222-222222222222")
+        db.execute(text("""
+            INSERT INTO reading_progress (user_id, chapter_id, last_page_read)
+            VALUES (2, '22222222-2222-2222-2222-222222222222', 5)
+        """))
+        db.execute(
+            text("INSERT INTO watch_list (series_id) VALUES (:id)"), {"id": SERIES_ID}
+        )
+        db.commit()
+        export = export_and_reset(db)
+        add_user(db, 1, "alice", "alice@local", "local")
+        add_user(db, 2, "dave", "dave@local", "local")
+        db.execute(text("SELECT setval(pg_get_serial_sequence('users', 'id'), 2)"))
+        add_series(db)
+        local_chapter = "33333333-3333-3333-3333-333333333333"
+        add_chapter(db, local_chapter)
+        db.execute(
+            text("INSERT INTO watch_list (series_id) VALUES (:id)"), {"id": SERIES_ID}
+        )
+        db.commit()
+
+        LibraryTransferService(db).import_library(export)
+        users = db.execute(text(
+            "SELECT username, id, hashed_password, is_superuser FROM users ORDER BY id"
+        )).all()
+        chapters = db.execute(text("SELECT id::text FROM chapters")).scalars().all()
+        progress = db.execute(
+            text(
+                "SELECT user_id, chapter_id::text, last_page_read "
+                "FROM reading_progress"
+            )
+        ).all()
+
+        assert [tuple(u) for u in users] == [
+            ("alice", 1, "local", False),
+            ("dave", 2, "local", False),
+            ("carol", 3, "exported", True),
+        ]
+        assert chapters == [local_chapter]
+        assert [tuple(p) for p in progress] == [(1, local_chapter, 5)]
+        assert db.execute(text("SELECT count(*) FROM watch_list")).scalar() == 1
+
+    def test_email_clash_rejected(self, pg_session):
+        """Test that a new user with a local account's email fails the whole import."""
+        db = pg_session
+        add_user(db, 1, "carol", "shared@x", "exported")
+        add_series(db)
+        db.commit()
+        export = export_and_reset(db)
+        add_user(db, 1, "erin", "shared@x", "local")
+        db.commit()
+
+        with pytest.raises(ValueError, match="carol"):
+            LibraryTransferService(db).import_library(export)
+
+        usernames = db.execute(text("SELECT username FROM users")).scalars().all()
+        assert usernames == ["erin"]
+        assert db.execute(text("SELECT count(*) FROM series")).scalar() == 0
+
+    def test_progress_without_users_rejected(self, pg_session):
+        """Test that progress is not imported onto local accounts without its users."""
+        db = pg_session
+        add_user(db, 1, "carol", "carol@x", "exported")
+        add_series(db)
+        add_chapter(db, "22222222-2222-2222-2222-222222222222")
+        db.execute(text("""
+            INSERT INTO reading_progress (user_id, chapter_id, last_page_read)
+            VALUES (1, '22222222-2222-2222-2222-222222222222', 5)
+        """))
+        db.commit()
+        export = without_section(export_and_reset(db), "users")
+        add_user(db, 1, "erin", "erin@local", "local")
+        db.commit()
+
+        with pytest.raises(ValueError, match="reading_progress"):
+            LibraryTransferService(db).import_library(export)
+
+        assert db.execute(text("SELECT count(*) FROM reading_progress")).scalar() == 0
+        assert db.execute(text("SELECT count(*) FROM series")).scalar() == 0
+
+    def test_progress_of_users_missing_from_export_dropped(self, pg_session):
+        """Test that progress of users missing from the export is dropped."""
+        db = pg_session
+        add_user(db, 1, "carol", "carol@x", "exported")
+        add_series(db)
+        add_chapter(db, "22222222-2222-2222-2222-222222222222")
+        db.execute(text("""
+            INSERT INTO reading_progress (user_id, chapter_id, last_page_read)
+            VALUES (1, '22222222-2222-2222-2222-222222222222', 5),
+                   (7, '22222222-2222-2222-2222-222222222222', 9)
+        """))
+        db.commit()
+        export = export_and_reset(db)
+        add_user(db, 7, "erin", "erin@local", "local")
+        db.commit()
+
+        LibraryTransferService(db).import_library(export)
+        progress = db.execute(text("""
+            SELECT u.username, p.last_page_read
+            FROM reading_progress p JOIN users u ON u.id = p.user_id
+        """)).all()
+
+        assert [tuple(p) for p in progress] == [("carol", 5)]
+
+
+class TestImportInvalidatesCache:
+    """Test cases for dropping cached responses after an import."""
+
+    def test_invalidation_published_on_commit(self, pg_engine, pg_session):
+        """Test that a committed import tells every API process to drop its cache."""
+        db = pg_session
+        add_series(db)
+        db.commit()
+        export = export_and_reset(db)
+        listener = pg_engine.raw_connection()
+        try:
+            listener.driver_connection.autocommit = True
+            listener.cursor().execute(f"LISTEN {EVENT_CHANNEL}")
+
+            LibraryTransferService(db).import_library(export)
+
+            events = wait_for_events(listener.driver_connection)
+        finally:
+            listener.cursor().execute(f"UNLISTEN {EVENT_CHANNEL}")
+            listener.driver_connection.autocommit = False
+            listener.close()
+
+        assert {
+            "type": CACHE_INVALIDATE_EVENT,
+            "data": {"tags": [ALL_TAG]},
+            "user_id": None,
+        } in events
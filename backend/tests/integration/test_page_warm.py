@@ -0,0 +1,60 @@
+import zipfile
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.library.page_cache import PageCache
+from app.services.pages import WARM_CHAPTER_JOB, PageService
+from app.workers.queue import JobQueue
+
+
+def warm_jobs(db) -> list:
+    return db.execute(text(
+        "SELECT status FROM job_queue WHERE job_type = :job_type ORDER BY created_at"
+    ), {"job_type": WARM_CHAPTER_JOB}).scalars().all()
+
+
+class TestQueueWarm:
+    """Test cases for queueing extraction of chapters read from their archive."""
+
+    def test_one_job_per_chapter(self, pg_session, tmp_path, monkeypatch):
+        """Test that cold reads queue one extraction until the chapter is extracted."""
+        library = tmp_path / "library"
+        library.mkdir()
+        monkeypatch.setattr(settings, "MANGA_LIBRARY_PATH", str(library))
+        with zipfile.ZipFile(library / "ch1.cbz", "w") as archive:
+            for number in range(1, 4):
+                archive.writestr(f"{number:03d}.jpg", b"page %d" % number)
+        series_id = pg_session.execute(
+            text("INSERT INTO series (title_primary) VALUES ('Series') RETURNING id")
+        ).scalar()
+        chapter_id = str(
+            pg_session.execute(
+                text("""
+                    INSERT INTO chapters
+                        (series_id, chapter_number, relative_path, file_name)
+                    VALUES (:series_id, 1, 'ch1.cbz', 'ch1.cbz') RETURNING id
+                """),
+                {"series_id": series_id},
+            ).scalar()
+        )
+        pg_session.commit()
+        cache = PageCache(str(tmp_path / "pages"), 1024**3)
+        service = PageService(pg_session, cache=cache)
+
+        service.get_page(chapter_id, 2)
+        service.get_page(chapter_id, 3)
+        assert warm_jobs(pg_session) == ["pending"]
+
+        (job,) = JobQueue(pg_session).claim([WARM_CHAPTER_JOB])
+        pg_session.commit()
+        assert service.get_page(chapter_id, 2).data == b"page 2"
+        assert warm_jobs(pg_session) == ["running"]
+
+        service.warm_chapter(chapter_id)
+        JobQueue(pg_session).complete(job.id)
+        assert service.get_page(chapter_id, 2).path is not None
+        # As if the extraction finished while the page was read from the archive.
+        monkeypatch.setattr(cache, "page_path", lambda *args: None)
+        assert service.get_page(chapter_id, 3).data == b"page 3"
+        assert warm_jobs(pg_session) == ["completed"]
@@ -0,0 +1,177 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.repositories.progress import ProgressEntry, ProgressRepository
+
+
+def add_series(db, title: str = "Series") -> str:
+    return str(db.execute(text(
+        "INSERT INTO series (title_primary) VALUES (:title) RETURNING id"
+    ), {"title": title}).scalar())
+
+
+def add_chapters(db, series_id: str, numbers) -> list:
+    return [
+        str(db.execute(text("""
+            INSERT INTO chapters
+                (series_id, chapter_number, relative_path, file_name, page_count)
+            VALUES (:series_id, :number, 'ch.cbz', 'ch.cbz', 20)
+            RETURNING id
+        """), {"series_id": series_id, "number": number}).scalar())
+        for number in numbers
+    ]
+
+
+def ago(minutes: float) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(minutes=minutes)
+
+
+def stored(db, user_id: int) -> dict:
+    return {
+        str(row.chapter_id): (row.last_page_read, row.is_read)
+        for row in db.execute(text(
+            "SELECT chapter_id, last_page_read, is_read FROM reading_progress "
+            "WHERE user_id = :user_id"
+        ), {"user_id": user_id})
+    }
+
+
+class TestSetProgress:
+    """Test cases for batched reading progress writes."""
+
+    def test_batch_upsert(self, pg_session):
+        """Test that one batch inserts new progress and updates existing progress."""
+        series_id = add_series(pg_session)
+        first, second = add_chapters(pg_session, series_id, (1, 2))
+        pg_session.commit()
+        repo = ProgressRepository(pg_session)
+        repo.set_progress(1, [ProgressEntry(first, 4, False, ago(10))])
+
+        result = repo.set_progress(1, [
+            ProgressEntry(first, 20, True, ago(5)),
+            ProgressEntry(second, 2, False, ago(5)),
+        ])
+
+        assert (result.applied, result.stale, result.unknown_chapters) == (2, 0, [])
+        assert stored(pg_session, 1) == {first: (20, True), second: (2, False)}
+
+    def test_older_progress_ignored(self, pg_session):
+        """Test that progress older than what is stored is ignored and newer applied."""
+        series_id = add_series(pg_session)
+        first, second = add_chapters(pg_session, series_id, (1, 2))
+        pg_session.commit()
+        repo = ProgressRepository(pg_session)
+        repo.set_progress(1, [
+            ProgressEntry(first, 15, False, ago(5)),
+            ProgressEntry(second, 3, False, ago(5)),
+        ])
+
+        result = repo.set_progress(1, [
+            ProgressEntry(first, 2, False, ago(60)),
+            ProgressEntry(second, 9, False, ago(1)),
+        ])
+
+        assert (result.applied, result.stale) == (1, 1)
+        assert stored(pg_session, 1) == {first: (15, False), second: (9, False)}
+
+    def test_future_timestamp_clamped(self, pg_session):
+        """Test that a future timestamp is stored as now so later writes still apply."""
+        series_id = add_series(pg_session)
+        (chapter,) = add_chapters(pg_session, series_id, (1,))
+        pg_session.commit()
+        repo = ProgressRepository(pg_session)
+
+        tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+        repo.set_progress(1, [ProgressEntry(chapter, 5, False, tomorrow)])
+        result = repo.set_progress(1, [ProgressEntry(chapter, 6, False)])
+
+        assert result.applied == 1
+        assert stored(pg_session, 1) == {chapter: (6, False)}
+
+    def test_unknown_chapters_reported(self, pg_session):
+        """Test that entries for missing chapters are reported and the rest applied."""
+        series_id = add_series(pg_session)
+        (chapter,) = add_chapters(pg_session, series_id, (1,))
+        pg_session.commit()
+        missing = str(uuid.uuid4())
+
+        result = ProgressRepository(pg_session).set_progress(1, [
+            ProgressEntry(chapter, 5, False),
+            ProgressEntry(missing, 5, False),
+        ])
+
+        counts = (result.applied, result.stale, result.unknown_chapters)
+        assert counts == (1, 0, [missing])
+        assert stored(pg_session, 1) == {chapter: (5, False)}
+
+
+class TestContinueReading:
+    """Test cases for the continue reading shelf."""
+
+    def test_next_unread_chapter_per_series(self, pg_session):
+        """Test that each series gives its next unread chapter, latest read first."""
+        finishing, partway, done = (add_series(pg_session, title) for title in "ABC")
+        a = add_chapters(pg_session, finishing, (1, 2, 3, 4))
+        b = add_chapters(pg_session, partway, (1, 2))
+        c = add_chapters(pg_session, done, (1,))
+        pg_session.commit()
+        repo = ProgressRepository(pg_session)
+        # Chapter 3 was read ahead of chapter 2 being finished.
+        repo.set_progress(1, [
+            ProgressEntry(a[0], 20, True, ago(30)),
+            ProgressEntry(a[2], 20, True, ago(25)),
+            ProgressEntry(a[1], 20, True, ago(20)),
+        ])
+        repo.set_progress(1, [ProgressEntry(b[0], 7, False, ago(10))])
+        repo.set_progress(1, [ProgressEntry(c[0], 20, True, ago(40))])
+
+        shelf = repo.get_continue_reading(1, 10)
+
+        assert [
+            (str(row["series_id"]), str(row["chapter_id"]), row["last_page_read"])
+            for row in shelf
+        ] == [
+            (partway, b[0], 7),
+            (finishing, a[3], 0),
+        ]
+
+    def test_limit(self, pg_session):
+        """Test that the shelf is cut to the most recent series."""
+        repo = ProgressRepository(pg_session)
+        series = [add_series(pg_session, f"S{n}") for n in range(3)]
+        chapters = [
+            add_chapters(pg_session, series_id, (1,))[0] for series_id in series
+        ]
+        pg_session.commit()
+        for age, chapter in zip((30, 10, 20), chapters, strict=True):
+            repo.set_progress(1, [ProgressEntry(chapter, 1, False, ago(age))])
+
+        shelf = repo.get_continue_reading(1, 2)
+
+        assert [str(row["series_id"]) for row in shelf] == [series[1], series[2]]
+
+    def test_users_isolated(self, pg_session):
+        """Test that one user's progress neither shows on nor alters another's shelf."""
+        series_id = add_series(pg_session)
+        first, second = add_chapters(pg_session, series_id, (1, 2))
+        pg_session.commit()
+        repo = ProgressRepository(pg_session)
+        repo.set_progress(1, [ProgressEntry(first, 20, True, ago(10))])
+        repo.set_progress(2, [ProgressEntry(first, 3, False, ago(5))])
+
+        first_shelf = repo.get_continue_reading(1, 10)
+        assert [str(row["chapter_id"]) for row in first_shelf] == [second]
+        second_shelf = repo.get_continue_reading(2, 10)
+        assert [
+            (str(row["chapter_id"]), row["last_page_read"]) for row in second_shelf
+        ] == [(first, 3)]
+        assert repo.get_continue_reading(3, 10) == []
+        assert stored(pg_session, 1) == {first: (20, True)}
+        assert stored(pg_session, 2) == {first: (3, False)}
+
+        repo.delete_user_progress(2)
+        pg_session.commit()
+        assert stored(pg_session, 2) == {}
+        assert len(repo.get_continue_reading(1, 10)) == 1
@@ -0,0 +1,181 @@
+import json
+
+from sqlalchemy import text
+
+from app.repositories.series import SeriesFilters, SeriesRepository
+
+
+def add_series(db, title: str, status: str = "ongoing", reading_status: str = "reading",
+               genres=(), tags=(), metadata=None) -> str:
+    return str(
+        db.execute(
+            text("""
+                INSERT INTO series
+                    (title_primary, status, reading_status, genres, tags, user_metadata)
+                VALUES (
+                    :title, :status, :reading_status, :genres, :tags,
+                    CAST(:metadata AS JSONB)
+                )
+                RETURNING id
+            """),
+            {
+                "title": title,
+                "status": status,
+                "reading_status": reading_status,
+                "genres": list(genres),
+                "tags": list(tags),
+                "metadata": json.dumps(metadata or {}),
+            },
+        ).scalar()
+    )
+
+
+def titles(rows) -> list:
+    return [row["title_primary"] for row in rows]
+
+
+class TestBrowseSeries:
+    """Test cases for the filtered series browse with facet counts."""
+
+    def setup_library(self, db):
+        add_series(db, "Alpha", genres=["Action", "Comedy"], tags=["isekai"],
+                   metadata={"rating": 5})
+        add_series(db, "Bravo", status="completed", genres=["Action"],
+                   tags=["isekai", "magic"])
+        add_series(db, "Charlie", reading_status="completed", genres=["Comedy"],
+                   metadata={"rating": 3, "note": "x"})
+        add_series(db, "Delta", status="completed", reading_status="plan_to_read",
+                   genres=["Action", "Drama"])
+        db.commit()
+
+    def test_no_filters(self, pg_session):
+        """Test that without filters every series is listed by title with all facets."""
+        self.setup_library(pg_session)
+
+        total, rows, facets = SeriesRepository(pg_session).browse_series(
+            SeriesFilters(), 10, 0
+        )
+
+        assert total == 4
+        assert titles(rows) == ["Alpha", "Bravo", "Charlie", "Delta"]
+        assert facets["genres"] == [("Action", 3), ("Comedy", 2), ("Drama", 1)]
+        assert facets["tags"] == [("isekai", 2), ("magic", 1)]
+        assert facets["metadata_keys"] == [("rating", 2), ("note", 1)]
+        assert facets["statuses"] == [("completed", 2), ("ongoing", 2)]
+        assert facets["reading_statuses"] == [
+            ("reading", 2), ("completed", 1), ("plan_to_read", 1)
+        ]
+
+    def test_genre_filter_requires_every_genre(self, pg_session):
+        """Test that a series must have all selected genres; facets count matches."""
+        self.setup_library(pg_session)
+
+        total, rows, facets = SeriesRepository(pg_session).browse_series(
+            SeriesFilters(genres=["Action", "Comedy"]), 10, 0
+        )
+
+        assert total == 1
+        assert titles(rows) == ["Alpha"]
+        assert facets["genres"] == [("Action", 1), ("Comedy", 1)]
+        assert facets["tags"] == [("isekai", 1)]
+
+    def test_tag_filter(self, pg_session):
+        """Test filtering by tags."""
+        self.setup_library(pg_session)
+
+        total, rows, facets = SeriesRepository(pg_session).browse_series(
+            SeriesFilters(tags=["isekai"]), 10, 0
+        )
+
+        assert total == 2
+        assert titles(rows) == ["Alpha", "Bravo"]
+        assert facets["genres"] == [("Action", 2), ("Comedy", 1)]
+
+    def test_metadata_key_filter(self, pg_session):
+        """Test that a series must have every selected user metadata key."""
+        self.setup_library(pg_session)
+        repo = SeriesRepository(pg_session)
+
+        total, rows, _ = repo.browse_series(
+            SeriesFilters(metadata_keys=["rating"]), 10, 0
+        )
+        assert (total, titles(rows)) == (2, ["Alpha", "Charlie"])
+
+        total, rows, facets = repo.browse_series(
+            SeriesFilters(metadata_keys=["rating", "note"]), 10, 0
+        )
+        assert (total, titles(rows)) == (1, ["Charlie"])
+        assert facets["metadata_keys"] == [("note", 1), ("rating", 1)]
+
+    def test_status_filter_counts_ignore_own_filter(self, pg_session):
+        """Test that status matches any selected value and its facet counts the rest."""
+        self.setup_library(pg_session)
+
+        total, rows, facets = SeriesRepository(pg_session).browse_series(
+            SeriesFilters(genres=["Action"], statuses=["completed"]), 10, 0
+        )
+
+        assert total == 2
+        assert titles(rows) == ["Bravo", "Delta"]
+        assert facets["statuses"] == [("completed", 2), ("ongoing", 1)]
+        assert facets["reading_statuses"] == [("plan_to_read", 1), ("reading", 1)]
+        assert facets["genres"] == [("Action", 2), ("Drama", 1)]
+
+    def test_reading_status_filter(self, pg_session):
+        """Test that reading status matches any selected value, its facet unfiltered."""
+        self.setup_library(pg_session)
+
+        total, rows, facets = SeriesRepository(pg_session).browse_series(
+            SeriesFilters(reading_statuses=["completed", "plan_to_read"]), 10, 0
+        )
+
+        assert total == 2
+        assert titles(rows) == ["Charlie", "Delta"]
+        assert facets["reading_statuses"] == [
+            ("reading", 2), ("completed", 1), ("plan_to_read", 1)
+        ]
+        assert facets["statuses"] == [("completed", 1), ("ongoing", 1)]
+
+    def test_pagination(self, pg_session):
+        """Test that pages follow title order; total and facets cover all matches."""
+        self.setup_library(pg_session)
+        repo = SeriesRepository(pg_session)
+
+        first = repo.browse_series(SeriesFilters(genres=["Action"]), 2, 0)
+        second = repo.browse_series(SeriesFilters(genres=["Action"]), 2, 2)
+
+        assert (first[0], titles(first[1])) == (3, ["Alpha", "Bravo"])
+        assert (second[0], titles(second[1])) == (3, ["Delta"])
+        assert first[2] == second[2]
+        assert first[2]["genres"][0] == ("Action", 3)
+
+    def test_chapter_counts(self, pg_session):
+        """Test that listed series carry their chapter count and latest chapter."""
+        series_id = add_series(pg_session, "Alpha")
+        for number in (1, 2, 3.5):
+            pg_session.execute(
+                text("""
+                    INSERT INTO chapters
+                        (series_id, chapter_number, relative_path, file_name)
+                    VALUES (:series_id, :number, 'a.cbz', 'a.cbz')
+                """),
+                {"series_id": series_id, "number": number},
+            )
+        pg_session.commit()
+
+        _, rows, _ = SeriesRepository(pg_session).browse_series(SeriesFilters(), 10, 0)
+
+        assert rows[0]["id"] == series_id
+        assert rows[0]["chapter_count"] == 3
+        assert float(rows[0]["latest_chapter"]) == 3.5
+
+    def test_no_matches(self, pg_session):
+        """Test that a filter matching nothing returns no rows and no facet values."""
+        self.setup_library(pg_session)
+
+        total, rows, facets = SeriesRepository(pg_session).browse_series(
+            SeriesFilters(genres=["Horror"]), 10, 0
+        )
+
+        assert (total, rows) == (0, [])
+        assert "genres" not in facets
@@ -0,0 +1,212 @@
+import uuid
+
+from sqlalchemy import text
+
+from app.services.sync import SyncService
+
+
+def add_series(db, title: str = "Series") -> str:
+    return str(db.execute(text(
+        "INSERT INTO series (title_primary) VALUES (:title) RETURNING id"
+    ), {"title": title}).scalar())
+
+
+def add_chapter(db, series_id: str, number: int, chapter_id: str = None) -> str:
+    return str(db.execute(text("""
+        INSERT INTO chapters (id, series_id, chapter_number, relative_path, file_name)
+        VALUES (:id, :series_id, :number, :path, :path)
+        RETURNING id
+    """), {
+        "id": chapter_id or str(uuid.uuid4()),
+        "series_id": series_id,
+        "number": number,
+        "path": f"ch{number:03d}.cbz",
+    }).scalar())
+
+
+def set_progress(db, user_id: int, chapter_id: str, page: int) -> None:
+    db.execute(text("""
+        INSERT INTO reading_progress (user_id, chapter_id, last_page_read)
+        VALUES (:user_id, :chapter_id, :page)
+        ON CONFLICT (user_id, chapter_id)
+        DO UPDATE SET last_page_read = EXCLUDED.last_page_read
+    """), {"user_id": user_id, "chapter_id": chapter_id, "page": page})
+
+
+def sync(db, cursor=None, limit=None, user_id=None):
+    """One sync call in its own transaction, as a request would make it."""
+    response = SyncService(db).get_changes(cursor, limit, user_id)
+    db.commit()
+    return response
+
+
+def changed_ids(response) -> dict:
+    return {
+        "series": [str(s.id) for s in response.series],
+        "chapters": [str(c.id) for c in response.chapters],
+        "progress": [(str(p.chapter_id), p.last_page_read) for p in response.progress],
+        "deleted_series": [str(i) for i in response.deleted.series],
+        "deleted_chapters": [str(i) for i in response.deleted.chapters],
+    }
+
+
+NO_CHANGES = {
+    "series": [],
+    "chapters": [],
+    "progress": [],
+    "deleted_series": [],
+    "deleted_chapters": [],
+}
+
+
+class TestDeltaSync:
+    """Test cases for paging through library changes since a cursor."""
+
+    def test_snapshot_then_delta_then_delete(self, pg_session):
+        """Test that a snapshot is followed by later changes, deletes as tombstones."""
+        series_id = add_series(pg_session)
+        first = add_chapter(pg_session, series_id, 1)
+        second = add_chapter(pg_session, series_id, 2)
+        pg_session.commit()
+
+        snapshot = sync(pg_session)
+        assert snapshot.reset and not snapshot.has_more
+        assert changed_ids(snapshot) == {
+            **NO_CHANGES,
+            "series": [series_id],
+            "chapters": [first, second],
+        }
+
+        unchanged = sync(pg_session, snapshot.cursor)
+        assert not unchanged.reset
+        assert changed_ids(unchanged) == NO_CHANGES
+
+        pg_session.execute(
+            text("UPDATE chapters SET title = 'Renamed' WHERE id = :id"), {"id": first}
+        )
+        pg_session.commit()
+        delta = sync(pg_session, unchanged.cursor)
+        assert changed_ids(delta) == {**NO_CHANGES, "chapters": [first]}
+        assert delta.chapters[0].title == "Renamed"
+
+        pg_session.execute(text("DELETE FROM chapters WHERE id = :id"), {"id": second})
+        pg_session.commit()
+        deleted = sync(pg_session, delta.cursor)
+        assert changed_ids(deleted) == {**NO_CHANGES, "deleted_chapters": [second]}
+
+        assert changed_ids(sync(pg_session, deleted.cursor)) == NO_CHANGES
+
+    def test_unrelated_column_changes_not_sent(self, pg_session):
+        """Test that changes to columns clients never receive stay out of the delta."""
+        series_id = add_series(pg_session)
+        chapter_id = add_chapter(pg_session, series_id, 1)
+        pg_session.commit()
+        snapshot = sync(pg_session)
+
+        pg_session.execute(
+            text("UPDATE chapters SET scan_status = 'scanned' WHERE id = :id"),
+            {"id": chapter_id},
+        )
+        # Legacy shared read state; per-user progress travels in ``progress``.
+        pg_session.execute(
+            text(
+                "UPDATE chapters SET is_read = true, last_page_read = 5 WHERE id = :id"
+            ),
+            {"id": chapter_id},
+        )
+        pg_session.execute(
+            text("UPDATE series SET last_read_at = NOW() WHERE id = :id"),
+            {"id": series_id},
+        )
+        pg_session.commit()
+
+        assert changed_ids(sync(pg_session, snapshot.cursor)) == NO_CHANGES
+
+    def test_reimported_row_suppresses_tombstone(self, pg_session):
+        """Test that a row deleted and then recreated with its ID is sent as live."""
+        series_id = add_series(pg_session)
+        chapter_id = add_chapter(pg_session, series_id, 1)
+        pg_session.commit()
+        snapshot = sync(pg_session)
+
+        pg_session.execute(
+            text("DELETE FROM chapters WHERE id = :id"), {"id": chapter_id}
+        )
+        pg_session.commit()
+        add_chapter(pg_session, series_id, 1, chapter_id=chapter_id)
+        pg_session.commit()
+
+        delta = sync(pg_session, snapshot.cursor)
+        assert changed_ids(delta) == {**NO_CHANGES, "chapters": [chapter_id]}
+        assert (
+            pg_session.execute(text("SELECT COUNT(*) FROM sync_tombstones")).scalar()
+            == 1
+        )
+
+    def test_paging_misses_no_changes(self, pg_session):
+        """Test that paging sends every row once and changes made mid-pass arrive."""
+        series_id = add_series(pg_session)
+        chapters = [add_chapter(pg_session, series_id, n) for n in range(1, 6)]
+        pg_session.commit()
+
+        seen = []
+        pages = [sync(pg_session, limit=2)]
+        seen += changed_ids(pages[0])["series"] + changed_ids(pages[0])["chapters"]
+        # While the pass is under way, a chapter already sent changes and
+        # another is deleted.
+        pg_session.execute(
+            text("UPDATE chapters SET title = 'Late' WHERE id = :id"),
+            {"id": chapters[0]},
+        )
+        pg_session.execute(
+            text("DELETE FROM chapters WHERE id = :id"), {"id": chapters[4]}
+        )
+        pg_session.commit()
+        while pages[-1].has_more:
+            pages.append(sync(pg_session, pages[-1].cursor, limit=2))
+            seen += (
+                changed_ids(pages[-1])["series"] + changed_ids(pages[-1])["chapters"]
+            )
+        assert all(len(page.series) + len(page.chapters) <= 2 for page in pages)
+        assert sorted(set(seen)) == sorted([series_id] + chapters[:4])
+
+        delta = []
+        cursor = pages[-1].cursor
+        while True:
+            page = sync(pg_session, cursor, limit=1)
+            delta.append(page)
+            cursor = page.cursor
+            if not page.has_more:
+                break
+        late = [
+            c.title
+            for page in pages + delta
+            for c in page.chapters
+            if str(c.id) == chapters[0]
+        ]
+        assert late[-1] == "Late"
+        assert [str(i) for page in delta for i in page.deleted.chapters] == [
+            chapters[4]
+        ]
+
+    def test_progress_of_requesting_user(self, pg_session):
+        """Test that only the syncing user's progress is sent, in snapshot and delta."""
+        series_id = add_series(pg_session)
+        first, second = (
+            add_chapter(pg_session, series_id, 1),
+            add_chapter(pg_session, series_id, 2),
+        )
+        set_progress(pg_session, 1, first, 5)
+        set_progress(pg_session, 2, second, 9)
+        pg_session.commit()
+
+        assert changed_ids(sync(pg_session))["progress"] == []
+        snapshot = sync(pg_session, user_id=1)
+        assert changed_ids(snapshot)["progress"] == [(first, 5)]
+
+        set_progress(pg_session, 1, second, 3)
+        set_progress(pg_session, 2, first, 4)
+        pg_session.commit()
+
+        delta = sync(pg_session, snapshot.cursor, user_id=1)
+        assert changed_ids(delta) == {**NO_CHANGES, "progress": [(second, 3)]}
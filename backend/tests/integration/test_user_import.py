@@ -0,0 +1,49 @@
+from app.repositories.user import UserRepository
+from app.schemas.user import UserCreate
+
+
+def make_row(row_no, username, email):
+    return (
+        row_no,
+        UserCreate(username=username, email=email, password="password123"),
+        f"hash{row_no}",
+    )
+
+
+class TestBulkCreateUsersCopy:
+    """Test cases for the COPY staging path of bulk user import."""
+
+    def test_conflicts_resolved_in_row_order(self, pg_session):
+        """Test that a row rejected for its email leaves its username free."""
+        repository = UserRepository(pg_session)
+        rows = [
+            make_row(1, "alice", "a@x.com"),
+            make_row(2, "bob", "a@x.com"),
+            make_row(3, "bob", "b@x.com"),
+        ]
+
+        created, errors = repository.bulk_create_users(rows)
+
+        assert created == 2
+        assert [(e.row, e.field) for e in errors] == [(2, "email")]
+        assert repository.get_user_by_username("bob").email == "b@x.com"
+
+    def test_existing_users_reported(self, pg_session):
+        """Test that clashes with existing users and within the batch are reported."""
+        repository = UserRepository(pg_session)
+        repository.bulk_create_users([make_row(1, "carol", "carol@x.com")])
+        rows = [
+            make_row(1, "carol", "new@x.com"),
+            make_row(2, "dave", "carol@x.com"),
+            make_row(3, "erin", "erin@x.com"),
+            make_row(4, "erin", "erin2@x.com"),
+        ]
+
+        created, errors = repository.bulk_create_users(rows)
+
+        assert created == 1
+        assert [(e.row, e.field) for e in errors] == [
+            (1, "username"),
+            (2, "email"),
+            (4, "username"),
+        ]
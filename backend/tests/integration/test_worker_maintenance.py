@@ -0,0 +1,33 @@
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.workers import jobs  # noqa: F401  (registers the maintenance tasks)
+from app.workers.queue import Worker
+
+
+class TestWorkerMaintenance:
+    """Test cases for the maintenance pass run by every worker."""
+
+    def test_prunes_only_expired_tombstones(self, pg_engine, pg_session, monkeypatch):
+        """Test that tombstones past the retention period go and newer ones stay."""
+        monkeypatch.setattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30)
+        for age_days in (45, 31, 29, 1):
+            pg_session.execute(
+                text("""
+                    INSERT INTO sync_tombstones (entity, entity_id, deleted_at)
+                    VALUES ('chapter', :entity_id, NOW() - make_interval(days => :age))
+                """),
+                {"entity_id": str(uuid.uuid4()), "age": age_days},
+            )
+        pg_session.commit()
+
+        Worker(sessionmaker(bind=pg_engine)).maintain()
+        remaining = pg_session.execute(text(
+            "SELECT EXTRACT(DAY FROM NOW() - deleted_at)::int "
+            "FROM sync_tombstones ORDER BY 1"
+        )).scalars().all()
+
+        assert remaining == [1, 29]
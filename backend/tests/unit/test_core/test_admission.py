@@ -0,0 +1,194 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import startup
+from app.core.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionPool,
+    AdmissionRejected,
+    PoolLimits,
+)
+from app.core.config import settings
+from app.main import create_app
+from app.services.user import UserService
+
+
+class TestAdmissionPool:
+    """Test cases for the per route class concurrency pool."""
+
+    def test_queue_full_rejected_immediately(self):
+        """Test that requests beyond concurrency plus queue fail fast."""
+        async def scenario():
+            pool = AdmissionPool(
+                "media", PoolLimits(concurrency=1, queue_size=1, queue_timeout=5)
+            )
+            await pool.acquire()
+            waiter = asyncio.create_task(pool.acquire())
+            await asyncio.sleep(0)
+
+            with pytest.raises(AdmissionRejected) as rejected:
+                await pool.acquire()
+            assert rejected.value.reason == "queue full"
+            assert pool.metrics()["queued"] == 1
+
+            pool.release(0.2)
+            await waiter
+            assert pool.active == 1 and pool.queued == 0
+            pool.release()
+            return pool.metrics()
+
+        metrics = asyncio.run(scenario())
+
+        assert metrics["active"] == 0
+        assert metrics["admitted"] == 2
+        assert metrics["rejected_queue_full"] == 1
+        assert metrics["max_queued"] == 1
+
+    def test_queue_timeout(self):
+        """Test that a request queued past the timeout is rejected and dequeued."""
+        async def scenario():
+            pool = AdmissionPool(
+                "auth", PoolLimits(concurrency=1, queue_size=4, queue_timeout=0.01)
+            )
+            await pool.acquire()
+            with pytest.raises(AdmissionRejected) as rejected:
+                await pool.acquire()
+            assert rejected.value.reason == "queue timeout"
+            assert pool.queued == 0
+            pool.release()
+            return pool
+
+        pool = asyncio.run(scenario())
+
+        assert pool.active == 0
+        assert pool.rejected_timeout == 1
+
+    def test_slots_go_to_waiters_in_order(self):
+        """Test that a released slot goes to the oldest waiter, not a new arrival."""
+        async def scenario():
+            pool = AdmissionPool(
+                "api", PoolLimits(concurrency=1, queue_size=4, queue_timeout=5)
+            )
+            order = []
+
+            async def request(name):
+                await pool.acquire()
+                order.append(name)
+                await asyncio.sleep(0)
+                pool.release()
+
+            await pool.acquire()
+            tasks = [asyncio.create_task(request(name)) for name in ("first", "second")]
+            await asyncio.sleep(0)
+            pool.release()
+            tasks.append(asyncio.create_task(request("third")))
+            await asyncio.gather(*tasks)
+            return order, pool.active
+
+        assert asyncio.run(scenario()) == (["first", "second", "third"], 0)
+
+    def test_cancelled_waiter_frees_its_place(self):
+        """Test that a client disconnecting while queued does not leak a slot."""
+        async def scenario():
+            pool = AdmissionPool(
+                "api", PoolLimits(concurrency=1, queue_size=4, queue_timeout=5)
+            )
+            await pool.acquire()
+            waiter = asyncio.create_task(pool.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            pool.release()
+            return pool
+
+        pool = asyncio.run(scenario())
+
+        assert (pool.active, pool.queued) == (0, 0)
+
+
+class TestAdmissionMiddleware:
+    """Test cases for routing requests through their class's pool."""
+
+    def make_client(self, limits: PoolLimits):
+        controller = AdmissionController(
+            {"api": limits, "media": limits},
+            [(None, r"/health/", None), (None, r"/pages/", "media")],
+        )
+        app = FastAPI()
+        app.add_middleware(AdmissionMiddleware, controller=controller)
+
+        @app.get("/pages/{number}")
+        async def page(number: int):
+            return {"number": number}
+
+        return TestClient(app), controller
+
+    def test_classify(self):
+        """Test that requests map to the first matching rule, else the default class."""
+        _, controller = self.make_client(PoolLimits(1, 1, 1))
+
+        assert controller.classify("GET", "/pages/1").name == "media"
+        assert controller.classify("GET", "/series").name == "api"
+        assert controller.classify("GET", "/health/live") is None
+
+    def test_rejection_response(self):
+        """Test that a full class answers 503 with Retry-After while others run."""
+        client, controller = self.make_client(
+            PoolLimits(concurrency=1, queue_size=0, queue_timeout=1)
+        )
+        # A request still streaming its response holds the only media slot.
+        controller.pools["media"].active = 1
+
+        response = client.get("/pages/1")
+
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert controller.pools["media"].rejected_queue_full == 1
+        assert client.get("/series").status_code == 404  # Admitted by the api pool
+
+        controller.pools["media"].active = 0
+        assert client.get("/pages/1").json() == {"number": 1}
+        assert controller.metrics()["media"]["active"] == 0
+
+
+class TestLoginOffEventLoop:
+    """Test cases for logins hashing passwords without blocking other requests."""
+
+    def test_cheap_route_answers_while_auth_pool_full(self, monkeypatch):
+        """Test that a login stuck in bcrypt neither blocks routes nor admits logins."""
+        monkeypatch.setattr(startup, "_warmup_steps", {})
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_ENABLED", False)
+        monkeypatch.setattr(settings, "ADMISSION_AUTH_CONCURRENCY", 1)
+        monkeypatch.setattr(settings, "ADMISSION_AUTH_QUEUE", 0)
+        hashing, release = threading.Event(), threading.Event()
+
+        def slow_authenticate(self, username, password):
+            hashing.set()
+            release.wait(10)
+
+        monkeypatch.setattr(UserService, "authenticate_user", slow_authenticate)
+        login = {"username": "admin", "password": "guess"}
+
+        with TestClient(create_app()) as client:
+            first = concurrent.futures.ThreadPoolExecutor(1).submit(
+                client.post, "/api/v1/auth/login", data=login
+            )
+            assert hashing.wait(5)
+            # Safety net: without it a blocked event loop would hang the test.
+            threading.Timer(10, release.set).start()
+
+            cheap = client.get("/")
+            answered_while_hashing = not release.is_set()
+            second = client.post("/api/v1/auth/login", data=login)
+            release.set()
+
+            assert cheap.status_code == 200
+            assert answered_while_hashing
+            assert second.status_code == 503
+            assert first.result(10).status_code == 401
@@ -0,0 +1,169 @@
+import threading
+import time
+
+from app.core.cache import (
+    CacheBackend,
+    CacheError,
+    MemoryCacheBackend,
+    ResponseCache,
+    SERIES_LIST_TAG,
+    series_tag,
+)
+from app.core.events import EventBroker
+
+
+class Counter:
+    """Compute function that counts its calls."""
+
+    def __init__(self, value: bytes = b"value", delay: float = 0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self) -> bytes:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.value
+
+
+class FailingBackend(CacheBackend):
+    """Backend that is never reachable."""
+
+    def lookup(self, key, tags):
+        raise CacheError("down")
+
+    def store(self, key, value, ttl):
+        raise CacheError("down")
+
+    def bump(self, tags):
+        raise CacheError("down")
+
+    def acquire(self, key, ttl):
+        raise CacheError("down")
+
+    def release(self, key):
+        raise CacheError("down")
+
+
+class TestResponseCache:
+    """Test cases for tagged response caching."""
+
+    def test_hit_after_miss(self):
+        """Test that a computed value is served from the cache afterwards."""
+        cache = ResponseCache(MemoryCacheBackend())
+        compute = Counter()
+
+        assert cache.get_or_compute("key", ["tag"], compute) == b"value"
+        assert cache.get_or_compute("key", ["tag"], compute) == b"value"
+        assert compute.calls == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_invalidate_by_tag(self):
+        """Test that invalidating a tag only drops the entries carrying it."""
+        cache = ResponseCache(MemoryCacheBackend())
+        first, second = Counter(b"a"), Counter(b"b")
+        cache.get_or_compute("a", [series_tag(1), SERIES_LIST_TAG], first)
+        cache.get_or_compute("b", [series_tag(2)], second)
+
+        cache.invalidate([series_tag(1)])
+        cache.get_or_compute("a", [series_tag(1), SERIES_LIST_TAG], first)
+        cache.get_or_compute("b", [series_tag(2)], second)
+
+        assert (first.calls, second.calls) == (2, 1)
+
+    def test_clear_drops_everything(self):
+        """Test that clearing the cache invalidates entries of every tag."""
+        cache = ResponseCache(MemoryCacheBackend())
+        compute = Counter()
+        cache.get_or_compute("key", ["tag"], compute)
+
+        cache.clear()
+        cache.get_or_compute("key", ["tag"], compute)
+
+        assert compute.calls == 2
+
+    def test_invalidation_during_compute(self):
+        """Test that a value computed across an invalidation is not served."""
+        cache = ResponseCache(MemoryCacheBackend())
+
+        def compute():
+            cache.invalidate(["tag"])
+            return b"stale"
+
+        cache.get_or_compute("key", ["tag"], compute)
+        assert cache.get_or_compute("key", ["tag"], Counter(b"fresh")) == b"fresh"
+
+    def test_single_flight(self):
+        """Test that concurrent misses for one key compute it once."""
+        cache = ResponseCache(MemoryCacheBackend())
+        compute = Counter(delay=0.2)
+        results = []
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    cache.get_or_compute("key", ["tag"], compute)
+                )
+            )
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert compute.calls == 1
+        assert results == [b"value"] * 10
+
+    def test_expired_entries_recomputed(self):
+        """Test that entries are recomputed after their TTL."""
+        cache = ResponseCache(MemoryCacheBackend(), ttl=0.01)
+        compute = Counter()
+        cache.get_or_compute("key", ["tag"], compute)
+
+        time.sleep(0.02)
+        cache.get_or_compute("key", ["tag"], compute)
+
+        assert compute.calls == 2
+
+    def test_backend_failure_computes(self):
+        """Test that an unreachable backend degrades to computing every request."""
+        cache = ResponseCache(FailingBackend())
+        compute = Counter()
+
+        assert cache.get_or_compute("key", ["tag"], compute) == b"value"
+        cache.invalidate(["tag"])
+        assert compute.calls == 1
+
+    def test_memory_is_bounded(self):
+        """Test that the least recently used entries are evicted at the cap."""
+        backend = MemoryCacheBackend(max_entries=10)
+        cache = ResponseCache(backend)
+
+        for i in range(100):
+            cache.get_or_compute(f"key-{i}", ["tag"], Counter())
+
+        assert len(backend) == 10
+
+
+class TestCacheInvalidationEvents:
+    """Test cases for invalidations received through the event broker."""
+
+    def test_handler_consumes_event(self):
+        """Test that invalidation events reach the cache and not SSE clients."""
+        cache = ResponseCache(MemoryCacheBackend())
+        broker = EventBroker(buffer_size=10, heartbeat_interval=60, max_subscribers=10)
+        broker.add_handler("cache_invalidate", cache.handle_invalidation)
+        subscriber = broker.subscribe(None)
+        compute = Counter()
+        cache.get_or_compute("key", [series_tag("abc")], compute)
+
+        delivered = broker.dispatch(
+            '{"type": "cache_invalidate", "data": {"tags": ["series:abc"]}}'
+        )
+        cache.get_or_compute("key", [series_tag("abc")], compute)
+
+        assert delivered == 0
+        assert not subscriber._buffer
+        assert compute.calls == 2
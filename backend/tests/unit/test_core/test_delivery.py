@@ -0,0 +1,68 @@
+import pytest
+from fastapi.responses import FileResponse
+
+from app.core import delivery
+from app.core.config import settings
+
+
+@pytest.fixture
+def roots(tmp_path, monkeypatch):
+    for name in ("manga", "thumbnails", "processed"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(settings, "MANGA_LIBRARY_PATH", str(tmp_path / "manga"))
+    monkeypatch.setattr(settings, "THUMBNAILS_PATH", str(tmp_path / "thumbnails"))
+    monkeypatch.setattr(settings, "PROCESSED_DATA_PATH", str(tmp_path / "processed"))
+    monkeypatch.setattr(settings, "X_ACCEL_PREFIX", "/_protected")
+    return tmp_path
+
+
+class TestFileDelivery:
+    """Test cases for X-Accel-Redirect file delivery."""
+
+    def test_x_accel_redirect(self, roots, monkeypatch):
+        """Test that files under a storage root go to nginx with an empty body."""
+        monkeypatch.setattr(settings, "FILE_DELIVERY", delivery.X_ACCEL)
+        page = roots / "processed" / "pages" / "c1" / "0001.jpg"
+        page.parent.mkdir(parents=True)
+        page.write_bytes(b"jpeg")
+
+        response = delivery.file_response(str(page), "image/jpeg")
+
+        assert (
+            response.headers["X-Accel-Redirect"]
+            == "/_protected/processed/pages/c1/0001.jpg"
+        )
+        assert response.headers["Content-Type"] == "image/jpeg"
+        assert response.body == b""
+
+    def test_uri_escaped(self, roots):
+        """Test that characters nginx would treat as URI syntax are escaped."""
+        path = roots / "manga" / "Series ?" / "Ch 1 #2 100%.cbz"
+
+        assert (
+            delivery.x_accel_uri(str(path))
+            == "/_protected/manga/Series%20%3F/Ch%201%20%232%20100%25.cbz"
+        )
+
+    def test_outside_roots_served_directly(self, roots, monkeypatch, tmp_path):
+        """Test that files outside or escaping the storage roots are not redirected."""
+        monkeypatch.setattr(settings, "FILE_DELIVERY", delivery.X_ACCEL)
+        outside = tmp_path / "other.jpg"
+        outside.write_bytes(b"jpeg")
+
+        assert delivery.x_accel_uri(str(roots / "manga" / ".." / "other.jpg")) is None
+        assert delivery.x_accel_uri(str(roots / "manga")) is None
+        assert isinstance(
+            delivery.file_response(str(outside), "image/jpeg"), FileResponse
+        )
+
+    def test_direct_mode(self, roots, monkeypatch):
+        """Test that the default mode serves the file from the API."""
+        monkeypatch.setattr(settings, "FILE_DELIVERY", delivery.DIRECT)
+        page = roots / "processed" / "0001.jpg"
+        page.write_bytes(b"jpeg")
+
+        response = delivery.file_response(str(page), "image/jpeg")
+
+        assert isinstance(response, FileResponse)
+        assert "X-Accel-Redirect" not in response.headers
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.events import DROPPED_MESSAGE, HEARTBEAT_MESSAGE, EventBroker
+
+
+async def next_message(subscriber, stream=None):
+    stream = stream or subscriber.messages()
+    return await asyncio.wait_for(stream.__anext__(), timeout=1)
+
+
+class TestEventBroker:
+    """Test cases for server-sent event fan-out."""
+
+    def test_user_and_broadcast_events(self):
+        """Test that user events reach only that user and broadcasts reach everyone."""
+        async def scenario():
+            broker = EventBroker(
+                buffer_size=10, heartbeat_interval=60, max_subscribers=10
+            )
+            alice, bob = broker.subscribe(1), broker.subscribe(2)
+
+            scan = {"type": "scan_progress", "data": {"n": 1}, "user_id": 1}
+            added = {"type": "chapters_added", "data": {}, "user_id": None}
+            assert broker.dispatch(json.dumps(scan)) == 1
+            assert broker.dispatch(json.dumps(added)) == 2
+
+            alice_stream, bob_stream = alice.messages(), bob.messages()
+            first = await next_message(alice, alice_stream)
+            assert first.startswith("id: 1\nevent: scan_progress\n")
+            assert 'data: {"n": 1}' in first
+            assert "event: chapters_added" in await next_message(alice, alice_stream)
+            assert "event: chapters_added" in await next_message(bob, bob_stream)
+
+        asyncio.run(scenario())
+
+    def test_slow_consumer_dropped(self):
+        """Test that overflowing a buffer drops the subscriber and frees its buffer."""
+        async def scenario():
+            broker = EventBroker(
+                buffer_size=2, heartbeat_interval=60, max_subscribers=10
+            )
+            slow = broker.subscribe(1)
+            for _ in range(3):
+                broker.send("scan_progress", {})
+
+            assert slow.dropped
+            assert len(broker) == 0
+            assert broker.dropped_total == 1
+            assert await next_message(slow) == DROPPED_MESSAGE
+
+        asyncio.run(scenario())
+
+    def test_heartbeat_takes_no_buffer_space(self):
+        """Test that heartbeats are delivered without filling the buffer."""
+        async def scenario():
+            broker = EventBroker(
+                buffer_size=1, heartbeat_interval=60, max_subscribers=10
+            )
+            subscriber = broker.subscribe(1)
+            for _ in range(5):
+                broker.ping_all()
+            broker.send("scan_progress", {})
+
+            stream = subscriber.messages()
+            assert "event: scan_progress" in await next_message(subscriber, stream)
+            assert await next_message(subscriber, stream) == HEARTBEAT_MESSAGE
+            assert not subscriber.dropped
+
+        asyncio.run(scenario())
+
+    def test_subscriber_limit(self):
+        """Test that subscriptions beyond the limit are refused."""
+        broker = EventBroker(buffer_size=1, heartbeat_interval=60, max_subscribers=1)
+        subscriber = broker.subscribe(1)
+        with pytest.raises(RuntimeError):
+            broker.subscribe(2)
+        broker.unsubscribe(subscriber)
+        broker.unsubscribe(subscriber)
+        assert len(broker) == 0
+        broker.subscribe(2)
+
+    def test_malformed_payload_ignored(self):
+        """Test that payloads that aren't events are ignored."""
+        broker = EventBroker(buffer_size=1, heartbeat_interval=60, max_subscribers=1)
+        broker.subscribe(1)
+        assert broker.dispatch("not json") == 0
+        assert broker.dispatch('{"data": 1}') == 0
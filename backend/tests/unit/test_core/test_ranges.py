@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.ranges import (
+    RangeNotSatisfiable,
+    content_range_header,
+    parse_range_header,
+)
+
+
+class TestParseRangeHeader:
+    """Test cases for Range header parsing."""
+
+    def test_single_ranges(self):
+        """Test explicit, open-ended and suffix ranges."""
+        assert parse_range_header("bytes=0-99", 1000) == (0, 100)
+        assert parse_range_header("bytes=900-", 1000) == (900, 1000)
+        assert parse_range_header("bytes=-100", 1000) == (900, 1000)
+        assert parse_range_header("bytes=990-5000", 1000) == (990, 1000)
+
+    def test_full_response_cases(self):
+        """Test that missing, malformed and multi-range headers send everything."""
+        assert parse_range_header(None, 1000) is None
+        assert parse_range_header("items=0-1", 1000) is None
+        assert parse_range_header("bytes=0-1,5-9", 1000) is None
+        assert parse_range_header("bytes=abc", 1000) is None
+
+    def test_if_range(self):
+        """Test that a stale If-Range validator disables the range."""
+        assert parse_range_header("bytes=0-9", 1000, if_range='"a"', etag='"a"') == (
+            0,
+            10,
+        )
+        assert (
+            parse_range_header("bytes=0-9", 1000, if_range='"old"', etag='"a"') is None
+        )
+
+    def test_unsatisfiable(self):
+        """Test that ranges past the end raise RangeNotSatisfiable."""
+        with pytest.raises(RangeNotSatisfiable) as exc:
+            parse_range_header("bytes=1000-", 1000)
+        assert exc.value.content_range_header == "bytes */1000"
+        assert content_range_header(0, 10, 1000) == "bytes 0-9/1000"
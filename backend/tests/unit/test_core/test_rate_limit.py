@@ -0,0 +1,217 @@
+import asyncio
+import sys
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import auth
+from app.core import startup
+from app.core.config import settings
+from app.core.forwarded import parse_networks, resolve_client_ip
+from app.core.rate_limit import (
+    LoginRateLimiter,
+    MemoryRateLimitBackend,
+    RateLimit,
+    RateLimitExceeded,
+    create_backend,
+)
+from app.main import create_app
+from app.services.user import UserService
+
+
+class TestMemoryRateLimitBackend:
+    """Test cases for the in-memory token bucket backend."""
+
+    def test_allows_burst_then_rejects(self):
+        """Test that hits beyond capacity are rejected with a retry delay."""
+        backend = MemoryRateLimitBackend()
+        limit = RateLimit(capacity=3, period=60)
+
+        assert [backend.hit("key", limit) for _ in range(3)] == [0, 0, 0]
+        retry_after = backend.hit("key", limit)
+
+        assert 0 < retry_after <= 20
+
+    def test_reset_refills_bucket(self):
+        """Test that resetting a key starts it from a full bucket."""
+        backend = MemoryRateLimitBackend()
+        limit = RateLimit(capacity=1, period=60)
+        backend.hit("key", limit)
+
+        backend.reset("key")
+
+        assert backend.hit("key", limit) == 0
+
+    def test_memory_is_bounded(self):
+        """Test that the least recently used buckets are evicted at the cap."""
+        backend = MemoryRateLimitBackend(max_keys=100)
+        limit = RateLimit(capacity=1, period=60)
+
+        for i in range(1000):
+            backend.hit(f"key-{i}", limit)
+
+        assert len(backend) == 100
+
+
+class TestRedisRateLimitBackend:
+    """Test cases for the Redis backend's client configuration."""
+
+    def test_client_has_socket_timeouts(self, monkeypatch):
+        """Test that the Redis client is built with the configured socket timeouts."""
+        created = {}
+
+        class FakeRedis:
+            @classmethod
+            def from_url(cls, url, **kwargs):
+                created.update(kwargs, url=url)
+                return cls()
+
+            def register_script(self, script):
+                return None
+
+        monkeypatch.setitem(
+            sys.modules, "redis", types.SimpleNamespace(Redis=FakeRedis)
+        )
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://cache:6379/0")
+        monkeypatch.setattr(settings, "RATE_LIMIT_REDIS_TIMEOUT_SECONDS", 0.25)
+
+        create_backend("redis")
+
+        assert created == {
+            "url": "redis://cache:6379/0",
+            "socket_timeout": 0.25,
+            "socket_connect_timeout": 0.25,
+        }
+
+
+class TestLoginRateLimiter:
+    """Test cases for per-IP and per-username login limits."""
+
+    def test_username_limit_across_ips(self):
+        """Test that one username is limited even when IPs rotate."""
+        limiter = LoginRateLimiter(
+            MemoryRateLimitBackend(), RateLimit(100, 60), RateLimit(2, 60)
+        )
+
+        limiter.check("10.0.0.1", "admin")
+        limiter.check("10.0.0.2", "Admin ")
+        with pytest.raises(RateLimitExceeded):
+            limiter.check("10.0.0.3", "admin")
+
+    def test_ip_limit_across_usernames(self):
+        """Test that one IP is limited even when usernames rotate."""
+        limiter = LoginRateLimiter(
+            MemoryRateLimitBackend(), RateLimit(2, 60), RateLimit(100, 60)
+        )
+
+        limiter.check("10.0.0.1", "alice")
+        limiter.check("10.0.0.1", "bob")
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            limiter.check("10.0.0.1", "carol")
+
+        assert exc_info.value.retry_after_header == "30"
+
+
+class TestResolveClientIp:
+    """Test cases for client IP resolution behind trusted proxies."""
+
+    trusted = parse_networks(("172.28.0.0/16",))
+
+    def test_forwarded_from_trusted_proxy(self):
+        """Test that the right-most untrusted hop is the client, not spoofed entries."""
+        client = resolve_client_ip(
+            "172.28.0.3", "6.6.6.6, 203.0.113.7, 172.28.0.9", self.trusted
+        )
+
+        assert client == "203.0.113.7"
+
+    def test_forwarded_from_untrusted_peer_ignored(self):
+        """Test that a client talking to the API directly cannot pick its own IP."""
+        client = resolve_client_ip("203.0.113.7", "6.6.6.6", self.trusted)
+
+        assert client == "203.0.113.7"
+
+    def test_no_trusted_proxies_configured(self):
+        """Test that the peer is used when no proxy is trusted."""
+        assert resolve_client_ip("172.28.0.3", "203.0.113.7", []) == "172.28.0.3"
+
+
+class TestLoginEndpointRateLimit:
+    """Test cases for rate limiting on the login endpoint."""
+
+    def test_rejected_before_authentication(self, monkeypatch):
+        """Test that excess attempts get 429 without reaching bcrypt."""
+        monkeypatch.setattr(startup, "_warmup_steps", {})
+        limiter = LoginRateLimiter(
+            MemoryRateLimitBackend(), RateLimit(100, 60), RateLimit(2, 60)
+        )
+        monkeypatch.setattr(auth, "get_login_rate_limiter", lambda: limiter)
+        calls = []
+        monkeypatch.setattr(
+            UserService, "authenticate_user", lambda self, u, p: calls.append(u)
+        )
+
+        with TestClient(create_app()) as client:
+            statuses = [
+                client.post(
+                    "/api/v1/auth/login",
+                    data={"username": "admin", "password": "guess"},
+                )
+                for _ in range(4)
+            ]
+
+        assert [r.status_code for r in statuses] == [401, 401, 429, 429]
+        assert statuses[2].headers["Retry-After"] == "30"
+        assert len(calls) == 2
+
+    def test_backend_called_off_event_loop(self, monkeypatch):
+        """Test that backend calls, Redis round trips, run in the threadpool."""
+        monkeypatch.setattr(startup, "_warmup_steps", {})
+        on_loop = []
+
+        class RecordingBackend(MemoryRateLimitBackend):
+            def hit(self, key, limit):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(True)
+                except RuntimeError:
+                    on_loop.append(False)
+                return super().hit(key, limit)
+
+        limiter = LoginRateLimiter(
+            RecordingBackend(), RateLimit(100, 60), RateLimit(100, 60)
+        )
+        monkeypatch.setattr(auth, "get_login_rate_limiter", lambda: limiter)
+        monkeypatch.setattr(UserService, "authenticate_user", lambda self, u, p: None)
+
+        with TestClient(create_app()) as client:
+            client.post(
+                "/api/v1/auth/login", data={"username": "admin", "password": "guess"}
+            )
+
+        assert on_loop == [False, False]
+
+    def test_forwarded_clients_get_own_buckets(self, monkeypatch):
+        """Test that clients behind the proxy are limited by their forwarded IP."""
+        monkeypatch.setattr(startup, "_warmup_steps", {})
+        monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["172.28.0.0/16"])
+        limiter = LoginRateLimiter(
+            MemoryRateLimitBackend(), RateLimit(2, 60), RateLimit(100, 60)
+        )
+        monkeypatch.setattr(auth, "get_login_rate_limiter", lambda: limiter)
+        monkeypatch.setattr(UserService, "authenticate_user", lambda self, u, p: None)
+
+        def attempt(client, forwarded_for, username):
+            return client.post(
+                "/api/v1/auth/login",
+                data={"username": username, "password": "guess"},
+                headers={"X-Forwarded-For": forwarded_for},
+            ).status_code
+
+        with TestClient(create_app(), client=("172.28.0.3", 50000)) as client:
+            first = [attempt(client, "203.0.113.7", name) for name in ("a", "b", "c")]
+            second = [attempt(client, "198.51.100.4", name) for name in ("d", "e")]
+
+        assert first == [401, 401, 429]
+        assert second == [401, 401]
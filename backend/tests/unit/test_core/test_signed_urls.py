@@ -0,0 +1,107 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import auth
+from app.core import startup
+from app.core.signed_urls import sign_path, verify_path
+from app.main import create_app
+from app.services.user import UserService
+
+PAGES = "/api/v1/library/chapters/0b6f4c1e-8d7e-4a33-9f5e-3f1f3b0c2a11/pages"
+
+
+class TestSignedUrls:
+    """Test cases for path-scoped media URL signatures."""
+
+    def test_valid_for_path_and_below(self):
+        """Test that a signature covers its path and the paths under it only."""
+        signature, _ = sign_path(PAGES, "alice")
+
+        assert verify_path(signature, PAGES) == "alice"
+        assert verify_path(signature, PAGES + "/3/tiles/0") == "alice"
+        assert verify_path(signature, PAGES + "-other/3") is None
+        assert verify_path(signature, "/api/v1/library/series/x/download") is None
+
+    def test_expired_rejected(self):
+        """Test that a signature stops working once it expires."""
+        signature, _ = sign_path(PAGES, "alice", ttl_seconds=-1)
+
+        assert verify_path(signature, PAGES + "/1") is None
+
+    def test_access_token_is_not_a_signature(self):
+        """Test that an access token cannot be passed off as a signature."""
+        token = auth.create_access_token(
+            {"sub": "alice"}, expires_delta=timedelta(minutes=5)
+        )
+
+        assert verify_path(token, PAGES + "/1") is None
+
+    def test_signature_is_not_an_access_token(self):
+        """Test that a leaked signature cannot be used as a bearer token."""
+        signature, _ = sign_path(PAGES, "alice")
+
+        with pytest.raises(HTTPException) as exc_info:
+            auth._user_from_token(signature, user_service=None)
+
+        assert exc_info.value.status_code == 401
+
+
+class TestMediaAuthentication:
+    """Test cases for authenticating page, tile and download requests."""
+
+    def test_signed_request_resolves_user(self, monkeypatch):
+        """Test that a signature for the requested path authenticates its subject."""
+        user = SimpleNamespace(username="alice", is_active=True)
+        monkeypatch.setattr(
+            UserService,
+            "get_user_by_username",
+            lambda self, name: user if name == "alice" else None,
+        )
+        signature, _ = sign_path(PAGES, "alice")
+
+        request = SimpleNamespace(url=SimpleNamespace(path=PAGES + "/2"))
+        other = SimpleNamespace(
+            url=SimpleNamespace(path="/api/v1/library/series/x/download")
+        )
+
+        assert auth.get_current_media_user(request, token=None, sig=signature) is user
+        with pytest.raises(HTTPException):
+            auth.get_current_media_user(other, token=None, sig=signature)
+
+    def test_query_access_token_refused_on_media(self, monkeypatch):
+        """Test that page URLs no longer accept an access token in the query string."""
+        monkeypatch.setattr(startup, "_warmup_steps", {})
+        token = auth.create_access_token(
+            {"sub": "alice"}, expires_delta=timedelta(minutes=5)
+        )
+
+        with TestClient(create_app()) as client:
+            response = client.get(f"{PAGES}/1", params={"access_token": token})
+
+        assert response.status_code == 401
+
+    def test_download_url_signed_for_download(self, monkeypatch):
+        """Test that the issued download link is signed for the download path only."""
+        monkeypatch.setattr(startup, "_warmup_steps", {})
+        app = create_app()
+        app.dependency_overrides[auth.get_current_active_user] = lambda: (
+            SimpleNamespace(username="alice")
+        )
+        series_id = "5d1c0b2a-0f4e-4c1b-8a57-2b0e9d7c6f31"
+
+        with TestClient(app) as client:
+            response = client.post(
+                f"/api/v1/library/series/{series_id}/download-url", params={"volume": 2}
+            )
+        url = urlsplit(response.json()["url"])
+        query = parse_qs(url.query)
+
+        assert url.path == f"/api/v1/library/series/{series_id}/download"
+        assert query["volume"] == ["2"]
+        assert verify_path(query["sig"][0], url.path) == "alice"
+        assert verify_path(query["sig"][0], PAGES + "/1") is None
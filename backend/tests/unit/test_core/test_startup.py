@@ -0,0 +1,102 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import startup
+from app.core.startup import StartupReport, register_warmup, run_warmup
+from app.main import create_app
+
+
+@pytest.fixture
+def isolated_warmup_steps(monkeypatch):
+    """Run with an empty warmup registry so tests don't touch real backends."""
+    monkeypatch.setattr(startup, "_warmup_steps", {})
+    return startup._warmup_steps
+
+
+class TestWarmup:
+    """Test cases for warmup step registration and execution."""
+
+    def test_run_warmup_times_each_step(self, isolated_warmup_steps):
+        """Test that every registered step runs and is timed."""
+        calls = []
+        register_warmup("first")(lambda: calls.append("first"))
+        register_warmup("second")(lambda: calls.append("second"))
+
+        report = run_warmup(StartupReport())
+
+        assert calls == ["first", "second"]
+        assert set(report.warmup_ms) == {"first", "second"}
+        assert report.warmup_errors == {}
+
+    def test_run_warmup_records_failures(self, isolated_warmup_steps):
+        """Test that a failing step is recorded without aborting the others."""
+        calls = []
+
+        @register_warmup("broken")
+        def broken():
+            raise RuntimeError("backend unavailable")
+
+        register_warmup("after")(lambda: calls.append("after"))
+
+        report = run_warmup(StartupReport())
+
+        assert report.warmup_errors == {"broken": "backend unavailable"}
+        assert calls == ["after"]
+
+    def test_first_request_marked_once(self):
+        """Test that only the first successful request is recorded."""
+        report = StartupReport()
+
+        assert report.mark_first_request() is True
+        first = report.first_request_ms
+        assert report.mark_first_request() is False
+        assert report.first_request_ms == first
+
+
+class TestLifespan:
+    """Test cases for the application lifespan hook."""
+
+    def test_ready_after_warmup(self, isolated_warmup_steps):
+        """Test that readiness flips only once warmup has run."""
+        seen_ready = []
+        app = create_app()
+        register_warmup("probe")(lambda: seen_ready.append(app.state.ready))
+
+        assert app.state.ready is False
+        with TestClient(app) as client:
+            assert seen_ready == [False]
+            assert app.state.ready is True
+
+            response = client.get("/api/v1/health/startup")
+            assert response.status_code == 200
+            body = response.json()
+            assert body["ready"] is True
+            assert "app.core.config" in body["module_import_ms"]
+            assert "probe" in body["warmup_ms"]
+
+        assert app.state.ready is False
+
+    def test_probes_do_not_mark_first_request(self, isolated_warmup_steps):
+        """Test that health probes and the startup report are not the first request."""
+        app = create_app()
+        report = app.state.startup_report
+
+        with TestClient(app) as client:
+            for probe in ("live", "ready", "startup"):
+                client.get(f"/api/v1/health/{probe}")
+            assert report.first_request_ms is None
+
+            client.get("/")
+            assert report.first_request_ms is not None
+
+    def test_apps_keep_their_own_report(self, isolated_warmup_steps):
+        """Test that building another app does not touch an existing app's timings."""
+        first = create_app()
+        timings = dict(first.state.startup_report.module_import_ms)
+
+        second = create_app()
+
+        assert second.state.startup_report is not first.state.startup_report
+        assert first.state.startup_report.module_import_ms == timings
+        assert set(second.state.startup_report.module_import_ms) == set(timings)
+        assert second.state.startup_report.app_created_ms is not None
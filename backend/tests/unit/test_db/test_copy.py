@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.db.copy import encode_copy_value
+
+
+class TestEncodeCopyValue:
+    """Test cases for COPY text format encoding."""
+
+    def test_null_and_scalars(self):
+        """Test NULL, booleans and numbers."""
+        assert encode_copy_value(None) == "\\N"
+        assert encode_copy_value(True) == "t"
+        assert encode_copy_value(Decimal("12.50")) == "12.50"
+
+    def test_text_escapes(self):
+        """Test that delimiters and backslashes inside text are escaped."""
+        assert encode_copy_value("a\tb\nc\\d\re") == "a\\tb\\nc\\\\d\\re"
+
+    def test_timestamps_and_bytes(self):
+        """Test timestamp and bytea encoding."""
+        moment = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        assert encode_copy_value(moment) == "2024-01-02T03:04:05+00:00"
+        assert encode_copy_value(b"\x01\xff") == "\\\\x01ff"
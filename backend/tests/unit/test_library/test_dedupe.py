@@ -0,0 +1,126 @@
+import io
+import zipfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.library.dedupe import (
+    dhash,
+    find_duplicate_chapters,
+    find_near_duplicate_pairs,
+    hamming_distances,
+    hash_chapter_pages,
+    pack_hashes,
+    popcount,
+    unpack_hashes,
+)
+
+
+def make_page(seed: int, quality: int = 90) -> bytes:
+    """Render a random grayscale page and encode it as JPEG."""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 255, size=(24, 16), dtype=np.uint8)
+    image = Image.fromarray(pixels).resize((320, 480), Image.Resampling.BICUBIC)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def brute_force_pairs(hashes: np.ndarray, max_distance: int) -> set:
+    distances = popcount((hashes[:, None] ^ hashes[None, :]).ravel()).reshape(
+        len(hashes), -1
+    )
+    i, j = np.nonzero(np.triu(distances <= max_distance, k=1))
+    return set(zip(i.tolist(), j.tolist(), strict=True))
+
+
+class TestPageHashing:
+    """Test cases for perceptual page hashing."""
+
+    def test_reencoded_page_hashes_close(self):
+        """Test that re-encoding a page barely changes its hash."""
+        original = dhash(make_page(1, quality=95))
+        reencoded = dhash(make_page(1, quality=40))
+        other = dhash(make_page(2))
+
+        assert (
+            hamming_distances(original, np.array([reencoded], dtype=np.uint64))[0] <= 4
+        )
+        assert hamming_distances(original, np.array([other], dtype=np.uint64))[0] > 10
+
+    def test_hash_chapter_pages(self, tmp_path):
+        """Test hashing every page of a CBZ in reading order."""
+        path = tmp_path / "Chapter 001.cbz"
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("002.jpg", make_page(2))
+            archive.writestr("001.jpg", make_page(1))
+            archive.writestr("ComicInfo.xml", "<ComicInfo/>")
+
+        hashes = hash_chapter_pages(str(path))
+
+        assert hashes.tolist() == [dhash(make_page(1)), dhash(make_page(2))]
+
+    def test_pack_roundtrip(self):
+        """Test that packed hashes survive a storage roundtrip."""
+        hashes = np.array([0, 1, 2**64 - 1], dtype=np.uint64)
+        assert unpack_hashes(pack_hashes(hashes)).tolist() == hashes.tolist()
+
+
+class TestNearDuplicateSearch:
+    """Test cases for the multi-index Hamming search."""
+
+    @pytest.mark.parametrize("max_distance", [0, 2, 4, 6])
+    def test_matches_brute_force(self, max_distance):
+        """Test that the indexed search finds exactly the brute-force pairs."""
+        rng = np.random.default_rng(max_distance)
+        base = rng.integers(0, 2**64 - 1, size=300, dtype=np.uint64)
+        flips = np.zeros(300, dtype=np.uint64)
+        for k in range(300):
+            for bit in rng.choice(64, rng.integers(0, 9), replace=False):
+                flips[k] |= np.uint64(1) << np.uint64(bit)
+        hashes = np.concatenate([base, base ^ flips])
+
+        i, j = find_near_duplicate_pairs(
+            hashes, max_distance=max_distance, min_information_bits=0
+        )
+
+        assert set(zip(i.tolist(), j.tolist(), strict=True)) == brute_force_pairs(
+            hashes, max_distance
+        )
+
+    def test_blank_pages_ignored(self):
+        """Test that low-information hashes never match."""
+        hashes = np.array([0, 0, 1, 2**64 - 1], dtype=np.uint64)
+        i, _ = find_near_duplicate_pairs(hashes)
+        assert len(i) == 0
+
+
+class TestDuplicateChapters:
+    """Test cases for chapter-level duplicate detection."""
+
+    def test_finds_repacked_chapter_within_series(self):
+        """Test that a re-release sharing most pages is reported once."""
+        rng = np.random.default_rng(7)
+        pages = rng.integers(0, 2**64 - 1, size=20, dtype=np.uint64)
+        unrelated = rng.integers(0, 2**64 - 1, size=20, dtype=np.uint64)
+        chapter_hashes = {
+            "ch1-groupA": pages,
+            "ch1-groupB": np.concatenate([pages[:18] ^ np.uint64(1), unrelated[:1]]),
+            "ch2": unrelated,
+            "other-series-copy": pages,
+        }
+        groups = {
+            "ch1-groupA": "s1",
+            "ch1-groupB": "s1",
+            "ch2": "s1",
+            "other-series-copy": "s2",
+        }
+
+        matches = find_duplicate_chapters(chapter_hashes, groups=groups)
+
+        assert len(matches) == 1
+        match = matches[0]
+        assert {match.chapter_a, match.chapter_b} == {"ch1-groupA", "ch1-groupB"}
+        assert match.matched_pages == 18
+        assert match.similarity == pytest.approx(18 / 19)
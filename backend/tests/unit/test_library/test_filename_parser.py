@@ -0,0 +1,141 @@
+import os
+import zipfile
+from collections import defaultdict
+from decimal import Decimal
+
+from app.library.archive import ChapterArchive
+from app.library.filename_parser import (
+    infer_series_prefix,
+    natural_sort_key,
+    parse_filename,
+    parse_filenames,
+)
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "filename_corpus.tsv")
+
+
+def load_corpus() -> dict:
+    """Corpus entries grouped by directory, in listing order."""
+    directories = defaultdict(list)
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            directory, name, volume, chapter, title, extra, group = fields
+            directories[directory].append(
+                (
+                    name,
+                    {
+                        "volume_number": int(volume) if volume else None,
+                        "chapter_number": Decimal(chapter) if chapter else None,
+                        "title": title or None,
+                        "extra": bool(extra),
+                        "group": group or None,
+                    },
+                )
+            )
+    return directories
+
+
+class TestFilenameCorpus:
+    """Test cases for parsing accuracy against the file name corpus."""
+
+    def test_batch_parse_matches_corpus(self):
+        """Test that every corpus listing parses to the expected fields."""
+        mismatches = []
+        total = 0
+        for directory, entries in load_corpus().items():
+            names = [name for name, _ in entries]
+            parsed_names = parse_filenames(names)
+            for parsed, (name, expected) in zip(parsed_names, entries, strict=True):
+                total += 1
+                actual = {key: getattr(parsed, key) for key in expected}
+                if actual != expected:
+                    mismatches.append((directory, name, actual, expected))
+        assert total > 30
+        assert mismatches == []
+
+    def test_known_series_name(self):
+        """Test that single files parse correctly when the series is known."""
+        for directory, entries in load_corpus().items():
+            for name, expected in entries:
+                parsed = parse_filename(name, series=directory)
+                assert parsed.chapter_number == expected["chapter_number"], name
+                assert parsed.volume_number == expected["volume_number"], name
+
+
+class TestFilenameParser:
+    """Test cases for individual parsing rules."""
+
+    def test_seed_chapter(self):
+        """Test the file name format used by the seed data."""
+        parsed = parse_filename("Chapter 001 - Romance Dawn.cbz")
+        assert parsed.chapter_number == Decimal("1")
+        assert parsed.title == "Romance Dawn"
+        assert parsed.extension == "cbz"
+
+    def test_number_in_series_name_without_context(self):
+        """Test that a lone file uses the first bare number."""
+        name, series = "20th Century Boys 001.cbz", "20th Century Boys"
+        assert parse_filename(name).chapter_number == Decimal("20")
+        assert parse_filename(name, series=series).chapter_number == Decimal("1")
+
+    def test_dash_separated_number_preferred(self):
+        """Test that a number set off by dashes beats one earlier in the series name."""
+        parsed = parse_filename("Mob Psycho 100 - 012.5.cbz")
+        assert (parsed.chapter_number, parsed.title) == (Decimal("12.5"), None)
+        parsed = parse_filename("Mob Psycho 100 - 101 - Finale.cbz")
+        assert (parsed.chapter_number, parsed.title) == (Decimal("101"), "Finale")
+
+    def test_out_of_range_numbers_skipped(self):
+        """Test that numbers that don't fit chapters.chapter_number are ignored."""
+        parsed = parse_filename("Series 123456789 - 7.cbz")
+        assert parsed.chapter_number == Decimal("7")
+
+    def test_tags_and_group(self):
+        """Test that bracketed tags are collected and a leading one is the group."""
+        parsed = parse_filename("[Group A] Title c05 (Digital) {v2}.cbz")
+        assert parsed.group == "Group A"
+        assert parsed.tags == ("Group A", "Digital", "v2")
+        assert parsed.chapter_number == Decimal("5")
+
+
+class TestSeriesPrefixInference:
+    """Test cases for inferring the series name from a listing."""
+
+    def test_prefix_stops_before_markers(self):
+        """Test that volume and chapter markers are not part of the prefix."""
+        assert (
+            infer_series_prefix(["Berserk v01 c001.cbz", "Berserk v01 c002.cbz"])
+            == "berserk"
+        )
+        assert infer_series_prefix(["Vol 1 Ch 3.cbz", "Vol 1 Ch 4.cbz"]) is None
+        assert infer_series_prefix(["Chapter 1.cbz", "Chapter 2.cbz"]) is None
+
+    def test_single_file_has_no_prefix(self):
+        """Test that one file is not enough to infer a series name."""
+        assert infer_series_prefix(["Berserk 001.cbz", "cover.jpg"]) is None
+
+
+class TestNaturalSort:
+    """Test cases for natural sort keys."""
+
+    def test_numbers_sort_by_value(self):
+        """Test that embedded numbers sort numerically."""
+        names = ["page10.jpg", "page2.jpg", "Page1.jpg", "page02.jpg"]
+        assert sorted(names, key=natural_sort_key) == [
+            "Page1.jpg",
+            "page02.jpg",
+            "page2.jpg",
+            "page10.jpg",
+        ]
+
+    def test_archive_pages_in_natural_order(self, tmp_path):
+        """Test that archive pages are returned in natural order."""
+        path = str(tmp_path / "chapter.cbz")
+        with zipfile.ZipFile(path, "w") as archive:
+            for name in ["10.jpg", "2.jpg", "1.jpg", "notes.txt"]:
+                archive.writestr(name, b"")
+        with ChapterArchive(path) as archive:
+            assert archive.pages() == ["1.jpg", "2.jpg", "10.jpg"]
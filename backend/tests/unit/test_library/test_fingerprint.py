@@ -0,0 +1,84 @@
+import threading
+
+from app.library.fingerprint import (
+    ALGORITHM,
+    QUICK_CHUNK,
+    full_fingerprint,
+    map_threaded,
+    quick_fingerprint,
+)
+
+
+def write(path, data: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+class TestFingerprints:
+    """Test cases for archive content fingerprints."""
+
+    def test_identical_content_matches(self, tmp_path):
+        """Test that a moved copy of a file has the same fingerprints."""
+        data = bytes(range(256)) * 4000
+        original = write(tmp_path / "a.cbz", data)
+        moved = write(tmp_path / "b.cbz", data)
+
+        assert quick_fingerprint(original) == quick_fingerprint(moved)
+        assert full_fingerprint(original) == full_fingerprint(moved)
+        assert full_fingerprint(original).startswith(f"{ALGORITHM}:")
+
+    def test_quick_fingerprint_covers_size_head_and_tail(self, tmp_path):
+        """Test that the quick fingerprint changes with the size, head or tail."""
+        data = bytearray(b"x" * (QUICK_CHUNK * 4))
+        base = quick_fingerprint(write(tmp_path / "a", data))
+
+        assert quick_fingerprint(write(tmp_path / "b", data + b"x")) != base
+        data[0] = 0
+        assert quick_fingerprint(write(tmp_path / "c", data)) != base
+        data[0], data[-1] = ord("x"), 0
+        assert quick_fingerprint(write(tmp_path / "d", data)) != base
+
+    def test_middle_change_needs_full_fingerprint(self, tmp_path):
+        """Test that a same-size change mid-file is only seen by the full hash."""
+        data = bytearray(b"x" * (QUICK_CHUNK * 4))
+        first = write(tmp_path / "a", data)
+        data[QUICK_CHUNK * 2] = 0
+        second = write(tmp_path / "b", data)
+
+        assert quick_fingerprint(first) == quick_fingerprint(second)
+        assert full_fingerprint(first) != full_fingerprint(second)
+
+    def test_small_and_empty_files(self, tmp_path):
+        """Test that files shorter than one chunk are fingerprinted whole."""
+        empty = write(tmp_path / "empty", b"")
+        short = write(tmp_path / "short", b"abc")
+
+        assert quick_fingerprint(empty) != quick_fingerprint(short)
+        assert full_fingerprint(empty) != full_fingerprint(short)
+
+
+class TestMapThreaded:
+    """Test cases for the bounded fingerprinting pool."""
+
+    def test_results_in_input_order(self):
+        """Test that results come back in input order."""
+        assert list(map_threaded(lambda x: x * 2, range(100), workers=4)) == [
+            x * 2 for x in range(100)
+        ]
+
+    def test_input_consumed_lazily(self):
+        """Test that no more than twice the worker count is queued ahead."""
+        consumed = []
+        lock = threading.Lock()
+
+        def items():
+            for i in range(1000):
+                with lock:
+                    consumed.append(i)
+                yield i
+
+        results = map_threaded(lambda x: x, items(), workers=2)
+        assert next(results) == 0
+        assert len(consumed) <= 4
+        results.close()
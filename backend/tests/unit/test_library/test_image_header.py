@@ -0,0 +1,78 @@
+import io
+import zipfile
+
+import pytest
+from PIL import Image
+
+from app.library.image_header import (
+    is_spread,
+    pack_dimensions,
+    read_chapter_dimensions,
+    read_image_size,
+    unpack_dimensions,
+)
+
+
+def encode(size, image_format: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buffer, format=image_format, **params)
+    return buffer.getvalue()
+
+
+class TestImageHeader:
+    """Test cases for reading page dimensions from image headers."""
+
+    @pytest.mark.parametrize("image_format, params", [
+        ("JPEG", {}),
+        ("JPEG", {"progressive": True}),
+        ("PNG", {}),
+        ("GIF", {}),
+        ("BMP", {}),
+        ("WEBP", {}),
+        ("WEBP", {"lossless": True}),
+        ("WEBP", {"exif": b"Exif\0\0"}),
+    ])
+    def test_formats(self, image_format, params):
+        """Test that each supported format reports its size."""
+        data = encode((1203, 1750), image_format, **params)
+        assert read_image_size(io.BytesIO(data)) == (1203, 1750)
+
+    def test_jpeg_after_large_metadata(self):
+        """Test that the frame header is found after segments beyond the first read."""
+        data = encode((800, 600), "JPEG", icc_profile=b"\0" * 60000)
+        assert read_image_size(io.BytesIO(data)) == (800, 600)
+
+    def test_jpeg_exif_rotation(self):
+        """Test that rotated JPEGs report the displayed size."""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        data = encode((800, 600), "JPEG", exif=exif.tobytes())
+        assert read_image_size(io.BytesIO(data)) == (600, 800)
+
+    def test_only_header_read(self):
+        """Test that no more than the header is consumed from the stream."""
+        stream = io.BytesIO(encode((1000, 1500), "PNG") + b"\0" * 1_000_000)
+        read_image_size(stream)
+        assert stream.tell() <= 4096
+
+    @pytest.mark.parametrize(
+        "data", [b"", b"not an image", b"\xff\xd8\xff", b"RIFF\0\0\0\0WEBPVP8 "]
+    )
+    def test_unrecognized(self, data):
+        """Test that unknown or truncated headers give no size."""
+        assert read_image_size(io.BytesIO(data)) is None
+
+    def test_chapter_dimensions(self, tmp_path):
+        """Test that pages are measured in reading order, unreadable ones as zero."""
+        path = tmp_path / "chapter.cbz"
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("p10.jpg", encode((1600, 1200), "JPEG"))
+            archive.writestr("p2.png", encode((800, 1200), "PNG"))
+            archive.writestr("p3.webp", b"broken")
+
+        sizes = read_chapter_dimensions(str(path))
+
+        assert sizes == [(800, 1200), (0, 0), (1600, 1200)]
+        assert unpack_dimensions(pack_dimensions(sizes)) == sizes
+        assert len(pack_dimensions(sizes)) == 8 * len(sizes)
+        assert [is_spread(*size) for size in sizes] == [False, False, True]
@@ -0,0 +1,108 @@
+import logging
+import time
+import zipfile
+
+import pytest
+
+from app.library import archive as archive_module
+from app.library import normalize
+from app.library.archive import ArchiveError, ChapterArchive
+
+
+def make_chapter(path, names, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(path, "w", compression=compression) as archive:
+        for name in names:
+            archive.writestr(name, name.encode() * 100)
+    return str(path)
+
+
+class TestNormalize:
+    """Test cases for repacking chapter archives."""
+
+    def test_reasons(self, tmp_path, monkeypatch):
+        """Test that deflated and unordered archives are picked, stored ones are not."""
+        monkeypatch.setattr(archive_module, "rarfile", object())
+        deflated = make_chapter(tmp_path / "a.cbz", ["1.jpg", "2.jpg"])
+        unordered = make_chapter(
+            tmp_path / "b.cbz", ["10.jpg", "2.jpg"], zipfile.ZIP_STORED
+        )
+        stored = make_chapter(
+            tmp_path / "c.cbz", ["2.jpg", "10.jpg", "info.xml"], zipfile.ZIP_STORED
+        )
+
+        assert normalize.normalization_reason(deflated) == normalize.COMPRESSED_PAGES
+        assert normalize.normalization_reason(unordered) == normalize.UNORDERED_PAGES
+        assert normalize.normalization_reason(stored) is None
+        rar = str(tmp_path / "d.cbr")
+        assert normalize.normalization_reason(rar) == normalize.RAR_ARCHIVE
+
+    def test_rar_skipped_without_rarfile(self, tmp_path, monkeypatch, caplog):
+        """Test that RAR archives are skipped without rarfile, logged only once."""
+        monkeypatch.setattr(archive_module, "rarfile", None)
+        monkeypatch.setattr(normalize, "_rar_skip_logged", False)
+
+        with caplog.at_level(logging.WARNING, logger=normalize.__name__):
+            reasons = [
+                normalize.normalization_reason(str(tmp_path / name))
+                for name in ("a.cbr", "b.rar")
+            ]
+
+        assert reasons == [None, None]
+        assert len(caplog.records) == 1
+
+    def test_repack(self, tmp_path):
+        """Test that pages are stored in order, metadata kept and junk dropped."""
+        names = [
+            "p10.jpg", "ComicInfo.xml", "p2.jpg", "p1.png",
+            "__MACOSX/._p1.png", ".DS_Store",
+        ]
+        source = make_chapter(tmp_path / "c.cbz", names)
+        dest = str(tmp_path / "out" / "c.cbz")
+        (tmp_path / "out").mkdir()
+
+        result = normalize.repack(source, dest)
+
+        assert result.pages == 3
+        with zipfile.ZipFile(dest) as archive:
+            infos = archive.infolist()
+            assert [info.filename for info in infos] == [
+                "p1.png", "p2.jpg", "p10.jpg", "ComicInfo.xml"
+            ]
+            stored = [zipfile.ZIP_STORED] * 3
+            assert [info.compress_type for info in infos[:3]] == stored
+            assert archive.read("p10.jpg") == b"p10.jpg" * 100
+        assert normalize.normalization_reason(dest) is None
+        assert list((tmp_path / "out").iterdir()) == [tmp_path / "out" / "c.cbz"]
+
+    def test_in_place_failure_keeps_original(self, tmp_path, monkeypatch):
+        """Test that a failed repack leaves the original and no temporary file."""
+        source = make_chapter(tmp_path / "c.cbz", ["1.jpg", "2.jpg"])
+        with open(source, "rb") as f:
+            original = f.read()
+        monkeypatch.setattr(
+            ChapterArchive, "pages", lambda self: ["1.jpg", "missing.jpg"]
+        )
+
+        with pytest.raises(KeyError):
+            normalize.repack(source, source)
+
+        with open(source, "rb") as f:
+            assert f.read() == original
+        assert [p.name for p in tmp_path.iterdir()] == ["c.cbz"]
+
+    def test_empty_archive_rejected(self, tmp_path):
+        """Test that an archive without pages is not repacked."""
+        source = make_chapter(tmp_path / "c.cbz", ["ComicInfo.xml"])
+
+        with pytest.raises(ArchiveError):
+            normalize.repack(source, str(tmp_path / "out.cbz"))
+
+    def test_throttle(self):
+        """Test that the throttle spaces out reads to the configured rate."""
+        throttle = normalize.Throttle(bytes_per_second=1000)
+        started = time.monotonic()
+
+        for _ in range(3):
+            throttle.consume(50)
+
+        assert time.monotonic() - started >= 0.09
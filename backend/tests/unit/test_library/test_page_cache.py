@@ -0,0 +1,134 @@
+import io
+import json
+import os
+import time
+import zipfile
+
+import pytest
+from PIL import Image
+
+from app.library import tiles
+from app.library.page_cache import INDEX_NAME, PageCache
+
+
+def make_chapter(path: str, pages: int, page_size: int = 1000) -> str:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for number in range(pages, 0, -1):
+            archive.writestr(f"p{number}.jpg", bytes([number]) * page_size)
+        archive.writestr("ComicInfo.xml", b"<ComicInfo/>")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageCache(str(tmp_path / "pages"), max_bytes=10_000)
+
+
+class TestPageCache:
+    """Test cases for the extracted page tier."""
+
+    def test_extract_and_serve(self, cache, tmp_path):
+        """Test that extracted pages are plain files in reading order."""
+        source = make_chapter(str(tmp_path / "c1.cbz"), pages=3)
+
+        assert cache.page_path("c1", 1, source) is None
+        assert cache.ensure("c1", source, accessed=True)
+
+        path = cache.page_path("c1", 2, source)
+        with open(path, "rb") as f:
+            assert f.read() == bytes([2]) * 1000
+        assert cache.page_path("c1", 4, source) is None
+        assert cache.total_bytes() == 3000
+        assert not cache.ensure("c1", source)
+
+    def test_changed_source_not_served(self, cache, tmp_path):
+        """Test that a chapter replaced on disk is re-extracted, not served stale."""
+        source = make_chapter(str(tmp_path / "c1.cbz"), pages=3)
+        cache.ensure("c1", source)
+
+        make_chapter(source, pages=2, page_size=10)
+        os.utime(source, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+        assert cache.page_path("c1", 1, source) is None
+        assert cache.ensure("c1", source)
+        assert cache.total_bytes() == 20
+
+    def test_evicts_lowest_score_within_budget(self, cache, tmp_path):
+        """Test that eviction keeps often-read chapters and the protected one."""
+        for name in ("hot", "cold", "new"):
+            make_chapter(str(tmp_path / f"{name}.cbz"), pages=4)
+        for _ in range(3):
+            cache.ensure("hot", str(tmp_path / "hot.cbz"), accessed=True)
+        cache.ensure("cold", str(tmp_path / "cold.cbz"), accessed=True)
+        cache.ensure("new", str(tmp_path / "new.cbz"), accessed=True)
+
+        assert cache.evict(protect=["new"]) == ["cold"]
+        assert cache.total_bytes() <= 10_000
+        assert cache.page_path("cold", 1, str(tmp_path / "cold.cbz")) is None
+        assert cache.page_path("hot", 1, str(tmp_path / "hot.cbz")) is not None
+
+    def test_index_rebuilt_from_manifests(self, cache, tmp_path):
+        """Test that a lost index is recovered without re-extracting."""
+        source = make_chapter(str(tmp_path / "c1.cbz"), pages=2)
+        cache.ensure("c1", source)
+        os.remove(os.path.join(cache.root, INDEX_NAME))
+        os.mkdir(os.path.join(cache.root, "partial"))
+
+        assert not cache.ensure("c1", source)
+
+        with open(os.path.join(cache.root, INDEX_NAME)) as f:
+            assert set(json.load(f)) == {"c1"}
+        assert not os.path.exists(os.path.join(cache.root, "partial"))
+
+    def test_tall_pages_tiled(self, tmp_path):
+        """Test that only pages taller than the threshold are split into tiles."""
+        source = str(tmp_path / "strip.cbz")
+        with zipfile.ZipFile(source, "w") as archive:
+            for number, height in ((1, 250), (2, 90)):
+                buffer = io.BytesIO()
+                Image.new("RGB", (40, height), "gray").save(buffer, "PNG")
+                archive.writestr(f"p{number}.png", buffer.getvalue())
+        cache = PageCache(
+            str(tmp_path / "pages"), max_bytes=10 ** 6,
+            tile_height=100, tile_min_height=100,
+        )
+
+        cache.ensure("c1", source)
+
+        manifest = cache.load_manifest("c1")
+        spans = [(t["top"], t["height"]) for t in manifest["tiles"]["1"]]
+        assert spans == [(0, 100), (100, 100), (200, 50)]
+        assert "2" not in manifest["tiles"]
+        with Image.open(cache.tile_path("c1", 1, 2, source)) as tile:
+            assert tile.size == (40, 50)
+        assert cache.tile_path("c1", 1, 3, source) is None
+        assert cache.total_bytes() == manifest["bytes"]
+
+        # Changing the tiling settings re-extracts the chapter.
+        retiled = PageCache(
+            cache.root, max_bytes=10 ** 6, tile_height=200, tile_min_height=100
+        )
+        assert retiled.ensure("c1", source)
+        assert len(retiled.load_manifest("c1")["tiles"]["1"]) == 2
+
+    def test_oversized_page_served_whole_without_pyvips(self, monkeypatch, tmp_path):
+        """Test that a page too large for the Pillow fallback is left untiled."""
+        monkeypatch.setattr(tiles, "pyvips", None)
+        monkeypatch.setattr(tiles, "PILLOW_MAX_PIXELS", 40 * 200)
+        source = str(tmp_path / "strip.cbz")
+        with zipfile.ZipFile(source, "w") as archive:
+            for number, height in ((1, 250), (2, 150)):
+                buffer = io.BytesIO()
+                Image.new("RGB", (40, height), "gray").save(buffer, "PNG")
+                archive.writestr(f"p{number}.png", buffer.getvalue())
+        cache = PageCache(
+            str(tmp_path / "pages"), max_bytes=10 ** 6,
+            tile_height=100, tile_min_height=100,
+        )
+
+        cache.ensure("c1", source)
+
+        manifest = cache.load_manifest("c1")
+        assert set(manifest["tiles"]) == {"2"}
+        assert cache.tile_path("c1", 1, 0, source) is None
+        assert cache.page_path("c1", 1, source) is not None
@@ -0,0 +1,62 @@
+import pytest
+from PIL import Image
+
+from app.library import tiles
+
+
+@pytest.fixture(params=["pillow", "vips"])
+def backend(request, monkeypatch):
+    if request.param == "pillow":
+        monkeypatch.setattr(tiles, "pyvips", None)
+    elif tiles.pyvips is None:
+        pytest.skip("pyvips is not installed")
+    return request.param
+
+
+class TestTiles:
+    """Test cases for tiling very tall pages."""
+
+    def test_tile_plan(self):
+        """Test that tiles cover every row once, the last one shorter."""
+        assert tiles.tile_plan(5000, 2048) == [(0, 2048), (2048, 2048), (4096, 904)]
+        assert tiles.tile_plan(4096, 2048) == [(0, 2048), (2048, 2048)]
+
+    def test_tile_page(self, backend, tmp_path):
+        """Test that each tile holds its band of the page."""
+        page = Image.new("RGB", (30, 250), (255, 0, 0))
+        page.paste((0, 0, 255), (0, 100, 30, 200))
+        page.save(tmp_path / "page.png")
+        out = tmp_path / "tiles"
+        out.mkdir()
+
+        result = tiles.tile_page(str(tmp_path / "page.png"), str(out), "0001", 100)
+
+        assert result == [
+            {"file": "0001-000.jpg", "top": 0, "height": 100},
+            {"file": "0001-001.jpg", "top": 100, "height": 100},
+            {"file": "0001-002.jpg", "top": 200, "height": 50},
+        ]
+        with Image.open(out / "0001-001.jpg") as tile:
+            assert tile.size == (30, 100)
+            red, _, blue = tile.getpixel((15, 50))
+            assert blue > 200 and red < 50
+
+    def test_transparency_on_white(self, backend, tmp_path):
+        """Test that transparent areas become white in the JPEG tiles."""
+        Image.new("RGBA", (20, 40), (0, 0, 0, 0)).save(tmp_path / "page.png")
+
+        tiles.tile_page(str(tmp_path / "page.png"), str(tmp_path), "0001", 40)
+
+        with Image.open(tmp_path / "0001-000.jpg") as tile:
+            assert min(tile.getpixel((10, 20))) > 240
+
+    def test_pillow_refuses_oversized_page(self, monkeypatch, tmp_path):
+        """Test that the Pillow fallback refuses pages above its pixel limit."""
+        monkeypatch.setattr(tiles, "pyvips", None)
+        monkeypatch.setattr(tiles, "PILLOW_MAX_PIXELS", 20 * 399)
+        Image.new("RGB", (20, 400)).save(tmp_path / "page.png")
+
+        with pytest.raises(ValueError):
+            tiles.tile_page(str(tmp_path / "page.png"), str(tmp_path), "0001", 100)
+
+        assert not list(tmp_path.glob("0001-*.jpg"))
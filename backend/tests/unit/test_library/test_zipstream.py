@@ -0,0 +1,101 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from app.library import zipstream
+from app.library.zipstream import build_zip_stream
+
+
+def make_chapter(path: str, pages: dict, compression=zipfile.ZIP_STORED) -> str:
+    with zipfile.ZipFile(path, "w", compression=compression) as archive:
+        for name, data in pages.items():
+            archive.writestr(name, data)
+    return path
+
+
+@pytest.fixture
+def chapters(tmp_path):
+    first = make_chapter(str(tmp_path / "c1.cbz"), {
+        "10.jpg": os.urandom(3000),
+        "2.jpg": os.urandom(5000),
+        "ComicInfo.xml": b"<ComicInfo/>",
+    })
+    second = make_chapter(str(tmp_path / "c2.cbz"), {
+        "01.png": b"png" * 20000,
+        "02.png": os.urandom(100),
+    }, compression=zipfile.ZIP_DEFLATED)
+    return [("Chapter 001", first), ("Chapter 002 - Ünïcode", second)]
+
+
+class TestZipStream:
+    """Test cases for streamed zip generation."""
+
+    def test_generated_zip_is_valid(self, chapters):
+        """Test that the stream is a valid zip with every page in order."""
+        stream = build_zip_stream(chapters)
+        data = b"".join(stream)
+        assert len(data) == stream.size
+
+        with zipfile.ZipFile(io.BytesIO(data)) as result:
+            assert result.testzip() is None
+            assert result.namelist() == [
+                "Chapter 001/2.jpg",
+                "Chapter 001/10.jpg",
+                "Chapter 002 - Ünïcode/01.png",
+                "Chapter 002 - Ünïcode/02.png",
+            ]
+            with zipfile.ZipFile(chapters[1][1]) as source:
+                assert result.read("Chapter 002 - Ünïcode/01.png") == source.read(
+                    "01.png"
+                )
+                # Deflated pages are passed through, not recompressed.
+                assert (
+                    result.getinfo("Chapter 002 - Ünïcode/01.png").compress_type
+                    == zipfile.ZIP_DEFLATED
+                )
+
+    def test_ranges_concatenate_to_whole(self, chapters):
+        """Test that arbitrary byte ranges reassemble the full archive."""
+        stream = build_zip_stream(chapters)
+        whole = b"".join(stream)
+        cuts = sorted(
+            {
+                0,
+                1,
+                29,
+                30,
+                31,
+                3100,
+                stream.size // 2,
+                stream.central_directory_offset + 7,
+                stream.size - 3,
+                stream.size,
+            }
+        )
+        spans = list(zip(cuts, cuts[1:], strict=False))
+        pieces = [b"".join(stream.iter_range(a, b)) for a, b in spans]
+        assert [len(p) for p in pieces] == [b - a for a, b in spans]
+        assert b"".join(pieces) == whole
+
+    def test_chunks_are_bounded(self, chapters, monkeypatch):
+        """Test that no chunk exceeds CHUNK_SIZE."""
+        monkeypatch.setattr(zipstream, "CHUNK_SIZE", 1024)
+        assert max(len(chunk) for chunk in build_zip_stream(chapters)) <= 1024
+
+    def test_zip64_end_records(self, chapters, monkeypatch):
+        """Test that zip64 end records are written and readable."""
+        monkeypatch.setattr(zipstream, "_ZIP64_COUNT_LIMIT", 2)
+        stream = build_zip_stream(chapters)
+        data = b"".join(stream)
+        assert b"PK\x06\x06" in data
+        with zipfile.ZipFile(io.BytesIO(data)) as result:
+            assert len(result.namelist()) == 4
+            assert result.testzip() is None
+
+    def test_etag_changes_with_source(self, chapters):
+        """Test that rewriting a chapter changes the ETag."""
+        before = build_zip_stream(chapters).etag
+        make_chapter(chapters[0][1], {"1.jpg": b"new"})
+        assert build_zip_stream(chapters).etag != before
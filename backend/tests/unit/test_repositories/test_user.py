@@ -238,4 +238,102 @@ class TestUserRepository:
         
         # Deactivate user
         user_repository.deactivate_user(created_user.id)
-        assert user_repository.get_active_users_count() == 0
\ No newline at end of file
+        assert user_repository.get_active_users_count() == 0
+
+    def test_bulk_create_users(self, user_repository):
+        """Test creating several users in one batch."""
+        rows = [
+            (
+                1,
+                UserCreate(
+                    username="alice", email="alice@example.com", password="password123"
+                ),
+                "hash1",
+            ),
+            (
+                2,
+                UserCreate(
+                    username="bob", email="bob@example.com", password="password123"
+                ),
+                "hash2",
+            ),
+        ]
+
+        created, errors = user_repository.bulk_create_users(rows)
+
+        assert created == 2
+        assert errors == []
+        assert user_repository.get_user_by_username("bob").hashed_password == "hash2"
+        assert user_repository.get_active_users_count() == 2
+
+    def test_bulk_create_users_reports_conflicts(
+        self, user_repository, sample_user_create
+    ):
+        """Test that conflicting rows are reported without aborting the batch."""
+        user_repository.create_user(sample_user_create, "hashed_password_123")
+        rows = [
+            (
+                1,
+                UserCreate(
+                    username="testuser", email="new@example.com", password="password123"
+                ),
+                "hash1",
+            ),
+            (
+                2,
+                UserCreate(
+                    username="carol", email="test@example.com", password="password123"
+                ),
+                "hash2",
+            ),
+            (
+                3,
+                UserCreate(
+                    username="dave", email="dave@example.com", password="password123"
+                ),
+                "hash3",
+            ),
+            (
+                4,
+                UserCreate(
+                    username="dave", email="dave2@example.com", password="password123"
+                ),
+                "hash4",
+            ),
+        ]
+
+        created, errors = user_repository.bulk_create_users(rows)
+
+        assert created == 1
+        assert [(e.row, e.field) for e in errors] == [
+            (1, "username"),
+            (2, "email"),
+            (4, "username"),
+        ]
+        assert user_repository.get_user_by_username("dave").email == "dave@example.com"
+
+    def test_bulk_create_users_rejected_row_claims_nothing(self, user_repository):
+        """Test that a row rejected for its email leaves its username free."""
+        rows = [
+            (
+                1,
+                UserCreate(username="alice", email="a@x.com", password="password123"),
+                "hash1",
+            ),
+            (
+                2,
+                UserCreate(username="bob", email="a@x.com", password="password123"),
+                "hash2",
+            ),
+            (
+                3,
+                UserCreate(username="bob", email="b@x.com", password="password123"),
+                "hash3",
+            ),
+        ]
+
+        created, errors = user_repository.bulk_create_users(rows)
+
+        assert created == 2
+        assert [(e.row, e.field) for e in errors] == [(2, "email")]
+        assert user_repository.get_user_by_username("bob").email == "b@x.com"
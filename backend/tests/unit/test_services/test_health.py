@@ -0,0 +1,137 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import startup
+from app.main import create_app
+from app.services import health
+from app.services.health import HealthMonitor, HealthSnapshot
+
+
+def make_snapshot(age: float = 0.0, **overrides) -> HealthSnapshot:
+    checks = {
+        "database": {"status": "healthy", "latency_ms": 1.0},
+        "library": {"status": "healthy", "path": "/manga"},
+        "job_queue": {"status": "healthy", "lag_seconds": 0.0},
+    }
+    checks.update(overrides)
+    return HealthSnapshot(
+        checked_at=datetime.now(timezone.utc),
+        monotonic_at=time.monotonic() - age,
+        checks=checks,
+    )
+
+
+class TestReadiness:
+    """Test cases for readiness evaluation of health snapshots."""
+
+    def test_no_snapshot_is_not_ready(self):
+        """Test that readiness fails before the first check has run."""
+        monitor = HealthMonitor(interval=1, timeout=1, max_age=10)
+        assert monitor.readiness()["ready"] is False
+
+    def test_fresh_healthy_snapshot_is_ready(self):
+        """Test that a fresh healthy snapshot reports ready."""
+        monitor = HealthMonitor(interval=1, timeout=1, max_age=10)
+        monitor.snapshot = make_snapshot()
+
+        result = monitor.readiness()
+
+        assert result["ready"] is True
+        assert result["status"] == "healthy"
+
+    def test_stale_snapshot_is_not_ready(self):
+        """Test that a snapshot older than the threshold fails readiness."""
+        monitor = HealthMonitor(interval=1, timeout=1, max_age=10)
+        monitor.snapshot = make_snapshot(age=30)
+
+        result = monitor.readiness()
+
+        assert result["ready"] is False
+        assert result["reason"] == "health snapshot is stale"
+
+    def test_library_unavailable_is_not_ready(self):
+        """Test that an unreachable library mount fails readiness."""
+        monitor = HealthMonitor(interval=1, timeout=1, max_age=10)
+        monitor.snapshot = make_snapshot(
+            library={"status": "unhealthy", "error": "gone"}
+        )
+
+        result = monitor.readiness()
+
+        assert result["ready"] is False
+        assert result["reason"] == "library unavailable"
+
+    def test_queue_lag_only_degrades(self):
+        """Test that job queue lag degrades but does not fail readiness."""
+        monitor = HealthMonitor(interval=1, timeout=1, max_age=10)
+        monitor.snapshot = make_snapshot(
+            job_queue={"status": "degraded", "lag_seconds": 900}
+        )
+
+        result = monitor.readiness()
+
+        assert result["ready"] is True
+        assert result["status"] == "degraded"
+
+
+class TestChecks:
+    """Test cases for the individual dependency checks."""
+
+    def test_check_library_missing_directory(self, tmp_path):
+        """Test that a missing library path is reported unhealthy."""
+        result = health.check_library(str(tmp_path / "missing"))
+        assert result["status"] == "unhealthy"
+
+    def test_check_library_readable_directory(self, tmp_path):
+        """Test that a readable library path is reported healthy."""
+        (tmp_path / "Series").mkdir()
+        assert health.check_library(str(tmp_path))["status"] == "healthy"
+
+    def test_refresh_times_out_slow_checks(self, monkeypatch):
+        """Test that a hung check is reported unhealthy instead of blocking."""
+        monkeypatch.setattr(health, "check_library", lambda: time.sleep(0.5))
+        monitor = HealthMonitor(interval=1, timeout=0.05, max_age=10)
+
+        snapshot = asyncio.run(monitor.refresh())
+
+        assert snapshot.checks["library"]["status"] == "unhealthy"
+        assert "timed out" in snapshot.checks["library"]["error"]
+
+
+class TestProbeEndpoints:
+    """Test cases for the liveness and readiness endpoints."""
+
+    @pytest.fixture
+    def client(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(startup, "_warmup_steps", {})
+        monkeypatch.setattr(health.settings, "MANGA_LIBRARY_PATH", str(tmp_path))
+        with TestClient(create_app()) as client:
+            yield client
+
+    def test_liveness_does_no_io(self, client, monkeypatch):
+        """Test that liveness answers even when every check would fail."""
+        monkeypatch.setattr(health, "check_database", lambda: 1 / 0)
+        response = client.get("/api/v1/health/live")
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+
+    def test_readiness_uses_cached_snapshot(self, client, monkeypatch):
+        """Test that readiness does not run checks per request."""
+        calls = []
+        monkeypatch.setattr(health, "check_database", lambda: calls.append(1))
+
+        for _ in range(5):
+            response = client.get("/api/v1/health/ready")
+            assert response.status_code == 200
+
+        assert calls == []
+
+    def test_readiness_fails_when_stale(self, client):
+        """Test that readiness returns 503 once the snapshot goes stale."""
+        client.app.state.health_monitor.snapshot = make_snapshot(age=3600)
+        response = client.get("/api/v1/health/ready")
+        assert response.status_code == 503
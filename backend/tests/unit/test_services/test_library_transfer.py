@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app.services.library_transfer import (
+    LibraryTransferService,
+    _copy_payload,
+    open_export_file,
+    open_import_file,
+)
+
+
+class TestLibraryTransferFormat:
+    """Test cases for the export file format helpers."""
+
+    @pytest.mark.parametrize("suffix", [".ndjson", ".ndjson.gz", ".ndjson.zst"])
+    def test_compressed_roundtrip(self, tmp_path, suffix):
+        """Test that every supported compression reads back line by line."""
+        if suffix.endswith(".zst"):
+            pytest.importorskip("zstandard")
+        path = str(tmp_path / f"library{suffix}")
+        lines = [
+            json.dumps({"id": i, "title": f"Chapter {i}"}).encode() + b"\n"
+            for i in range(100)
+        ]
+
+        with open_export_file(path) as out:
+            for line in lines:
+                out.write(line)
+        with open_import_file(path) as source:
+            assert list(source) == lines
+
+    def test_copy_payload_escapes_backslashes(self):
+        """Test that JSON escapes survive COPY text format unescaping."""
+        line = json.dumps({"title": 'a\\b "c"\td\ne'}).encode() + b"\n"
+
+        payload = _copy_payload([line]).read()
+
+        assert payload.count(b"\n") == 1
+        assert b"\t" not in payload
+        # COPY turns every doubled backslash back into one.
+        assert payload.replace(b"\\\\", b"\\") == line
+
+    def test_upsert_skips_identical_rows(self):
+        """Test that updates only fire when a column actually changed."""
+        sql = LibraryTransferService._upsert_sql(
+            "series", ["id", "title_primary", "status"]
+        )
+
+        assert (
+            'ON CONFLICT (id) DO UPDATE SET "title_primary" = EXCLUDED."title_primary"'
+            in sql
+        )
+        assert "IS DISTINCT FROM" in sql
+        assert '"id" = EXCLUDED' not in sql
+
+    def test_upsert_uses_composite_keys(self):
+        """Test that progress rows conflict on their composite key, never updated."""
+        sql = LibraryTransferService._upsert_sql(
+            "reading_progress", ["user_id", "chapter_id", "is_read"]
+        )
+
+        assert (
+            'ON CONFLICT (user_id, chapter_id) DO UPDATE SET '
+            '"is_read" = EXCLUDED."is_read"'
+        ) in sql
+        assert '"chapter_id" = EXCLUDED' not in sql
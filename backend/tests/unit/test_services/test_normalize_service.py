@@ -0,0 +1,30 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.normalize import PROCESSED, REPLACE, NormalizeService
+
+
+class TestNormalizeTarget:
+    """Test cases for checking the normalization target before a batch."""
+
+    def test_replace_needs_writable_library(self, monkeypatch):
+        """Test that replacing files on a read-only library fails the batch up front."""
+        monkeypatch.setattr(os, "access", lambda path, mode: False)
+        db = MagicMock()
+
+        with pytest.raises(RuntimeError, match="read-write"):
+            NormalizeService(db, target=REPLACE).run_batch()
+
+        db.execute.assert_not_called()
+
+    def test_processed_target_ignores_library_mount(self, monkeypatch):
+        """Test that copies under the processed path work with a read-only library."""
+        monkeypatch.setattr(os, "access", lambda path, mode: False)
+        service = NormalizeService(MagicMock(), target=PROCESSED)
+        monkeypatch.setattr(
+            service.chapter_repo, "get_normalize_candidates", lambda after_id, limit: []
+        )
+
+        assert service.run_batch(batch_size=10).checked == 0
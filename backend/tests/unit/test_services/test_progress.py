@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.schemas.progress import ProgressUpdate
+from app.services.progress import latest_per_chapter
+
+
+class TestLatestPerChapter:
+    """Test cases for collapsing a progress batch to one update per chapter."""
+
+    def test_newest_update_wins(self):
+        """Test that a chapter's latest update is kept, wherever it is in the batch."""
+        chapter = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        newer = ProgressUpdate(chapter_id=chapter, last_page_read=12, updated_at=now)
+        older = ProgressUpdate(
+            chapter_id=chapter, last_page_read=3, updated_at=now - timedelta(hours=1)
+        )
+        other = ProgressUpdate(chapter_id=uuid.uuid4(), is_read=True)
+
+        assert latest_per_chapter([newer, other, older]) == [newer, other]
+
+    def test_missing_timestamp_means_now(self):
+        """Test that an update without a timestamp wins; the last sent breaks ties."""
+        chapter = uuid.uuid4()
+        recorded = ProgressUpdate(
+            chapter_id=chapter, last_page_read=3, updated_at=datetime.now(timezone.utc)
+        )
+        first = ProgressUpdate(chapter_id=chapter, last_page_read=5)
+        last = ProgressUpdate(chapter_id=chapter, last_page_read=7)
+
+        assert latest_per_chapter([first, recorded]) == [first]
+        assert latest_per_chapter([recorded, first, last]) == [last]
@@ -0,0 +1,24 @@
+import pytest
+
+from app.services.sync import SyncCursor
+
+
+class TestSyncCursor:
+    """Test cases for opaque sync cursors."""
+
+    def test_round_trip(self):
+        """Test that a cursor decodes to the state it was encoded from."""
+        cursor = SyncCursor(
+            since=1234, since_at=1700000000.5, after=99, next=1300, next_at=1700000100.0
+        )
+        encoded = cursor.encode()
+        assert "=" not in encoded
+        assert SyncCursor.decode(encoded) == cursor
+
+    @pytest.mark.parametrize(
+        "value", ["", "garbage", "eyJ2IjoyfQ", "eyJ2IjoxLCJ4Ijp0cnVlfQ"]
+    )
+    def test_invalid_cursor(self, value):
+        """Test that malformed, other-version and unknown-field cursors are rejected."""
+        with pytest.raises(ValueError, match="Invalid sync cursor"):
+            SyncCursor.decode(value)
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from app.services.user_import import detect_format, parse_user_import
+
+
+class TestUserImportParsing:
+    """Test cases for bulk user import file parsing."""
+
+    def test_parse_csv(self):
+        """Test parsing a CSV file with an optional column left empty."""
+        content = (
+            "username,email,password,full_name\n"
+            "alice,alice@example.com,password123,Alice\n"
+            "bob,bob@example.com,password123,\n"
+        ).encode()
+
+        rows, errors = parse_user_import(content, "csv")
+
+        assert errors == []
+        assert [(row_no, user.username) for row_no, user in rows] == [
+            (1, "alice"),
+            (2, "bob"),
+        ]
+        assert rows[1][1].full_name is None
+
+    def test_parse_json_wrapped(self):
+        """Test parsing a JSON object with a users list."""
+        content = json.dumps(
+            {
+                "users": [
+                    {
+                        "username": "alice",
+                        "email": "alice@example.com",
+                        "password": "password123",
+                    },
+                ]
+            }
+        )
+
+        rows, errors = parse_user_import(content, "json")
+
+        assert len(rows) == 1
+        assert errors == []
+
+    def test_invalid_rows_reported_by_row_number(self):
+        """Test that invalid rows are reported while valid rows are kept."""
+        content = json.dumps(
+            [
+                {
+                    "username": "alice",
+                    "email": "alice@example.com",
+                    "password": "password123",
+                },
+                {"username": "bob", "email": "not-an-email", "password": "password123"},
+                {
+                    "username": "carol",
+                    "email": "carol@example.com",
+                    "password": "short",
+                },
+            ]
+        )
+
+        rows, errors = parse_user_import(content, "json")
+
+        assert [row_no for row_no, _ in rows] == [1]
+        assert [(e.row, e.field) for e in errors] == [(2, "email"), (3, "password")]
+
+    def test_csv_missing_columns(self):
+        """Test that a CSV without the required header is rejected."""
+        with pytest.raises(ValueError, match="missing columns: password"):
+            parse_user_import(b"username,email\nalice,alice@example.com\n", "csv")
+
+    def test_detect_format(self):
+        """Test import format detection."""
+        assert detect_format("users.CSV") == "csv"
+        assert detect_format("upload", "application/json") == "json"
+        with pytest.raises(ValueError):
+            detect_format("users.xlsx")
@@ -0,0 +1,18 @@
+from datetime import date
+
+from app.workers.queue import partition_day, partition_name
+
+
+class TestJobHistoryPartitions:
+    """Test cases for naming the daily job history partitions."""
+
+    def test_name_round_trip(self):
+        """Test that a partition name maps back to its day."""
+        assert partition_name(date(2026, 3, 7)) == "job_history_p20260307"
+        assert partition_day("job_history_p20260307") == date(2026, 3, 7)
+
+    def test_other_tables_ignored(self):
+        """Test that tables not named like partitions are never taken for one."""
+        assert partition_day("job_history") is None
+        assert partition_day("job_history_p2026037") is None
+        assert partition_day("job_history_pdefault") is None